@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""基准测试公共工具。
+
+将 src 目录加入模块搜索路径（并把应用日志降到 WARNING），
+提供计时和结果输出辅助函数。
+"""
+
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Tuple, TypeVar
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from utils.logger import logger  # noqa: E402
+
+logger.set_level(logging.WARNING)
+
+T = TypeVar("T")
+
+
+def timed(func: Callable[..., T], *args, repeat: int = 1, **kwargs) -> Tuple[T, float]:
+    """多次调用函数，返回最后一次的结果和最短耗时（秒）。
+
+    Args:
+        func: 被测函数
+        repeat: 重复次数
+
+    Returns:
+        (函数返回值, 最短耗时)
+    """
+    best = float("inf")
+    result = None
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def report(name: str, before: float, after: float, unit: str = "s") -> None:
+    """输出一行前后对比结果。
+
+    Args:
+        name: 测试项名称
+        before: 优化前耗时
+        after: 优化后耗时
+        unit: 单位
+    """
+    speedup = before / after if after > 0 else float("inf")
+    print(f"{name:<28} before {before:9.3f} {unit}   after {after:9.3f} {unit}   x{speedup:.1f}")
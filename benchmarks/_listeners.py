@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""本地监听端口夹具（端口扫描基准测试使用）。
+
+在 127.0.0.1 上准备三类端口：
+- open：正常监听，后台线程接受连接后立即关闭；
+- filtered：backlog 为 0 且已被一个连接占满的监听端口，之后的 SYN 会被内核
+  丢弃，连接只能超时（模拟防火墙丢包）；
+- closed：短暂绑定后释放的端口，连接会立即收到 RST。
+"""
+
+import selectors
+import socket
+import threading
+from typing import List
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class LocalListeners:
+    """本地监听端口夹具，作为上下文管理器使用。"""
+
+    def __init__(self, open_count: int = 10, filtered_count: int = 5, closed_count: int = 200) -> None:
+        """初始化夹具。
+
+        Args:
+            open_count: 开放端口数
+            filtered_count: 丢包（超时）端口数
+            closed_count: 关闭端口数
+        """
+        self.open_count = open_count
+        self.filtered_count = filtered_count
+        self.closed_count = closed_count
+        self.open_ports: List[int] = []
+        self.filtered_ports: List[int] = []
+        self.closed_ports: List[int] = []
+        self._sockets: List[socket.socket] = []
+        self._selector = selectors.DefaultSelector()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._accept_loop, daemon=True)
+
+    @property
+    def ports(self) -> List[int]:
+        """全部端口（升序）。"""
+        return sorted(self.open_ports + self.filtered_ports + self.closed_ports)
+
+    def __enter__(self) -> "LocalListeners":
+        for _ in range(self.open_count):
+            sock = self._listen(128)
+            sock.setblocking(False)
+            self._selector.register(sock, selectors.EVENT_READ)
+            self.open_ports.append(sock.getsockname()[1])
+
+        for _ in range(self.filtered_count):
+            sock = self._listen(0)
+            port = sock.getsockname()[1]
+            # 占满接受队列，之后的连接请求会被丢弃
+            filler = socket.create_connection(("127.0.0.1", port))
+            self._sockets.append(filler)
+            self.filtered_ports.append(port)
+
+        used = set(self.open_ports) | set(self.filtered_ports)
+        while len(self.closed_ports) < self.closed_count:
+            port = _free_port()
+            if port not in used:
+                used.add(port)
+                self.closed_ports.append(port)
+
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join(timeout=2)
+        self._selector.close()
+        for sock in self._sockets:
+            sock.close()
+
+    def _listen(self, backlog: int) -> socket.socket:
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        sock.listen(backlog)
+        self._sockets.append(sock)
+        return sock
+
+    def _accept_loop(self) -> None:
+        while not self._stop.is_set():
+            for key, _ in self._selector.select(timeout=0.1):
+                try:
+                    conn, _ = key.fileobj.accept()
+                    conn.close()
+                except OSError:
+                    pass
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""背景移除批处理基准测试。
+
+对比优化前逐张“解码 → 预处理 → 推理 → 合成 → gc.collect()”的处理方式与
+BackgroundRemover.iter_remove_background 的流水线批处理（线程池中解码、预处理、
+合成，多张合并为一次推理），输出每秒处理的图像数，并校验输出逐像素一致。
+
+仓库不附带模型，推理使用替身会话：每次调用有固定开销（模拟一次推理的调度
+成本），另有与图像数成正比的耗时（time.sleep，不占用 CPU，模拟在 GPU 上执行），
+输出为由输入亮度得到的掩码。
+
+用法:
+    python benchmarks/bench_background_removal.py [--images 40] [--call-overhead-ms 20] [--per-image-ms 15]
+"""
+
+import argparse
+import gc
+import io
+import time
+from typing import Callable, List
+
+import numpy as np
+from PIL import Image
+
+from _common import report, timed
+
+from services.image_service import BackgroundRemover
+
+
+class _Node:
+    def __init__(self, name: str, shape: list) -> None:
+        self.name = name
+        self.shape = shape
+
+
+class FakeSession:
+    """替身推理会话：固定调用开销 + 按图像数计的推理耗时。"""
+
+    def __init__(self, overhead: float, per_image: float, batch_dim) -> None:
+        self.overhead = overhead
+        self.per_image = per_image
+        self.inputs = [_Node("input", [batch_dim, 3, 1024, 1024])]
+        self.calls = 0
+
+    def get_inputs(self) -> List[_Node]:
+        return self.inputs
+
+    def get_outputs(self) -> List[_Node]:
+        return [_Node("output", [self.inputs[0].shape[0], 1, 1024, 1024])]
+
+    def get_providers(self) -> List[str]:
+        return ["CPUExecutionProvider"]
+
+    def run(self, _, feeds: dict) -> List[np.ndarray]:
+        self.calls += 1
+        batch = feeds["input"]
+        time.sleep(self.overhead + self.per_image * len(batch))
+        # 亮度高于中灰（归一化后大于 0）的区域视为前景
+        luma = batch.mean(axis=1, keepdims=True)
+        return [(luma > 0).astype(np.float32)]
+
+
+def make_remover(session: FakeSession) -> BackgroundRemover:
+    """用替身会话构造 BackgroundRemover（跳过模型文件检查）。"""
+    remover = BackgroundRemover.__new__(BackgroundRemover)
+    remover.sess = session
+    remover.using_gpu = False
+    remover.device_info = "CPUExecutionProvider"
+    remover.input_name = "input"
+    remover.output_name = "output"
+    remover.model_input_size = (1024, 1024)
+    batch_dim = session.get_inputs()[0].shape[0]
+    remover._fixed_batch = batch_dim if isinstance(batch_dim, int) and batch_dim > 0 else None
+    remover.max_batch = remover._fixed_batch or BackgroundRemover.DEFAULT_MAX_BATCH
+    remover.workers = 4
+    return remover
+
+
+def reference_remove_background(remover: BackgroundRemover, image: Image.Image) -> Image.Image:
+    """优化前的单张处理（每张结束后强制 gc.collect()）。"""
+    try:
+        orig_im = image.convert("RGB") if image.mode != "RGB" else image
+        orig_im_size = orig_im.size[::-1]
+        image_tensor = remover._preprocess_image(np.array(orig_im), remover.model_input_size)
+        result = remover.sess.run([remover.output_name], {remover.input_name: image_tensor})[0]
+        mask = remover._postprocess_image(result, orig_im_size)
+        rgba_image = Image.new("RGBA", orig_im.size)
+        rgba_image.paste(orig_im, (0, 0))
+        rgba_image.putalpha(Image.fromarray(mask, mode='L'))
+        return rgba_image
+    finally:
+        gc.collect()
+
+
+def make_images(count: int, width: int, height: int) -> List[bytes]:
+    """生成合成的 JPEG 图像数据（渐变背景上的亮色圆形）。"""
+    rng = np.random.default_rng(0)
+    yy, xx = np.mgrid[0:height, 0:width]
+    encoded = []
+    for _ in range(count):
+        cx, cy = rng.integers(width // 4, width * 3 // 4), rng.integers(height // 4, height * 3 // 4)
+        radius = rng.integers(min(width, height) // 8, min(width, height) // 3)
+        pixels = np.empty((height, width, 3), dtype=np.uint8)
+        pixels[..., 0] = (xx * 100 // width).astype(np.uint8)
+        pixels[..., 1] = (yy * 100 // height).astype(np.uint8)
+        pixels[..., 2] = 60
+        pixels[(xx - cx) ** 2 + (yy - cy) ** 2 < radius ** 2] = (240, 220, 200)
+        buffer = io.BytesIO()
+        Image.fromarray(pixels).save(buffer, format="JPEG", quality=90)
+        encoded.append(buffer.getvalue())
+    return encoded
+
+
+def loader(data: bytes) -> Callable[[], Image.Image]:
+    return lambda: Image.open(io.BytesIO(data))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=int, default=40, help="图像数")
+    parser.add_argument("--width", type=int, default=1600, help="图像宽度")
+    parser.add_argument("--height", type=int, default=1200, help="图像高度")
+    parser.add_argument("--call-overhead-ms", type=float, default=20.0, help="替身会话每次调用的固定开销（毫秒）")
+    parser.add_argument("--per-image-ms", type=float, default=15.0, help="替身会话每张图像的推理耗时（毫秒）")
+    args = parser.parse_args()
+
+    encoded = make_images(args.images, args.width, args.height)
+    overhead = args.call_overhead_ms / 1000
+    per_image = args.per_image_ms / 1000
+    print(f"{args.images} JPEG images {args.width}x{args.height}, call overhead {args.call_overhead_ms:g} ms, "
+          f"{args.per_image_ms:g} ms/image")
+
+    old_session = FakeSession(overhead, per_image, "batch")
+    old_remover = make_remover(old_session)
+    old_results, old_time = timed(
+        lambda: [reference_remove_background(old_remover, Image.open(io.BytesIO(data))) for data in encoded]
+    )
+
+    for batch_dim in ("batch", 1):
+        session = FakeSession(overhead, per_image, batch_dim)
+        remover = make_remover(session)
+        results, new_time = timed(lambda: list(remover.iter_remove_background(loader(data) for data in encoded)))
+        label = "dynamic batch" if batch_dim == "batch" else "fixed batch 1"
+        report(f"pipeline ({label})", old_time, new_time)
+        print(f"  images/s: before {args.images / old_time:.1f}   after {args.images / new_time:.1f}   "
+              f"session calls: before {old_session.calls}   after {session.calls}")
+        same = sum(
+            error is None and np.array_equal(np.asarray(result), np.asarray(reference))
+            for (result, error), reference in zip(results, old_results)
+        )
+        print(f"  identical output: {same}/{args.images}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""FFmpeg 进度解析基准测试。
+
+合成一次长时间编码的 stderr 输出，对比优化前每行两次正则匹配的读取线程
+与 FFmpegProgressReader 解析 -progress 键值协议的 CPU 耗时和回调次数。
+
+优化前使用 -stats，stderr 中每个进度块之外还有一行人类可读的统计行；
+优化后使用 -nostats，只有进度块。两者都包含相同的 ffmpeg 日志行。
+
+用法:
+    python benchmarks/bench_ffmpeg_progress.py [--hours 2] [--speed 4]
+"""
+
+import argparse
+import io
+import re
+import time
+from typing import Callable, List
+
+from _common import report
+
+from utils.ffmpeg_progress import FFmpegProgressReader
+
+# ffmpeg 每 0.5 秒（墙钟时间）输出一个进度块
+PROGRESS_PERIOD = 0.5
+
+
+def make_stderr(hours: float, speed: float, stats_lines: bool) -> bytes:
+    """生成 ffmpeg stderr 内容。
+
+    Args:
+        hours: 媒体时长（小时）
+        speed: 编码速度（相对实时的倍数）
+        stats_lines: 是否包含 -stats 的统计行（优化前）
+    """
+    duration = hours * 3600
+    step = PROGRESS_PERIOD * speed
+    parts: List[bytes] = [
+        b"ffmpeg version 6.1 Copyright (c) 2000-2023 the FFmpeg developers\n",
+        b"Input #0, mov,mp4,m4a,3gp,3g2,mj2, from 'input.mp4':\n",
+        b"  Duration: 02:00:00.00, start: 0.000000, bitrate: 8000 kb/s\n",
+        b"Stream mapping:\n",
+        b"  Stream #0:0 -> #0:0 (h264 (native) -> h264 (libx264))\n",
+    ]
+    t = 0.0
+    frame = 0
+    while t < duration:
+        t = min(t + step, duration)
+        frame = int(t * 30)
+        size = int(t * 1_000_000)
+        h, rem = divmod(t, 3600)
+        m, s = divmod(rem, 60)
+        stamp = f"{int(h):02d}:{int(m):02d}:{s:09.6f}"
+        end = t >= duration
+        parts.append((
+            f"frame={frame}\nfps={30 * speed:.2f}\nstream_0_0_q=28.0\n"
+            f"bitrate=8000.0kbits/s\ntotal_size={size}\nout_time_us={int(t * 1e6)}\n"
+            f"out_time_ms={int(t * 1e6)}\nout_time={stamp}\ndup_frames=0\ndrop_frames=0\n"
+            f"speed={speed:.2f}x\nprogress={'end' if end else 'continue'}\n"
+        ).encode())
+        if stats_lines:
+            parts.append((
+                f"frame={frame:5d} fps={30 * speed:.0f} q=28.0 size={size // 1024:8d}kB "
+                f"time={stamp[:11]} bitrate=8000.0kbits/s speed={speed:.2f}x\n"
+            ).encode())
+    parts.append(b"[libx264 @ 0x55] kb/s:7998.12\n")
+    return b"".join(parts)
+
+
+def reference_reader(stream: io.BytesIO, duration: float, callback: Callable) -> None:
+    """优化前的读取线程主体：逐行解码并用正则提取 time= 和 speed=。"""
+    for line in iter(stream.readline, b''):
+        try:
+            line_str = line.decode('utf-8', errors='ignore').strip()
+            time_match = re.search(r"time=(\d{2}):(\d{2}):(\d{2})\.\d{2}", line_str)
+            speed_match = re.search(r"speed=\s*([\d.]+)x", line_str)
+            if time_match:
+                hours = int(time_match.group(1))
+                minutes = int(time_match.group(2))
+                seconds = int(time_match.group(3))
+                current_time = hours * 3600 + minutes * 60 + seconds
+                progress = min(current_time / duration, 0.99) if duration > 0 else 0
+                speed_str = f"{speed_match.group(1)}x" if speed_match else "N/A"
+                if speed_match and float(speed_match.group(1)) > 0:
+                    remaining_seconds = (duration - current_time) / float(speed_match.group(1))
+                    remaining_time_str = f"{int(remaining_seconds // 60)}m {int(remaining_seconds % 60)}s"
+                else:
+                    remaining_time_str = "计算中..."
+                callback(progress, speed_str, remaining_time_str)
+        except Exception:
+            pass
+
+
+def cpu_time(func: Callable, repeat: int) -> float:
+    """多次调用，返回最短的进程 CPU 时间（秒）。"""
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        start = time.process_time()
+        func()
+        best = min(best, time.process_time() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hours", type=float, default=2.0, help="媒体时长（小时）")
+    parser.add_argument("--speed", type=float, default=4.0, help="编码速度（相对实时的倍数）")
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数")
+    args = parser.parse_args()
+
+    duration = args.hours * 3600
+    old_data = make_stderr(args.hours, args.speed, stats_lines=True)
+    new_data = make_stderr(args.hours, args.speed, stats_lines=False)
+    blocks = new_data.count(b"progress=")
+    print(f"{args.hours:g} h at {args.speed:g}x: {blocks} progress blocks, "
+          f"stderr {len(old_data) / 1024:.0f} KB before / {len(new_data) / 1024:.0f} KB after")
+
+    old_calls = []
+
+    def run_old() -> None:
+        old_calls.clear()
+        reference_reader(io.BytesIO(old_data), duration, lambda *a: old_calls.append(a))
+
+    new_calls = []
+
+    def run_new(min_interval: float) -> None:
+        new_calls.clear()
+        reader = FFmpegProgressReader(
+            io.BytesIO(new_data),
+            duration=duration,
+            on_progress=new_calls.append,
+            min_interval=min_interval,
+        )
+        # 直接在当前线程执行读取循环，只测解析开销
+        reader._run()
+
+    old_time = cpu_time(run_old, args.repeat)
+    unthrottled = cpu_time(lambda: run_new(0.0), args.repeat)
+    unthrottled_calls = len(new_calls)
+    throttled = cpu_time(lambda: run_new(PROGRESS_PERIOD), args.repeat)
+
+    report("parse (unthrottled)", old_time, unthrottled)
+    report("parse (throttled)", old_time, throttled)
+    print(f"  callbacks: before {len(old_calls)}   after {unthrottled_calls} unthrottled, "
+          f"{len(new_calls)} throttled (stream replayed instantly)")
+    print(f"  final progress: {new_calls[-1].progress:.2f}, out_time {new_calls[-1].out_time:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
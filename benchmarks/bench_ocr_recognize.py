@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""OCR 文字识别批处理基准测试。
+
+在合成的文档图像上对比逐框识别（优化前的代码）与 OCRService.recognize_text
+的按宽高比分批识别，输出每秒识别的文本行数，并校验两者结果一致。
+
+仓库不附带模型，方向分类和识别使用替身会话：每次调用有固定开销
+（模拟一次推理的调度/启动成本），计算量与输入像素数成正比，
+输出形状与 PaddleOCR 识别模型一致。
+
+用法:
+    python benchmarks/bench_ocr_recognize.py [--lines 300] [--call-overhead-ms 1.0]
+"""
+
+import argparse
+import time
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+
+from _common import report, timed
+
+from services.ocr_service import OCRService
+
+ALPHABET = "abcdefghijklmnopqrstuvwxyz0123456789"
+
+
+class _Input:
+    def __init__(self, name: str, shape: list) -> None:
+        self.name = name
+        self.shape = shape
+
+
+class FakeSession:
+    """替身推理会话：固定调用开销 + 与输入大小成正比的计算。"""
+
+    def __init__(self, name: str, shape: list, num_classes: int, overhead: float, per_column: bool) -> None:
+        self.inputs = [_Input(name, shape)]
+        self.num_classes = num_classes
+        self.overhead = overhead
+        self.per_column = per_column
+        self.calls = 0
+
+    def get_inputs(self) -> List[_Input]:
+        return self.inputs
+
+    def run(self, _, feeds: dict) -> List[np.ndarray]:
+        self.calls += 1
+        time.sleep(self.overhead)
+        x = next(iter(feeds.values()))
+        n, _, _, w = x.shape
+        if not self.per_column:
+            # 方向分类：(batch, 2)，全部判为 0 度
+            score = x.mean(axis=(1, 2, 3))
+            return [np.stack([np.ones_like(score), np.zeros_like(score)], axis=1)]
+        # 识别：每 8 列输出一个时间步（不足 8 列按零填充），按列均值映射到字符类别
+        steps = -(-w // 8)
+        x = np.pad(x, ((0, 0), (0, 0), (0, 0), (0, steps * 8 - w)))
+        columns = x.reshape(n, 3, x.shape[2], steps, 8).mean(axis=(1, 2, 4))
+        classes = (np.abs(columns) * 997).astype(np.int64) % (self.num_classes - 1) + 1
+        # 白色背景和批内填充（归一化后为 0）输出 blank
+        classes[(columns > 0.99) | (columns == 0)] = 0
+        out = np.zeros((n, steps, self.num_classes), dtype=np.float32)
+        np.put_along_axis(out, classes[..., None], 1.0, axis=2)
+        return [out]
+
+
+def reference_recognize_text(service: OCRService, image: np.ndarray, boxes: List[np.ndarray]) -> List[Tuple[str, float]]:
+    """优化前的逐框识别：每个框分别调用方向分类和识别模型。"""
+    results = []
+    for box in boxes:
+        text_img = service._crop_text_region(image, box)
+        if text_img is None or text_img.size == 0:
+            results.append(("", 0.0))
+            continue
+        if service.use_angle_cls and service.cls_session:
+            angle_idx, angle_conf = service._classify_text_angle(text_img)
+            if angle_idx == 1 and angle_conf > 0.9:
+                text_img = service._rotate_image_180(text_img)
+        img_preprocessed = service._preprocess_rec(text_img)
+        input_name = service.rec_session.get_inputs()[0].name
+        outputs = service.rec_session.run(None, {input_name: img_preprocessed})
+        results.append(service._decode_text(outputs[0]))
+    return results
+
+
+def make_document(lines: int, seed: int = 0) -> Tuple[np.ndarray, List[np.ndarray]]:
+    """生成白底黑字的合成文档图像及每行的文本框。"""
+    rng = np.random.default_rng(seed)
+    line_height = 28
+    width = 1600
+    image = np.full((lines * line_height + 20, width, 3), 255, dtype=np.uint8)
+    boxes = []
+    for i in range(lines):
+        length = int(rng.integers(4, 60))
+        text = "".join(rng.choice(list(ALPHABET), length))
+        y = 10 + i * line_height
+        cv2.putText(image, text, (10, y + 20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 1, cv2.LINE_AA)
+        (text_w, _), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 1)
+        x1 = 6
+        x2 = min(width - 1, 14 + text_w)
+        boxes.append(np.array([[x1, y], [x2, y], [x2, y + 26], [x1, y + 26]], dtype=np.float32))
+    return image, boxes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=300, help="合成文档的文本行数")
+    parser.add_argument("--call-overhead-ms", type=float, default=1.0, help="替身会话每次调用的固定开销（毫秒）")
+    args = parser.parse_args()
+
+    overhead = args.call_overhead_ms / 1000
+    service = OCRService()
+    service.char_dict = ["blank"] + list(ALPHABET) + [" "]
+    service.rec_image_height = 48
+    service.use_angle_cls = True
+    service.cls_session = FakeSession("x", ["batch", 3, 80, 160], 2, overhead, per_column=False)
+    service.rec_session = FakeSession("x", ["batch", 3, 48, "width"], len(service.char_dict), overhead, per_column=True)
+    service.cls_input_name = service.rec_input_name = "x"
+
+    image, boxes = make_document(args.lines)
+    print(f"{args.lines} text lines, call overhead {args.call_overhead_ms} ms")
+
+    service.cls_session.calls = service.rec_session.calls = 0
+    ref_results, ref_time = timed(reference_recognize_text, service, image, boxes)
+    ref_calls = service.cls_session.calls + service.rec_session.calls
+
+    service.cls_session.calls = service.rec_session.calls = 0
+    new_results, new_time = timed(service.recognize_text, image, boxes)
+    new_calls = service.cls_session.calls + service.rec_session.calls
+
+    report("recognize_text", ref_time, new_time)
+    print(f"  lines/s: before {args.lines / ref_time:.0f}   after {args.lines / new_time:.0f}")
+    print(f"  session calls: before {ref_calls}   after {new_calls}")
+    same = sum(a[0] == b[0] for a, b in zip(ref_results, new_results))
+    print(f"  identical text: {same}/{len(boxes)} lines")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""端口扫描基准测试。
+
+使用本地监听端口夹具（_listeners.LocalListeners）准备开放、丢包（超时）和
+关闭三类端口，对比优化前 PortScannerView 逐个 await 连接的扫描方式与
+PortScanner 的并发扫描的耗时，并校验两者找到的开放端口一致、PortScanner
+对每类端口给出的状态正确。
+
+本机回环上开放和关闭端口的往返都很短，差距主要来自丢包端口的超时：
+优化前逐个等待，优化后并发等待。
+
+用法:
+    python benchmarks/bench_port_scan.py [--open 10] [--filtered 5] [--closed 200] [--timeout 1]
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Dict, List, Set
+
+from _common import report
+from _listeners import LocalListeners
+
+from services.port_scan_service import PortScanner, STATE_CLOSED, STATE_FILTERED, STATE_OPEN
+
+HOST = "127.0.0.1"
+
+
+async def reference_check_port(host: str, port: int, timeout: float) -> bool:
+    """优化前 PortScannerView._check_port 的连接方式。"""
+    try:
+        await asyncio.wait_for(asyncio.open_connection(host, port), timeout=timeout)
+        return True
+    except (asyncio.TimeoutError, ConnectionRefusedError, OSError):
+        return False
+
+
+async def reference_scan(ports: List[int], timeout: float) -> Set[int]:
+    """优化前的扫描：逐个端口等待连接结果。"""
+    found = set()
+    for port in ports:
+        if await reference_check_port(HOST, port, timeout):
+            found.add(port)
+    return found
+
+
+async def concurrent_scan(ports: List[int], timeout: float) -> Dict[int, str]:
+    """PortScanner 并发扫描，返回 端口 → 状态。"""
+    scanner = PortScanner(max_timeout=timeout)
+    return {result.port: result.state async for result in scanner.scan([HOST], ports)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--open", type=int, default=10, help="开放端口数")
+    parser.add_argument("--filtered", type=int, default=5, help="丢包（超时）端口数")
+    parser.add_argument("--closed", type=int, default=200, help="关闭端口数")
+    parser.add_argument("--timeout", type=float, default=1.0, help="连接超时（秒），两种方式相同")
+    args = parser.parse_args()
+
+    with LocalListeners(args.open, args.filtered, args.closed) as listeners:
+        ports = listeners.ports
+        print(f"{len(ports)} ports on {HOST}: {args.open} open, {args.filtered} filtered, "
+              f"{args.closed} closed; timeout {args.timeout:g} s")
+
+        start = time.perf_counter()
+        ref_open = asyncio.run(reference_scan(ports, args.timeout))
+        ref_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        states = asyncio.run(concurrent_scan(ports, args.timeout))
+        new_time = time.perf_counter() - start
+
+        report("scan", ref_time, new_time)
+        new_open = {port for port, state in states.items() if state == STATE_OPEN}
+        print(f"  open ports found: before {len(ref_open)}   after {len(new_open)}   "
+              f"identical: {ref_open == new_open}")
+        expected = {port: STATE_OPEN for port in listeners.open_ports}
+        expected.update({port: STATE_FILTERED for port in listeners.filtered_ports})
+        expected.update({port: STATE_CLOSED for port in listeners.closed_ports})
+        wrong = sum(states.get(port) != state for port, state in expected.items())
+        print(f"  states matching the fixture: {len(expected) - wrong}/{len(expected)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""语音识别批量解码基准测试。
+
+对比优化前逐个片段 decode_stream 的识别方式与 SpeechRecognitionService
+按时长排序分批、每批一次 decode_streams 的识别方式，输出耗时、实时率（RTF）
+和解码调用次数，并校验结果顺序与输入一致。
+
+仓库不附带模型，识别器使用替身：每次解码调用有固定开销，另有与音频时长
+成正比的耗时（time.sleep，模拟 ONNX Runtime 释放 GIL 的推理）。批量解码时
+每个片段按批内最长片段补齐计费，所以还会输出按时长排序分批与按原顺序分批
+的补齐开销。多个识别器实例（--decoders）在替身中可以完全并行，实际收益
+取决于 CPU 核数，这一项只代表上限。
+
+用法:
+    python benchmarks/bench_speech_decode.py [--segments 200] [--call-overhead-ms 20] [--rtf 0.002]
+"""
+
+import argparse
+import time
+from typing import List
+
+import numpy as np
+
+from _common import report, timed
+
+from services.speech_recognition_service import SpeechRecognitionService
+
+
+class _Result:
+    def __init__(self) -> None:
+        self.text = ""
+
+
+class _Stream:
+    def __init__(self) -> None:
+        self.samples: np.ndarray = np.zeros(0, dtype=np.float32)
+        self.result = _Result()
+
+    def accept_waveform(self, sample_rate: int, samples: np.ndarray) -> None:
+        self.samples = samples
+
+
+class FakeRecognizer:
+    """替身识别器：识别结果为片段首个样本值（片段编号），便于校验顺序。"""
+
+    def __init__(self, overhead: float, rtf: float, sample_rate: int) -> None:
+        self.overhead = overhead
+        self.rtf = rtf
+        self.sample_rate = sample_rate
+        self.calls = 0
+
+    def create_stream(self) -> _Stream:
+        return _Stream()
+
+    def _finish(self, stream: _Stream) -> None:
+        stream.result.text = f" {int(stream.samples[0])} "
+
+    def decode_stream(self, stream: _Stream) -> None:
+        self.calls += 1
+        time.sleep(self.overhead + self.rtf * len(stream.samples) / self.sample_rate)
+        self._finish(stream)
+
+    def decode_streams(self, streams: List[_Stream]) -> None:
+        self.calls += 1
+        # 批内按最长片段补齐
+        longest = max(len(stream.samples) for stream in streams)
+        time.sleep(self.overhead + self.rtf * longest * len(streams) / self.sample_rate)
+        for stream in streams:
+            self._finish(stream)
+
+
+def make_segments(count: int, sample_rate: int, seed: int = 0) -> List[np.ndarray]:
+    """生成与 VAD 输出相近的片段（1~28 秒），首个样本写入片段编号。"""
+    rng = np.random.default_rng(seed)
+    segments = []
+    for index, seconds in enumerate(rng.uniform(1.0, 28.0, count)):
+        chunk = np.zeros(int(seconds * sample_rate), dtype=np.float32)
+        chunk[0] = index
+        segments.append(chunk)
+    return segments
+
+
+def padding_ratio(batches: List[List[int]], lengths: List[int]) -> float:
+    """补齐后的总样本数与实际样本数之比。"""
+    padded = sum(max(lengths[i] for i in batch) * len(batch) for batch in batches)
+    return padded / sum(lengths)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--segments", type=int, default=200, help="片段数")
+    parser.add_argument("--call-overhead-ms", type=float, default=20.0, help="每次解码调用的固定开销（毫秒）")
+    parser.add_argument("--rtf", type=float, default=0.002, help="替身识别器每秒音频的解码耗时（秒）")
+    parser.add_argument("--decoders", type=int, default=1, help="并行的识别器实例数")
+    args = parser.parse_args()
+
+    service = SpeechRecognitionService()
+    sr = service.sample_rate
+    overhead = args.call_overhead_ms / 1000
+    segments = make_segments(args.segments, sr)
+    lengths = [len(chunk) for chunk in segments]
+    audio_seconds = sum(lengths) / sr
+    print(f"{args.segments} segments, {audio_seconds / 60:.1f} min of audio, "
+          f"call overhead {args.call_overhead_ms:g} ms, rtf {args.rtf:g}")
+
+    service.recognizer = FakeRecognizer(overhead, args.rtf, sr)
+    ref_texts, ref_time = timed(lambda: [service._recognize_audio_chunk(chunk) for chunk in segments])
+    ref_calls = service.recognizer.calls
+
+    service.recognizer = FakeRecognizer(overhead, args.rtf, sr)
+    service.current_provider = "cpu"
+    service._recognizer_factory = lambda threads: FakeRecognizer(overhead, args.rtf, sr)
+    service.set_decode_options(num_decoders=args.decoders)
+    new_texts, new_time = timed(service._recognize_chunks, segments)
+    new_calls = sum(recognizer.calls for recognizer in service._get_recognizers())
+
+    report(f"decode (decoders={args.decoders})", ref_time, new_time)
+    print(f"  RTF: before {ref_time / audio_seconds:.4f}   after {new_time / audio_seconds:.4f}   "
+          f"decode calls: before {ref_calls}   after {new_calls}")
+    print(f"  order preserved: {new_texts == ref_texts == [str(i) for i in range(args.segments)]}")
+
+    sorted_batches = service._plan_decode_batches(lengths)
+    in_order = [list(range(start, min(start + service.decode_batch_size, args.segments)))
+                for start in range(0, args.segments, service.decode_batch_size)]
+    print(f"  padding overhead: sorted batches {padding_ratio(sorted_batches, lengths) - 1:.1%}   "
+          f"input-order batches {padding_ratio(in_order, lengths) - 1:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""冷启动导入基准测试。
+
+在全新的子进程中分别测量两种导入方式的耗时和已加载模块：
+
+- lazy：应用现在的启动路径（main.py 首帧前导入的 services、MainView 等），
+  服务和工具视图按需导入；
+- eager：模拟优化前的启动，一次性导入 services/utils/views 包导出的全部名称
+  以及所有工具视图模块。
+
+同时列出两种方式下已加载的重量级模块（numpy、cv2、onnxruntime 等；
+httpx 由 flet 自身导入，两种方式下都会出现）。
+结果受磁盘缓存影响，取多次运行中的最短耗时。
+
+用法:
+    python benchmarks/bench_startup_imports.py [--repeat 5]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+from _common import SRC_DIR, report
+
+# 与 main.py 中的 _HEAVY_MODULES 保持一致
+HEAVY_MODULES = ("numpy", "cv2", "onnxruntime", "sherpa_onnx", "httpx", "ffmpeg", "PIL")
+
+_PRELUDE = """
+import json, sys, time
+start = time.perf_counter()
+from utils import patch
+from utils import nuitka_setup
+import flet
+from services import ConfigService, GlobalHotkeyService
+from views.main_view import MainView
+"""
+
+_EAGER = """
+import importlib
+from utils.tool_registry import TOOL_VIEWS
+from utils.lazy_import import import_object
+for package in ("services", "utils", "views", "views.image", "views.media",
+                "views.dev_tools", "views.others"):
+    module = importlib.import_module(package)
+    for name in module._LAZY_EXPORTS:
+        getattr(module, name)
+for path in TOOL_VIEWS.values():
+    import_object(path)
+"""
+
+_EPILOGUE = """
+elapsed = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{"seconds": elapsed, "modules": len(sys.modules), "heavy": heavy}}))
+"""
+
+
+def run_once(eager: bool) -> dict:
+    """在子进程中执行一次导入并返回测量结果。"""
+    code = _PRELUDE + (_EAGER if eager else "") + _EPILOGUE.format(heavy=HEAVY_MODULES)
+    completed = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=str(SRC_DIR),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def measure(eager: bool, repeat: int) -> dict:
+    """多次运行，返回耗时最短的一次。"""
+    runs = [run_once(eager) for _ in range(max(1, repeat))]
+    return min(runs, key=lambda item: item["seconds"])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="每种方式运行的子进程数")
+    args = parser.parse_args()
+
+    eager = measure(True, args.repeat)
+    lazy = measure(False, args.repeat)
+
+    report("startup imports", eager["seconds"], lazy["seconds"])
+    print(f"  modules loaded: before {eager['modules']}   after {lazy['modules']}")
+    print(f"  heavy modules before: {', '.join(eager['heavy']) or '-'}")
+    print(f"  heavy modules after:  {', '.join(lazy['heavy']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""文本差异基准测试。
+
+在合成的日志文本上对比优化前 TextDiffView 使用的 difflib.ndiff（对全部行计算，
+含行内模糊匹配）与 TextDiff.compute + 取一页显示行的耗时，并校验两者统计的
+增删行数（TextDiff 的编辑脚本不应比 difflib 的更长）。
+
+两组输入：
+- edits：在 --lines 行日志中随机修改/插入/删除 --edits 处；
+- blocks：相同的日志中替换若干连续的大段内容（ndiff 的行内模糊匹配在大段
+  替换上接近平方复杂度）。
+
+用法:
+    python benchmarks/bench_text_diff.py [--lines 20000] [--edits 200]
+"""
+
+import argparse
+import difflib
+import random
+from typing import List, Tuple
+
+from _common import report, timed
+
+from utils.text_diff import TextDiff
+
+# 界面每页显示的行数（与 TextDiffView.PAGE_ROWS 一致）
+PAGE_ROWS = 500
+
+
+def make_log(lines: int, rng: random.Random) -> List[str]:
+    """生成合成日志行。"""
+    levels = ("INFO", "DEBUG", "WARN", "ERROR")
+    words = ("request", "user", "cache", "miss", "hit", "db", "query", "timeout", "retry", "ok")
+    return [
+        f"2024-05-{1 + i // 40000:02d} 12:{(i // 60) % 60:02d}:{i % 60:02d} {rng.choice(levels)} "
+        f"worker-{rng.randrange(16)} {' '.join(rng.choices(words, k=6))} id={rng.randrange(10 ** 6)}"
+        for i in range(lines)
+    ]
+
+
+def scatter_edits(lines: List[str], edits: int, rng: random.Random) -> List[str]:
+    """随机修改、插入、删除若干行。"""
+    result = list(lines)
+    for _ in range(edits):
+        pos = rng.randrange(len(result))
+        kind = rng.randrange(3)
+        if kind == 0:
+            result[pos] = result[pos].replace("INFO", "WARN") + " changed"
+        elif kind == 1:
+            result.insert(pos, f"inserted line {rng.randrange(10 ** 6)}")
+        else:
+            del result[pos]
+    return result
+
+
+def replace_blocks(lines: List[str], blocks: int, size: int, rng: random.Random) -> List[str]:
+    """把若干连续段落替换为相似但不同的内容。"""
+    result = list(lines)
+    for _ in range(blocks):
+        pos = rng.randrange(len(result) - size)
+        result[pos:pos + size] = [line + f" v{rng.randrange(100)}" for line in result[pos:pos + size]]
+    return result
+
+
+def reference_ndiff(a: List[str], b: List[str]) -> Tuple[int, int]:
+    """优化前的对比：ndiff 全部行，返回 (删除行数, 新增行数)。"""
+    diff = list(difflib.ndiff(a, b))
+    removed = sum(1 for line in diff if line.startswith("- "))
+    added = sum(1 for line in diff if line.startswith("+ "))
+    return removed, added
+
+
+def compute_first_page(a: List[str], b: List[str]) -> Tuple[int, int]:
+    """优化后：计算差异并取出第一页显示行（含行内差异）。"""
+    diff = TextDiff.compute(a, b)
+    diff.rows(0, PAGE_ROWS, only_changes=True)
+    return diff.removed, diff.added
+
+
+def run_case(name: str, a: List[str], b: List[str], skip_reference: bool) -> None:
+    new_counts, new_time = timed(compute_first_page, a, b, repeat=3)
+    if skip_reference:
+        print(f"{name:<28} after {new_time:9.3f} s   (ndiff skipped)")
+    else:
+        ref_counts, ref_time = timed(reference_ndiff, a, b)
+        report(name, ref_time, new_time)
+        print(f"  -/+ lines: ndiff {ref_counts[0]}/{ref_counts[1]}   TextDiff {new_counts[0]}/{new_counts[1]}")
+        if sum(new_counts) > sum(ref_counts):
+            print("  WARNING: TextDiff edit script is longer than ndiff's")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=20000, help="日志行数")
+    parser.add_argument("--edits", type=int, default=200, help="随机编辑处数")
+    parser.add_argument("--blocks", type=int, default=4, help="整段替换的段数")
+    parser.add_argument("--block-size", type=int, default=300, help="每段替换的行数")
+    parser.add_argument("--skip-ndiff", action="store_true", help="不运行优化前的 ndiff（输入很大时）")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    base = make_log(args.lines, rng)
+    print(f"{args.lines} lines, page size {PAGE_ROWS}")
+
+    run_case(f"{args.edits} scattered edits", base, scatter_edits(base, args.edits, rng), args.skip_ndiff)
+    run_case(f"{args.blocks}x{args.block_size} replaced blocks", base,
+             replace_blocks(base, args.blocks, args.block_size, rng), args.skip_ndiff)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""能量型 VAD 兜底基准测试。
+
+在合成的语音信号（噪声底上的随机语音段）上对比逐帧循环的参考实现
+（优化前的代码）与 VADService._fallback_energy_vad 的向量化实现，输出耗时
+并校验切分结果完全一致。
+
+另外在幅度超过 1 的音频上运行 detect_speech_segments（替身 VAD 始终返回
+空结果，从而走兜底分支），对比优化前“整段归一化复制 + 逐帧兜底”与现在
+只记录缩放系数的 tracemalloc 峰值内存。
+
+用法:
+    python benchmarks/bench_vad_fallback.py [--minutes 60]
+"""
+
+import argparse
+import logging
+import tracemalloc
+from typing import List, Tuple
+
+import numpy as np
+
+from _common import report, timed
+
+from services.vad_service import VADService
+from utils.logger import logger
+
+
+def reference_fallback_energy_vad(
+    audio: np.ndarray,
+    sample_rate: int,
+    min_silence_duration: float,
+    min_speech_duration: float,
+    frame_ms: float = 20.0,
+    hop_ms: float = 10.0,
+    padding: float = 0.08,
+) -> List[Tuple[float, float]]:
+    """优化前的逐帧能量型 VAD。"""
+    audio = audio.astype(np.float32, copy=False)
+    frame = max(1, int(sample_rate * frame_ms / 1000.0))
+    hop = max(1, int(sample_rate * hop_ms / 1000.0))
+
+    n_frames = 1 + max(0, (len(audio) - frame) // hop)
+    rms = np.empty(n_frames, dtype=np.float32)
+    for i in range(n_frames):
+        start = i * hop
+        seg = audio[start:start + frame]
+        if seg.size < frame:
+            seg = np.pad(seg, (0, frame - seg.size), mode="constant")
+        rms[i] = np.sqrt(np.mean(seg * seg, dtype=np.float32))
+
+    noise = float(np.percentile(rms, 20))
+    hi = float(np.percentile(rms, 95))
+    if hi < 1e-4:
+        return []
+    thr = max(noise + 0.25 * max(hi - noise, 0.0), 0.01)
+    voiced = rms >= thr
+
+    segments: List[Tuple[float, float]] = []
+    in_seg = False
+    seg_start = 0.0
+    for i, v in enumerate(voiced):
+        t = (i * hop) / sample_rate
+        if v and not in_seg:
+            in_seg = True
+            seg_start = t
+        elif not v and in_seg:
+            in_seg = False
+            segments.append((seg_start, t))
+    if in_seg:
+        segments.append((seg_start, len(audio) / sample_rate))
+    if not segments:
+        return []
+
+    merged: List[Tuple[float, float]] = []
+    cur_s, cur_e = segments[0]
+    for s, e in segments[1:]:
+        if s - cur_e < min_silence_duration:
+            cur_e = e
+        else:
+            merged.append((cur_s, cur_e))
+            cur_s, cur_e = s, e
+    merged.append((cur_s, cur_e))
+
+    out: List[Tuple[float, float]] = []
+    audio_dur = len(audio) / sample_rate
+    for s, e in merged:
+        if e - s < min_speech_duration:
+            continue
+        s2 = max(0.0, s - padding)
+        e2 = min(audio_dur, e + padding)
+        if e2 > s2:
+            out.append((s2, e2))
+    return out
+
+
+def reference_detect(service: VADService, audio: np.ndarray) -> List[Tuple[float, float]]:
+    """优化前 detect_speech_segments 中与兜底分支相关的内存开销：整段归一化复制后再兜底。"""
+    audio_vad = audio.astype(np.float32, copy=False)
+    peak = float(np.max(np.abs(audio_vad)))
+    if peak > 1.0:
+        audio_vad = audio_vad / peak
+    return reference_fallback_energy_vad(
+        audio_vad, service.sample_rate, service.min_silence_duration, service.min_speech_duration
+    )
+
+
+class SilentVAD:
+    """替身 VAD：接受所有窗口但从不产出片段。"""
+
+    def reset(self) -> None:
+        pass
+
+    def accept_waveform(self, samples: np.ndarray) -> None:
+        pass
+
+    def empty(self) -> bool:
+        return True
+
+    def flush(self) -> None:
+        pass
+
+
+def make_speech(seconds: float, sample_rate: int, seed: int = 0) -> np.ndarray:
+    """噪声底上交替出现的语音段（0.3~6 秒）和静音（0.1~2 秒）。"""
+    rng = np.random.default_rng(seed)
+    total = int(seconds * sample_rate)
+    audio = (0.003 * rng.standard_normal(total)).astype(np.float32)
+    pos = 0
+    while pos < total:
+        length = int(rng.uniform(0.3, 6.0) * sample_rate)
+        end = min(pos + length, total)
+        t = np.arange(end - pos, dtype=np.float32) / sample_rate
+        envelope = 0.5 * (1 + np.sin(2 * np.pi * 3 * t))
+        audio[pos:end] += (0.2 * envelope * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+        pos = end + int(rng.uniform(0.1, 2.0) * sample_rate)
+    return audio
+
+
+def peak_memory(func, *args) -> float:
+    """返回函数执行期间 tracemalloc 记录的峰值内存（MB）。"""
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--minutes", type=float, default=60.0, help="合成音频时长（分钟）")
+    parser.add_argument("--memory-minutes", type=float, default=10.0, help="内存测试的音频时长（分钟）")
+    args = parser.parse_args()
+
+    service = VADService()
+    sr = service.sample_rate
+    audio = make_speech(args.minutes * 60, sr)
+    print(f"{args.minutes:g} min synthetic speech @ {sr} Hz ({audio.nbytes / 1024 / 1024:.0f} MB)")
+
+    params = (sr, service.min_silence_duration, service.min_speech_duration)
+    ref_segments, ref_time = timed(reference_fallback_energy_vad, audio, *params)
+    new_segments, new_time = timed(service._fallback_energy_vad, audio, *params)
+    report("fallback energy VAD", ref_time, new_time)
+    print(f"  segments: before {len(ref_segments)}   after {len(new_segments)}   "
+          f"identical: {ref_segments == new_segments}")
+
+    # 幅度超过 1 的音频：优化前会先复制一份归一化音频
+    loud = make_speech(args.memory_minutes * 60, sr, seed=1) * np.float32(4.0)
+    service.vad = SilentVAD()
+    # 替身 VAD 必然触发“未检测到语音片段”警告，这里不输出
+    logger.set_level(logging.ERROR)
+    ref_peak = peak_memory(reference_detect, service, loud)
+    new_peak = peak_memory(service.detect_speech_segments, loud)
+    print(f"detect_speech_segments ({args.memory_minutes:g} min, peak 4x): "
+          f"extra memory before {ref_peak:.1f} MB   after {new_peak:.1f} MB "
+          f"(audio {loud.nbytes / 1024 / 1024:.0f} MB)")
+    same = reference_detect(service, loud) == service.detect_speech_segments(loud)
+    print(f"  identical segments: {same}")
+
+
+if __name__ == "__main__":
+    main()
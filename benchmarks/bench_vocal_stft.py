@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""人声分离 STFT/ISTFT 与重采样基准测试。
+
+在合成立体声信号上对比逐帧循环的参考实现（优化前的代码）与
+VocalSeparationService 中的批量实现，输出耗时和最大误差；
+重采样另外输出 tracemalloc 峰值内存。
+
+用法:
+    python benchmarks/bench_vocal_stft.py [--seconds 300]
+"""
+
+import argparse
+import tracemalloc
+
+import numpy as np
+
+from _common import report, timed
+
+from services.vocal_separation_service import VocalSeparationService
+
+
+def reference_stft(y: np.ndarray, n_fft: int, hop_length: int) -> np.ndarray:
+    """优化前的逐帧 STFT。"""
+    win = np.hanning(n_fft)
+    pad_len = n_fft // 2
+    y = np.pad(y, (pad_len, pad_len), mode='reflect')
+    n_frames = 1 + (len(y) - n_fft) // hop_length
+    spec = np.zeros((n_fft // 2 + 1, n_frames), dtype=np.complex64)
+    for i in range(n_frames):
+        start = i * hop_length
+        spec[:, i] = np.fft.rfft(y[start:start + n_fft] * win, n=n_fft)
+    return spec
+
+
+def reference_istft(spec: np.ndarray, hop_length: int, length: int) -> np.ndarray:
+    """优化前的逐帧 ISTFT。"""
+    n_fft = (spec.shape[0] - 1) * 2
+    n_frames = spec.shape[1]
+    win = np.hanning(n_fft)
+    expected_len = n_fft + hop_length * (n_frames - 1)
+    y = np.zeros(expected_len)
+    window_sum = np.zeros(expected_len)
+    for i in range(n_frames):
+        start = i * hop_length
+        y[start:start + n_fft] += np.fft.irfft(spec[:, i], n=n_fft) * win
+        window_sum[start:start + n_fft] += win * win
+    nonzero = window_sum > 1e-10
+    y[nonzero] /= window_sum[nonzero]
+    pad_len = n_fft // 2
+    y = y[pad_len:-pad_len]
+    if len(y) > length:
+        y = y[:length]
+    elif len(y) < length:
+        y = np.pad(y, (0, length - len(y)))
+    return y
+
+
+def reference_resample(y: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+    """优化前的整段 FFT 重采样（单通道）。"""
+    n_samples = int(np.ceil(len(y) * target_sr / orig_sr))
+    Y = np.fft.rfft(y)
+    n_fft_new = n_samples if n_samples % 2 == 0 else n_samples + 1
+    n_freq_new = n_fft_new // 2 + 1
+    if target_sr > orig_sr:
+        Y_new = np.zeros(n_freq_new, dtype=Y.dtype)
+        Y_new[:len(Y)] = Y
+    else:
+        Y_new = Y[:n_freq_new]
+    y_new = np.fft.irfft(Y_new, n=n_fft_new)[:n_samples]
+    y_new *= target_sr / orig_sr
+    return y_new
+
+
+def peak_memory(func, *args) -> float:
+    """返回函数执行期间 tracemalloc 记录的峰值内存（MB）。"""
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=300.0, help="合成音频时长（秒）")
+    args = parser.parse_args()
+
+    service = VocalSeparationService()
+    sr = service.sample_rate
+    n_fft = service.n_fft
+    hop = service.hop_length
+
+    rng = np.random.default_rng(0)
+    n = int(args.seconds * sr)
+    t = np.arange(n) / sr
+    audio = np.stack([
+        0.5 * np.sin(2 * np.pi * 440 * t) + 0.05 * rng.standard_normal(n),
+        0.5 * np.sin(2 * np.pi * 660 * t) + 0.05 * rng.standard_normal(n),
+    ])
+    print(f"{args.seconds:.0f} s stereo @ {sr} Hz, n_fft={n_fft}, hop={hop}")
+
+    ref_spec, ref_time = timed(lambda: np.stack([reference_stft(ch, n_fft, hop) for ch in audio]))
+    new_spec, new_time = timed(service._stft, audio, n_fft, hop)
+    report("STFT", ref_time, new_time)
+    print(f"  max |diff| = {np.abs(ref_spec - new_spec).max():.2e}")
+
+    ref_wave, ref_time = timed(lambda: np.stack([reference_istft(s, hop, n) for s in ref_spec]))
+    new_wave, new_time = timed(service._istft, new_spec, hop, length=n)
+    report("ISTFT", ref_time, new_time)
+    print(f"  max |diff| = {np.abs(ref_wave - new_wave).max():.2e}")
+
+    # 重采样：48 kHz -> 44.1 kHz，比较去除边缘后的误差
+    src_sr = 48000
+    n_src = int(args.seconds * src_sr)
+    t_src = np.arange(n_src) / src_sr
+    source = np.stack([np.sin(2 * np.pi * 1000 * t_src), np.sin(2 * np.pi * 3000 * t_src)])
+    ref_res, ref_time = timed(lambda: np.stack([reference_resample(ch, src_sr, sr) for ch in source]))
+    new_res, new_time = timed(service._resample_audio, source, src_sr, sr)
+    report("resample 48k->44.1k", ref_time, new_time)
+    edge = sr
+    print(f"  max |diff| (edges excluded) = {np.abs(ref_res - new_res)[:, edge:-edge].max():.2e}")
+
+    ref_peak = peak_memory(lambda: [reference_resample(ch, src_sr, sr) for ch in source])
+    new_peak = peak_memory(service._resample_audio, source, src_sr, sr)
+    print(f"  peak memory: before {ref_peak:.0f} MB   after {new_peak:.0f} MB "
+          f"(input {source.nbytes / 1024 / 1024:.0f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -844,8 +844,12 @@ def get_nuitka_cmd(mode="release", enable_upx=False, upx_path=None, jobs=2):
         f"--jobs={jobs}",  # 并行编译进程数
         # 数据文件
         f"--include-data-dir={ASSETS_DIR}=src/assets",
+        # 服务和视图通过延迟导入（importlib）加载，需显式包含
+        "--include-package=services",
+        "--include-package=views",
+        "--include-package=utils",
     ]
-    
+
     # 根据模式设置优化参数
     if mode == "release":
         # Release 模式：完整优化
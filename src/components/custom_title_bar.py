@@ -7,11 +7,9 @@
 import sys
 import threading
 from pathlib import Path
-from typing import Callable, Optional
+from typing import TYPE_CHECKING, Callable, Optional
 
 import flet as ft
-from PIL import Image, ImageDraw
-from pystray import Icon, Menu, MenuItem
 
 from constants import (
     APP_TITLE,
@@ -22,7 +20,11 @@ from constants import (
     PADDING_SMALL,
 )
 from services import ConfigService
-from services.weather_service import WeatherService
+
+if TYPE_CHECKING:
+    from PIL import Image
+    from pystray import Icon
+    from services.weather_service import WeatherService
 
 
 def _get_icon_path() -> str:
@@ -76,12 +78,12 @@ class CustomTitleBar(ft.Container):
         self.page: ft.Page = page
         self.config_service: Optional[ConfigService] = config_service
         
-        # 初始化天气服务
-        self.weather_service: WeatherService = WeatherService()
+        # 天气服务（依赖 httpx，首次加载天气时再创建）
+        self._weather_service: Optional["WeatherService"] = None
         self.weather_data: Optional[dict] = None
         
         # 托盘图标相关
-        self.tray_icon: Optional[Icon] = None
+        self.tray_icon: Optional["Icon"] = None
         self.minimize_to_tray: bool = False  # 是否启用最小化到托盘
         
         # 获取用户设置的主题色、天气显示和托盘配置
@@ -339,12 +341,22 @@ class CustomTitleBar(ft.Container):
         except Exception:
             pass  # 忽略更新错误
     
-    def _create_tray_icon_image(self) -> Image.Image:
+    @property
+    def weather_service(self) -> "WeatherService":
+        """天气服务（懒加载）。"""
+        if self._weather_service is None:
+            from services.weather_service import WeatherService
+            self._weather_service = WeatherService()
+        return self._weather_service
+    
+    def _create_tray_icon_image(self) -> "Image.Image":
         """创建托盘图标图像。
         
         Returns:
             PIL Image 对象
         """
+        from PIL import Image, ImageDraw
+        
         # 尝试加载应用图标
         icon_path = _get_icon_path()
         
@@ -374,6 +386,8 @@ class CustomTitleBar(ft.Container):
             return  # 已经初始化过了
         
         try:
+            from pystray import Icon, Menu, MenuItem
+            
             # 创建托盘图标图像
             icon_image = self._create_tray_icon_image()
             
@@ -547,8 +561,8 @@ class CustomTitleBar(ft.Container):
             self.tray_icon.stop()
             self.tray_icon = None
         
-        # 关闭天气服务
-        if self.weather_service:
+        # 关闭天气服务（未创建过则无需关闭）
+        if self._weather_service:
             import asyncio
             try:
                 # 获取当前事件循环
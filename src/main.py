@@ -7,6 +7,12 @@
 还未优化...
 """
 
+import sys
+import time
+
+# 启动计时起点（用于统计模块导入和首帧耗时）
+_PROCESS_START = time.perf_counter()
+
 # 补丁，请勿删除
 from utils import patch  # noqa: F401
 # Nuitka 打包初始化（必须在导入 flet 之前执行）
@@ -28,7 +34,27 @@ from constants import (
 )
 from services import ConfigService, GlobalHotkeyService
 from views.main_view import MainView
-from utils import logger
+from utils import configure_session_registry, logger
+
+_IMPORTS_DONE = time.perf_counter()
+
+# 首帧之前不应加载的重量级模块（由服务和工具视图按需导入）
+_HEAVY_MODULES = ("numpy", "cv2", "onnxruntime", "sherpa_onnx", "httpx", "ffmpeg", "PIL")
+
+
+def _log_startup_timing() -> None:
+    """记录启动耗时，并检查首帧前是否误加载了重量级模块。
+    
+    需要逐模块的导入耗时时，可使用 `python -X importtime src/main.py` 查看。
+    """
+    first_frame = time.perf_counter()
+    logger.info(
+        f"启动耗时: 模块导入 {_IMPORTS_DONE - _PROCESS_START:.2f}s, "
+        f"首帧 {first_frame - _PROCESS_START:.2f}s"
+    )
+    loaded = [name for name in _HEAVY_MODULES if name in sys.modules]
+    if loaded:
+        logger.warning(f"首帧前已加载重量级模块（会拖慢启动）: {', '.join(loaded)}")
 
 
 def main(page: ft.Page) -> None:
@@ -46,7 +72,10 @@ def main(page: ft.Page) -> None:
     save_logs = config_service.get_config_value("save_logs", False)
     if save_logs:
         logger.enable_file_logging()
-    
+
+    # ONNX 会话注册表的内存预算和空闲时长以配置为准（包括未传入配置创建的会话）
+    configure_session_registry(config_service)
+
     saved_font = config_service.get_config_value("font_family", "System")
     saved_theme_color = config_service.get_config_value("theme_color", PRIMARY_COLOR)
     saved_theme_mode = config_service.get_config_value("theme_mode", "system")
@@ -162,6 +191,7 @@ def main(page: ft.Page) -> None:
     
     # 更新页面
     page.update()
+    _log_startup_timing()
     
     # 启动全局热键服务
     global_hotkey_service = GlobalHotkeyService(config_service, page)
@@ -659,4 +689,7 @@ def _check_and_fix_auto_start(config_service: ConfigService) -> None:
 
 # 启动应用
 if __name__ == "__main__":
+    # 打包后的程序使用进程池（如批量压缩）时需要
+    import multiprocessing
+    multiprocessing.freeze_support()
     ft.app(target=main)
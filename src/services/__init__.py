@@ -1,27 +1,59 @@
 # -*- coding: utf-8 -*-
 """业务服务模块初始化文件。"""
 
-from .audio_service import AudioService
-from .sogou_search_service import SogouSearchService
-from .config_service import ConfigService
-from .encoding_service import EncodingService
-from .ffmpeg_service import FFmpegService
-from .http_service import HttpService
-from .image_service import ImageService
-from .ocr_service import OCRService
-from .vad_service import VADService
-from .vocal_separation_service import VocalSeparationService
-from .speech_recognition_service import SpeechRecognitionService
-from .weather_service import WeatherService
-from .websocket_service import WebSocketService
-from .update_service import UpdateService, UpdateInfo, UpdateStatus
-from .auto_updater import AutoUpdater
-from .face_detection_service import FaceDetector, FaceDetectionResult
-from .id_photo_service import IDPhotoService, IDPhotoParams, IDPhotoResult
-from .subtitle_remove_service import SubtitleRemoveService
-from .translate_service import TranslateService, SUPPORTED_LANGUAGES
-from .ai_subtitle_fix_service import AISubtitleFixService
-from .global_hotkey_service import GlobalHotkeyService
+from utils.lazy_import import lazy_exports
+
+# 导出名称 → 所在子模块。各服务依赖 numpy、cv2、onnxruntime、httpx、ffmpeg-python 等，
+# 改为首次访问时再导入，避免拖慢启动
+_LAZY_EXPORTS = {
+    "AudioService": ".audio_service",
+    "SogouSearchService": ".sogou_search_service",
+    "ConfigService": ".config_service",
+    "EncodingService": ".encoding_service",
+    "FFmpegService": ".ffmpeg_service",
+    "FFmpegJob": ".ffmpeg_job_service",
+    "FFmpegJobQueue": ".ffmpeg_job_service",
+    "FFmpegJobStatus": ".ffmpeg_job_service",
+    "FFmpegQueueProgress": ".ffmpeg_job_service",
+    "MediaInfo": ".media_probe_service",
+    "MediaProbeCache": ".media_probe_service",
+    "HttpService": ".http_service",
+    "ImageService": ".image_service",
+    "ImageBatchCompressService": ".image_batch_service",
+    "CompressTask": ".image_batch_service",
+    "CompressTaskResult": ".image_batch_service",
+    "BatchCompressStats": ".image_batch_service",
+    "FramePipeline": ".frame_pipeline_service",
+    "FramePipelineStats": ".frame_pipeline_service",
+    "JobStage": ".staged_job_service",
+    "StagedJob": ".staged_job_service",
+    "StagedJobScheduler": ".staged_job_service",
+    "PortScanner": ".port_scan_service",
+    "PortScanResult": ".port_scan_service",
+    "OCRService": ".ocr_service",
+    "OCRPageResult": ".ocr_service",
+    "VADService": ".vad_service",
+    "VocalSeparationService": ".vocal_separation_service",
+    "SpeechRecognitionService": ".speech_recognition_service",
+    "WeatherService": ".weather_service",
+    "WebSocketService": ".websocket_service",
+    "UpdateService": ".update_service",
+    "UpdateInfo": ".update_service",
+    "UpdateStatus": ".update_service",
+    "AutoUpdater": ".auto_updater",
+    "FaceDetector": ".face_detection_service",
+    "FaceDetectionResult": ".face_detection_service",
+    "IDPhotoService": ".id_photo_service",
+    "IDPhotoParams": ".id_photo_service",
+    "IDPhotoResult": ".id_photo_service",
+    "SubtitleRemoveService": ".subtitle_remove_service",
+    "TranslateService": ".translate_service",
+    "SUPPORTED_LANGUAGES": ".translate_service",
+    "AISubtitleFixService": ".ai_subtitle_fix_service",
+    "GlobalHotkeyService": ".global_hotkey_service",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _LAZY_EXPORTS, globals())
 
 __all__ = [
     "AudioService",
@@ -29,9 +61,27 @@ __all__ = [
     "ConfigService", 
     "EncodingService",
     "FFmpegService",
+    "FFmpegJob",
+    "FFmpegJobQueue",
+    "FFmpegJobStatus",
+    "FFmpegQueueProgress",
+    "MediaInfo",
+    "MediaProbeCache",
     "HttpService",
     "ImageService",
+    "ImageBatchCompressService",
+    "CompressTask",
+    "CompressTaskResult",
+    "BatchCompressStats",
+    "FramePipeline",
+    "FramePipelineStats",
+    "JobStage",
+    "StagedJob",
+    "StagedJobScheduler",
+    "PortScanner",
+    "PortScanResult",
     "OCRService",
+    "OCRPageResult",
     "VADService",
     "VocalSeparationService",
     "SpeechRecognitionService",
@@ -5,8 +5,9 @@
 """
 
 import os
+import subprocess
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Callable, List, Optional, Tuple
 
 import ffmpeg
 
@@ -123,7 +124,8 @@ class AudioService:
         bitrate: Optional[str] = None,
         sample_rate: Optional[int] = None,
         channels: Optional[int] = None,
-        quality: Optional[int] = None
+        quality: Optional[int] = None,
+        process_callback: Optional[Callable[[subprocess.Popen], None]] = None
     ) -> Tuple[bool, str]:
         """转换音频格式。
         
@@ -135,6 +137,7 @@ class AudioService:
             sample_rate: 采样率 (如 44100, 48000)
             channels: 声道数 (1=单声道, 2=立体声)
             quality: 质量等级 (仅用于某些编码器，0-9，值越小质量越高)
+            process_callback: ffmpeg 进程启动后的回调（用于取消时终止进程）
         
         Returns:
             (是否成功, 消息)
@@ -187,7 +190,12 @@ class AudioService:
             stream = ffmpeg.output(stream, str(output_path), **output_kwargs)
             
             # 执行转换（覆盖已存在的文件）
-            ffmpeg.run(stream, overwrite_output=True, capture_stdout=True, capture_stderr=True)
+            process = ffmpeg.run_async(stream, overwrite_output=True, pipe_stdout=True, pipe_stderr=True)
+            if process_callback:
+                process_callback(process)
+            out, err = process.communicate()
+            if process.returncode != 0:
+                raise ffmpeg.Error('ffmpeg', out, err)
             
             # 计算文件大小变化
             input_size = input_path.stat().st_size
@@ -115,6 +115,15 @@ class ConfigService:
             "onnx_cpu_threads": 0,  # CPU推理线程数，0=自动检测
             "onnx_execution_mode": "sequential",  # 执行模式: sequential(顺序,省内存) 或 parallel(并行,多核快)
             "onnx_enable_model_cache": False,  # 是否缓存优化后的模型，加速二次启动
+            # ONNX 会话共享：空闲会话的保留时长和常驻预算（超出时淘汰最久未使用的空闲会话）
+            "onnx_session_idle_ttl": 300,  # 空闲会话保留时长（秒），0=释放后立即卸载
+            "onnx_session_ram_budget_mb": 2048,  # CPU会话内存预算（MB），0=不限制
+            "onnx_session_vram_budget_mb": 2048,  # GPU会话显存预算（MB），0=不限制
+            "image_enhance_memmap_threshold_mb": 128,  # 图像增强输出超过该大小（MB）时使用磁盘映射缓冲区
+            # 语音识别批量解码（加载模型时读取）
+            "asr_decode_batch_size": 8,  # 每批最多片段数，1=逐个解码
+            "asr_decode_batch_seconds": 240,  # 每批最长总时长（秒）
+            "asr_num_decoders": 1,  # 并行解码的识别器实例数（仅CPU，每个实例额外占用一份模型内存）
         }
     
     def save_config(self) -> bool:
@@ -5,11 +5,10 @@
 参考 HivisionIDPhotos 项目实现。
 """
 
-import gc
-from itertools import product
+from functools import lru_cache
 from math import ceil
 from pathlib import Path
-from typing import Optional, Tuple, List, TYPE_CHECKING
+from typing import Optional, Sequence, Tuple, List, TYPE_CHECKING
 
 import cv2
 import numpy as np
@@ -48,23 +47,25 @@ class PriorBox:
         Returns:
             先验框数组，形状为 (N, 4)
         """
+        height, width = self.image_size
         anchors = []
-        for k, f in enumerate(self.feature_maps):
-            min_sizes = self.min_sizes[k]
-            for i, j in product(range(f[0]), range(f[1])):
-                for min_size in min_sizes:
-                    s_kx = min_size / self.image_size[1]
-                    s_ky = min_size / self.image_size[0]
-                    dense_cx = [
-                        x * self.steps[k] / self.image_size[1] for x in [j + 0.5]
-                    ]
-                    dense_cy = [
-                        y * self.steps[k] / self.image_size[0] for y in [i + 0.5]
-                    ]
-                    for cy, cx in product(dense_cy, dense_cx):
-                        anchors += [cx, cy, s_kx, s_ky]
-        
-        output = np.array(anchors).reshape(-1, 4)
+        for k, (rows, cols) in enumerate(self.feature_maps):
+            step = self.steps[k]
+            sizes = np.asarray(self.min_sizes[k], dtype=np.float64)
+            # 顺序与逐个生成时一致：行 → 列 → 尺寸
+            cy, cx = np.meshgrid(
+                (np.arange(rows) + 0.5) * step / height,
+                (np.arange(cols) + 0.5) * step / width,
+                indexing="ij",
+            )
+            level = np.empty((rows, cols, len(sizes), 4))
+            level[..., 0] = cx[..., None]
+            level[..., 1] = cy[..., None]
+            level[..., 2] = sizes / width
+            level[..., 3] = sizes / height
+            anchors.append(level.reshape(-1, 4))
+        
+        output = np.concatenate(anchors, axis=0)
         
         if self.clip:
             output = np.clip(output, 0, 1)
@@ -72,6 +73,21 @@ class PriorBox:
         return output
 
 
+@lru_cache(maxsize=8)
+def get_priors(image_size: Tuple[int, int]) -> np.ndarray:
+    """获取指定输入尺寸的先验框（按尺寸缓存，返回只读数组）。
+    
+    Args:
+        image_size: 模型输入尺寸 (height, width)
+    
+    Returns:
+        先验框数组，形状为 (N, 4)
+    """
+    priors = PriorBox(RETINAFACE_CONFIG, image_size=image_size).forward()
+    priors.setflags(write=False)
+    return priors
+
+
 def decode(loc: np.ndarray, priors: np.ndarray, variances: List[float]) -> np.ndarray:
     """解码位置预测。
     
@@ -120,41 +136,45 @@ def decode_landm(pre: np.ndarray, priors: np.ndarray, variances: List[float]) ->
     return landms
 
 
-def py_cpu_nms(dets: np.ndarray, thresh: float) -> List[int]:
+def py_cpu_nms(dets: np.ndarray, thresh: float, top_k: Optional[int] = None) -> List[int]:
     """CPU 上的非极大值抑制。
     
+    先用 argpartition 取置信度最高的 top_k 个框（线性时间），
+    再一次性计算它们两两之间的 IoU 矩阵，按置信度顺序贪心抑制。
+    
     Args:
         dets: 检测结果，形状为 (N, 5)，最后一列为置信度
         thresh: NMS 阈值
+        top_k: 参与 NMS 的最大框数，None 表示不限制
     
     Returns:
-        保留的索引列表
+        保留的索引列表（按置信度从高到低）
     """
-    x1 = dets[:, 0]
-    y1 = dets[:, 1]
-    x2 = dets[:, 2]
-    y2 = dets[:, 3]
     scores = dets[:, 4]
+    if top_k is not None and len(scores) > top_k:
+        candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        order = candidates[np.argsort(-scores[candidates], kind="stable")]
+    else:
+        order = np.argsort(-scores, kind="stable")
+    if order.size == 0:
+        return []
     
+    boxes = dets[order, :4]
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
     areas = (x2 - x1 + 1) * (y2 - y1 + 1)
-    order = scores.argsort()[::-1]
     
+    w = np.maximum(0.0, np.minimum(x2[:, None], x2[None, :]) - np.maximum(x1[:, None], x1[None, :]) + 1)
+    h = np.maximum(0.0, np.minimum(y2[:, None], y2[None, :]) - np.maximum(y1[:, None], y1[None, :]) + 1)
+    inter = w * h
+    overlap = inter / (areas[:, None] + areas[None, :] - inter) > thresh
+    
+    suppressed = np.zeros(order.size, dtype=bool)
     keep = []
-    while order.size > 0:
-        i = order[0]
-        keep.append(i)
-        xx1 = np.maximum(x1[i], x1[order[1:]])
-        yy1 = np.maximum(y1[i], y1[order[1:]])
-        xx2 = np.minimum(x2[i], x2[order[1:]])
-        yy2 = np.minimum(y2[i], y2[order[1:]])
-        
-        w = np.maximum(0.0, xx2 - xx1 + 1)
-        h = np.maximum(0.0, yy2 - yy1 + 1)
-        inter = w * h
-        ovr = inter / (areas[i] + areas[order[1:]] - inter)
-        
-        inds = np.where(ovr <= thresh)[0]
-        order = order[inds + 1]
+    for i in range(order.size):
+        if suppressed[i]:
+            continue
+        keep.append(int(order[i]))
+        suppressed |= overlap[i]
     
     return keep
 
@@ -212,14 +232,25 @@ class FaceDetector:
     """人脸检测器。
     
     使用 RetinaFace ONNX 模型进行人脸检测，支持 GPU 加速。
+    
+    默认按原图尺寸推理；指定 input_size（构造时或 detect_batch 调用时）后图像等比
+    缩放并填充到该尺寸，先验框只需生成一次，多张图像可以合并为一个 batch 推理。
     """
     
+    # 固定输入尺寸时，一次推理的默认最大图像数
+    DEFAULT_MAX_BATCH = 8
+    
+    # 图像均值（BGR 顺序转 RGB 后减去）
+    MEAN = (104, 117, 123)
+    
     def __init__(
         self,
         model_path: Path,
         config_service: Optional['ConfigService'] = None,
         confidence_threshold: float = 0.8,
-        nms_threshold: float = 0.2
+        nms_threshold: float = 0.2,
+        input_size: Optional[Tuple[int, int]] = None,
+        max_batch: int = DEFAULT_MAX_BATCH
     ) -> None:
         """初始化人脸检测器。
         
@@ -228,6 +259,8 @@ class FaceDetector:
             config_service: 配置服务实例
             confidence_threshold: 置信度阈值
             nms_threshold: NMS 阈值
+            input_size: 固定输入尺寸 (height, width)，None 表示按原图尺寸推理
+            max_batch: 固定输入尺寸时一次推理的最大图像数
         """
         if not model_path.exists():
             raise FileNotFoundError(f"模型文件不存在: {model_path}")
@@ -235,8 +268,10 @@ class FaceDetector:
         self.model_path = model_path
         self.confidence_threshold = confidence_threshold
         self.nms_threshold = nms_threshold
-        self.top_k = 5000
+        # 参与 NMS 的最大框数（IoU 矩阵大小为 top_k²）
+        self.top_k = 750
         self.keep_top_k = 750
+        self.input_size = input_size
         
         # 使用统一的工具函数创建会话
         self.sess = create_onnx_session(
@@ -248,6 +283,10 @@ class FaceDetector:
         actual_provider = self.sess.get_providers()[0]
         self.using_gpu = actual_provider != 'CPUExecutionProvider'
         
+        # 模型的 batch 维为固定的 1 时只能逐张推理
+        batch_dim = self.sess.get_inputs()[0].shape[0]
+        self.max_batch = 1 if batch_dim == 1 else max(1, max_batch)
+        
         logger.info(f"人脸检测模型已加载: {model_path.name}")
         logger.info(f"使用设备: {actual_provider}")
     
@@ -267,74 +306,79 @@ class FaceDetector:
         else:
             return "CPU"
     
-    def detect(self, image: np.ndarray) -> List[FaceDetectionResult]:
-        """检测图像中的人脸。
+    def _preprocess(self, image: np.ndarray) -> np.ndarray:
+        """BGR 图像转为减去均值的 RGB float32 图像 (H, W, 3)。"""
+        img = cv2.cvtColor(image, cv2.COLOR_BGR2RGB).astype(np.float32)
+        img -= self.MEAN
+        return img
+    
+    def _letterbox(self, image: np.ndarray, input_size: Tuple[int, int]) -> Tuple[np.ndarray, float]:
+        """等比缩放到固定输入尺寸，右侧和下方填充均值色。
         
         Args:
             image: 输入图像 (BGR 格式)
+            input_size: 目标尺寸 (height, width)
         
         Returns:
-            人脸检测结果列表
+            (预处理后的图像 (3, H, W), 缩放比例)
         """
-        # 转换为 RGB
-        img_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        img = np.float32(img_rgb)
-        
-        im_height, im_width = img.shape[:2]
-        scale = np.array([im_width, im_height, im_width, im_height])
-        
-        # 预处理：减去均值
-        img -= (104, 117, 123)
-        img = img.transpose(2, 0, 1)
-        img = np.expand_dims(img, axis=0)
-        
-        # 推理
-        inputs = {"input": img}
-        loc, conf, landms = self.sess.run(None, inputs)
+        target_h, target_w = input_size
+        im_height, im_width = image.shape[:2]
+        ratio = min(target_h / im_height, target_w / im_width)
+        new_h = max(1, min(target_h, int(round(im_height * ratio))))
+        new_w = max(1, min(target_w, int(round(im_width * ratio))))
+        interpolation = cv2.INTER_AREA if ratio < 1 else cv2.INTER_LINEAR
+        resized = cv2.resize(image, (new_w, new_h), interpolation=interpolation)
+        
+        # 减去均值后填充区域为 0，即均值色
+        canvas = np.zeros((3, target_h, target_w), dtype=np.float32)
+        canvas[:, :new_h, :new_w] = self._preprocess(resized).transpose(2, 0, 1)
+        return canvas, ratio
+    
+    def _postprocess(
+        self,
+        loc: np.ndarray,
+        conf: np.ndarray,
+        landms: np.ndarray,
+        priors: np.ndarray,
+        input_size: Tuple[int, int],
+        ratio: float = 1.0
+    ) -> List[FaceDetectionResult]:
+        """解码单张图像的模型输出。
         
-        # 生成先验框
-        priorbox = PriorBox(RETINAFACE_CONFIG, image_size=(im_height, im_width))
-        priors = priorbox.forward()
-        prior_data = priors
+        Args:
+            loc: 位置预测 (N, 4)
+            conf: 置信度 (N, 2)
+            landms: 关键点预测 (N, 10)
+            priors: 先验框 (N, 4)
+            input_size: 模型输入尺寸 (height, width)
+            ratio: 原图到模型输入的缩放比例
         
-        # 解码
-        boxes = decode(np.squeeze(loc, axis=0), prior_data, RETINAFACE_CONFIG["variance"])
-        boxes = boxes * scale
-        scores = np.squeeze(conf, axis=0)[:, 1]
+        Returns:
+            人脸检测结果列表（坐标为原图坐标）
+        """
+        variance = RETINAFACE_CONFIG["variance"]
         
-        landms_decoded = decode_landm(
-            np.squeeze(landms, axis=0), prior_data, RETINAFACE_CONFIG["variance"]
-        )
+        # 先按置信度过滤，只解码需要的框
+        scores = conf[:, 1]
+        inds = np.where(scores > self.confidence_threshold)[0]
+        if inds.size == 0:
+            return []
         
-        scale1 = np.array([
-            im_width, im_height, im_width, im_height,
-            im_width, im_height, im_width, im_height,
-            im_width, im_height,
-        ])
-        landms_decoded = landms_decoded * scale1
+        in_height, in_width = input_size
+        scale = np.array([in_width, in_height] * 2) / ratio
+        scale1 = np.array([in_width, in_height] * 5) / ratio
         
-        # 过滤低置信度
-        inds = np.where(scores > self.confidence_threshold)[0]
-        boxes = boxes[inds]
-        landms_decoded = landms_decoded[inds]
+        boxes = decode(loc[inds], priors[inds], variance) * scale
+        landms_decoded = decode_landm(landms[inds], priors[inds], variance) * scale1
         scores = scores[inds]
         
-        # 保留 top-K
-        order = scores.argsort()[::-1][:self.top_k]
-        boxes = boxes[order]
-        landms_decoded = landms_decoded[order]
-        scores = scores[order]
-        
-        # NMS
+        # NMS（内部只保留置信度最高的 top_k 个框）
         dets = np.hstack((boxes, scores[:, np.newaxis])).astype(np.float32, copy=False)
-        keep = py_cpu_nms(dets, self.nms_threshold)
+        keep = py_cpu_nms(dets, self.nms_threshold, self.top_k)[:self.keep_top_k]
         dets = dets[keep, :]
         landms_decoded = landms_decoded[keep]
         
-        # 保留 top-K
-        dets = dets[:self.keep_top_k, :]
-        landms_decoded = landms_decoded[:self.keep_top_k, :]
-        
         # 构建结果
         results = []
         for i in range(len(dets)):
@@ -362,6 +406,66 @@ class FaceDetector:
         
         return results
     
+    def detect(self, image: np.ndarray) -> List[FaceDetectionResult]:
+        """检测图像中的人脸。
+        
+        Args:
+            image: 输入图像 (BGR 格式)
+        
+        Returns:
+            人脸检测结果列表
+        """
+        if self.input_size is not None:
+            return self.detect_batch([image])[0]
+        
+        im_height, im_width = image.shape[:2]
+        img = self._preprocess(image).transpose(2, 0, 1)[np.newaxis]
+        
+        # 推理
+        loc, conf, landms = self.sess.run(None, {"input": img})
+        
+        priors = get_priors((im_height, im_width))
+        return self._postprocess(loc[0], conf[0], landms[0], priors, (im_height, im_width))
+    
+    def detect_batch(
+        self,
+        images: Sequence[np.ndarray],
+        input_size: Optional[Tuple[int, int]] = None
+    ) -> List[List[FaceDetectionResult]]:
+        """批量检测多张图像中的人脸。
+        
+        有输入尺寸时图像缩放到同一尺寸，每 max_batch 张合并为一次推理；
+        否则逐张按原图尺寸检测。
+        
+        Args:
+            images: 输入图像列表 (BGR 格式)
+            input_size: 本次使用的输入尺寸 (height, width)，None 表示使用构造时的 input_size
+        
+        Returns:
+            与输入顺序对应的人脸检测结果列表
+        """
+        input_size = input_size or self.input_size
+        if input_size is None:
+            return [self.detect(image) for image in images]
+        
+        input_size = tuple(input_size)
+        priors = get_priors(input_size)
+        results: List[List[FaceDetectionResult]] = []
+        
+        for start in range(0, len(images), self.max_batch):
+            chunk = images[start:start + self.max_batch]
+            letterboxed = [self._letterbox(image, input_size) for image in chunk]
+            batch = np.stack([img for img, _ in letterboxed])
+            
+            loc, conf, landms = self.sess.run(None, {"input": batch})
+            
+            for index, (_, ratio) in enumerate(letterboxed):
+                results.append(self._postprocess(
+                    loc[index], conf[index], landms[index], priors, input_size, ratio
+                ))
+        
+        return results
+    
     def detect_single(self, image: np.ndarray) -> Optional[FaceDetectionResult]:
         """检测图像中的单个人脸。
         
@@ -374,8 +478,18 @@ class FaceDetector:
         Raises:
             ValueError: 如果检测到多个人脸
         """
-        results = self.detect(image)
+        return self.pick_largest(self.detect(image))
+    
+    @staticmethod
+    def pick_largest(results: List[FaceDetectionResult]) -> Optional[FaceDetectionResult]:
+        """从检测结果中选出面积最大的人脸。
         
+        Args:
+            results: detect() 或 detect_batch() 返回的单张图像检测结果
+        
+        Returns:
+            最大的人脸检测结果，列表为空时返回 None
+        """
         if len(results) == 0:
             return None
         
@@ -388,7 +502,7 @@ class FaceDetector:
     
     def __del__(self) -> None:
         """析构函数，释放资源。"""
-        if hasattr(self, 'sess'):
-            del self.sess
-            gc.collect()
+        if getattr(self, 'sess', None) is not None:
+            self.sess.release()
+            self.sess = None
 
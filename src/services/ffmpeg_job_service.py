@@ -0,0 +1,381 @@
+# -*- coding: utf-8 -*-
+"""FFmpeg 并发作业队列模块。
+
+批量处理时同时运行多个 ffmpeg 进程，汇总所有作业的进度和预计剩余时间，
+支持单个作业的取消和重试。并发数由 FFmpegService.recommend_job_workers
+根据编码器类型选择（软件编码器本身已多线程，硬件编码器有会话数限制）。
+"""
+
+import queue
+import subprocess
+import threading
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils import logger
+
+
+class FFmpegJobStatus(Enum):
+    """作业状态枚举。"""
+    PENDING = "pending"         # 等待中
+    RUNNING = "running"         # 运行中
+    SUCCEEDED = "succeeded"     # 成功
+    FAILED = "failed"           # 失败
+    CANCELLED = "cancelled"     # 已取消
+
+
+@dataclass
+class FFmpegJob:
+    """单个 ffmpeg 作业。
+
+    作业函数接收作业本身，返回 (是否成功, 消息)。作业函数应把 job.report_progress
+    作为进度回调传给 FFmpegService 的处理方法，并通过 job.attach_process 登记
+    ffmpeg 进程，以便取消时终止进程。
+
+    Attributes:
+        index: 作业序号
+        item: 输入项（如文件路径）
+        func: 作业函数
+        weight: 作业权重（如文件大小或时长），用于汇总进度
+        name: 显示名称
+        status: 当前状态
+        progress: 作业进度 (0-1)
+        speed: 处理速度（如 "2.5x"）
+        message: 结果消息
+        attempts: 已执行次数
+        data: 调用方附加的数据（如输出路径）
+    """
+    index: int
+    item: Any
+    func: Callable[['FFmpegJob'], Tuple[bool, str]]
+    weight: float = 1.0
+    name: str = ""
+    status: FFmpegJobStatus = FFmpegJobStatus.PENDING
+    progress: float = 0.0
+    speed: str = ""
+    message: str = ""
+    attempts: int = 0
+    data: Dict[str, Any] = field(default_factory=dict)
+    started_at: float = 0.0
+    finished_at: float = 0.0
+    _process: Optional[subprocess.Popen] = field(default=None, repr=False)
+    _cancel_event: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def cancelled(self) -> bool:
+        """是否已请求取消。"""
+        return self._cancel_event.is_set()
+
+    @property
+    def finished(self) -> bool:
+        """是否已结束（成功、失败或取消）。"""
+        return self.status in (FFmpegJobStatus.SUCCEEDED, FFmpegJobStatus.FAILED, FFmpegJobStatus.CANCELLED)
+
+    def report_progress(self, progress: float, speed: str = "", remaining: str = "") -> None:
+        """进度回调，签名与 FFmpegService 各方法的 progress_callback 一致。
+
+        Args:
+            progress: 作业进度 (0-1)
+            speed: 处理速度
+            remaining: 作业剩余时间（汇总时不使用）
+        """
+        self.progress = max(self.progress, min(1.0, progress))
+        self.speed = speed
+
+    def attach_process(self, process: subprocess.Popen) -> None:
+        """登记作业的 ffmpeg 进程（已取消时立即终止）。"""
+        self._process = process
+        if self.cancelled:
+            self._terminate()
+
+    def _terminate(self) -> None:
+        process = self._process
+        if process is not None and process.poll() is None:
+            try:
+                process.terminate()
+            except Exception as e:
+                logger.warning(f"终止 ffmpeg 进程失败: {e}")
+
+
+@dataclass
+class FFmpegQueueProgress:
+    """队列汇总进度快照。
+
+    Attributes:
+        total: 作业总数
+        succeeded: 成功数
+        failed: 失败数
+        cancelled: 取消数
+        running: 运行中的作业
+        progress: 按权重汇总的总进度 (0-1)
+        elapsed: 已用时间（秒）
+        eta: 预计剩余时间（秒），无法估计时为 None
+    """
+    total: int
+    succeeded: int
+    failed: int
+    cancelled: int
+    running: List[FFmpegJob]
+    progress: float
+    elapsed: float
+    eta: Optional[float]
+
+    @property
+    def finished(self) -> int:
+        """已结束的作业数。"""
+        return self.succeeded + self.failed + self.cancelled
+
+    @property
+    def eta_text(self) -> str:
+        """预计剩余时间文本。"""
+        if self.eta is None:
+            return "计算中..."
+        return f"{int(self.eta // 60)}m {int(self.eta % 60)}s"
+
+    def summary(self, max_names: int = 3) -> str:
+        """进度摘要（用于进度显示），有作业运行时第二行列出正在处理的文件。
+
+        Args:
+            max_names: 最多列出的文件数
+        """
+        text = (
+            f"{self.finished}/{self.total} 完成, {len(self.running)} 个处理中 | "
+            f"总进度 {self.progress:.0%} | 预计剩余: {self.eta_text}"
+        )
+        if self.running and max_names > 0:
+            names = ", ".join(job.name for job in self.running[:max_names])
+            if len(self.running) > max_names:
+                names += " ..."
+            text += f"\n正在处理: {names}"
+        return text
+
+
+class FFmpegJobQueue:
+    """FFmpeg 并发作业队列。
+
+    用法：submit 提交作业后调用 run（阻塞，请在后台线程中调用）。运行期间可以
+    cancel 单个作业或全部作业；作业结束后可以 retry，重试的作业会在本次 run
+    中继续执行，run 结束后重试则需要再次调用 run。
+    """
+
+    # 进度回调的最小间隔（秒）
+    PROGRESS_INTERVAL: float = 0.5
+
+    def __init__(self, max_workers: int = 1, max_retries: int = 0) -> None:
+        """初始化作业队列。
+
+        Args:
+            max_workers: 同时运行的 ffmpeg 进程数
+            max_retries: 失败作业自动重试的次数（硬件编码器会话数超限等偶发失败）
+        """
+        self.max_workers = max(1, max_workers)
+        self.max_retries = max(0, max_retries)
+        self.jobs: List[FFmpegJob] = []
+        self._pending: queue.Queue = queue.Queue()
+        # 作业结束事件，由工作线程放入，在调用 run 的线程中处理
+        self._finished: queue.Queue = queue.Queue()
+        self._outstanding = 0
+        self._lock = threading.Lock()
+        self._start_time = 0.0
+
+    def submit(
+        self,
+        func: Callable[[FFmpegJob], Tuple[bool, str]],
+        item: Any = None,
+        weight: float = 1.0,
+        name: str = ""
+    ) -> FFmpegJob:
+        """提交作业。
+
+        Args:
+            func: 作业函数，参数为 FFmpegJob，返回 (是否成功, 消息)
+            item: 输入项（如文件路径）
+            weight: 作业权重（如文件大小），用于汇总进度
+            name: 显示名称，默认取 item 的 name 属性
+
+        Returns:
+            作业对象
+        """
+        job = FFmpegJob(
+            index=len(self.jobs),
+            item=item,
+            func=func,
+            weight=max(float(weight or 0), 1.0),
+            name=name or getattr(item, "name", "") or str(item),
+        )
+        self.jobs.append(job)
+        self._enqueue(job)
+        return job
+
+    def _enqueue(self, job: FFmpegJob) -> None:
+        with self._lock:
+            self._outstanding += 1
+        self._pending.put(job)
+
+    def cancel(self, job: FFmpegJob) -> None:
+        """取消作业：等待中的作业不再执行，运行中的作业终止其 ffmpeg 进程。"""
+        job._cancel_event.set()
+        job._terminate()
+
+    def cancel_all(self) -> None:
+        """取消所有未结束的作业。"""
+        for job in self.jobs:
+            if not job.finished:
+                self.cancel(job)
+
+    def retry(self, job: FFmpegJob) -> bool:
+        """重新执行失败或已取消的作业。
+
+        Returns:
+            是否已重新加入队列
+        """
+        if job.status not in (FFmpegJobStatus.FAILED, FFmpegJobStatus.CANCELLED):
+            return False
+        self._reset(job)
+        self._enqueue(job)
+        return True
+
+    @staticmethod
+    def _reset(job: FFmpegJob) -> None:
+        job._cancel_event.clear()
+        job._process = None
+        job.status = FFmpegJobStatus.PENDING
+        job.progress = 0.0
+        job.speed = ""
+        job.message = ""
+
+    def progress(self) -> FFmpegQueueProgress:
+        """获取汇总进度快照（线程安全，可随时调用）。"""
+        counts = {status: 0 for status in FFmpegJobStatus}
+        running: List[FFmpegJob] = []
+        done_weight = 0.0
+        total_weight = 0.0
+        for job in list(self.jobs):
+            counts[job.status] += 1
+            total_weight += job.weight
+            if job.finished:
+                done_weight += job.weight
+            else:
+                done_weight += job.weight * job.progress
+                if job.status == FFmpegJobStatus.RUNNING:
+                    running.append(job)
+
+        overall = done_weight / total_weight if total_weight > 0 else 0.0
+        elapsed = time.perf_counter() - self._start_time if self._start_time else 0.0
+        # 并发执行时单个作业的剩余时间没有意义，按整体吞吐估计
+        eta = elapsed * (1 - overall) / overall if overall >= 0.01 and elapsed > 0 else None
+        return FFmpegQueueProgress(
+            total=len(self.jobs),
+            succeeded=counts[FFmpegJobStatus.SUCCEEDED],
+            failed=counts[FFmpegJobStatus.FAILED],
+            cancelled=counts[FFmpegJobStatus.CANCELLED],
+            running=running,
+            progress=overall,
+            elapsed=elapsed,
+            eta=eta,
+        )
+
+    def _execute(self, job: FFmpegJob) -> None:
+        """在工作线程中执行一个作业。"""
+        if job.cancelled:
+            job.status = FFmpegJobStatus.CANCELLED
+            job.message = "已取消"
+            return
+
+        job.status = FFmpegJobStatus.RUNNING
+        job.attempts += 1
+        job.started_at = time.perf_counter()
+        try:
+            success, message = job.func(job)
+        except Exception as e:
+            success, message = False, str(e)
+        finally:
+            job.finished_at = time.perf_counter()
+            job._process = None
+
+        job.message = message
+        if job.cancelled:
+            job.status = FFmpegJobStatus.CANCELLED
+            job.message = "已取消"
+        elif success:
+            job.status = FFmpegJobStatus.SUCCEEDED
+            job.progress = 1.0
+        else:
+            job.status = FFmpegJobStatus.FAILED
+
+    def _worker(self) -> None:
+        while True:
+            job = self._pending.get()
+            if job is None:
+                return
+            self._execute(job)
+            self._finished.put(job)
+
+    def run(
+        self,
+        on_progress: Optional[Callable[[FFmpegQueueProgress], None]] = None,
+        on_job_finished: Optional[Callable[[FFmpegJob], None]] = None
+    ) -> List[FFmpegJob]:
+        """执行队列中的所有作业（阻塞，请在后台线程中调用）。
+
+        Args:
+            on_progress: 汇总进度回调，至多每 PROGRESS_INTERVAL 秒调用一次
+            on_job_finished: 作业结束回调（自动重试的中间失败不会触发）
+
+        Returns:
+            所有作业列表（按提交顺序）
+        """
+        self._start_time = time.perf_counter()
+        workers = [
+            threading.Thread(target=self._worker, daemon=True, name=f"FFmpegJob-{i}")
+            for i in range(self.max_workers)
+        ]
+        for worker in workers:
+            worker.start()
+
+        try:
+            while True:
+                with self._lock:
+                    if self._outstanding == 0:
+                        break
+                try:
+                    job = self._finished.get(timeout=self.PROGRESS_INTERVAL)
+                except queue.Empty:
+                    job = None
+
+                if job is not None:
+                    with self._lock:
+                        self._outstanding -= 1
+                    if job.status == FFmpegJobStatus.FAILED and job.attempts <= self.max_retries:
+                        logger.warning(f"ffmpeg 作业失败，重试 ({job.attempts}/{self.max_retries}): {job.name}")
+                        self._reset(job)
+                        self._enqueue(job)
+                        continue
+                    if job.status == FFmpegJobStatus.FAILED:
+                        logger.error(f"ffmpeg 作业失败: {job.name}: {job.message}")
+                    if on_job_finished:
+                        try:
+                            on_job_finished(job)
+                        except Exception as e:
+                            logger.warning(f"作业完成回调异常: {e}")
+
+                if on_progress:
+                    try:
+                        on_progress(self.progress())
+                    except Exception as e:
+                        logger.warning(f"进度回调异常: {e}")
+        finally:
+            for _ in workers:
+                self._pending.put(None)
+            for worker in workers:
+                worker.join()
+
+        summary = self.progress()
+        logger.info(
+            f"ffmpeg 作业队列完成: {summary.succeeded}/{summary.total} 成功, "
+            f"{summary.failed} 失败, {summary.cancelled} 取消, 并发 {self.max_workers}, "
+            f"总耗时 {summary.elapsed:.1f}s"
+        )
+        return self.jobs
@@ -7,14 +7,18 @@
 import os
 import platform
 import subprocess
+import threading
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Callable, Optional, Tuple, Dict
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
 
 import ffmpeg
 import httpx
-import re
 
+from services.ffmpeg_job_service import FFmpegJobQueue
+from services.media_probe_service import MediaInfo, MediaProbeCache, probe_key
+from utils.ffmpeg_progress import FFMPEG_PROGRESS_ARGS, FFmpegProgress, FFmpegProgressReader
 from utils.file_utils import get_app_root
 
 
@@ -60,6 +64,10 @@ class FFmpegService:
     
         # 编码器可用性验证缓存（避免每次构建 UI 都跑一次 ffmpeg）
         self._encoder_usable_cache: Dict[str, bool] = {}
+        
+        # 媒体探测缓存（首次使用时创建）
+        self._probe_cache: Optional[MediaProbeCache] = None
+        self._probe_cache_lock = threading.Lock()
     
     @property
     def ffmpeg_dir(self) -> Path:
@@ -504,19 +512,29 @@ class FFmpegService:
         except Exception as e:
             return False, f"安装失败: {str(e)}"
 
-    def safe_probe(self, file_path: str) -> Optional[dict]:
-        """安全地获取视频信息（处理编码问题）。
-        
-        Args:
-            file_path: 视频文件路径
-            
-        Returns:
-            包含视频信息的字典，如果失败则返回None
+    # 批量探测时同时运行的 ffprobe 进程数
+    PROBE_WORKERS = 8
+
+    @property
+    def probe_cache(self) -> MediaProbeCache:
+        """媒体探测缓存（有配置服务时持久化到数据目录，否则仅在内存中）。"""
+        if self._probe_cache is None:
+            with self._probe_cache_lock:
+                if self._probe_cache is None:
+                    if self.config_service:
+                        db_path = self.config_service.get_data_dir() / "probe_cache.db"
+                        self._probe_cache = MediaProbeCache.shared(db_path)
+                    else:
+                        self._probe_cache = MediaProbeCache()
+        return self._probe_cache
+
+    def _run_ffprobe(self, ffprobe_path: str, file_path: str) -> Optional[str]:
+        """运行 ffprobe 并返回 JSON 文本（处理编码问题），ffprobe 无法解析文件时返回 None。
+
+        Raises:
+            subprocess.TimeoutExpired: ffprobe 超时
+            OSError: 无法启动 ffprobe
         """
-        ffprobe_path = self.get_ffprobe_path()
-        if not ffprobe_path:
-            return None
-            
         try:
             # 构建命令
             cmd = [
@@ -546,38 +564,141 @@ class FFmpegService:
             
             # 1. 尝试 utf-8
             try:
-                json_str = stdout_data.decode('utf-8')
+                return stdout_data.decode('utf-8')
             except UnicodeDecodeError:
                 # 2. 尝试 gbk (Windows 常见)
                 try:
-                    json_str = stdout_data.decode('gbk')
+                    return stdout_data.decode('gbk')
                 except UnicodeDecodeError:
                     # 3. 强制忽略错误
-                    json_str = stdout_data.decode('utf-8', errors='ignore')
-            
-            import json
-            return json.loads(json_str)
+                    return stdout_data.decode('utf-8', errors='ignore')
             
+        except (subprocess.TimeoutExpired, OSError):
+            # 与文件本身无关的失败，交给调用方处理（不缓存）
+            raise
         except Exception:
             return None
 
+    def probe_many(
+        self,
+        file_paths: Sequence[Union[str, Path]],
+        max_workers: Optional[int] = None
+    ) -> List[Optional[MediaInfo]]:
+        """批量获取媒体信息（优先使用缓存，未命中的文件并发运行 ffprobe）。
+
+        Args:
+            file_paths: 文件路径列表
+            max_workers: 同时运行的 ffprobe 进程数，默认 PROBE_WORKERS
+
+        Returns:
+            与输入顺序对应的媒体信息列表，无法探测的文件为 None
+        """
+        keys = [probe_key(path) for path in file_paths]
+        cache = self.probe_cache
+        results = cache.lookup(key for key in keys if key is not None)
+
+        # 同一文件只探测一次
+        missing = list(dict.fromkeys(key for key in keys if key is not None and key not in results))
+        if missing:
+            ffprobe_path = self.get_ffprobe_path()
+            if ffprobe_path:
+                def probe_one(key) -> Tuple[Optional[MediaInfo], bool]:
+                    """返回 (媒体信息, 结果是否可以缓存)。"""
+                    try:
+                        raw_json = self._run_ffprobe(ffprobe_path, key[0])
+                    except (subprocess.TimeoutExpired, OSError) as e:
+                        from utils import logger
+                        logger.warning(f"ffprobe 探测失败（不缓存）: {key[0]}: {e}")
+                        return None, False
+                    if raw_json is None:
+                        return None, True
+                    try:
+                        return MediaInfo.from_probe(key[0], raw_json), True
+                    except (ValueError, TypeError, AttributeError):
+                        return None, True
+
+                workers = max(1, min(max_workers or self.PROBE_WORKERS, len(missing)))
+                if workers == 1:
+                    outcomes = list(map(probe_one, missing))
+                else:
+                    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ffprobe") as executor:
+                        outcomes = list(executor.map(probe_one, missing))
+                cache.store({key: info for key, (info, cacheable) in zip(missing, outcomes) if cacheable})
+                results.update((key, info) for key, (info, _) in zip(missing, outcomes))
+
+        return [results.get(key) if key is not None else None for key in keys]
+
+    def probe(self, file_path: Union[str, Path]) -> Optional[MediaInfo]:
+        """获取单个文件的媒体信息（带缓存）。
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            媒体信息，无法探测时返回 None
+        """
+        return self.probe_many([file_path])[0]
+
+    def safe_probe(self, file_path: str) -> Optional[dict]:
+        """安全地获取视频信息（处理编码问题，结果带缓存）。
+        
+        Args:
+            file_path: 视频文件路径
+            
+        Returns:
+            包含视频信息的字典，如果失败则返回None
+        """
+        info = self.probe(file_path)
+        return info.to_dict() if info else None
+
     def get_video_duration(self, video_path: Path) -> float:
-        """获取视频时长（秒）。"""
-        ffprobe_path = self.get_ffprobe_path()
-        if not ffprobe_path:
-            return 0.0
-        try:
-            probe = ffmpeg.probe(str(video_path), cmd=ffprobe_path)
-            return float(probe['format']['duration'])
-        except (ffmpeg.Error, KeyError):
-            return 0.0
+        """获取视频时长（秒，结果带缓存）。"""
+        info = self.probe(video_path)
+        return info.duration if info else 0.0
+
+    def run_with_progress(
+        self,
+        process: subprocess.Popen,
+        duration: float,
+        progress_callback: Optional[Callable[[float, str, str], None]] = None,
+        on_progress: Optional[Callable[[FFmpegProgress], None]] = None
+    ) -> Tuple[int, str]:
+        """等待 ffmpeg 进程结束，解析其 stderr 中的 -progress 输出并回报进度。
+
+        进程需要以 FFMPEG_PROGRESS_ARGS 作为全局参数启动，且 stderr 为管道。
+        无论是否有回调都会持续读取 stderr，避免管道写满导致 ffmpeg 阻塞。
+
+        Args:
+            process: ffmpeg 进程
+            duration: 预期的输出总时长（秒），用于计算进度
+            progress_callback: 进度回调 (progress, speed, remaining_time)
+            on_progress: 结构化进度回调，参数为 FFmpegProgress
+
+        Returns:
+            (退出码, stderr 最后若干行日志)
+        """
+        def handle(progress: FFmpegProgress) -> None:
+            if on_progress:
+                on_progress(progress)
+            if progress_callback and progress.duration > 0:
+                progress_callback(progress.progress, progress.speed_text, progress.remaining_text)
+
+        reader = FFmpegProgressReader(
+            process.stderr,
+            duration=duration,
+            on_progress=handle if (progress_callback or on_progress) else None,
+        ).start()
+        process.wait()
+        reader.join(timeout=5)
+        return process.returncode, reader.tail
 
     def compress_video(
         self,
         input_path: Path,
         output_path: Path,
         params: Dict,
-        progress_callback: Optional[Callable[[float, str, str], None]] = None
+        progress_callback: Optional[Callable[[float, str, str], None]] = None,
+        process_callback: Optional[Callable[[subprocess.Popen], None]] = None
     ) -> Tuple[bool, str]:
         """压缩视频。
 
@@ -586,6 +707,7 @@ class FFmpegService:
             output_path: 输出视频路径
             params: 压缩参数字典
             progress_callback: 进度回调 (progress, speed, remaining_time)
+            process_callback: ffmpeg 进程启动后的回调（用于取消时终止进程）
 
         Returns:
             (是否成功, 消息)
@@ -792,7 +914,7 @@ class FFmpegService:
                 stream = ffmpeg.output(stream, str(output_path), **output_params)
 
             # 添加全局参数以确保进度输出
-            stream = stream.global_args('-stats', '-loglevel', 'info', '-progress', 'pipe:2')
+            stream = stream.global_args(*FFMPEG_PROGRESS_ARGS)
             
             # 使用 ffmpeg-python 的 run_async 运行
             process = ffmpeg.run_async(
@@ -802,60 +924,15 @@ class FFmpegService:
                 pipe_stdout=True,
                 overwrite_output=True
             )
+            if process_callback:
+                process_callback(process)
             
-            if progress_callback and duration > 0:
-                # 实时读取 stderr 获取进度
-                import threading
-                
-                def read_stderr():
-                    for line in iter(process.stderr.readline, b''):
-                        try:
-                            line_str = line.decode('utf-8', errors='ignore').strip()
-                            
-                            # 解析时间进度
-                            time_match = re.search(r"time=(\d{2}):(\d{2}):(\d{2})\.\d{2}", line_str)
-                            speed_match = re.search(r"speed=\s*([\d.]+)x", line_str)
-                            
-                            if time_match:
-                                hours = int(time_match.group(1))
-                                minutes = int(time_match.group(2))
-                                seconds = int(time_match.group(3))
-                                current_time = hours * 3600 + minutes * 60 + seconds
-                                
-                                progress = min(current_time / duration, 0.99) if duration > 0 else 0
-                                
-                                speed_str = f"{speed_match.group(1)}x" if speed_match else "N/A"
-                                
-                                if speed_match and float(speed_match.group(1)) > 0:
-                                    remaining_seconds = (duration - current_time) / float(speed_match.group(1))
-                                    remaining_time_str = f"{int(remaining_seconds // 60)}m {int(remaining_seconds % 60)}s"
-                                else:
-                                    remaining_time_str = "计算中..."
-                                
-                                progress_callback(progress, speed_str, remaining_time_str)
-                        except Exception:
-                            pass
-                    process.stderr.close()
-                
-                stderr_thread = threading.Thread(target=read_stderr, daemon=True)
-                stderr_thread.start()
-                
-                # 等待进程结束
-                process.wait()
-                stderr_thread.join(timeout=1)
-            else:
-                # 没有回调时直接等待
-                process.wait()
+            # 等待结束，通过 -progress 输出回报进度
+            returncode, stderr_output = self.run_with_progress(process, duration, progress_callback)
             
             # 检查返回码
-            if process.returncode != 0:
-                stderr_output = ""
-                try:
-                    if process.stderr:
-                        stderr_output = process.stderr.read().decode('utf-8', errors='ignore')
-                except Exception:
-                    pass
-                return False, f"FFmpeg 执行失败，退出码: {process.returncode}\n{stderr_output}"
+            if returncode != 0:
+                return False, f"FFmpeg 执行失败，退出码: {returncode}\n{stderr_output}"
             
             return True, "压缩成功"
 
@@ -1057,6 +1134,63 @@ class FFmpegService:
                 if encoder in encoders:
                     return encoder
         return None
+
+    # 硬件编码器的并发会话数（消费级显卡驱动通常限制同时打开的编码会话）
+    HW_ENCODER_SESSIONS = {
+        "_nvenc": 3,
+        "_amf": 2,
+        "_qsv": 2,
+        "_videotoolbox": 2,
+        "_vaapi": 2,
+    }
+
+    # 自身会占满多个核心的软件视频编码器
+    THREADED_SOFTWARE_ENCODERS = ("libx264", "libx265", "libvpx", "libaom", "libsvtav1", "mpeg4")
+
+    def recommend_job_workers(self, encoder: Optional[str] = None) -> int:
+        """根据编码器类型推荐同时运行的 ffmpeg 进程数。
+
+        - 配置项 ffmpeg_max_workers 大于 0 时直接使用该值
+        - 硬件编码器：受编码会话数限制
+        - 多线程软件视频编码器：每个进程约占 8 个核心
+        - 其它（音频编码、流复制等）：单线程为主，按核心数并发
+
+        Args:
+            encoder: 视频编码器名称，None 或 "copy" 表示音频处理或仅封装转换
+
+        Returns:
+            推荐的并发进程数
+        """
+        if self.config_service:
+            configured = self.config_service.get_config_value("ffmpeg_max_workers", 0)
+            try:
+                if int(configured) > 0:
+                    return int(configured)
+            except (TypeError, ValueError):
+                pass
+
+        cpu_count = os.cpu_count() or 1
+        if encoder and encoder != "copy":
+            for suffix, sessions in self.HW_ENCODER_SESSIONS.items():
+                if encoder.endswith(suffix):
+                    return sessions
+            if encoder.startswith(self.THREADED_SOFTWARE_ENCODERS):
+                return max(1, min(cpu_count // 8, 4))
+        return max(1, min(cpu_count - 1, 8))
+
+    def create_job_queue(self, encoder: Optional[str] = None) -> FFmpegJobQueue:
+        """创建批量处理用的并发作业队列。
+
+        Args:
+            encoder: 视频编码器名称（见 recommend_job_workers）
+
+        Returns:
+            FFmpegJobQueue 实例
+        """
+        workers = self.recommend_job_workers(encoder)
+        # 硬件编码器在会话数超限时会偶发打开失败，自动重试一次
+        is_hw = bool(encoder) and any(encoder.endswith(suffix) for suffix in self.HW_ENCODER_SESSIONS)
+        return FFmpegJobQueue(max_workers=workers, max_retries=1 if is_hw else 0)
     
     def get_install_info(self) -> dict:
         """获取FFmpeg安装信息。
@@ -1251,7 +1385,7 @@ class FFmpegService:
                 output_stream = ffmpeg.output(video_stream, str(output_path), **output_params)
             
             # 添加全局参数
-            output_stream = output_stream.global_args('-stats', '-loglevel', 'info', '-progress', 'pipe:2')
+            output_stream = output_stream.global_args(*FFMPEG_PROGRESS_ARGS)
             
             # 运行ffmpeg
             process = ffmpeg.run_async(
@@ -1262,61 +1396,12 @@ class FFmpegService:
                 overwrite_output=True
             )
             
-            # 实时读取进度
-            if progress_callback and duration > 0:
-                import threading
-                
-                def read_stderr():
-                    for line in iter(process.stderr.readline, b''):
-                        try:
-                            line_str = line.decode('utf-8', errors='ignore').strip()
-                            
-                            # 解析时间进度
-                            time_match = re.search(r"time=(\d{2}):(\d{2}):(\d{2})\.\d{2}", line_str)
-                            speed_match = re.search(r"speed=\s*([\d.]+)x", line_str)
-                            
-                            if time_match:
-                                hours = int(time_match.group(1))
-                                minutes = int(time_match.group(2))
-                                seconds = int(time_match.group(3))
-                                current_time = hours * 3600 + minutes * 60 + seconds
-                                
-                                # 调整后的时长
-                                adjusted_duration = duration / speed
-                                progress = min(current_time / adjusted_duration, 0.99) if adjusted_duration > 0 else 0
-                                
-                                speed_str = f"{speed_match.group(1)}x" if speed_match else "N/A"
-                                
-                                if speed_match and float(speed_match.group(1)) > 0:
-                                    remaining_seconds = (adjusted_duration - current_time) / float(speed_match.group(1))
-                                    remaining_time_str = f"{int(remaining_seconds // 60)}m {int(remaining_seconds % 60)}s"
-                                else:
-                                    remaining_time_str = "计算中..."
-                                
-                                progress_callback(progress, speed_str, remaining_time_str)
-                        except Exception:
-                            pass
-                    process.stderr.close()
-                
-                stderr_thread = threading.Thread(target=read_stderr, daemon=True)
-                stderr_thread.start()
-                
-                # 等待进程结束
-                process.wait()
-                stderr_thread.join(timeout=1)
-            else:
-                # 没有回调时直接等待
-                process.wait()
+            # 等待结束，通过 -progress 输出回报进度
+            returncode, stderr_output = self.run_with_progress(process, duration / speed, progress_callback)
             
             # 检查返回码
-            if process.returncode != 0:
-                stderr_output = ""
-                try:
-                    if process.stderr:
-                        stderr_output = process.stderr.read().decode('utf-8', errors='ignore')
-                except Exception:
-                    pass
-                return False, f"FFmpeg 执行失败，退出码: {process.returncode}\n{stderr_output}"
+            if returncode != 0:
+                return False, f"FFmpeg 执行失败，退出码: {returncode}\n{stderr_output}"
             
             return True, "速度调整成功"
         
@@ -1330,7 +1415,8 @@ class FFmpegService:
         input_path: Path,
         output_path: Path,
         speed: float,
-        progress_callback: Optional[Callable[[float, str, str], None]] = None
+        progress_callback: Optional[Callable[[float, str, str], None]] = None,
+        process_callback: Optional[Callable[[subprocess.Popen], None]] = None
     ) -> Tuple[bool, str]:
         """调整音频播放速度。
         
@@ -1339,6 +1425,7 @@ class FFmpegService:
             output_path: 输出音频路径
             speed: 速度倍数（0.1-10.0），1.0为原速，2.0为2倍速
             progress_callback: 进度回调 (progress, speed, remaining_time)
+            process_callback: ffmpeg 进程启动后的回调（用于取消时终止进程）
         
         Returns:
             (是否成功, 消息)
@@ -1408,7 +1495,7 @@ class FFmpegService:
             output_stream = ffmpeg.output(audio_stream, str(output_path), **output_params)
             
             # 添加全局参数
-            output_stream = output_stream.global_args('-stats', '-loglevel', 'info', '-progress', 'pipe:2')
+            output_stream = output_stream.global_args(*FFMPEG_PROGRESS_ARGS)
             
             # 运行ffmpeg
             process = ffmpeg.run_async(
@@ -1418,62 +1505,15 @@ class FFmpegService:
                 pipe_stdout=True,
                 overwrite_output=True
             )
+            if process_callback:
+                process_callback(process)
             
-            # 实时读取进度
-            if progress_callback and duration > 0:
-                import threading
-                
-                def read_stderr():
-                    for line in iter(process.stderr.readline, b''):
-                        try:
-                            line_str = line.decode('utf-8', errors='ignore').strip()
-                            
-                            # 解析时间进度
-                            time_match = re.search(r"time=(\d{2}):(\d{2}):(\d{2})\.\d{2}", line_str)
-                            speed_match = re.search(r"speed=\s*([\d.]+)x", line_str)
-                            
-                            if time_match:
-                                hours = int(time_match.group(1))
-                                minutes = int(time_match.group(2))
-                                seconds = int(time_match.group(3))
-                                current_time = hours * 3600 + minutes * 60 + seconds
-                                
-                                # 调整后的时长
-                                adjusted_duration = duration / speed
-                                progress = min(current_time / adjusted_duration, 0.99) if adjusted_duration > 0 else 0
-                                
-                                speed_str = f"{speed_match.group(1)}x" if speed_match else "N/A"
-                                
-                                if speed_match and float(speed_match.group(1)) > 0:
-                                    remaining_seconds = (adjusted_duration - current_time) / float(speed_match.group(1))
-                                    remaining_time_str = f"{int(remaining_seconds // 60)}m {int(remaining_seconds % 60)}s"
-                                else:
-                                    remaining_time_str = "计算中..."
-                                
-                                progress_callback(progress, speed_str, remaining_time_str)
-                        except Exception:
-                            pass
-                    process.stderr.close()
-                
-                stderr_thread = threading.Thread(target=read_stderr, daemon=True)
-                stderr_thread.start()
-                
-                # 等待进程结束
-                process.wait()
-                stderr_thread.join(timeout=1)
-            else:
-                # 没有回调时直接等待
-                process.wait()
+            # 等待结束，通过 -progress 输出回报进度
+            returncode, stderr_output = self.run_with_progress(process, duration / speed, progress_callback)
             
             # 检查返回码
-            if process.returncode != 0:
-                stderr_output = ""
-                try:
-                    if process.stderr:
-                        stderr_output = process.stderr.read().decode('utf-8', errors='ignore')
-                except Exception:
-                    pass
-                return False, f"FFmpeg 执行失败，退出码: {process.returncode}\n{stderr_output}"
+            if returncode != 0:
+                return False, f"FFmpeg 执行失败，退出码: {returncode}\n{stderr_output}"
             
             return True, "速度调整成功"
         
@@ -1633,7 +1673,7 @@ class FFmpegService:
                 )
             
             # 添加进度输出参数
-            stream = stream.global_args('-stats', '-loglevel', 'info', '-progress', 'pipe:2')
+            stream = stream.global_args(*FFMPEG_PROGRESS_ARGS)
             
             # 运行ffmpeg
             process = ffmpeg.run_async(
@@ -1644,64 +1684,16 @@ class FFmpegService:
                 overwrite_output=True
             )
             
-            # 实时读取进度
-            if progress_callback and duration > 0:
-                import threading
-                
-                def read_stderr():
-                    for line in iter(process.stderr.readline, b''):
-                        try:
-                            line_str = line.decode('utf-8', errors='ignore').strip()
-                            
-                            # 解析时间进度
-                            time_match = re.search(r"time=(\d{2}):(\d{2}):(\d{2})\.\d{2}", line_str)
-                            speed_match = re.search(r"speed=\s*([\d.]+)x", line_str)
-                            
-                            if time_match:
-                                hours = int(time_match.group(1))
-                                minutes = int(time_match.group(2))
-                                seconds = int(time_match.group(3))
-                                current_time = hours * 3600 + minutes * 60 + seconds
-                                
-                                progress = min(current_time / duration, 0.99) if duration > 0 else 0
-                                
-                                speed_str = f"{speed_match.group(1)}x" if speed_match else "N/A"
-                                
-                                if speed_match and float(speed_match.group(1)) > 0:
-                                    remaining_seconds = (duration - current_time) / float(speed_match.group(1))
-                                    remaining_time_str = f"{int(remaining_seconds // 60)}m {int(remaining_seconds % 60)}s"
-                                else:
-                                    remaining_time_str = "计算中..."
-                                
-                                progress_callback(progress, speed_str, remaining_time_str)
-                        except Exception:
-                            pass
-                    process.stderr.close()
-                
-                stderr_thread = threading.Thread(target=read_stderr, daemon=True)
-                stderr_thread.start()
-                
-                # 等待进程结束
-                process.wait()
-                stderr_thread.join(timeout=1)
-            else:
-                # 没有回调时直接等待
-                process.wait()
+            # 等待结束，通过 -progress 输出回报进度
+            returncode, stderr_output = self.run_with_progress(process, duration, progress_callback)
             
             # 检查返回码
-            if process.returncode != 0:
-                stderr_output = ""
-                try:
-                    if process.stderr:
-                        stderr_output = process.stderr.read().decode('utf-8', errors='ignore')
-                except Exception:
-                    pass
-                
+            if returncode != 0:
                 # 如果是auto模式且remux失败，可以提示用户尝试重新编码模式
                 if repair_mode == "auto":
-                    return False, f"自动修复失败。建议尝试'重新编码'或'激进修复'模式\n详情: {stderr_output[:200]}"
+                    return False, f"自动修复失败。建议尝试'重新编码'或'激进修复'模式\n详情: {stderr_output[-200:]}"
                 
-                return False, f"FFmpeg 执行失败，退出码: {process.returncode}\n{stderr_output[:200]}"
+                return False, f"FFmpeg 执行失败，退出码: {returncode}\n{stderr_output[-200:]}"
             
             return True, f"视频修复成功（模式: {repair_mode}）"
         
@@ -8,7 +8,7 @@ import gc
 import logging
 import threading
 from pathlib import Path
-from typing import Optional, Tuple, TYPE_CHECKING
+from typing import List, Optional, Tuple, TYPE_CHECKING
 
 import numpy as np
 import onnxruntime as ort
@@ -33,6 +33,9 @@ class FrameInterpolationService:
     使用 RIFE 模型在两帧之间生成中间帧，实现帧率提升。
     """
     
+    # 单次推理的默认最大 batch（帧对数 × 中间帧数）
+    DEFAULT_MAX_BATCH: int = 4
+    
     def __init__(
         self,
         model_name: str = DEFAULT_INTERPOLATION_MODEL_KEY,
@@ -51,6 +54,16 @@ class FrameInterpolationService:
         self.inference_lock = threading.Lock()  # 线程安全锁
         self._first_inference = True  # 标记是否是首次推理（用于调试日志）
         
+        # 模型输入信息（加载时缓存）
+        self._input_names: List[str] = []
+        self._input_shapes: List[list] = []
+        self._fixed_batch: Optional[int] = None  # 固定 batch 维度，None 表示动态
+        self._supports_batch: bool = False
+        self.max_batch: int = 1
+        
+        # 最近预处理过的帧（下一对帧的第一帧通常就是上一对的第二帧）
+        self._frame_cache: List[Tuple[np.ndarray, int, np.ndarray]] = []
+        
         logger.info(f"初始化 RIFE 插帧服务: {model_name}")
     
     def load_model(self, model_path: Path) -> None:
@@ -114,6 +127,8 @@ class FrameInterpolationService:
             logger.info(f"  输入: {[inp.name for inp in input_info]}")
             logger.info(f"  输出: {[out.name for out in output_info]}")
             
+            self._cache_input_info(input_info)
+            
             # 显示数据类型信息
             if input_info:
                 input_type = str(input_info[0].type)
@@ -130,11 +145,59 @@ class FrameInterpolationService:
     def unload_model(self) -> None:
         """卸载模型并释放内存。"""
         if self.sess:
+            self.sess.release(evict=True)
             self.sess = None
             self._first_inference = True  # 重置标志
+            self._input_names = []
+            self._input_shapes = []
+            self._fixed_batch = None
+            self._supports_batch = False
+            self.max_batch = 1
+            self._frame_cache = []
             gc.collect()
             logger.info("RIFE 模型已卸载")
     
+    def _cache_input_info(self, input_info: list) -> None:
+        """缓存模型输入信息，并判断是否支持 batch 推理。
+        
+        Args:
+            input_info: sess.get_inputs() 的返回值
+        """
+        self._input_names = [inp.name for inp in input_info]
+        self._input_shapes = [list(inp.shape) for inp in input_info]
+        
+        batch_dim = self._input_shapes[0][0] if self._input_shapes and self._input_shapes[0] else None
+        self._fixed_batch = batch_dim if isinstance(batch_dim, int) and batch_dim > 0 else None
+        
+        # 多输入模式的 timestep 是标量，无法区分 batch 中的不同样本
+        scalar_timestep = len(self._input_names) >= 3
+        self._supports_batch = (self._fixed_batch != 1) and not scalar_timestep
+        
+        if not self._supports_batch:
+            self.max_batch = 1
+        elif self._fixed_batch:
+            self.max_batch = self._fixed_batch
+        else:
+            max_batch = self.DEFAULT_MAX_BATCH
+            if self.config_service:
+                max_batch = self.config_service.get_config_value(
+                    "frame_interpolation_batch_size", self.DEFAULT_MAX_BATCH
+                )
+            self.max_batch = max(1, int(max_batch))
+        
+        logger.info(f"  batch 推理: {'支持' if self._supports_batch else '不支持'} (最大 batch: {self.max_batch})")
+    
+    def pairs_per_batch(self, n: int) -> int:
+        """一次推理能容纳的帧对数量。
+        
+        Args:
+            n: 每对帧之间的中间帧数量
+            
+        Returns:
+            建议每次传给 interpolate_pairs 的帧对数量（至少为 1）
+        """
+        return max(1, self.max_batch // max(1, n))
+    
     def get_device_info(self) -> str:
         """获取设备信息。"""
         if not self.sess:
@@ -201,55 +264,55 @@ class FrameInterpolationService:
         
         return frame
     
-    def interpolate(
-        self,
-        frame0: np.ndarray,
-        frame1: np.ndarray,
-        timestep: float = 0.5,
-        pad_to_multiple: int = 32
-    ) -> np.ndarray:
-        """在两帧之间插值生成中间帧（优化版）。
+    def _prepare_frame(self, frame: np.ndarray, pad_to_multiple: int) -> np.ndarray:
+        """填充并预处理单帧，命中缓存时直接复用。
         
-        优化策略（参考 Video2x）：
-        1. 使用 np.pad 代替手动填充（更快）
-        2. 边缘复制模式代替零填充（效果更好）
-        3. 减少中间变量和内存拷贝
+        缓存按帧对象本身匹配（调用方不应原地修改已传入的帧），
+        连续帧对中上一对的第二帧即下一对的第一帧，只需预处理一次。
         
         Args:
-            frame0: 第一帧 RGB 图像 (H, W, 3)，值范围 0-255
-            frame1: 第二帧 RGB 图像 (H, W, 3)，值范围 0-255
-            timestep: 时间步长，0.5 表示生成正中间的帧，范围 [0, 1]
-            pad_to_multiple: 填充到的倍数（RIFE 通常需要32的倍数）
+            frame: RGB 图像 (H, W, 3)，值范围 0-255
+            pad_to_multiple: 填充到的倍数
             
         Returns:
-            插值后的帧 (H, W, 3)，值范围 0-255
+            预处理后的帧 (1, 3, H', W')
         """
-        if self.sess is None:
-            raise RuntimeError("模型未加载，请先调用 load_model()")
+        for cached_frame, cached_multiple, cached_tensor in self._frame_cache:
+            if cached_frame is frame and cached_multiple == pad_to_multiple:
+                return cached_tensor
         
-        # 获取原始尺寸
-        orig_h, orig_w = frame0.shape[:2]
+        orig_h, orig_w = frame.shape[:2]
         
         # 计算填充后的尺寸
         pad_h = ((orig_h - 1) // pad_to_multiple + 1) * pad_to_multiple
         pad_w = ((orig_w - 1) // pad_to_multiple + 1) * pad_to_multiple
         
-        # 优化：使用 np.pad 进行边缘填充（比零填充效果更好，比手动拷贝更快）
+        # 使用 'edge' 模式：边缘像素复制（比零填充效果更好）
+        padded = frame
         if orig_h != pad_h or orig_w != pad_w:
-            pad_h_diff = pad_h - orig_h
-            pad_w_diff = pad_w - orig_w
-            # 使用 'edge' 模式：边缘像素复制（比零填充效果更好）
-            frame0 = np.pad(frame0, ((0, pad_h_diff), (0, pad_w_diff), (0, 0)), mode='edge')
-            frame1 = np.pad(frame1, ((0, pad_h_diff), (0, pad_w_diff), (0, 0)), mode='edge')
+            padded = np.pad(frame, ((0, pad_h - orig_h), (0, pad_w - orig_w), (0, 0)), mode='edge')
         
-        # 预处理（优化版本会自动处理连续内存）
-        img0 = self.preprocess_frame(frame0)
-        img1 = self.preprocess_frame(frame1)
+        tensor = self.preprocess_frame(padded)
         
-        # 准备输入
-        # RIFE 模型的输入格式
-        input_names = [inp.name for inp in self.sess.get_inputs()]
-        input_shapes = [inp.shape for inp in self.sess.get_inputs()]
+        self._frame_cache.append((frame, pad_to_multiple, tensor))
+        if len(self._frame_cache) > 2:
+            self._frame_cache.pop(0)
+        
+        return tensor
+    
+    def _build_inputs(self, img0: np.ndarray, img1: np.ndarray, timesteps: np.ndarray) -> dict:
+        """构建模型输入字典。
+        
+        Args:
+            img0: 第一帧 (B, 3, H, W)
+            img1: 第二帧 (B, 3, H, W)
+            timesteps: 每个样本的时间步 (B,)
+            
+        Returns:
+            输入字典
+        """
+        input_names = self._input_names
+        input_shapes = self._input_shapes
         
         # 构建输入字典
         inputs = {}
@@ -257,26 +320,20 @@ class FrameInterpolationService:
         if len(input_names) == 1:
             # 单输入模式：检查期望的通道数
             expected_channels = input_shapes[0][1] if len(input_shapes[0]) > 1 else None
+            batch, _, h, w = img0.shape
             
-            if expected_channels == 8:
+            if expected_channels in (7, 8):
                 # 需要 8 通道：img0 (3) + img1 (3) + timestep_map (2)
-                # 创建 timestep 通道（两个通道，值都是 timestep）
-                h, w = img0.shape[2], img0.shape[3]
-                timestep_map = np.full((1, 2, h, w), timestep, dtype=img0.dtype)
-                concatenated = np.concatenate([img0, img1, timestep_map], axis=1)
-                
-                if self._first_inference:
-                    logger.info(f"✓ 使用8通道模式 (6ch frames + 2ch timestep): {input_names[0]}")
-                    logger.info(f"  shape: {concatenated.shape}, dtype: {concatenated.dtype}")
-            
-            elif expected_channels == 7:
                 # 需要 7 通道：img0 (3) + img1 (3) + timestep (1)
-                h, w = img0.shape[2], img0.shape[3]
-                timestep_map = np.full((1, 1, h, w), timestep, dtype=img0.dtype)
+                timestep_channels = expected_channels - 6
+                timestep_map = np.broadcast_to(
+                    timesteps.astype(img0.dtype).reshape(batch, 1, 1, 1),
+                    (batch, timestep_channels, h, w)
+                )
                 concatenated = np.concatenate([img0, img1, timestep_map], axis=1)
                 
                 if self._first_inference:
-                    logger.info(f"✓ 使用7通道模式 (6ch frames + 1ch timestep): {input_names[0]}")
+                    logger.info(f"✓ 使用{expected_channels}通道模式 (6ch frames + {timestep_channels}ch timestep): {input_names[0]}")
                     logger.info(f"  shape: {concatenated.shape}, dtype: {concatenated.dtype}")
             
             else:
@@ -299,7 +356,7 @@ class FrameInterpolationService:
             
             # 某些 RIFE 版本需要 timestep 参数
             if len(input_names) >= 3:
-                timestep_input = np.array([timestep], dtype=np.float32)
+                timestep_input = timesteps[:1].astype(np.float32)
                 if self.model_info and self.model_info.precision == "fp16":
                     timestep_input = timestep_input.astype(np.float16)
                 inputs[input_names[2]] = timestep_input
@@ -310,18 +367,125 @@ class FrameInterpolationService:
         if self._first_inference:
             self._first_inference = False
         
+        return inputs
+    
+    def _infer(self, img0: np.ndarray, img1: np.ndarray, timesteps: np.ndarray) -> np.ndarray:
+        """执行推理，模型不支持 batch 时逐个样本推理。
+        
+        Args:
+            img0: 第一帧 (B, 3, H, W)
+            img1: 第二帧 (B, 3, H, W)
+            timesteps: 每个样本的时间步 (B,)
+            
+        Returns:
+            模型输出 (B, 3, H, W)
+        """
+        count = img0.shape[0]
+        
+        if not self._supports_batch or count == 1:
+            outputs = []
+            for i in range(count):
+                inputs = self._build_inputs(img0[i:i + 1], img1[i:i + 1], timesteps[i:i + 1])
+                # 推理（加锁以支持 DirectML）
+                with self.inference_lock:
+                    outputs.append(self.sess.run(None, inputs)[0])
+            return np.concatenate(outputs, axis=0) if count > 1 else outputs[0]
+        
+        # 固定 batch 维度的模型需要补齐到固定大小
+        if self._fixed_batch and count < self._fixed_batch:
+            pad = self._fixed_batch - count
+            img0 = np.concatenate([img0, np.repeat(img0[-1:], pad, axis=0)], axis=0)
+            img1 = np.concatenate([img1, np.repeat(img1[-1:], pad, axis=0)], axis=0)
+            timesteps = np.concatenate([timesteps, np.repeat(timesteps[-1:], pad)])
+        
+        inputs = self._build_inputs(img0, img1, timesteps)
+        
         # 推理（加锁以支持 DirectML）
         with self.inference_lock:
             outputs = self.sess.run(None, inputs)
         
-        # 后处理
-        output_frame = self.postprocess_frame(outputs[0])
+        return outputs[0][:count]
+    
+    def interpolate(
+        self,
+        frame0: np.ndarray,
+        frame1: np.ndarray,
+        timestep: float = 0.5,
+        pad_to_multiple: int = 32
+    ) -> np.ndarray:
+        """在两帧之间插值生成中间帧。
         
-        # 如果进行了填充，裁剪回原始尺寸
-        if output_frame.shape[0] != orig_h or output_frame.shape[1] != orig_w:
-            output_frame = output_frame[:orig_h, :orig_w]
+        Args:
+            frame0: 第一帧 RGB 图像 (H, W, 3)，值范围 0-255
+            frame1: 第二帧 RGB 图像 (H, W, 3)，值范围 0-255
+            timestep: 时间步长，0.5 表示生成正中间的帧，范围 [0, 1]
+            pad_to_multiple: 填充到的倍数（RIFE 通常需要32的倍数）
+            
+        Returns:
+            插值后的帧 (H, W, 3)，值范围 0-255
+        """
+        if self.sess is None:
+            raise RuntimeError("模型未加载，请先调用 load_model()")
         
-        return output_frame
+        # 获取原始尺寸
+        orig_h, orig_w = frame0.shape[:2]
+        
+        img0 = self._prepare_frame(frame0, pad_to_multiple)
+        img1 = self._prepare_frame(frame1, pad_to_multiple)
+        
+        output = self._infer(img0, img1, np.array([timestep], dtype=np.float32))
+        
+        # 后处理，如果进行了填充，裁剪回原始尺寸
+        output_frame = self.postprocess_frame(output)
+        return output_frame[:orig_h, :orig_w]
+    
+    def interpolate_pairs(
+        self,
+        frames: List[np.ndarray],
+        n: int = 1,
+        pad_to_multiple: int = 32
+    ) -> List[List[np.ndarray]]:
+        """对连续帧序列中的每一对相邻帧生成 n 个中间帧。
+        
+        每帧只预处理一次，所有 (帧对, 时间步) 组合按 max_batch 打包推理。
+        上一次调用的最后一帧作为本次调用的第一帧传入时会复用其预处理结果。
+        
+        Args:
+            frames: 连续帧列表 [f0, f1, ..., fk]，RGB (H, W, 3)
+            n: 每对帧之间的中间帧数量
+            pad_to_multiple: 填充到的倍数（RIFE 通常需要32的倍数）
+            
+        Returns:
+            长度为 k 的列表，第 i 项是 f(i) 与 f(i+1) 之间的 n 个中间帧
+        """
+        if self.sess is None:
+            raise RuntimeError("模型未加载，请先调用 load_model()")
+        
+        pair_count = len(frames) - 1
+        results: List[List[np.ndarray]] = [[] for _ in range(max(0, pair_count))]
+        if pair_count <= 0 or n <= 0:
+            return results
+        
+        orig_h, orig_w = frames[0].shape[:2]
+        
+        # 先预处理所有帧（相邻帧对共享同一份预处理结果）
+        prepared = [self._prepare_frame(frame, pad_to_multiple) for frame in frames]
+        
+        jobs = [(pair, i / (n + 1)) for pair in range(pair_count) for i in range(1, n + 1)]
+        
+        for start in range(0, len(jobs), self.max_batch):
+            chunk = jobs[start:start + self.max_batch]
+            img0 = np.concatenate([prepared[pair] for pair, _ in chunk], axis=0)
+            img1 = np.concatenate([prepared[pair + 1] for pair, _ in chunk], axis=0)
+            timesteps = np.array([t for _, t in chunk], dtype=np.float32)
+            
+            outputs = self._infer(img0, img1, timesteps)
+            
+            for k, (pair, _) in enumerate(chunk):
+                output_frame = self.postprocess_frame(outputs[k:k + 1])
+                results[pair].append(output_frame[:orig_h, :orig_w])
+        
+        return results
     
     def interpolate_n_times(
         self,
@@ -339,13 +503,7 @@ class FrameInterpolationService:
         Returns:
             中间帧列表，长度为 n
         """
-        frames = []
-        for i in range(1, n + 1):
-            timestep = i / (n + 1)
-            frame = self.interpolate(frame0, frame1, timestep)
-            frames.append(frame)
-        
-        return frames
+        return self.interpolate_pairs([frame0, frame1], n)[0]
     
     def interpolate_n_times_highperf(
         self,
@@ -356,8 +514,7 @@ class FrameInterpolationService:
     ) -> list[np.ndarray]:
         """高性能版本：在两帧之间生成 n 个中间帧。
         
-        注意：在单帧优化模式下，此方法等同于 interpolate_n_times。
-        保留此方法是为了向后兼容。
+        两帧各预处理一次，n 个时间步打包为一次推理（模型支持 batch 时）。
         
         Args:
             frame0: 第一帧
@@ -368,8 +525,7 @@ class FrameInterpolationService:
         Returns:
             中间帧列表，长度为 n
         """
-        # 在优化的单帧模式下，直接调用 interpolate_n_times
-        return self.interpolate_n_times(frame0, frame1, n)
+        return self.interpolate_pairs([frame0, frame1], n)[0]
     
     def increase_fps(
         self,
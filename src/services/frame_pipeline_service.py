@@ -0,0 +1,324 @@
+# -*- coding: utf-8 -*-
+"""视频帧流水线模块。
+
+提供 解码 → 处理 → 编码 三阶段流水线：解码和编码各占一个线程，
+处理在调用线程中执行（便于 ONNX/DirectML 推理）。阶段之间使用有界队列，
+下游跟不上时上游阻塞等待（背压），不会丢帧。帧缓冲区预先分配并循环使用，
+通过 memoryview 直接读写管道，不产生额外拷贝。
+"""
+
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils import logger
+
+
+@dataclass
+class FramePipelineStats:
+    """流水线统计信息。
+
+    Attributes:
+        frames_in: 已解码的帧数
+        frames_out: 已写入编码器的帧数
+        elapsed: 总耗时（秒）
+        busy: 各阶段实际工作耗时（秒），键为 'decode' / 'process' / 'encode'
+    """
+    frames_in: int = 0
+    frames_out: int = 0
+    elapsed: float = 0.0
+    busy: Dict[str, float] = field(default_factory=lambda: {"decode": 0.0, "process": 0.0, "encode": 0.0})
+
+    @property
+    def input_fps(self) -> float:
+        """解码吞吐（帧/秒）。"""
+        return self.frames_in / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def output_fps(self) -> float:
+        """输出吞吐（帧/秒）。"""
+        return self.frames_out / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def utilization(self) -> Dict[str, float]:
+        """各阶段利用率（工作耗时 / 总耗时）。"""
+        if self.elapsed <= 0:
+            return {name: 0.0 for name in self.busy}
+        return {name: min(1.0, busy / self.elapsed) for name, busy in self.busy.items()}
+
+    @property
+    def bottleneck(self) -> str:
+        """利用率最高的阶段（即瓶颈）。"""
+        return max(self.busy, key=self.busy.get)
+
+    def summary(self) -> str:
+        """单行统计摘要（用于日志和进度显示）。"""
+        usage = self.utilization
+        return (
+            f"输入 {self.input_fps:.1f} fps, 输出 {self.output_fps:.1f} fps | "
+            f"解码 {usage['decode']:.0%} 处理 {usage['process']:.0%} 编码 {usage['encode']:.0%} | "
+            f"瓶颈: {self.bottleneck}"
+        )
+
+
+def pipe_frame_reader(stream: BinaryIO) -> Callable[[np.ndarray], bool]:
+    """创建从管道（如 ffmpeg stdout）读取原始帧的函数。
+
+    Args:
+        stream: 二进制输入流
+
+    Returns:
+        read_frame(buffer) -> bool，读满一帧返回 True，EOF 返回 False
+    """
+    def read_frame(buffer: np.ndarray) -> bool:
+        view = memoryview(buffer).cast('B')
+        filled = 0
+        while filled < len(view):
+            count = stream.readinto(view[filled:])
+            if not count:
+                return False
+            filled += count
+        return True
+
+    return read_frame
+
+
+def pipe_frame_writer(stream: BinaryIO) -> Callable[[np.ndarray], None]:
+    """创建向管道（如 ffmpeg stdin）写入原始帧的函数。
+
+    Args:
+        stream: 二进制输出流
+
+    Returns:
+        write_frame(frame)
+    """
+    def write_frame(frame: np.ndarray) -> None:
+        if frame.dtype != np.uint8:
+            frame = frame.astype(np.uint8)
+        stream.write(memoryview(np.ascontiguousarray(frame)).cast('B'))
+
+    return write_frame
+
+
+class FramePipeline:
+    """三阶段视频帧流水线。
+
+    处理函数接收一批输入帧，返回要按顺序写出的帧列表（可以直接返回输入帧本身）。
+    输入帧的缓冲区在其之前的所有输出写完后才会回收；设置 retain_frames 后，
+    上一批最后的若干帧在下一批处理完之前保持有效（用于插帧等需要前一帧的场景）。
+    """
+
+    # 队列等待超时（秒），用于定期检查取消和错误
+    POLL_INTERVAL: float = 0.1
+
+    def __init__(
+        self,
+        frame_shape: Tuple[int, int, int],
+        read_frame: Callable[[np.ndarray], bool],
+        write_frame: Callable[[np.ndarray], None],
+        process: Callable[[List[np.ndarray]], List[np.ndarray]],
+        batch_size: int = 1,
+        queue_depth: int = 8,
+        retain_frames: int = 0,
+    ) -> None:
+        """初始化流水线。
+
+        Args:
+            frame_shape: 输入帧形状 (H, W, C)
+            read_frame: 将一帧读入给定缓冲区的函数，EOF 时返回 False
+            write_frame: 写出一帧的函数
+            process: 处理函数，输入一批帧，返回要写出的帧列表
+            batch_size: 每批处理的帧数（最后一批可能不足）
+            queue_depth: 解码队列和编码队列的深度
+            retain_frames: 上一批末尾需要保持有效的帧数
+        """
+        self.frame_shape = frame_shape
+        self.read_frame = read_frame
+        self.write_frame = write_frame
+        self.process = process
+        self.batch_size = max(1, batch_size)
+        self.queue_depth = max(1, queue_depth)
+        self.retain_frames = max(0, retain_frames)
+
+        self.stats = FramePipelineStats()
+        self._cancel_event = threading.Event()
+        self._finished = threading.Event()
+        self._errors: List[BaseException] = []
+        self._stats_lock = threading.Lock()
+
+    def cancel(self) -> None:
+        """请求取消（各阶段会尽快退出）。"""
+        self._cancel_event.set()
+
+    @property
+    def is_cancelled(self) -> bool:
+        """是否已被取消。"""
+        return self._cancel_event.is_set()
+
+    def _stopped(self) -> bool:
+        return self._cancel_event.is_set() or self._finished.is_set() or bool(self._errors)
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        """阻塞放入队列（背压），取消或出错时返回 False。"""
+        while not self._stopped():
+            try:
+                q.put(item, timeout=self.POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue):
+        """阻塞取出队列元素，取消或出错时返回 None。"""
+        while not self._stopped():
+            try:
+                return q.get(timeout=self.POLL_INTERVAL)
+            except queue.Empty:
+                continue
+        return None
+
+    def _add_busy(self, stage: str, seconds: float) -> None:
+        with self._stats_lock:
+            self.stats.busy[stage] += seconds
+
+    def run(
+        self,
+        on_progress: Optional[Callable[[FramePipelineStats], None]] = None
+    ) -> FramePipelineStats:
+        """运行流水线直到输入结束、取消或出错（阻塞，处理阶段在当前线程执行）。
+
+        Args:
+            on_progress: 每批处理完成后的回调（在当前线程调用）
+
+        Returns:
+            统计信息
+
+        Raises:
+            Exception: 任一阶段出错时重新抛出该异常
+        """
+        # 缓冲池大小：解码队列 + 一批处理中的帧 + 保留帧 + 等待写出的帧
+        pool_size = self.queue_depth + 2 * self.batch_size + self.retain_frames
+        free_buffers: queue.Queue = queue.Queue()
+        for _ in range(pool_size):
+            free_buffers.put(np.empty(self.frame_shape, dtype=np.uint8))
+
+        decoded: queue.Queue = queue.Queue(maxsize=self.queue_depth)
+        # 编码队列元素: ('frame', 数组) 或 ('release', 缓冲区) 或 _END(结束)
+        encode_queue: queue.Queue = queue.Queue(maxsize=self.queue_depth * self.batch_size)
+
+        start_time = time.perf_counter()
+
+        def decoder_worker() -> None:
+            try:
+                while not self._stopped():
+                    buffer = self._get(free_buffers)
+                    if buffer is None:
+                        break
+                    t0 = time.perf_counter()
+                    ok = self.read_frame(buffer)
+                    self._add_busy("decode", time.perf_counter() - t0)
+                    if not ok:
+                        break
+                    self.stats.frames_in += 1
+                    # 每帧使用新的数组视图，避免下游按对象缓存时误用已回收的缓冲区
+                    if not self._put(decoded, (buffer, buffer.view())):
+                        break
+            except BaseException as e:
+                logger.error(f"帧流水线解码阶段出错: {e}")
+                self._errors.append(e)
+            finally:
+                self._put_end(decoded)
+
+        def encoder_worker() -> None:
+            try:
+                while True:
+                    item = self._get(encode_queue)
+                    if item is None or item is _END:
+                        break
+                    kind, payload = item
+                    if kind == 'release':
+                        free_buffers.put(payload)
+                        continue
+                    t0 = time.perf_counter()
+                    self.write_frame(payload)
+                    self._add_busy("encode", time.perf_counter() - t0)
+                    self.stats.frames_out += 1
+            except BaseException as e:
+                logger.error(f"帧流水线编码阶段出错: {e}")
+                self._errors.append(e)
+
+        decoder = threading.Thread(target=decoder_worker, daemon=True, name="FramePipeline-Decode")
+        encoder = threading.Thread(target=encoder_worker, daemon=True, name="FramePipeline-Encode")
+        decoder.start()
+        encoder.start()
+
+        retained: List[np.ndarray] = []
+        try:
+            eof = False
+            while not eof and not self._stopped():
+                # 收集一批帧
+                buffers: List[np.ndarray] = []
+                frames: List[np.ndarray] = []
+                while len(frames) < self.batch_size:
+                    item = self._get(decoded)
+                    if item is None or item is _END:
+                        eof = True
+                        break
+                    buffers.append(item[0])
+                    frames.append(item[1])
+
+                if not frames:
+                    break
+
+                t0 = time.perf_counter()
+                outputs = self.process(frames)
+                self._add_busy("process", time.perf_counter() - t0)
+
+                for output in outputs:
+                    if not self._put(encode_queue, ('frame', output)):
+                        break
+
+                # 之前保留的帧和本批中不再需要保留的帧，在输出写完后回收
+                retained.extend(buffers)
+                split = max(0, len(retained) - self.retain_frames)
+                releasable, retained = retained[:split], retained[split:]
+                for buffer in releasable:
+                    self._put(encode_queue, ('release', buffer))
+
+                self.stats.elapsed = time.perf_counter() - start_time
+                if on_progress:
+                    on_progress(self.stats)
+        except BaseException as e:
+            logger.error(f"帧流水线处理阶段出错: {e}")
+            self._errors.append(e)
+        finally:
+            self._put_end(encode_queue)
+            # 出错或取消时解码线程可能阻塞在读取上，不无限等待
+            encoder.join(timeout=None if not self._stopped() else 5.0)
+            self._finished.set()
+            decoder.join(timeout=5.0)
+            self.stats.elapsed = time.perf_counter() - start_time
+
+        if self._errors:
+            raise self._errors[0]
+
+        logger.info(f"帧流水线完成: {self.stats.frames_in} 帧输入, {self.stats.frames_out} 帧输出 | {self.stats.summary()}")
+        return self.stats
+
+    def _put_end(self, q: queue.Queue) -> None:
+        """放入结束标记（队列满时等待，取消或出错时放弃）。"""
+        while True:
+            try:
+                q.put(_END, timeout=self.POLL_INTERVAL)
+                return
+            except queue.Full:
+                if self._stopped():
+                    return
+
+
+# 队列结束标记
+_END = object()
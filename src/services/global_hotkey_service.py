@@ -52,9 +52,9 @@ class GlobalHotkeyService:
         self._callbacks: Dict[int, Callable] = {}
         
         # OCR 服务（延迟初始化）
+        # 仅预加载模式下常驻；其余情况每次识别后释放会话句柄，模型由会话注册表
+        # 在空闲超时后卸载，期间再次识别（或与 OCR 页面使用同一模型）直接复用
         self._ocr_service = None
-        self._ocr_unload_timer: Optional[threading.Timer] = None
-        self._ocr_unload_delay = 300  # 5 分钟后自动卸载模型
         
         # OCR 区域选择锁，防止同时运行多个
         self._ocr_selecting = False
@@ -241,14 +241,6 @@ class GlobalHotkeyService:
     
     def stop(self) -> None:
         """停止全局热键监听。"""
-        # 取消 OCR 卸载定时器
-        if self._ocr_unload_timer is not None:
-            try:
-                self._ocr_unload_timer.cancel()
-            except Exception:
-                pass
-            self._ocr_unload_timer = None
-        
         # 卸载 OCR 模型
         if self._ocr_service is not None:
             try:
@@ -694,6 +686,7 @@ class GlobalHotkeyService:
             img_array = None
             img_bgr = None
             should_unload = False
+            ocr_service = None
             
             try:
                 from PIL import ImageGrab
@@ -739,18 +732,21 @@ class GlobalHotkeyService:
                 # 非预加载模式，使用后应该卸载模型释放内存
                 should_unload = not preload_ocr
                 
-                # 初始化 OCR 服务
-                if self._ocr_service is None:
+                # 初始化 OCR 服务（非预加载模式下只用于本次识别）
+                ocr_service = None if should_unload else self._ocr_service
+                if ocr_service is None:
                     from services import OCRService
-                    self._ocr_service = OCRService(self.config_service)
+                    ocr_service = OCRService(self.config_service)
+                    if not should_unload:
+                        self._ocr_service = ocr_service
                 
-                # 加载模型（如果需要）
-                if not self._ocr_service.det_session or not self._ocr_service.rec_session:
+                # 加载模型（如果需要；会话注册表中已有时直接复用）
+                if not ocr_service.det_session or not ocr_service.rec_session:
                     from constants import DEFAULT_OCR_MODEL_KEY
                     model_key = self.config_service.get_config_value("ocr_model_key", DEFAULT_OCR_MODEL_KEY)
                     use_gpu = self.config_service.get_config_value("gpu_acceleration", True)
                     
-                    success, message = self._ocr_service.load_model(
+                    success, message = ocr_service.load_model(
                         model_key,
                         use_gpu=use_gpu,
                         progress_callback=lambda p, m: None
@@ -760,7 +756,7 @@ class GlobalHotkeyService:
                         return
                 
                 # 执行识别
-                success, results = self._ocr_service.ocr_image(img_bgr)
+                success, results = ocr_service.ocr_image(img_bgr)
                 
                 # 释放图像数据
                 del img_bgr
@@ -857,9 +853,9 @@ class GlobalHotkeyService:
                 except Exception:
                     pass
                 
-                # 如果非预加载模式，启动延迟卸载定时器
-                if should_unload and self._ocr_service is not None:
-                    self._schedule_ocr_unload()
+                # 非预加载模式：只释放会话句柄，模型空闲超时后由会话注册表卸载
+                if should_unload and ocr_service is not None:
+                    ocr_service.unload_model(evict=False)
                 
                 # 强制垃圾回收
                 try:
@@ -871,48 +867,6 @@ class GlobalHotkeyService:
         thread = threading.Thread(target=do_ocr, daemon=True)
         thread.start()
     
-    def _schedule_ocr_unload(self) -> None:
-        """安排 OCR 模型延迟卸载。
-        
-        如果已有定时器在运行，会先取消再重新安排。
-        这样连续使用时会不断重置定时器，只有空闲一段时间后才会卸载。
-        """
-        # 取消已有的定时器
-        if self._ocr_unload_timer is not None:
-            try:
-                self._ocr_unload_timer.cancel()
-            except Exception:
-                pass
-            self._ocr_unload_timer = None
-        
-        # 启动新的延迟卸载定时器
-        self._ocr_unload_timer = threading.Timer(
-            self._ocr_unload_delay,
-            self._do_ocr_unload
-        )
-        self._ocr_unload_timer.daemon = True
-        self._ocr_unload_timer.start()
-        logger.debug(f"OCR 模型将在 {self._ocr_unload_delay} 秒后自动卸载")
-    
-    def _do_ocr_unload(self) -> None:
-        """执行 OCR 模型卸载。"""
-        try:
-            if self._ocr_service is not None:
-                self._ocr_service.unload_model()
-                del self._ocr_service
-                self._ocr_service = None
-                logger.info("OCR 模型已自动卸载，内存已释放")
-            
-            # 强制多次垃圾回收（确保循环引用被清理）
-            import gc
-            gc.collect()
-            gc.collect()
-            gc.collect()
-        except Exception as e:
-            logger.warning(f"自动卸载 OCR 模型失败: {e}")
-        finally:
-            self._ocr_unload_timer = None
-    
     def _trigger_screen_record(self) -> None:
         """触发屏幕录制 - 直接框选区域并开始录制。"""
         def do_screen_record():
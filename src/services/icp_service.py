@@ -628,12 +628,14 @@ class ICPService:
         try:
             # 释放YOLO检测模型
             if self.detector:
+                self.detector.session.release(evict=True)
                 del self.detector
                 self.detector = None
                 logger.info("ICP检测模型(ibig)已卸载")
 
             # 释放相似度模型
             if self.siamese:
+                self.siamese.session.release(evict=True)
                 del self.siamese
                 self.siamese = None
                 logger.info("ICP相似度模型(isma)已卸载")
@@ -6,11 +6,10 @@
 """
 
 import gc
-import io
 import math
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Tuple, List, Callable, TYPE_CHECKING
+from typing import Optional, Tuple, List, Callable, Sequence, TYPE_CHECKING
 
 import cv2
 import numpy as np
@@ -22,7 +21,7 @@ from constants import (
     DEFAULT_MODEL_KEY,
     DEFAULT_FACE_DETECTION_MODEL_KEY,
 )
-from utils import logger
+from utils import encode_to_target_size, logger
 
 if TYPE_CHECKING:
     from services import ConfigService
@@ -81,6 +80,10 @@ class IDPhotoService:
     整合背景移除、人脸检测和美颜功能，生成标准证件照。
     """
     
+    # 批量处理时人脸检测的固定输入尺寸 (height, width)，使多张图像可以合并推理；
+    # 单张检测和对齐后的重新检测仍按原图尺寸推理
+    BATCH_FACE_INPUT_SIZE = (640, 640)
+    
     def __init__(self, config_service: Optional['ConfigService'] = None) -> None:
         """初始化证件照服务。
         
@@ -132,6 +135,11 @@ class IDPhotoService:
         """检查人脸检测模型是否已加载。"""
         return self.face_detector is not None
     
+    @property
+    def batch_size(self) -> int:
+        """process_batch 每组建议的图像数（人脸检测一次推理的最大图像数）。"""
+        return self.face_detector.max_batch if self.face_detector else 1
+    
     def is_background_model_exists(self) -> bool:
         """检查背景移除模型文件是否存在。"""
         return self._get_model_path("background").exists()
@@ -251,16 +259,7 @@ class IDPhotoService:
         if not self.face_detector:
             raise RuntimeError("人脸检测模型未加载")
         
-        result = self.face_detector.detect_single(image)
-        if result is None:
-            return None
-        
-        return {
-            "rectangle": result.rectangle,
-            "roll_angle": result.roll_angle,
-            "landmarks": result.landmarks,
-            "confidence": result.confidence,
-        }
+        return self._face_info(self.face_detector.detect_single(image))
     
     @staticmethod
     def apply_whitening(image: np.ndarray, strength: int) -> np.ndarray:
@@ -647,27 +646,16 @@ class IDPhotoService:
         
         pil_image = Image.fromarray(rgb_image)
         
-        # 二分查找最佳质量值
-        quality = 95
+        # 查找不超过目标大小的最高质量
+        target_bytes = target_kb * 1024
+        result = encode_to_target_size(
+            pil_image, target_bytes, "JPEG", save_kwargs={"dpi": (dpi, dpi)}
+        )
         
-        while True:
-            img_byte_arr = io.BytesIO()
-            pil_image.save(img_byte_arr, format="JPEG", quality=quality, dpi=(dpi, dpi))
-            img_size_kb = len(img_byte_arr.getvalue()) / 1024
-            
-            if img_size_kb <= target_kb or quality <= 1:
-                # 如果图像小于目标大小，添加padding以精确匹配
-                if img_size_kb < target_kb:
-                    padding_size = int((target_kb * 1024) - len(img_byte_arr.getvalue()))
-                    padding = b"\x00" * padding_size
-                    img_byte_arr.write(padding)
-                
-                return img_byte_arr.getvalue()
-            
-            # 降低质量
-            quality -= 5
-            if quality < 1:
-                quality = 1
+        # 如果图像小于目标大小，添加padding以精确匹配
+        if len(result.data) < target_bytes:
+            return result.data + b"\x00" * (target_bytes - len(result.data))
+        return result.data
     
     @staticmethod
     def generate_layout(
@@ -871,40 +859,29 @@ class IDPhotoService:
         
         return result
     
-    def process(
+    def _face_info(self, result) -> Optional[dict]:
+        """将人脸检测结果转换为人脸信息字典。"""
+        if result is None:
+            return None
+        
+        return {
+            "rectangle": result.rectangle,
+            "roll_angle": result.roll_angle,
+            "landmarks": result.landmarks,
+            "confidence": result.confidence,
+        }
+    
+    def _prepare_matting(
         self,
         image: np.ndarray,
         params: IDPhotoParams,
-        bg_color: Tuple[int, int, int] = (67, 142, 219),
-        render_mode: str = "solid",
-        generate_layout: bool = True,
-        layout_size: Tuple[int, int] = (1205, 1795),
-        progress_callback: Optional[Callable[[float, str], None]] = None
-    ) -> IDPhotoResult:
-        """处理证件照。
-        
-        Args:
-            image: 输入图像 (BGR 格式)
-            params: 证件照参数
-            bg_color: 背景颜色 (R, G, B)
-            render_mode: 渲染模式
-            generate_layout: 是否生成排版照
-            layout_size: 排版尺寸 (height, width)
-            progress_callback: 进度回调函数
+        update_progress: Callable[[float, str], None]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """预处理、抠图和美颜。
         
         Returns:
-            证件照处理结果
+            (美颜后的原图 BGR, 抠图结果 BGRA)
         """
-        if not self.bg_remover:
-            raise RuntimeError("背景移除模型未加载")
-        
-        if not params.change_bg_only and not self.face_detector:
-            raise RuntimeError("人脸检测模型未加载")
-        
-        def update_progress(value: float, message: str):
-            if progress_callback:
-                progress_callback(value, message)
-        
         # 1. 预处理：缩放到合适大小
         update_progress(0.05, "正在预处理图像...")
         processing_image = self.resize_image_esp(image, 2000)
@@ -944,28 +921,49 @@ class IDPhotoService:
             _, _, _, a = cv2.split(matting_image)
             matting_image = cv2.merge([b, g, r, a])
         
-        # 如果只换底，直接返回
-        if params.change_bg_only:
-            update_progress(0.9, "正在添加背景...")
-            result_with_bg = self.add_background(matting_image, bg_color, render_mode)
-            
-            # 生成排版照
-            layout = None
-            if generate_layout:
-                update_progress(0.95, "正在生成排版照...")
-                layout = self.generate_layout(result_with_bg, params.size, layout_size)
-            
-            update_progress(1.0, "处理完成")
-            return IDPhotoResult(
-                standard=result_with_bg,
-                hd=result_with_bg,
-                matting=matting_image,
-                layout=layout
-            )
+        return origin_image, matting_image
+    
+    def _change_background(
+        self,
+        matting_image: np.ndarray,
+        params: IDPhotoParams,
+        bg_color: Tuple[int, int, int],
+        render_mode: str,
+        generate_layout: bool,
+        layout_size: Tuple[int, int],
+        update_progress: Callable[[float, str], None]
+    ) -> IDPhotoResult:
+        """只换底：直接为抠图结果添加背景。"""
+        update_progress(0.9, "正在添加背景...")
+        result_with_bg = self.add_background(matting_image, bg_color, render_mode)
         
-        # 4. 人脸检测
-        update_progress(0.5, "正在检测人脸...")
-        face_info = self.detect_face(origin_image)
+        # 生成排版照
+        layout = None
+        if generate_layout:
+            update_progress(0.95, "正在生成排版照...")
+            layout = self.generate_layout(result_with_bg, params.size, layout_size)
+        
+        update_progress(1.0, "处理完成")
+        return IDPhotoResult(
+            standard=result_with_bg,
+            hd=result_with_bg,
+            matting=matting_image,
+            layout=layout
+        )
+    
+    def _compose(
+        self,
+        origin_image: np.ndarray,
+        matting_image: np.ndarray,
+        face_info: Optional[dict],
+        params: IDPhotoParams,
+        bg_color: Tuple[int, int, int],
+        render_mode: str,
+        generate_layout: bool,
+        layout_size: Tuple[int, int],
+        update_progress: Callable[[float, str], None]
+    ) -> IDPhotoResult:
+        """根据人脸检测结果矫正、裁剪并生成证件照。"""
         if face_info is None:
             raise ValueError("未检测到人脸，请使用包含清晰人脸的照片")
         
@@ -1011,4 +1009,129 @@ class IDPhotoService:
             matting=matting_image,
             layout=layout
         )
+    
+    def process(
+        self,
+        image: np.ndarray,
+        params: IDPhotoParams,
+        bg_color: Tuple[int, int, int] = (67, 142, 219),
+        render_mode: str = "solid",
+        generate_layout: bool = True,
+        layout_size: Tuple[int, int] = (1205, 1795),
+        progress_callback: Optional[Callable[[float, str], None]] = None
+    ) -> IDPhotoResult:
+        """处理证件照。
+        
+        Args:
+            image: 输入图像 (BGR 格式)
+            params: 证件照参数
+            bg_color: 背景颜色 (R, G, B)
+            render_mode: 渲染模式
+            generate_layout: 是否生成排版照
+            layout_size: 排版尺寸 (height, width)
+            progress_callback: 进度回调函数
+        
+        Returns:
+            证件照处理结果
+        """
+        if not self.bg_remover:
+            raise RuntimeError("背景移除模型未加载")
+        
+        if not params.change_bg_only and not self.face_detector:
+            raise RuntimeError("人脸检测模型未加载")
+        
+        def update_progress(value: float, message: str):
+            if progress_callback:
+                progress_callback(value, message)
+        
+        origin_image, matting_image = self._prepare_matting(image, params, update_progress)
+        
+        # 如果只换底，直接返回
+        if params.change_bg_only:
+            return self._change_background(
+                matting_image, params, bg_color, render_mode,
+                generate_layout, layout_size, update_progress
+            )
+        
+        # 4. 人脸检测
+        update_progress(0.5, "正在检测人脸...")
+        face_info = self.detect_face(origin_image)
+        
+        return self._compose(
+            origin_image, matting_image, face_info, params, bg_color,
+            render_mode, generate_layout, layout_size, update_progress
+        )
+    
+    def process_batch(
+        self,
+        images: Sequence[np.ndarray],
+        params: IDPhotoParams,
+        bg_color: Tuple[int, int, int] = (67, 142, 219),
+        render_mode: str = "solid",
+        generate_layout: bool = True,
+        layout_size: Tuple[int, int] = (1205, 1795)
+    ) -> List[Tuple[Optional[IDPhotoResult], Optional[Exception]]]:
+        """批量处理证件照。
+        
+        先逐张抠图和美颜，再通过 FaceDetector.detect_batch 合并推理所有图像的
+        人脸检测，最后逐张裁剪合成。调用方按 batch_size 分组传入以限制内存占用。
+        
+        Args:
+            images: 输入图像列表 (BGR 格式)
+            params: 证件照参数
+            bg_color: 背景颜色 (R, G, B)
+            render_mode: 渲染模式
+            generate_layout: 是否生成排版照
+            layout_size: 排版尺寸 (height, width)
+        
+        Returns:
+            (证件照处理结果, None) 或处理失败时的 (None, 异常)，与输入一一对应
+        """
+        if not self.bg_remover:
+            raise RuntimeError("背景移除模型未加载")
+        
+        if not params.change_bg_only and not self.face_detector:
+            raise RuntimeError("人脸检测模型未加载")
+        
+        def update_progress(value: float, message: str):
+            pass
+        
+        results: List[Tuple[Optional[IDPhotoResult], Optional[Exception]]] = [
+            (None, None) for _ in images
+        ]
+        prepared: List[Tuple[int, np.ndarray, np.ndarray]] = []
+        
+        for index, image in enumerate(images):
+            try:
+                origin_image, matting_image = self._prepare_matting(image, params, update_progress)
+                if params.change_bg_only:
+                    results[index] = (self._change_background(
+                        matting_image, params, bg_color, render_mode,
+                        generate_layout, layout_size, update_progress
+                    ), None)
+                else:
+                    prepared.append((index, origin_image, matting_image))
+            except Exception as e:
+                results[index] = (None, e)
+        
+        if not prepared:
+            return results
+        
+        # 4. 人脸检测：所有图像合并推理
+        detections = self.face_detector.detect_batch(
+            [origin for _, origin, _ in prepared],
+            input_size=self.BATCH_FACE_INPUT_SIZE
+        )
+        
+        for (index, origin_image, matting_image), faces in zip(prepared, detections):
+            try:
+                face_info = self._face_info(self.face_detector.pick_largest(faces))
+                results[index] = (self._compose(
+                    origin_image, matting_image, face_info, params, bg_color,
+                    render_mode, generate_layout, layout_size, update_progress
+                ), None)
+            except Exception as e:
+                results[index] = (None, e)
+        
+        return results
 
@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+"""图片批量压缩服务模块。
+
+将 ImageService.compress_image 分发到进程池中并行执行，
+逐个文件回传结果，支持取消并统计吞吐量。
+"""
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from utils import GifUtils, logger
+
+
+@dataclass
+class CompressTask:
+    """单个压缩任务。
+
+    Attributes:
+        index: 任务在批次中的序号
+        input_path: 输入图片路径
+        output_path: 输出图片路径
+    """
+    index: int
+    input_path: Path
+    output_path: Path
+
+
+@dataclass
+class CompressTaskResult:
+    """单个压缩任务的结果。"""
+    index: int
+    input_path: Path
+    output_path: Path
+    success: bool
+    message: str
+    skipped: bool = False
+    original_size: int = 0
+    compressed_size: int = 0
+
+    @property
+    def saved_bytes(self) -> int:
+        """节省的字节数。"""
+        return self.original_size - self.compressed_size if self.success else 0
+
+
+@dataclass
+class BatchCompressStats:
+    """批量压缩的累计统计。"""
+    total: int = 0
+    completed: int = 0
+    success: int = 0
+    failed: int = 0
+    skipped: int = 0
+    original_bytes: int = 0
+    compressed_bytes: int = 0
+    elapsed: float = 0.0
+    cancelled: bool = False
+
+    @property
+    def saved_bytes(self) -> int:
+        """累计节省的字节数。"""
+        return self.original_bytes - self.compressed_bytes
+
+    @property
+    def files_per_second(self) -> float:
+        """吞吐量（文件/秒）。"""
+        return self.completed / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        """吞吐量（输入 MB/秒）。"""
+        if self.elapsed <= 0:
+            return 0.0
+        return self.original_bytes / (1024 * 1024) / self.elapsed
+
+
+# 子进程内的 ImageService 实例（由 _init_worker 创建，每个进程一个）
+_worker_image_service = None
+
+
+def _init_worker() -> None:
+    """进程池初始化函数：在每个子进程中创建一次 ImageService。"""
+    global _worker_image_service
+    from services.config_service import ConfigService
+    from services.image_service import ImageService
+
+    _worker_image_service = ImageService(ConfigService())
+
+
+def _compress_one(
+    task: CompressTask, mode: str, quality: int, target_kb: Optional[int] = None
+) -> CompressTaskResult:
+    """在工作进程中压缩单个文件。
+
+    Args:
+        task: 压缩任务
+        mode: 压缩模式 ('fast', 'balanced', 'max', 'target')
+        quality: 质量参数
+        target_kb: 目标文件大小（KB），仅 target 模式使用
+
+    Returns:
+        压缩结果
+    """
+    if _worker_image_service is None:
+        _init_worker()
+
+    input_path = task.input_path
+    output_path = task.output_path
+
+    try:
+        # 动图 GIF 不参与压缩
+        if GifUtils.is_animated_gif(input_path):
+            return CompressTaskResult(
+                task.index, input_path, output_path,
+                success=False, message="跳过动图 GIF", skipped=True,
+            )
+
+        # 覆盖模式下压缩后原文件会被替换，需要提前记录大小
+        original_size = input_path.stat().st_size
+        success, message = _worker_image_service.compress_image(
+            input_path, output_path, mode=mode, quality=quality, target_kb=target_kb
+        )
+        compressed_size = output_path.stat().st_size if success and output_path.exists() else 0
+
+        return CompressTaskResult(
+            task.index, input_path, output_path,
+            success=success, message=message,
+            original_size=original_size if success else 0,
+            compressed_size=compressed_size,
+        )
+    except Exception as e:
+        return CompressTaskResult(
+            task.index, input_path, output_path,
+            success=False, message=f"压缩失败: {e}",
+        )
+
+
+class ImageBatchCompressService:
+    """图片批量压缩服务类。
+
+    使用进程池并行压缩图片（Pillow、mozjpeg、pngquant 均适用），
+    每完成一个文件即通过回调回传结果，可随时取消。
+    """
+
+    # 每个工作进程最多同时排队的任务数，控制取消响应速度和内存占用
+    QUEUE_DEPTH_PER_WORKER: int = 2
+
+    # Windows 上 ProcessPoolExecutor 的 max_workers 不能超过 61
+    WINDOWS_MAX_PROCESS_WORKERS: int = 61
+
+    def __init__(self, max_workers: Optional[int] = None, use_processes: bool = True) -> None:
+        """初始化批量压缩服务。
+
+        Args:
+            max_workers: 最大并发数，None 表示使用 CPU 核心数（Windows 进程池最多 61）
+            use_processes: 是否使用进程池（False 时使用线程池）
+        """
+        self.max_workers: int = max(1, max_workers or os.cpu_count() or 1)
+        if use_processes and sys.platform == "win32":
+            self.max_workers = min(self.max_workers, self.WINDOWS_MAX_PROCESS_WORKERS)
+        self.use_processes: bool = use_processes
+        self._cancel_event = threading.Event()
+
+    def cancel(self) -> None:
+        """请求取消当前批次（已在执行的文件会完成，其余不再处理）。"""
+        self._cancel_event.set()
+
+    @property
+    def is_cancelled(self) -> bool:
+        """当前批次是否已被取消。"""
+        return self._cancel_event.is_set()
+
+    def _create_executor(self, task_count: int, use_processes: bool) -> Executor:
+        """创建执行器。"""
+        workers = min(self.max_workers, max(1, task_count))
+        if use_processes and workers > 1:
+            return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+        return ThreadPoolExecutor(max_workers=workers)
+
+    def compress_batch(
+        self,
+        tasks: List[CompressTask],
+        mode: str = 'balanced',
+        quality: int = 85,
+        on_result: Optional[Callable[[CompressTaskResult, BatchCompressStats], None]] = None,
+        target_kb: Optional[int] = None,
+    ) -> BatchCompressStats:
+        """并行压缩一批图片（阻塞直到完成或取消，请在后台线程中调用）。
+
+        Args:
+            tasks: 压缩任务列表
+            mode: 压缩模式 ('fast', 'balanced', 'max', 'target')
+            quality: 质量参数
+            on_result: 每个文件完成时的回调 (结果, 当前累计统计)，
+                在调用 compress_batch 的线程中执行
+            target_kb: 目标文件大小（KB），仅 target 模式使用
+
+        Returns:
+            最终统计信息
+        """
+        self._cancel_event.clear()
+        stats = BatchCompressStats(total=len(tasks))
+        if not tasks:
+            return stats
+
+        start_time = time.perf_counter()
+        # 进程池崩溃时需要重新提交的任务
+        requeued: List[CompressTask] = []
+        pending_tasks = iter(tasks)
+        in_flight: Dict[Future, CompressTask] = {}
+        max_in_flight = self.max_workers * self.QUEUE_DEPTH_PER_WORKER
+        use_processes = self.use_processes
+
+        while True:
+            executor = self._create_executor(len(tasks), use_processes)
+            try:
+                while True:
+                    # 保持有限数量的任务在途，便于及时响应取消
+                    while len(in_flight) < max_in_flight and not self._cancel_event.is_set():
+                        task = requeued.pop() if requeued else next(pending_tasks, None)
+                        if task is None:
+                            break
+                        try:
+                            in_flight[executor.submit(_compress_one, task, mode, quality, target_kb)] = task
+                        except BrokenProcessPool:
+                            requeued.append(task)
+                            raise
+                    if not in_flight:
+                        break
+
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        task = in_flight.pop(future)
+                        try:
+                            result = future.result()
+                        except BrokenProcessPool:
+                            requeued.append(task)
+                            continue
+                        except Exception as e:
+                            result = CompressTaskResult(
+                                task.index, task.input_path, task.output_path,
+                                success=False, message=f"压缩失败: {e}",
+                            )
+
+                        self._accumulate(stats, result)
+                        stats.elapsed = time.perf_counter() - start_time
+                        if on_result:
+                            try:
+                                on_result(result, stats)
+                            except Exception as e:
+                                logger.warning(f"批量压缩回调异常: {e}")
+
+                    if requeued and use_processes:
+                        raise BrokenProcessPool("工作进程异常退出")
+                break
+            except BrokenProcessPool as e:
+                # 进程池不可用（如受限环境），退回线程池处理剩余任务
+                logger.warning(f"压缩进程池异常，改用线程池: {e}")
+                requeued.extend(in_flight.values())
+                in_flight.clear()
+                use_processes = False
+            finally:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+        stats.elapsed = time.perf_counter() - start_time
+        stats.cancelled = stats.cancelled or self._cancel_event.is_set()
+        logger.info(
+            f"批量压缩完成: {stats.completed}/{stats.total} 个文件, "
+            f"{stats.files_per_second:.1f} 文件/秒, {stats.mb_per_second:.1f} MB/秒"
+        )
+        return stats
+
+    @staticmethod
+    def _accumulate(stats: BatchCompressStats, result: CompressTaskResult) -> None:
+        """将单个结果累加到统计中。"""
+        stats.completed += 1
+        if result.skipped:
+            stats.skipped += 1
+        elif result.success:
+            stats.success += 1
+            stats.original_bytes += result.original_size
+            stats.compressed_bytes += result.compressed_size
+        else:
+            stats.failed += 1
@@ -9,10 +9,15 @@ import os
 import platform
 import subprocess
 import sys
+import tempfile
+import time
 import zipfile
 import shutil
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional, Tuple, Callable, TYPE_CHECKING
+from typing import Deque, Iterable, Iterator, List, Optional, Tuple, Callable, Union, TYPE_CHECKING
 
 import cv2
 import httpx
@@ -20,7 +25,7 @@ import numpy as np
 from PIL import Image
 
 from models import GifAdjustmentOptions
-from utils import GifUtils, logger, create_onnx_session
+from utils import GifUtils, encode_to_target_size, logger, create_onnx_session
 from utils.file_utils import get_app_root
 
 if TYPE_CHECKING:
@@ -623,15 +628,17 @@ class ImageService:
         input_path: Path,
         output_path: Path,
         mode: str = 'balanced',
-        quality: int = 85
+        quality: int = 85,
+        target_kb: Optional[int] = None
     ) -> Tuple[bool, str]:
         """压缩图片。
         
         Args:
             input_path: 输入图片路径
             output_path: 输出图片路径
-            mode: 压缩模式 ('fast', 'balanced', 'max')
-            quality: 质量参数（1-100）
+            mode: 压缩模式 ('fast', 'balanced', 'max', 'target')
+            quality: 质量参数（1-100），target 模式下为质量上限
+            target_kb: 目标文件大小（KB），仅 target 模式使用
         
         Returns:
             (是否成功, 消息)
@@ -669,6 +676,12 @@ class ImageService:
                 else:
                     return self._compress_with_pillow(input_path, output_path, quality - 10)
             
+            elif mode == 'target':
+                # 目标大小 - 查找不超过目标大小的最高质量
+                if not target_kb or target_kb <= 0:
+                    return False, "请设置有效的目标大小"
+                return self._compress_to_target_size(input_path, output_path, target_kb, quality)
+            
             else:
                 return False, f"未知的压缩模式: {mode}"
         
@@ -763,6 +776,54 @@ class ImageService:
         except Exception as e:
             return False, f"Pillow 压缩失败: {e}"
     
+    def _compress_to_target_size(
+        self,
+        input_path: Path,
+        output_path: Path,
+        target_kb: int,
+        max_quality: int = 95
+    ) -> Tuple[bool, str]:
+        """压缩到指定大小以内（JPEG/WebP）。
+        
+        Args:
+            input_path: 输入图片路径
+            output_path: 输出图片路径
+            target_kb: 目标文件大小（KB）
+            max_quality: 质量上限
+        
+        Returns:
+            (是否成功, 消息)
+        """
+        ext = output_path.suffix.lower()
+        if ext in ['.jpg', '.jpeg', '.jfif']:
+            image_format = 'JPEG'
+            save_kwargs = {'optimize': True, 'progressive': True}
+        elif ext == '.webp':
+            image_format = 'WEBP'
+            save_kwargs = {'method': 6}
+        else:
+            return False, f"目标大小模式仅支持 JPEG/WebP 格式: {ext}"
+        
+        try:
+            with Image.open(input_path) as img:
+                img.load()
+                result = encode_to_target_size(
+                    img, target_kb * 1024, image_format,
+                    max_quality=max_quality, save_kwargs=save_kwargs
+                )
+            
+            # 覆盖模式下输出即输入，读完后再写入
+            with open(output_path, 'wb') as f:
+                f.write(result.data)
+            
+            size_kb = len(result.data) / 1024
+            if not result.fits:
+                return True, f"最低质量仍超出目标大小: {size_kb:.1f} KB"
+            return True, f"压缩成功 (目标大小): {size_kb:.1f} KB, 质量 {result.quality}"
+        
+        except Exception as e:
+            return False, f"目标大小压缩失败: {e}"
+    
     def _compress_with_mozjpeg(
         self,
         input_path: Path,
@@ -2068,6 +2129,9 @@ class BackgroundRemover:
     使用ONNX模型进行图像背景移除，支持GPU加速。
     """
     
+    # 模型 batch 维为动态时，一次推理的默认图像数
+    DEFAULT_MAX_BATCH = 4
+    
     def __init__(
         self, 
         model_path: Path, 
@@ -2103,12 +2167,19 @@ class BackgroundRemover:
         
         # 记录实际使用的执行提供者
         self.device_info = self.sess.get_providers()[0]
+        
+        # batch 维为固定整数时按该大小推理（为 1 时逐张推理）
+        batch_dim = self.sess.get_inputs()[0].shape[0]
+        self._fixed_batch = batch_dim if isinstance(batch_dim, int) and batch_dim > 0 else None
+        self.max_batch = self._fixed_batch or self.DEFAULT_MAX_BATCH
+        # 预处理和合成的线程数
+        self.workers = max(2, min(4, os.cpu_count() or 1))
     
     def __del__(self):
         """析构函数：确保对象销毁时清理 ONNX Runtime 会话。"""
         try:
-            if hasattr(self, 'sess') and self.sess is not None:
-                del self.sess
+            if getattr(self, 'sess', None) is not None:
+                self.sess.release()
         except Exception:
             # 忽略析构时的任何错误（包括日志管理器错误）
             pass
@@ -2116,8 +2187,8 @@ class BackgroundRemover:
     def unload_model(self) -> None:
         """卸载模型并释放内存。"""
         try:
-            if hasattr(self, 'sess') and self.sess is not None:
-                del self.sess
+            if getattr(self, 'sess', None) is not None:
+                self.sess.release(evict=True)
                 self.sess = None
             gc.collect()
             logger.info("BackgroundRemover 模型已卸载")
@@ -2197,13 +2268,150 @@ class BackgroundRemover:
         
         return result_image
     
-    def _clear_memory(self) -> None:
-        """清理内存。"""
+    def _prepare(
+        self,
+        image: Union[Image.Image, Callable[[], Image.Image]]
+    ) -> Tuple[Image.Image, np.ndarray]:
+        """解码并预处理单张图像（在线程池中执行）。
+        
+        Args:
+            image: PIL 图像，或返回 PIL 图像的加载函数（在此处调用，解码也在线程池中）
+        
+        Returns:
+            (RGB 原图, 预处理后的张量 (3, H, W))
+        """
+        if callable(image):
+            image = image()
+        orig_im = image.convert("RGB") if image.mode != "RGB" else image
+        tensor = self._preprocess_image(np.asarray(orig_im), self.model_input_size)[0]
+        return orig_im, tensor
+    
+    def _compose(self, orig_im: Image.Image, result: np.ndarray) -> Image.Image:
+        """放大掩码并合成 RGBA 图像（在线程池中执行）。
+        
+        Args:
+            orig_im: RGB 原图
+            result: 单张图像的模型输出 (C, H, W)
+        """
+        mask = self._postprocess_image(result, orig_im.size[::-1])
+        rgba_image = orig_im.convert("RGBA")
+        rgba_image.putalpha(Image.fromarray(mask, mode='L'))
+        return rgba_image
+    
+    def _infer(self, tensors: List[np.ndarray]) -> np.ndarray:
+        """对一组预处理后的张量执行一次推理。
+        
+        Returns:
+            模型输出 (B, C, H, W)，B 与输入数量一致
+        """
+        batch = np.stack(tensors)
+        count = len(tensors)
+        # 固定 batch 维的模型需要补齐
+        if self._fixed_batch and count < self._fixed_batch:
+            padding = np.zeros((self._fixed_batch - count,) + batch.shape[1:], dtype=batch.dtype)
+            batch = np.concatenate([batch, padding])
         try:
-            # 强制垃圾回收
-            gc.collect()
-        except Exception:
-            pass  # 静默处理清理异常
+            result = self.sess.run([self.output_name], {self.input_name: batch})[0]
+        except Exception as e:
+            raise RuntimeError(f"模型推理失败: {e}")
+        if result.ndim == 3:
+            result = result[:, np.newaxis]
+        return result[:count]
+    
+    def iter_remove_background(
+        self,
+        images: Iterable[Union[Image.Image, Callable[[], Image.Image]]],
+        batch_size: Optional[int] = None
+    ) -> Iterator[Tuple[Optional[Image.Image], Optional[Exception]]]:
+        """流水线批量去除背景，按输入顺序逐个产出结果。
+        
+        解码和预处理在线程池中提前进行，每 batch_size 张合并为一次推理，
+        掩码放大和透明通道合成也在线程池中执行，与下一批推理重叠。
+        
+        Args:
+            images: 输入的 PIL 图像或无参加载函数（可以是惰性生成器）。传入加载
+                函数时图像在线程池中解码；加载失败的项产出 (None, 异常)
+            batch_size: 每次推理的图像数，None 表示使用 max_batch
+        
+        Yields:
+            (去除背景后的 RGBA 图像, None) 或处理失败时的 (None, 异常)，与输入一一对应
+        """
+        batch_size = max(1, min(batch_size or self.max_batch, self.max_batch))
+        source = iter(images)
+        exhausted = False
+        prepared: Deque[Future] = deque()
+        finished: Deque[Future] = deque()
+        count = 0
+        start_time = time.perf_counter()
+        
+        def failed(error: Exception) -> Future:
+            future: Future = Future()
+            future.set_exception(error)
+            return future
+        
+        def take(future: Future) -> Tuple[Optional[Image.Image], Optional[Exception]]:
+            try:
+                return future.result(), None
+            except Exception as e:
+                return None, e
+        
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bg-remove") as executor:
+            while True:
+                # 保持两个批次的图像在预处理
+                while not exhausted and len(prepared) < batch_size * 2:
+                    image = next(source, None)
+                    if image is None:
+                        exhausted = True
+                        break
+                    prepared.append(executor.submit(self._prepare, image))
+                if not prepared:
+                    break
+                
+                chunk = [prepared.popleft() for _ in range(min(batch_size, len(prepared)))]
+                items: List[Tuple[Optional[Image.Image], Optional[np.ndarray], Optional[Exception]]] = []
+                for future in chunk:
+                    try:
+                        orig_im, tensor = future.result()
+                        items.append((orig_im, tensor, None))
+                    except Exception as e:
+                        items.append((None, None, e))
+                
+                outputs = None
+                error: Optional[Exception] = None
+                tensors = [tensor for _, tensor, _ in items if tensor is not None]
+                if tensors:
+                    try:
+                        outputs = self._infer(tensors)
+                    except Exception as e:
+                        error = e
+                
+                index = 0
+                for orig_im, tensor, item_error in items:
+                    if item_error is not None:
+                        finished.append(failed(item_error))
+                        continue
+                    if outputs is None:
+                        finished.append(failed(error))
+                    else:
+                        finished.append(executor.submit(self._compose, orig_im, outputs[index]))
+                    index += 1
+                del outputs, tensors, items
+                
+                # 产出已完成的结果；积压过多时等待，限制内存占用
+                while finished and (finished[0].done() or len(finished) > batch_size * 2):
+                    count += 1
+                    yield take(finished.popleft())
+            
+            while finished:
+                count += 1
+                yield take(finished.popleft())
+        
+        elapsed = time.perf_counter() - start_time
+        if count:
+            logger.info(
+                f"背景移除完成: {count} 张, 耗时 {elapsed:.1f}s, "
+                f"{count / elapsed if elapsed > 0 else 0:.2f} 张/秒 (batch={batch_size})"
+            )
     
     def remove_background(self, image: Image.Image) -> Image.Image:
         """处理图像并去除背景，返回RGBA格式的PIL图像。
@@ -2214,41 +2422,8 @@ class BackgroundRemover:
         Returns:
             去除背景后的RGBA图像
         """
-        try:
-            if image.mode != "RGB":
-                orig_im = image.convert("RGB")
-            else:
-                orig_im = image
-            
-            orig_im_size = orig_im.size[::-1]  # PIL size 是 (width, height)，需要反转为 (height, width)
-            
-            # 将 PIL 图像转换为 numpy 数组
-            image_np = np.array(orig_im)
-            
-            # 预处理图像
-            image_tensor = self._preprocess_image(image_np, self.model_input_size)
-            
-            # 模型推理
-            try:
-                result = self.sess.run([self.output_name], {self.input_name: image_tensor})[0]
-            except Exception as e:
-                raise RuntimeError(f"模型推理失败: {e}")
-            
-            # 后处理图像
-            mask = self._postprocess_image(result, orig_im_size)
-            
-            # 创建RGBA图像
-            rgba_image = Image.new("RGBA", orig_im.size)
-            rgba_image.paste(orig_im, (0, 0))
-            
-            # 应用掩码
-            mask_pil = Image.fromarray(mask, mode='L')
-            rgba_image.putalpha(mask_pil)
-            
-            return rgba_image
-        finally:
-            # 确保每次处理后都清理内存
-            self._clear_memory()
+        orig_im, tensor = self._prepare(image)
+        return self._compose(orig_im, self._infer([tensor])[0])
     
     def remove_background_batch(self, images: list[Image.Image]) -> list[Image.Image]:
         """批量处理多个图像。
@@ -2258,39 +2433,120 @@ class BackgroundRemover:
         
         Returns:
             去除背景后的RGBA图像列表
+        
+        Raises:
+            RuntimeError: 任一图像处理失败
         """
         results = []
-        try:
-            for img in images:
-                # 单独处理每张图片
-                if img.mode != "RGB":
-                    orig_im = img.convert("RGB")
-                else:
-                    orig_im = img
-                
-                orig_im_size = orig_im.size[::-1]
-                image_np = np.array(orig_im)
-                image_tensor = self._preprocess_image(image_np, self.model_input_size)
-                
-                try:
-                    result = self.sess.run([self.output_name], {self.input_name: image_tensor})[0]
-                except Exception as e:
-                    raise RuntimeError(f"模型推理失败: {e}")
-                
-                mask = self._postprocess_image(result, orig_im_size)
-                rgba_image = Image.new("RGBA", orig_im.size)
-                rgba_image.paste(orig_im, (0, 0))
-                mask_pil = Image.fromarray(mask, mode='L')
-                rgba_image.putalpha(mask_pil)
-                results.append(rgba_image)
-                
-                # 每处理一张图片后进行一次轻量级清理
-                gc.collect()
-        finally:
-            # 批量处理完成后进行完整的内存清理
-            self._clear_memory()
-            
-            return results
+        for result, error in self.iter_remove_background(images):
+            if error is not None:
+                raise RuntimeError(f"背景移除失败: {error}") from error
+            results.append(result)
+        return results
+
+
+@lru_cache(maxsize=64)
+def _feather_window(length: int, overlap: int) -> np.ndarray:
+    """tile 拼接用的一维渐变权重（两端在重叠区域内线性渐变，中间为1）。
+    
+    二维权重为行、列两个一维窗口的外积。
+    
+    Args:
+        length: tile 在该方向上的长度
+        overlap: 重叠像素数
+    
+    Returns:
+        只读的 float32 权重数组 (length,)
+    """
+    window = np.ones(length, dtype=np.float32)
+    if overlap > 0:
+        ramp = np.arange(1, min(overlap, length) + 1, dtype=np.float32) / (overlap + 1)
+        window[:len(ramp)] *= ramp
+        window[length - len(ramp):] *= ramp[::-1]
+    window.flags.writeable = False
+    return window
+
+
+class _TileBlender:
+    """按 tile 行带累加图像块，并把已完成的输出行流式写入结果数组。
+    
+    累加缓冲区只覆盖一个 tile 行带的高度，权重图为单通道，
+    因此内存占用与输出图像高度无关。
+    """
+    
+    def __init__(
+        self,
+        out: np.ndarray,
+        band_height: int,
+        overlap: int,
+        swap_rb: bool = False
+    ) -> None:
+        """初始化拼接器。
+        
+        Args:
+            out: 结果数组 (H, W, C)，uint8（可以是内存映射数组）
+            band_height: 单个 tile 的最大输出高度
+            overlap: 输出尺度下的重叠像素数
+            swap_rb: 写出时是否交换 R/B 通道（BGR -> RGB）
+        """
+        self.out = out
+        self.overlap = overlap
+        self.swap_rb = swap_rb
+        output_w = out.shape[1]
+        channels = out.shape[2]
+        self.acc = np.zeros((band_height, output_w, channels), dtype=np.float32)
+        self.weight = np.zeros((band_height, output_w), dtype=np.float32)
+        self.top = 0  # 累加缓冲区第0行对应的输出行
+    
+    def add(self, tile: np.ndarray, out_y: int, out_x: int) -> None:
+        """累加一个处理后的图像块（必须按行带从上到下的顺序加入）。
+        
+        Args:
+            tile: 已裁剪到实际尺寸的图像块 (h, w, C)
+            out_y: 在输出图像中的起始行
+            out_x: 在输出图像中的起始列
+        """
+        # 新行带开始后，其上方的行不会再有贡献，可以写出
+        if out_y > self.top:
+            self.flush(out_y)
+        
+        h, w = tile.shape[:2]
+        weight = np.outer(_feather_window(h, self.overlap), _feather_window(w, self.overlap))
+        
+        row = out_y - self.top
+        acc = self.acc[row:row + h, out_x:out_x + w]
+        acc += tile * weight[:, :, None]
+        self.weight[row:row + h, out_x:out_x + w] += weight
+    
+    def flush(self, until_row: Optional[int] = None) -> None:
+        """归一化并写出 [top, until_row) 范围内的输出行。
+        
+        Args:
+            until_row: 写出到该行（不含），None 表示写出全部剩余行
+        """
+        output_h = self.out.shape[0]
+        if until_row is None:
+            until_row = output_h
+        until_row = min(until_row, output_h, self.top + self.acc.shape[0])
+        count = until_row - self.top
+        if count <= 0:
+            return
+        
+        # 归一化（避免重叠区域变亮）
+        block = self.acc[:count]
+        block /= np.maximum(self.weight[:count], 1e-8)[:, :, None]
+        np.clip(block, 0, 255, out=block)
+        if self.swap_rb:
+            block = block[:, :, ::-1]
+        self.out[self.top:until_row] = block
+        
+        # 移动缓冲区，清空新的空闲行
+        remaining = self.acc.shape[0] - count
+        self.acc[:remaining] = self.acc[count:]
+        self.acc[remaining:] = 0
+        self.weight[:remaining] = self.weight[count:]
+        self.weight[remaining:] = 0
+        self.top = until_row
 
 
 class ImageEnhancer:
@@ -2299,6 +2555,11 @@ class ImageEnhancer:
     使用 Real-ESRGAN ONNX 模型进行图像超分辨率增强，支持GPU加速。
     """
     
+    # 输出超过该大小（MB）时拼接到临时内存映射文件
+    DEFAULT_MEMMAP_THRESHOLD_MB: int = 128
+    # enhance_image_to_file 可直接编码的输出格式
+    FILE_OUTPUT_FORMATS = ('.jpg', '.jpeg', '.png', '.webp', '.bmp', '.tif', '.tiff')
+    
     def __init__(
         self, 
         model_path: Path,
@@ -2310,7 +2571,9 @@ class ImageEnhancer:
         scale: int = 4,
         cpu_threads: int = 0,
         execution_mode: str = "sequential",
-        enable_model_cache: bool = False
+        enable_model_cache: bool = False,
+        memmap_threshold_mb: int = DEFAULT_MEMMAP_THRESHOLD_MB,
+        config_service: Optional['ConfigService'] = None
     ) -> None:
         """初始化图像增强器。
         
@@ -2325,6 +2588,9 @@ class ImageEnhancer:
             cpu_threads: CPU推理线程数，0=自动检测
             execution_mode: 执行模式（sequential/parallel）
             enable_model_cache: 是否启用模型缓存优化
+            memmap_threshold_mb: 输出超过该大小（MB）时使用临时内存映射文件，0 表示总是使用
+            config_service: 配置服务实例（用于同步会话注册表的内存预算和空闲时长，
+                显式传入的参数优先于配置）
         """
         try:
             import onnxruntime as ort
@@ -2338,69 +2604,18 @@ class ImageEnhancer:
         if data_path and not data_path.exists():
             raise FileNotFoundError(f"模型数据文件不存在: {data_path}")
         
-        # 配置会话选项，启用内存优化
-        sess_options = ort.SessionOptions()
-        sess_options.enable_mem_pattern = True
-        sess_options.enable_mem_reuse = True
-        sess_options.enable_cpu_mem_arena = enable_memory_arena
-        sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
-        sess_options.log_severity_level = 3  # ERROR级别
-        
-        # 应用性能优化参数
-        if cpu_threads > 0:
-            sess_options.intra_op_num_threads = cpu_threads
-            sess_options.inter_op_num_threads = cpu_threads
-        
-        # 执行模式
-        if execution_mode == "parallel":
-            sess_options.execution_mode = ort.ExecutionMode.ORT_PARALLEL
-        else:
-            sess_options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
-        
-        # 模型缓存优化
-        if enable_model_cache:
-            cache_path = model_path.with_suffix('.optimized.onnx')
-            sess_options.optimized_model_filepath = str(cache_path)
-        
-        # 选择执行提供者（GPU或CPU）
-        providers = []
-        self.using_gpu = False
-        
-        if use_gpu:
-            available_providers = ort.get_available_providers()
-            
-            # 按优先级尝试 GPU 提供者
-            # 1. CUDA (NVIDIA GPU)
-            if 'CUDAExecutionProvider' in available_providers:
-                providers.append(('CUDAExecutionProvider', {
-                    'device_id': gpu_device_id,
-                    'arena_extend_strategy': 'kNextPowerOfTwo',
-                    'gpu_mem_limit': gpu_memory_limit * 1024 * 1024,
-                    'cudnn_conv_algo_search': 'EXHAUSTIVE',
-                    'do_copy_in_default_stream': True,
-                }))
-                self.using_gpu = True
-            # 2. DirectML (Windows 通用 GPU)
-            elif 'DmlExecutionProvider' in available_providers:
-                providers.append('DmlExecutionProvider')
-                self.using_gpu = True
-            # 3. CoreML (macOS Apple Silicon，onnxruntime 内置)
-            elif 'CoreMLExecutionProvider' in available_providers:
-                providers.append('CoreMLExecutionProvider')
-                self.using_gpu = True
-            # 4. ROCm (AMD GPU)
-            elif 'ROCMExecutionProvider' in available_providers:
-                providers.append('ROCMExecutionProvider')
-                self.using_gpu = True
-        
-        # CPU作为后备
-        providers.append('CPUExecutionProvider')
-        
+        # 使用统一的工具函数创建（共享）会话，外部权重数据与模型位于同一目录
         try:
-            self.sess = ort.InferenceSession(
-                str(model_path),
-                sess_options=sess_options,
-                providers=providers
+            self.sess = create_onnx_session(
+                model_path=model_path,
+                use_gpu=use_gpu,
+                gpu_device_id=gpu_device_id,
+                gpu_memory_limit=gpu_memory_limit,
+                enable_memory_arena=enable_memory_arena,
+                cpu_threads=cpu_threads,
+                execution_mode=execution_mode,
+                enable_model_cache=enable_model_cache,
+                config_service=config_service
             )
             
             # 记录实际使用的提供者
@@ -2429,14 +2644,18 @@ class ImageEnhancer:
         # tile之间的重叠像素（用于避免边缘伪影）
         self.tile_overlap = 8
         
+        # 输出超过该字节数时拼接（及缩放）到临时内存映射文件。
+        # enhance_image_to_file 直接从映射文件编码，结果不会整幅驻留内存
+        self.memmap_threshold_bytes = max(0, memmap_threshold_mb) * 1024 * 1024
+        
         # 记录实际使用的执行提供者
         self.device_info = self.sess.get_providers()[0]
     
     def __del__(self):
         """析构函数：确保对象销毁时清理 ONNX Runtime 会话。"""
         try:
-            if hasattr(self, 'sess') and self.sess is not None:
-                del self.sess
+            if getattr(self, 'sess', None) is not None:
+                self.sess.release()
         except Exception:
             # 忽略析构时的任何错误（包括日志管理器错误）
             pass
@@ -2444,8 +2663,8 @@ class ImageEnhancer:
     def unload_model(self) -> None:
         """卸载模型并释放内存。"""
         try:
-            if hasattr(self, 'sess') and self.sess is not None:
-                del self.sess
+            if getattr(self, 'sess', None) is not None:
+                self.sess.release(evict=True)
                 self.sess = None
             gc.collect()
             logger.info("ImageEnhancer 模型已卸载")
@@ -2623,9 +2842,37 @@ class ImageEnhancer:
         
         return results
     
+    def _tile_positions(self, h: int, w: int) -> list[tuple[int, int, int, int]]:
+        """计算 tile 位置（按行优先顺序，去除边缘重复的位置）。
+        
+        Args:
+            h: 图像高度
+            w: 图像宽度
+        
+        Returns:
+            位置列表，每个元素为 (y_start, y_end, x_start, x_end)
+        """
+        tile_size = self.tile_size
+        step = tile_size - self.tile_overlap
+        
+        def spans(length: int) -> list[tuple[int, int]]:
+            result = []
+            for start in range(0, length, step):
+                end = min(start + tile_size, length)
+                span = (max(0, end - tile_size), end)
+                # 靠近边缘的起点会被收拢到同一位置，跳过重复
+                if not result or result[-1] != span:
+                    result.append(span)
+            return result
+        
+        x_spans = spans(w)
+        return [(y0, y1, x0, x1) for y0, y1 in spans(h) for x0, x1 in x_spans]
+    
     def _split_into_tiles(self, image: np.ndarray) -> list[tuple[np.ndarray, int, int, int, int]]:
         """将大图像分割成小块。
         
+        内部 tile 是原图的视图，只有尺寸不足的边缘 tile 会复制并填充。
+        
         Args:
             image: 输入图像 (H, W, C)
         
@@ -2634,38 +2881,123 @@ class ImageEnhancer:
         """
         h, w = image.shape[:2]
         tile_size = self.tile_size
-        overlap = self.tile_overlap
         
         tiles = []
-        
-        # 计算需要的行数和列数
-        for y in range(0, h, tile_size - overlap):
-            for x in range(0, w, tile_size - overlap):
-                # 计算当前tile的边界
-                y_end = min(y + tile_size, h)
-                x_end = min(x + tile_size, w)
-                y_start = max(0, y_end - tile_size)
-                x_start = max(0, x_end - tile_size)
-                
-                # 提取tile
-                tile = image[y_start:y_end, x_start:x_end]
-                
-                # 如果tile尺寸不足，需要padding
-                if tile.shape[0] < tile_size or tile.shape[1] < tile_size:
-                    padded_tile = np.zeros((tile_size, tile_size, tile.shape[2]), dtype=tile.dtype)
-                    padded_tile[:tile.shape[0], :tile.shape[1]] = tile
-                    tile = padded_tile
-                
-                tiles.append((tile, y_start, y_end, x_start, x_end))
+        for y_start, y_end, x_start, x_end in self._tile_positions(h, w):
+            # 提取tile
+            tile = image[y_start:y_end, x_start:x_end]
+            
+            # 如果tile尺寸不足，需要padding
+            if tile.shape[0] < tile_size or tile.shape[1] < tile_size:
+                padded_tile = np.zeros((tile_size, tile_size, tile.shape[2]), dtype=tile.dtype)
+                padded_tile[:tile.shape[0], :tile.shape[1]] = tile
+                tile = padded_tile
+            
+            tiles.append((tile, y_start, y_end, x_start, x_end))
         
         return tiles
     
+    def _tiles_to_batch_input(self, image: np.ndarray, positions: list[tuple[int, int, int, int]]) -> np.ndarray:
+        """直接从原图构建一批 tile 的模型输入（不创建中间 tile 副本）。
+        
+        Args:
+            image: 输入图像 (H, W, 3)，BGR格式
+            positions: tile 位置列表
+        
+        Returns:
+            模型输入 (B, 3, tile_size, tile_size)，RGB，值范围 [0, 1]
+        """
+        tile_size = self.tile_size
+        batch = np.zeros((len(positions), 3, tile_size, tile_size), dtype=np.float32)
+        for k, (y_start, y_end, x_start, x_end) in enumerate(positions):
+            # BGR -> RGB, HWC -> CHW，不足部分保持零填充
+            tile = image[y_start:y_end, x_start:x_end, ::-1]
+            batch[k, :, :y_end - y_start, :x_end - x_start] = tile.transpose(2, 0, 1)
+        batch /= 255.0
+        return batch
+    
+    def _create_output_buffer(self, output_h: int, output_w: int, channels: int) -> np.ndarray:
+        """分配结果数组，超过阈值时使用临时文件内存映射。
+        
+        映射文件的页面由操作系统按需换入换出，不计入进程的匿名内存；
+        转换为 PIL 图像时才会把整幅结果复制到内存。
+        
+        Args:
+            output_h: 输出高度
+            output_w: 输出宽度
+            channels: 通道数
+        
+        Returns:
+            uint8 结果数组 (output_h, output_w, channels)
+        """
+        shape = (output_h, output_w, channels)
+        if output_h * output_w * channels <= self.memmap_threshold_bytes:
+            return np.empty(shape, dtype=np.uint8)
+        
+        logger.info(f"输出图像较大 ({output_w}x{output_h})，使用内存映射缓冲区")
+        # 临时文件在映射关闭后自动删除
+        return np.memmap(tempfile.TemporaryFile(), dtype=np.uint8, mode='w+', shape=shape)
+    
+    def _enhance_tiled(self, image: np.ndarray, rgb: bool = True) -> np.ndarray:
+        """分块增强大图像，按 tile 行带流式拼接。
+        
+        Args:
+            image: 输入图像 (H, W, 3)，BGR格式
+            rgb: 输出 RGB（True）或 BGR（False）
+        
+        Returns:
+            增强后的图像 (H*scale, W*scale, 3)（大图为内存映射数组）
+        """
+        h, w = image.shape[:2]
+        scale = self.model_scale
+        positions = self._tile_positions(h, w)
+        
+        out = self._create_output_buffer(h * scale, w * scale, 3)
+        blender = _TileBlender(
+            out,
+            band_height=self.tile_size * scale,
+            overlap=self.tile_overlap * scale,
+            swap_rb=rgb
+        )
+        
+        # ⚡ 性能优化：使用批量推理
+        # batch_size根据GPU显存自动调整：
+        # - 小tile(512): batch=8
+        # - 中tile(1024): batch=4  
+        # - 大tile(2048): batch=2
+        batch_size = max(2, min(8, 4096 // self.tile_size))
+        
+        for i in range(0, len(positions), batch_size):
+            batch_positions = positions[i:i + batch_size]
+            batch_input = self._tiles_to_batch_input(image, batch_positions)
+            
+            try:
+                batch_output = self.sess.run([self.output_name], {self.input_name: batch_input})[0]
+                processed = [self._postprocess_image(batch_output[j:j + 1]) for j in range(len(batch_positions))]
+            except Exception as e:
+                # 如果批量推理失败（可能是显存不足），回退到逐个处理
+                logger.warning(f"批量推理失败({len(batch_positions)}个tile)，回退到逐个处理: {e}")
+                processed = []
+                for j in range(len(batch_positions)):
+                    output = self.sess.run([self.output_name], {self.input_name: batch_input[j:j + 1]})[0]
+                    processed.append(self._postprocess_image(output))
+            del batch_input
+            
+            for processed_tile, (y_start, y_end, x_start, x_end) in zip(processed, batch_positions):
+                # 裁剪处理后的tile到实际大小
+                actual_h = (y_end - y_start) * scale
+                actual_w = (x_end - x_start) * scale
+                blender.add(processed_tile[:actual_h, :actual_w], y_start * scale, x_start * scale)
+        
+        blender.flush()
+        return out
+    
     def _merge_tiles(self, tiles: list[tuple[np.ndarray, int, int, int, int]], 
                      output_h: int, output_w: int) -> np.ndarray:
         """将处理后的图像块合并成完整图像。
         
         Args:
-            tiles: 处理后的图像块列表
+            tiles: 处理后的图像块列表（按 _split_into_tiles 的顺序）
             output_h: 输出图像高度
             output_w: 输出图像宽度
         
@@ -2678,54 +3010,89 @@ class ImageEnhancer:
         else:
             channels = 3
         
-        output = np.zeros((output_h, output_w, channels), dtype=np.float32)
-        weight_map = np.zeros((output_h, output_w, channels), dtype=np.float32)
-        
-        # 创建权重矩阵（用于平滑拼接边界）
-        tile_size = self.tile_size * self.model_scale
-        overlap = self.tile_overlap * self.model_scale
+        output = np.empty((output_h, output_w, channels), dtype=np.uint8)
+        blender = _TileBlender(
+            output,
+            band_height=self.tile_size * self.model_scale,
+            overlap=self.tile_overlap * self.model_scale
+        )
         
         for processed_tile, y_start, y_end, x_start, x_end in tiles:
-            # 计算输出位置（使用模型原生倍率）
-            out_y_start = y_start * self.model_scale
-            out_y_end = y_end * self.model_scale
-            out_x_start = x_start * self.model_scale
-            out_x_end = x_end * self.model_scale
-            
-            # 获取实际tile尺寸（可能小于tile_size）
+            # 获取实际tile尺寸（可能小于tile_size），使用模型原生倍率
             actual_h = (y_end - y_start) * self.model_scale
             actual_w = (x_end - x_start) * self.model_scale
             
-            # 裁剪处理后的tile到实际大小
-            processed_tile = processed_tile[:actual_h, :actual_w]
-            
-            # 创建当前tile的权重（中心权重高，边缘权重低，用于平滑拼接）
-            weight = np.ones((actual_h, actual_w, channels), dtype=np.float32)
-            if overlap > 0:
-                # 在重叠区域应用渐变权重
-                for i in range(min(overlap, actual_h)):
-                    weight[i, :] *= (i + 1) / (overlap + 1)
-                    weight[-(i+1), :] *= (i + 1) / (overlap + 1)
-                for j in range(min(overlap, actual_w)):
-                    weight[:, j] *= (j + 1) / (overlap + 1)
-                    weight[:, -(j+1)] *= (j + 1) / (overlap + 1)
-            
-            # 累加到输出图像
-            output[out_y_start:out_y_end, out_x_start:out_x_end] += processed_tile.astype(np.float32) * weight
-            weight_map[out_y_start:out_y_end, out_x_start:out_x_end] += weight
+            blender.add(
+                processed_tile[:actual_h, :actual_w],
+                y_start * self.model_scale,
+                x_start * self.model_scale
+            )
         
-        # 归一化（避免重叠区域变亮）
-        weight_map = np.maximum(weight_map, 1e-8)  # 避免除零
-        output = output / weight_map
+        blender.flush()
+        return output
+    
+    def _enhance_array(self, image: Image.Image, rgb: bool) -> np.ndarray:
+        """增强单张图像并返回结果数组（使用tile分块处理）。
         
-        # 转换回uint8
-        output = np.clip(output, 0, 255).astype(np.uint8)
+        输出超过 memmap_threshold_bytes 时，分块拼接结果和自定义倍率的缩放
+        结果都放在临时内存映射文件中。
         
-        return output
+        Args:
+            image: 输入的PIL图像
+            rgb: 输出 RGB（True）或 BGR（False）
+        
+        Returns:
+            增强后的 uint8 数组 (H, W, 3)（大图为内存映射数组）
+        """
+        # 转换为RGB模式
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        
+        # 转换为numpy数组（BGR格式）
+        image_np = np.array(image)
+        if len(image_np.shape) == 2:  # 灰度图
+            image_np = cv2.cvtColor(image_np, cv2.COLOR_GRAY2BGR)
+        else:  # RGB -> BGR
+            image_np = cv2.cvtColor(image_np, cv2.COLOR_RGB2BGR)
+        
+        h, w = image_np.shape[:2]
+        
+        # 如果图像尺寸小于等于tile_size，直接处理
+        if h <= self.tile_size and w <= self.tile_size:
+            # 需要padding到tile_size
+            padded = np.zeros((self.tile_size, self.tile_size, image_np.shape[2]), dtype=image_np.dtype)
+            padded[:h, :w] = image_np
+            
+            result_np = self._process_tile(padded)
+            
+            # 裁剪到实际输出尺寸（使用模型原生倍率）
+            result_np = result_np[:h * self.model_scale, :w * self.model_scale]
+            
+            # BGR -> RGB
+            result = cv2.cvtColor(result_np, cv2.COLOR_BGR2RGB) if rgb else result_np
+        else:
+            # 大图像需要分块处理（大图使用内存映射缓冲区）
+            result = self._enhance_tiled(image_np, rgb=rgb)
+        del image_np
+        
+        # 如果自定义倍率不等于模型倍率，需要进行缩放
+        if abs(self.current_scale - self.model_scale) > 0.01:
+            # 计算目标尺寸
+            target_h = int(h * self.current_scale)
+            target_w = int(w * self.current_scale)
+            # 使用高质量插值进行缩放，大图直接写入内存映射缓冲区
+            resized = self._create_output_buffer(target_h, target_w, 3)
+            cv2.resize(result, (target_w, target_h), dst=resized, interpolation=cv2.INTER_LANCZOS4)
+            result = resized
+        
+        return result
     
     def enhance_image(self, image: Image.Image) -> Image.Image:
         """增强单张图像（使用tile分块处理）。
         
+        返回的 PIL 图像需要完整驻留内存；只需要保存到文件时应使用
+        enhance_image_to_file，大图结果不会整幅进入内存。
+        
         Args:
             image: 输入的PIL图像
         
@@ -2733,72 +3100,56 @@ class ImageEnhancer:
             增强后的PIL图像（放大scale倍）
         """
         try:
-            # 转换为RGB模式
-            if image.mode not in ('RGB', 'L'):
-                image = image.convert('RGB')
-            
-            # 转换为numpy数组（BGR格式）
-            image_np = np.array(image)
-            if len(image_np.shape) == 2:  # 灰度图
-                image_np = cv2.cvtColor(image_np, cv2.COLOR_GRAY2BGR)
-            else:  # RGB -> BGR
-                image_np = cv2.cvtColor(image_np, cv2.COLOR_RGB2BGR)
-            
-            h, w = image_np.shape[:2]
-            
-            # 如果图像尺寸小于等于tile_size，直接处理
-            if h <= self.tile_size and w <= self.tile_size:
-                # 需要padding到tile_size
-                padded = np.zeros((self.tile_size, self.tile_size, image_np.shape[2]), dtype=image_np.dtype)
-                padded[:h, :w] = image_np
-                
-                result_np = self._process_tile(padded)
-                
-                # 裁剪到实际输出尺寸（使用模型原生倍率）
-                result_np = result_np[:h * self.model_scale, :w * self.model_scale]
-            else:
-                # 大图像需要分块处理
-                tiles_with_pos = self._split_into_tiles(image_np)
-                
-                # ⚡ 性能优化：使用批量推理
-                # 分离tile数据和位置信息
-                tiles_only = [tile for tile, _, _, _, _ in tiles_with_pos]
-                positions = [(y_start, y_end, x_start, x_end) for _, y_start, y_end, x_start, x_end in tiles_with_pos]
-                
-                # 批量处理所有tiles（关键优化！）
-                # batch_size根据GPU显存自动调整：
-                # - 小tile(512): batch=8
-                # - 中tile(1024): batch=4  
-                # - 大tile(2048): batch=2
-                batch_size = max(2, min(8, 4096 // self.tile_size))
-                processed_tiles_list = self._process_tiles_batch(tiles_only, batch_size=batch_size)
-                
-                # 重新组合tile和位置信息
-                processed_tiles = []
-                for processed_tile, (y_start, y_end, x_start, x_end) in zip(processed_tiles_list, positions):
-                    processed_tiles.append((processed_tile, y_start, y_end, x_start, x_end))
-                
-                # 合并tiles（使用模型原生倍率）
-                output_h = h * self.model_scale
-                output_w = w * self.model_scale
-                result_np = self._merge_tiles(processed_tiles, output_h, output_w)
-            
-            # 如果自定义倍率不等于模型倍率，需要进行缩放
-            if abs(self.current_scale - self.model_scale) > 0.01:
-                # 计算目标尺寸
-                target_h = int(h * self.current_scale)
-                target_w = int(w * self.current_scale)
-                # 使用高质量插值进行缩放
-                result_np = cv2.resize(result_np, (target_w, target_h), interpolation=cv2.INTER_LANCZOS4)
-            
-            # 转换回PIL图像（BGR -> RGB）
-            result_rgb = cv2.cvtColor(result_np, cv2.COLOR_BGR2RGB)
+            result_rgb = self._enhance_array(image, rgb=True)
+            
+            # 转换回PIL图像（复制到内存），随后立即释放内存映射的临时文件
             result_image = Image.fromarray(result_rgb)
+            del result_rgb
             
             return result_image
         finally:
             self._clear_memory()
     
+    def enhance_image_to_file(self, image: Image.Image, output_path: Path, quality: int = 95) -> None:
+        """增强单张图像并直接编码保存到文件。
+        
+        输出超过 memmap_threshold_bytes 时，结果只存在于临时内存映射文件中，
+        编码器逐行读取，进程内存只额外占用编码后的文件数据。
+        
+        Args:
+            image: 输入的PIL图像
+            output_path: 输出路径，扩展名须在 FILE_OUTPUT_FORMATS 中
+            quality: JPEG/WebP 质量 (1-100)
+        
+        Raises:
+            ValueError: 不支持的输出格式
+            RuntimeError: 编码失败
+        """
+        suffix = output_path.suffix.lower()
+        if suffix not in self.FILE_OUTPUT_FORMATS:
+            raise ValueError(f"不支持的输出格式: {suffix}")
+        
+        if suffix in ('.jpg', '.jpeg'):
+            # 不启用 Huffman 优化：优化需要缓存整幅图像的 DCT 系数，无法逐行编码
+            params = [cv2.IMWRITE_JPEG_QUALITY, quality]
+        elif suffix == '.webp':
+            params = [cv2.IMWRITE_WEBP_QUALITY, quality]
+        elif suffix == '.png':
+            params = [cv2.IMWRITE_PNG_COMPRESSION, 9]
+        else:
+            params = []
+        
+        try:
+            result_bgr = self._enhance_array(image, rgb=False)
+            success, encoded = cv2.imencode(suffix, result_bgr, params)
+            del result_bgr
+            if not success:
+                raise RuntimeError(f"图像编码失败: {output_path.name}")
+            # 使用 tofile 支持非 ASCII 路径
+            encoded.tofile(str(output_path))
+        finally:
+            self._clear_memory()
+    
     def enhance_image_batch(self, images: list[Image.Image]) -> list[Image.Image]:
         """批量增强多张图像（真正的批量推理优化）。
         
@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+"""媒体探测缓存模块。
+
+缓存 ffprobe 结果，键为 (路径, 文件大小, 修改时间)，文件变化后自动失效。
+常用字段（时长、分辨率、帧率、编码）单独存储，读取时不需要解析完整的 JSON；
+完整的 ffprobe 输出按需解析。缓存持久化到 SQLite，按最近使用时间淘汰。
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from utils import logger
+
+# 缓存键: (规范化路径, 文件大小, 修改时间 ns)
+ProbeKey = Tuple[str, int, int]
+
+
+@dataclass
+class MediaInfo:
+    """媒体文件的探测结果。
+
+    Attributes:
+        path: 文件路径
+        duration: 时长（秒），未知时为 0
+        width: 第一个视频流的宽度，没有视频流时为 0
+        height: 第一个视频流的高度
+        fps: 第一个视频流的帧率
+        video_codec: 第一个视频流的编码名称
+        audio_codec: 第一个音频流的编码名称
+    """
+    path: str
+    duration: float = 0.0
+    width: int = 0
+    height: int = 0
+    fps: float = 0.0
+    video_codec: str = ""
+    audio_codec: str = ""
+    _raw_json: str = field(default="{}", repr=False)
+
+    @property
+    def has_video(self) -> bool:
+        """是否包含视频流。"""
+        return bool(self.video_codec)
+
+    @property
+    def has_audio(self) -> bool:
+        """是否包含音频流。"""
+        return bool(self.audio_codec)
+
+    def to_dict(self) -> dict:
+        """完整的 ffprobe 输出（每次返回新的字典，调用方可以修改）。"""
+        return json.loads(self._raw_json)
+
+    @classmethod
+    def from_probe(cls, path: str, raw_json: str) -> 'MediaInfo':
+        """从 ffprobe 的 JSON 输出提取常用字段。"""
+        data = json.loads(raw_json)
+        streams = data.get('streams', [])
+        video = next((s for s in streams if s.get('codec_type') == 'video'), {})
+        audio = next((s for s in streams if s.get('codec_type') == 'audio'), {})
+
+        duration = _to_float(data.get('format', {}).get('duration')) or _to_float(video.get('duration'))
+        return cls(
+            path=path,
+            duration=duration,
+            width=int(video.get('width') or 0),
+            height=int(video.get('height') or 0),
+            fps=_parse_rate(video.get('avg_frame_rate')) or _parse_rate(video.get('r_frame_rate')),
+            video_codec=video.get('codec_name', ""),
+            audio_codec=audio.get('codec_name', ""),
+            _raw_json=raw_json,
+        )
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _parse_rate(rate: Optional[str]) -> float:
+    """解析 "30000/1001" 形式的帧率。"""
+    if not rate:
+        return 0.0
+    num, _, den = rate.partition('/')
+    try:
+        return float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+
+
+def probe_key(path: Union[str, Path]) -> Optional[ProbeKey]:
+    """计算文件的缓存键，文件不存在时返回 None。"""
+    try:
+        resolved = os.path.abspath(str(path))
+        stat = os.stat(resolved)
+    except OSError:
+        return None
+    return resolved, stat.st_size, stat.st_mtime_ns
+
+
+class MediaProbeCache:
+    """ffprobe 结果缓存（内存 LRU + SQLite 持久化，线程安全）。
+
+    探测失败的文件（ffprobe 无法解析）也会缓存为 None，避免短时间内反复探测不支持的
+    文件；失败结果只保存在内存中，FAILURE_TTL 秒后过期重新探测。超时、找不到 ffprobe
+    等与文件无关的失败由调用方判断，不应写入缓存。
+    """
+
+    # 探测失败结果的有效期（秒）
+    FAILURE_TTL: float = 60.0
+
+    _COLUMNS = "duration, width, height, fps, video_codec, audio_codec, raw_json"
+
+    # 按数据库路径共享的实例（多个 FFmpegService 实例共用同一个缓存）
+    _shared: Dict[str, 'MediaProbeCache'] = {}
+    _shared_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, db_path: Path) -> 'MediaProbeCache':
+        """获取指定数据库路径的共享缓存实例。"""
+        key = os.path.abspath(str(db_path))
+        with cls._shared_lock:
+            cache = cls._shared.get(key)
+            if cache is None:
+                cache = cls._shared[key] = cls(db_path)
+            return cache
+
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        max_entries: int = 5000,
+        memory_entries: int = 1024
+    ) -> None:
+        """初始化缓存。
+
+        Args:
+            db_path: SQLite 数据库路径，None 表示仅使用内存缓存
+            max_entries: 持久化缓存的最大条目数，超出后淘汰最久未使用的条目
+            memory_entries: 内存缓存的最大条目数
+        """
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[ProbeKey, MediaInfo]" = OrderedDict()
+        # 探测失败的文件 → 过期时间（time.monotonic）
+        self._failures: Dict[ProbeKey, float] = {}
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        if db_path is not None:
+            try:
+                db_path.parent.mkdir(parents=True, exist_ok=True)
+                self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS probes ("
+                    "path TEXT NOT NULL, size INTEGER NOT NULL, mtime INTEGER NOT NULL, "
+                    "duration REAL, width INTEGER, height INTEGER, fps REAL, "
+                    "video_codec TEXT, audio_codec TEXT, raw_json TEXT NOT NULL, last_used REAL NOT NULL, "
+                    "PRIMARY KEY (path, size, mtime)) WITHOUT ROWID"
+                )
+                self._conn.execute("CREATE INDEX IF NOT EXISTS probes_last_used ON probes(last_used)")
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"媒体探测缓存数据库不可用，仅使用内存缓存: {e}")
+                self._conn = None
+
+    def _remember(self, key: ProbeKey, info: MediaInfo) -> None:
+        self._memory[key] = info
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _remember_failure(self, key: ProbeKey) -> None:
+        now = time.monotonic()
+        if len(self._failures) >= self.memory_entries:
+            self._failures = {k: t for k, t in self._failures.items() if t > now}
+        self._failures[key] = now + self.FAILURE_TTL
+
+    def lookup(self, keys: Iterable[ProbeKey]) -> Dict[ProbeKey, Optional[MediaInfo]]:
+        """批量查询缓存。
+
+        Args:
+            keys: 缓存键列表
+
+        Returns:
+            命中的条目（值为 None 表示该文件最近探测失败过）
+        """
+        hits: Dict[ProbeKey, Optional[MediaInfo]] = {}
+        missing: List[ProbeKey] = []
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    hits[key] = self._memory[key]
+                elif key in self._failures:
+                    if self._failures[key] > now:
+                        hits[key] = None
+                    else:
+                        del self._failures[key]
+                        missing.append(key)
+                else:
+                    missing.append(key)
+
+            if not missing or self._conn is None:
+                return hits
+
+            try:
+                now = time.time()
+                found: List[ProbeKey] = []
+                for key in missing:
+                    row = self._conn.execute(
+                        f"SELECT {self._COLUMNS} FROM probes WHERE path=? AND size=? AND mtime=?", key
+                    ).fetchone()
+                    if row is None:
+                        continue
+                    info = MediaInfo(key[0], *row)
+                    hits[key] = info
+                    found.append(key)
+                    self._remember(key, info)
+                if found:
+                    self._conn.executemany(
+                        "UPDATE probes SET last_used=? WHERE path=? AND size=? AND mtime=?",
+                        [(now, *key) for key in found]
+                    )
+                    self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"读取媒体探测缓存失败: {e}")
+        return hits
+
+    def store(self, items: Dict[ProbeKey, Optional[MediaInfo]]) -> None:
+        """批量写入缓存。
+
+        Args:
+            items: 缓存键 → 探测结果（None 表示探测失败）
+        """
+        if not items:
+            return
+        with self._lock:
+            for key, info in items.items():
+                if info is None:
+                    self._remember_failure(key)
+                else:
+                    self._failures.pop(key, None)
+                    self._remember(key, info)
+            if self._conn is None:
+                return
+            try:
+                now = time.time()
+                rows = [
+                    (
+                        path, size, mtime, info.duration, info.width, info.height, info.fps,
+                        info.video_codec, info.audio_codec, info._raw_json, now
+                    )
+                    for (path, size, mtime), info in items.items()
+                    if info is not None
+                ]
+                if not rows:
+                    return
+                # 同一路径的旧版本（文件已修改）不会再命中，直接删除
+                self._conn.executemany(
+                    "DELETE FROM probes WHERE path=? AND NOT (size=? AND mtime=?)",
+                    [row[:3] for row in rows]
+                )
+                self._conn.executemany(
+                    f"INSERT OR REPLACE INTO probes (path, size, mtime, {self._COLUMNS}, last_used) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                self._evict()
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"写入媒体探测缓存失败: {e}")
+
+    def _evict(self) -> None:
+        """条目数超出上限 10% 时，按最近使用时间淘汰到上限。"""
+        count = self._conn.execute("SELECT COUNT(*) FROM probes").fetchone()[0]
+        if count <= self.max_entries * 1.1:
+            return
+        self._conn.execute(
+            "DELETE FROM probes WHERE (path, size, mtime) IN ("
+            "SELECT path, size, mtime FROM probes ORDER BY last_used LIMIT ?)",
+            (count - self.max_entries,)
+        )
+
+    def clear(self) -> None:
+        """清空缓存。"""
+        with self._lock:
+            self._memory.clear()
+            self._failures.clear()
+            if self._conn is not None:
+                try:
+                    self._conn.execute("DELETE FROM probes")
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"清空媒体探测缓存失败: {e}")
+
+    def close(self) -> None:
+        """关闭数据库连接。"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -5,8 +5,15 @@
 """
 
 import gc
+import hashlib
+import json
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Callable, List, Optional, Tuple
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, Union
 
 import cv2
 import httpx
@@ -17,6 +24,39 @@ from constants import DEFAULT_OCR_MODEL_KEY, OCR_MODELS, OCRModelInfo
 from utils import logger, create_onnx_session
 
 
+@dataclass
+class OCRPageResult:
+    """ocr_many 中单张图像的识别结果。
+    
+    Attributes:
+        index: 图像在输入序列中的序号
+        path: 图像路径
+        success: 是否成功
+        results: 结果列表，格式: [(box, text, confidence), ...]
+        cached: 是否来自结果缓存
+        error: 失败原因
+    """
+    index: int
+    path: str
+    success: bool
+    results: List[Tuple[List, str, float]] = field(default_factory=list)
+    cached: bool = False
+    error: str = ""
+    
+    def to_dict(self) -> dict:
+        """转换为可写入 JSONL 的字典。"""
+        return {
+            "path": self.path,
+            "success": self.success,
+            "cached": self.cached,
+            "error": self.error,
+            "results": [
+                {"box": box, "text": text, "confidence": round(float(conf), 4)}
+                for box, text, conf in self.results
+            ],
+        }
+
+
 class OCRService:
     """OCR服务类。
     
@@ -26,6 +66,27 @@ class OCRService:
     - 模型下载和管理
     """
     
+    # 识别/方向分类每批处理的文本行数
+    REC_BATCH_SIZE: int = 8
+    CLS_BATCH_SIZE: int = 16
+    # 识别输入宽度范围（PaddleOCR 标准：至少 320，按批内最大宽高比扩展）
+    REC_MIN_WIDTH: int = 320
+    REC_MAX_WIDTH: int = 2560
+    # 结果缓存格式版本（预处理或后处理逻辑变化时递增，使旧缓存失效）
+    RESULT_CACHE_VERSION: int = 2
+    # 整图检测时输入的最大边长
+    DET_MAX_SIZE: int = 960
+    # 分块检测：长边与短边之比达到 DET_TILE_MIN_ASPECT（长截图），或整图检测的
+    # 缩小倍数超过 DET_TILE_MAX_DOWNSCALE 时自动启用；普通 2K/4K 截图仍整图检测
+    DET_TILE_MIN_ASPECT: float = 3.0
+    DET_TILE_MAX_DOWNSCALE: float = 4.0
+    # 块边长、相邻块重叠和每批块数
+    DET_TILE_SIZE: int = 960
+    DET_TILE_OVERLAP: int = 160
+    DET_TILE_BATCH: int = 4
+    # 最终结果的置信度阈值
+    MIN_CONFIDENCE: float = 0.5
+    
     def __init__(self, config_service=None) -> None:
         """初始化OCR服务。
         
@@ -40,6 +101,14 @@ class OCRService:
         self.current_model_key = None
         self.rec_image_height = 32  # 识别模型输入高度（动态获取）
         self.use_angle_cls = True  # 是否使用方向分类
+        # 模型输入信息（加载时缓存，避免每次推理都查询）
+        self.det_input_name: Optional[str] = None
+        self.det_batch_dim: Optional[int] = None
+        self.cls_input_name: Optional[str] = None
+        self.rec_input_name: Optional[str] = None
+        self.cls_batch_dim: Optional[int] = None  # 固定 batch 维度，None 表示动态
+        self.rec_batch_dim: Optional[int] = None
+        self.rec_fixed_width: Optional[int] = None  # 固定输入宽度，None 表示动态
     
     def get_available_models(self) -> list[str]:
         """获取可用的OCR模型列表。
@@ -247,6 +316,17 @@ class OCRService:
             rec_input = self.rec_session.get_inputs()[0]
             rec_output = self.rec_session.get_outputs()[0]
             
+            # 缓存输入名称和固定维度
+            self.det_input_name = self.det_session.get_inputs()[0].name
+            self.det_batch_dim = self._fixed_dim(self.det_session.get_inputs()[0].shape, 0)
+            self.rec_input_name = rec_input.name
+            self.rec_batch_dim = self._fixed_dim(rec_input.shape, 0)
+            self.rec_fixed_width = self._fixed_dim(rec_input.shape, 3)
+            if self.cls_session:
+                cls_input = self.cls_session.get_inputs()[0]
+                self.cls_input_name = cls_input.name
+                self.cls_batch_dim = self._fixed_dim(cls_input.shape, 0)
+            
             # 验证字典前几个字符（用于调试）
             if len(self.char_dict) > 10:
                 logger.info(f"  字典前10个字符: {self.char_dict[1:11]}")
@@ -309,37 +389,19 @@ class OCRService:
             self.unload_model()
             return False, f"加载失败: {str(e)}"
     
-    def unload_model(self) -> None:
-        """卸载模型，释放资源。"""
+    def unload_model(self, evict: bool = True) -> None:
+        """卸载模型，释放资源。
+        
+        Args:
+            evict: 是否立即卸载共享会话（其他服务仍在使用时等其释放后卸载）；
+                False 时只释放句柄，会话由注册表按空闲时长和内存预算卸载
+        """
         try:
-            # 释放 ONNX session（需要显式调用内部方法）
-            if self.det_session:
-                try:
-                    # 尝试释放 ONNX Runtime 的内部资源
-                    if hasattr(self.det_session, '_sess'):
-                        del self.det_session._sess
-                except Exception:
-                    pass
-                del self.det_session
-                self.det_session = None
-            
-            if self.cls_session:
-                try:
-                    if hasattr(self.cls_session, '_sess'):
-                        del self.cls_session._sess
-                except Exception:
-                    pass
-                del self.cls_session
-                self.cls_session = None
-            
-            if self.rec_session:
-                try:
-                    if hasattr(self.rec_session, '_sess'):
-                        del self.rec_session._sess
-                except Exception:
-                    pass
-                del self.rec_session
-                self.rec_session = None
+            for name in ('det_session', 'cls_session', 'rec_session'):
+                session = getattr(self, name)
+                if session is not None:
+                    session.release(evict=evict)
+                    setattr(self, name, None)
             
             if self.char_dict:
                 self.char_dict.clear() if hasattr(self.char_dict, 'clear') else None
@@ -349,6 +411,13 @@ class OCRService:
             self.current_model_key = None
             self.rec_image_height = 32  # 重置为默认值
             self.use_angle_cls = True  # 重置为默认值
+            self.det_input_name = None
+            self.det_batch_dim = None
+            self.cls_input_name = None
+            self.rec_input_name = None
+            self.cls_batch_dim = None
+            self.rec_batch_dim = None
+            self.rec_fixed_width = None
             
             # 强制多次垃圾回收（确保循环引用被清理）
             gc.collect()
@@ -393,11 +462,13 @@ class OCRService:
         }
         return provider_map.get(provider, provider)
     
-    def detect_text(self, image: np.ndarray) -> List[np.ndarray]:
+    def detect_text(self, image: np.ndarray, tiled: Optional[bool] = None) -> List[np.ndarray]:
         """检测图像中的文本区域。
         
         Args:
             image: 输入图像(BGR格式)
+            tiled: 是否分块检测（原始分辨率下切成重叠的块），
+                None 表示图像为长截图或整图检测缩小过多时自动启用
         
         Returns:
             文本框列表，每个框是4个点的坐标
@@ -405,16 +476,196 @@ class OCRService:
         if not self.det_session:
             raise RuntimeError("检测模型未加载")
         
+        if tiled is None:
+            tiled = self._should_tile(image.shape[:2])
+        if tiled:
+            return self._detect_tiled(image)
+        
         # 预处理
-        img_resized, ratio_h, ratio_w = self._preprocess_det(image)
+        det_input = self._preprocess_det(image)
+        
+        return self._detect_preprocessed(det_input, image.shape[:2])
+    
+    def _detect_preprocessed(
+        self,
+        det_input: Tuple[np.ndarray, float, float],
+        image_shape: Tuple[int, int]
+    ) -> List[np.ndarray]:
+        """对已预处理的检测输入执行推理和后处理。
+        
+        Args:
+            det_input: _preprocess_det 的返回值
+            image_shape: 原图 (高, 宽)
+        
+        Returns:
+            文本框列表
+        """
+        img_resized, ratio_h, ratio_w = det_input
         
         # 推理
-        input_name = self.det_session.get_inputs()[0].name
-        outputs = self.det_session.run(None, {input_name: img_resized})
+        outputs = self.det_session.run(None, {self.det_input_name: img_resized})
         
         # 后处理
-        boxes = self._postprocess_det(outputs[0], ratio_h, ratio_w, image.shape[:2])
+        return self._postprocess_det(outputs[0], ratio_h, ratio_w, image_shape)
+    
+    def _should_tile(self, image_shape: Tuple[int, int]) -> bool:
+        """图像是否需要分块检测。
+        
+        整图检测会把长边缩放到 DET_MAX_SIZE。长截图缩放后短边上的文字太小，
+        超大图像缩小倍数过高，这两种情况才分块；分块需要多次推理，其他图像整图检测。
+        """
+        long_side, short_side = max(image_shape), max(1, min(image_shape))
+        if long_side <= self.DET_MAX_SIZE:
+            return False
+        return (
+            long_side / short_side >= self.DET_TILE_MIN_ASPECT
+            or long_side / self.DET_MAX_SIZE > self.DET_TILE_MAX_DOWNSCALE
+        )
+    
+    @staticmethod
+    def _tile_starts(length: int, tile: int, step: int) -> List[int]:
+        """沿一个方向的块起点，最后一块与图像边缘对齐。"""
+        if length <= tile:
+            return [0]
+        starts = list(range(0, length - tile, step))
+        starts.append(length - tile)
+        return starts
+    
+    def _detect_tiled(self, image: np.ndarray) -> List[np.ndarray]:
+        """分块检测文本区域。
         
+        在原始分辨率下把图像切成边长 DET_TILE_SIZE、相互重叠 DET_TILE_OVERLAP 的块，
+        逐批推理（每批 DET_TILE_BATCH 块），把各块的框平移回全图坐标后合并接缝处的
+        重复框和被切断的框。检测的临时内存只与块大小有关，与图像高度无关。
+        
+        Args:
+            image: 输入图像(BGR格式)
+        
+        Returns:
+            文本框列表（按从上到下、从左到右排序）
+        """
+        h, w = image.shape[:2]
+        # 块尺寸为 32 的倍数；图像小于一块时按图像尺寸向上取整
+        tile_h = min(self.DET_TILE_SIZE, -(-h // 32) * 32)
+        tile_w = min(self.DET_TILE_SIZE, -(-w // 32) * 32)
+        step_h = max(32, tile_h - self.DET_TILE_OVERLAP)
+        step_w = max(32, tile_w - self.DET_TILE_OVERLAP)
+        tiles = [
+            (y, x)
+            for y in self._tile_starts(h, tile_h, step_h)
+            for x in self._tile_starts(w, tile_w, step_w)
+        ]
+        batch_size = self.det_batch_dim or self.DET_TILE_BATCH
+        
+        # 每项: (全图坐标的框, 贴着图像内部块边缘的方向 (左, 上, 右, 下))
+        records: List[Tuple[np.ndarray, Tuple[bool, bool, bool, bool]]] = []
+        margin = 3
+        for start in range(0, len(tiles), batch_size):
+            batch_tiles = tiles[start:start + batch_size]
+            # 固定 batch 维的模型需要补齐
+            batch_len = self.det_batch_dim or len(batch_tiles)
+            batch = np.zeros((batch_len, 3, tile_h, tile_w), dtype=np.float32)
+            for k, (y, x) in enumerate(batch_tiles):
+                crop = image[y:y + tile_h, x:x + tile_w]
+                batch[k, :, :crop.shape[0], :crop.shape[1]] = self._normalize_det(crop)
+            
+            preds = self.det_session.run(None, {self.det_input_name: batch})[0]
+            
+            for k, (y, x) in enumerate(batch_tiles):
+                valid_h = min(tile_h, h - y)
+                valid_w = min(tile_w, w - x)
+                # 只在有效区域内后处理，补零区域不会产生框
+                pred = preds[k:k + 1, :, :valid_h, :valid_w]
+                for box in self._postprocess_det(pred, 1.0, 1.0, (valid_h, valid_w)):
+                    seams = (
+                        bool(x > 0 and box[:, 0].min() <= margin),
+                        bool(y > 0 and box[:, 1].min() <= margin),
+                        bool(x + valid_w < w and box[:, 0].max() >= valid_w - margin),
+                        bool(y + valid_h < h and box[:, 1].max() >= valid_h - margin),
+                    )
+                    records.append((box + np.array([x, y], dtype=np.int32), seams))
+        
+        boxes = self._merge_tile_boxes(records)
+        logger.info(f"分块检测: {len(tiles)} 块 ({tile_w}x{tile_h}), {len(records)} 个候选框, 合并后 {len(boxes)} 个")
+        return boxes
+    
+    @staticmethod
+    def _merge_tile_boxes(
+        records: List[Tuple[np.ndarray, Tuple[bool, bool, bool, bool]]]
+    ) -> List[np.ndarray]:
+        """合并相邻块检测到的重复框和被接缝切断的框。
+        
+        两个框满足以下任一条件时合并为它们的外接矩形：
+        - 交集超过较小框面积的一半（重叠区域内的同一文本被两块都检测到）；
+        - 两框在一个方向上大部分重叠、另一方向上相接，且其中一个框朝向另一个框的
+          一侧贴着块边缘（文本被接缝切成两段）。
+        
+        Args:
+            records: (框, 贴着块边缘的方向 (左, 上, 右, 下)) 列表
+        
+        Returns:
+            合并后的文本框列表（按从上到下、从左到右排序）
+        """
+        if not records:
+            return []
+        
+        rects = np.array([
+            [box[:, 0].min(), box[:, 1].min(), box[:, 0].max(), box[:, 1].max()]
+            for box, _ in records
+        ], dtype=np.int64)
+        seams = [touches for _, touches in records]
+        
+        def cut_between(a: int, b: int, axis: int) -> bool:
+            """a 在 b 的左侧（axis=0）或上方（axis=1）时，两者之间是否有接缝。"""
+            return seams[a][axis + 2] or seams[b][axis]
+        parent = list(range(len(records)))
+        
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+        
+        gap = 2  # 视为相接的最大间距（像素）
+        order = np.argsort(rects[:, 1], kind="stable")
+        for a_pos, i in enumerate(order):
+            x0, y0, x1, y1 = rects[i]
+            for j in order[a_pos + 1:]:
+                bx0, by0, bx1, by1 = rects[j]
+                if by0 > y1 + gap:
+                    break
+                overlap_w = min(x1, bx1) - max(x0, bx0)
+                overlap_h = min(y1, by1) - max(y0, by0)
+                if overlap_w < -gap or overlap_h < -gap:
+                    continue
+                min_w = max(1, min(x1 - x0, bx1 - bx0))
+                min_h = max(1, min(y1 - y0, by1 - by0))
+                min_area = min((x1 - x0) * (y1 - y0), (bx1 - bx0) * (by1 - by0))
+                duplicate = overlap_w > 0 and overlap_h > 0 and overlap_w * overlap_h * 2 >= min_area
+                # 左右相接：按水平中心判断先后；上下相接：按垂直中心判断先后
+                left, right = (i, j) if x0 + x1 <= bx0 + bx1 else (j, i)
+                top, bottom = (i, j) if y0 + y1 <= by0 + by1 else (j, i)
+                split = (
+                    (overlap_h * 2 >= min_h and cut_between(left, right, 0))
+                    or (overlap_w * 2 >= min_w and cut_between(top, bottom, 1))
+                )
+                if duplicate or split:
+                    parent[find(j)] = find(i)
+        
+        groups: dict = {}
+        for i in range(len(records)):
+            groups.setdefault(find(i), []).append(i)
+        
+        boxes = []
+        for members in groups.values():
+            if len(members) == 1:
+                boxes.append(records[members[0]][0])
+                continue
+            x0, y0 = rects[members, 0].min(), rects[members, 1].min()
+            x1, y1 = rects[members, 2].max(), rects[members, 3].max()
+            boxes.append(np.array([[x0, y0], [x1, y0], [x1, y1], [x0, y1]], dtype=np.int32))
+        
+        boxes.sort(key=lambda box: (int(box[:, 1].min()), int(box[:, 0].min())))
         return boxes
     
     def recognize_text(self, image: np.ndarray, boxes: List[np.ndarray]) -> List[Tuple[str, float]]:
@@ -430,49 +681,96 @@ class OCRService:
         if not self.rec_session or not self.char_dict:
             raise RuntimeError("识别模型未加载")
         
-        results = []
+        results: List[Tuple[str, float]] = [("", 0.0)] * len(boxes)
         
+        # 裁剪文本区域
+        crops = []
         for i, box in enumerate(boxes):
             try:
-                # 裁剪文本区域
                 text_img = self._crop_text_region(image, box)
-                
-                if text_img is None or text_img.size == 0:
-                    logger.debug(f"文本区域 {i+1} 裁剪失败，跳过")
-                    results.append(("", 0.0))
-                    continue
-                
-                # 方向分类和旋转（如果启用）
-                if self.use_angle_cls and self.cls_session:
-                    angle_idx, angle_conf = self._classify_text_angle(text_img)
-                    # 如果是180度（angle_idx=1）且置信度>0.9，旋转图像
-                    if angle_idx == 1 and angle_conf > 0.9:
-                        text_img = self._rotate_image_180(text_img)
-                        logger.debug(f"区域 {i+1}: 检测到180度旋转 (置信度: {angle_conf:.3f})")
-                
-                # 预处理
-                img_preprocessed = self._preprocess_rec(text_img)
-                
-                # 推理
-                input_name = self.rec_session.get_inputs()[0].name
-                outputs = self.rec_session.run(None, {input_name: img_preprocessed})
-                
-                # 解码
-                text, confidence = self._decode_text(outputs[0])
-                
-                # 日志记录识别结果（用于调试）
-                if text:
-                    logger.debug(f"区域 {i+1}: '{text}' (置信度: {confidence:.3f})")
-                
-                results.append((text, confidence))
-                
             except Exception as e:
-                logger.warning(f"识别文本区域 {i+1} 失败: {e}，跳过此区域")
-                results.append(("", 0.0))
+                logger.warning(f"裁剪文本区域 {i+1} 失败: {e}，跳过此区域")
                 continue
+            if text_img is None or text_img.size == 0:
+                logger.debug(f"文本区域 {i+1} 裁剪失败，跳过")
+                continue
+            crops.append((i, text_img))
+        
+        if not crops:
+            return results
+        
+        # 按宽高比排序，使同一批的宽度接近，减少填充
+        crops.sort(key=lambda item: item[1].shape[1] / float(item[1].shape[0]))
+        indices = [i for i, _ in crops]
+        images = [img for _, img in crops]
+        
+        # 方向分类和旋转（如果启用）
+        if self.use_angle_cls and self.cls_session:
+            images = self._classify_and_rotate_batch(images, indices)
+        
+        # 分批识别，结果按原始顺序写回
+        batch_size = self.rec_batch_dim or self.REC_BATCH_SIZE
+        for start in range(0, len(images), batch_size):
+            batch_images = images[start:start + batch_size]
+            batch_indices = indices[start:start + batch_size]
+            try:
+                batch_input = self._preprocess_rec_batch(batch_images, self.rec_batch_dim)
+                preds = self.rec_session.run(None, {self.rec_input_name: batch_input})[0]
+                
+                for k, i in enumerate(batch_indices):
+                    text, confidence = self._decode_text(preds[k:k + 1])
+                    
+                    # 日志记录识别结果（用于调试）
+                    if text:
+                        logger.debug(f"区域 {i+1}: '{text}' (置信度: {confidence:.3f})")
+                    
+                    results[i] = (text, confidence)
+            except Exception as e:
+                logger.warning(f"识别文本区域 {[i + 1 for i in batch_indices]} 失败: {e}，跳过这些区域")
         
         return results
     
+    def _classify_and_rotate_batch(self, images: List[np.ndarray], indices: List[int]) -> List[np.ndarray]:
+        """批量分类文本方向，并将 180 度的文本行旋转回正。
+        
+        Args:
+            images: 文本行图像列表(BGR格式)
+            indices: 对应的文本框序号（用于日志）
+        
+        Returns:
+            处理后的图像列表
+        """
+        images = list(images)
+        batch_size = self.cls_batch_dim or self.CLS_BATCH_SIZE
+        
+        for start in range(0, len(images), batch_size):
+            batch_images = images[start:start + batch_size]
+            try:
+                batch_input = np.zeros((batch_size if self.cls_batch_dim else len(batch_images), 3, 80, 160), dtype=np.float32)
+                for k, img in enumerate(batch_images):
+                    batch_input[k] = self._preprocess_cls(img)[0]
+                probs = self.cls_session.run(None, {self.cls_input_name: batch_input})[0]
+            except Exception as e:
+                logger.warning(f"方向分类失败: {e}")
+                continue
+            
+            for k in range(len(batch_images)):
+                angle_idx = int(np.argmax(probs[k]))
+                angle_conf = float(probs[k][angle_idx])
+                # 如果是180度（angle_idx=1）且置信度>0.9，旋转图像
+                if angle_idx == 1 and angle_conf > 0.9:
+                    images[start + k] = self._rotate_image_180(batch_images[k])
+                    logger.debug(f"区域 {indices[start + k] + 1}: 检测到180度旋转 (置信度: {angle_conf:.3f})")
+        
+        return images
+    
+    @staticmethod
+    def _fixed_dim(shape: list, axis: int) -> Optional[int]:
+        """获取模型输入的固定维度，动态维度返回 None。"""
+        if shape and len(shape) > axis and isinstance(shape[axis], int) and shape[axis] > 0:
+            return shape[axis]
+        return None
+    
     def ocr(
         self,
         image_path: str,
@@ -594,6 +892,201 @@ class OCRService:
             logger.error(f"OCR图像识别失败: {e}")
             return False, []
     
+    def ocr_many(
+        self,
+        image_paths: Iterable[Union[str, Path]],
+        output_path: Optional[Union[str, Path]] = None,
+        use_cache: bool = True,
+        cache_dir: Optional[Path] = None,
+        max_workers: Optional[int] = None,
+        cancel_event: Optional[threading.Event] = None
+    ) -> Iterator[OCRPageResult]:
+        """批量OCR，按输入顺序逐张产出结果。
+        
+        读取、解码和检测预处理在线程池中提前进行，检测推理在独立线程中执行，
+        识别在调用方线程中执行，三者流水线重叠。结果按图像内容哈希缓存到磁盘，
+        未变化的图像直接返回缓存结果。
+        
+        Args:
+            image_paths: 图像路径序列（可以是生成器）
+            output_path: JSONL 输出文件路径，每张图像写一行，None 表示不写文件
+            use_cache: 是否使用结果缓存
+            cache_dir: 缓存目录，默认为数据目录下的 ocr_cache
+            max_workers: 读取/预处理线程数，None 表示自动
+            cancel_event: 取消事件，置位后停止处理后续图像
+        
+        Yields:
+            每张图像的 OCRPageResult
+        """
+        if not self.det_session or not self.rec_session:
+            raise RuntimeError("OCR模型未加载")
+        
+        if use_cache:
+            cache_dir = cache_dir or self._get_result_cache_dir()
+        else:
+            cache_dir = None
+        
+        workers = max(1, max_workers or min(4, os.cpu_count() or 1))
+        # 在途图像数上限（限制内存占用）
+        max_pending = max(4, workers * 2)
+        
+        loader = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr-load")
+        detector = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ocr-det")
+        jsonl_file = open(output_path, 'w', encoding='utf-8') if output_path else None
+        
+        # 每项: [序号, 路径, 读取任务, 检测任务]
+        pending: deque = deque()
+        path_iter = iter(enumerate(image_paths))
+        exhausted = False
+        
+        def is_cancelled() -> bool:
+            return cancel_event is not None and cancel_event.is_set()
+        
+        try:
+            while True:
+                # 补充读取任务
+                while not exhausted and len(pending) < max_pending and not is_cancelled():
+                    item = next(path_iter, None)
+                    if item is None:
+                        exhausted = True
+                        break
+                    index, path = item
+                    path = str(path)
+                    pending.append([index, path, loader.submit(self._load_page, path, cache_dir), None])
+                
+                if not pending or is_cancelled():
+                    break
+                
+                # 提前提交后续已读取图像的检测，使检测与当前图像的识别重叠
+                for entry in list(pending)[:2]:
+                    self._submit_page_detection(detector, entry)
+                
+                # 当前图像：等待读取完成后同样交给检测线程，保证同一会话上不会并发推理
+                pending[0][2].result()
+                self._submit_page_detection(detector, pending[0])
+                index, path, load_future, det_future = pending.popleft()
+                page = load_future.result()
+                result = self._finish_page(index, path, page, det_future)
+                
+                if jsonl_file:
+                    jsonl_file.write(json.dumps(result.to_dict(), ensure_ascii=False) + "\n")
+                    jsonl_file.flush()
+                
+                yield result
+        finally:
+            loader.shutdown(wait=False, cancel_futures=True)
+            detector.shutdown(wait=False, cancel_futures=True)
+            if jsonl_file:
+                jsonl_file.close()
+    
+    def _submit_page_detection(self, detector: ThreadPoolExecutor, entry: list) -> None:
+        """如果图像已读取完成且需要检测，则提交检测任务。"""
+        load_future: Future = entry[2]
+        if entry[3] is not None or not load_future.done():
+            return
+        page = load_future.result()
+        if page.get("tiled"):
+            entry[3] = detector.submit(self._detect_tiled, page["image"])
+        elif page.get("det_input") is not None:
+            entry[3] = detector.submit(self._detect_preprocessed, page["det_input"], page["image"].shape[:2])
+    
+    def _load_page(self, path: str, cache_dir: Optional[Path]) -> dict:
+        """读取一张图像，查询缓存，并完成检测预处理（在读取线程中执行）。"""
+        page = {"image": None, "det_input": None, "tiled": False, "cache_file": None, "cached": None, "error": ""}
+        try:
+            data = Path(path).read_bytes()
+            
+            if cache_dir is not None:
+                cache_file = cache_dir / self._result_cache_key(data)
+                page["cache_file"] = cache_file
+                page["cached"] = self._read_result_cache(cache_file)
+                if page["cached"] is not None:
+                    return page
+            
+            image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+            if image is None:
+                page["error"] = "无法解码图像"
+                return page
+            
+            page["image"] = image
+            # 大图分块检测，在检测线程中逐块预处理
+            if self._should_tile(image.shape[:2]):
+                page["tiled"] = True
+            else:
+                page["det_input"] = self._preprocess_det(image)
+        except Exception as e:
+            page["error"] = f"读取图像失败: {e}"
+        return page
+    
+    def _finish_page(self, index: int, path: str, page: dict, det_future: Optional[Future]) -> OCRPageResult:
+        """完成单张图像的检测和识别，并写入缓存。"""
+        if page["cached"] is not None:
+            return OCRPageResult(index, path, True, page["cached"], cached=True)
+        
+        if page["error"]:
+            logger.error(f"OCR读取失败: {path}, {page['error']}")
+            return OCRPageResult(index, path, False, error=page["error"])
+        
+        try:
+            image = page["image"]
+            # 检测（包括分块检测）都在检测线程中执行，这里只等待结果
+            boxes = det_future.result()
+            
+            texts = self.recognize_text(image, boxes) if boxes else []
+            results = [
+                (box.tolist(), text, float(conf))
+                for box, (text, conf) in zip(boxes, texts)
+                if conf >= self.MIN_CONFIDENCE
+            ]
+        except Exception as e:
+            logger.error(f"OCR识别失败: {path}, {e}")
+            return OCRPageResult(index, path, False, error=str(e))
+        
+        if page["cache_file"] is not None:
+            self._write_result_cache(page["cache_file"], results)
+        
+        return OCRPageResult(index, path, True, results)
+    
+    def _get_result_cache_dir(self) -> Optional[Path]:
+        """获取结果缓存目录，没有配置服务时返回 None（不使用缓存）。"""
+        if not self.config_service:
+            return None
+        return self.config_service.get_data_dir() / "ocr_cache"
+    
+    def _result_cache_key(self, data: bytes) -> Path:
+        """根据图像内容和当前模型配置计算缓存文件的相对路径。"""
+        hasher = hashlib.blake2b(data, digest_size=20)
+        hasher.update(
+            f"|{self.RESULT_CACHE_VERSION}|{self.current_model_key}|{self.use_angle_cls}".encode("utf-8")
+        )
+        digest = hasher.hexdigest()
+        return Path(digest[:2]) / f"{digest}.json"
+    
+    @staticmethod
+    def _read_result_cache(cache_file: Path) -> Optional[List[Tuple[List, str, float]]]:
+        """读取缓存结果，不存在或损坏时返回 None。"""
+        try:
+            if not cache_file.exists():
+                return None
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return [(box, text, conf) for box, text, conf in data]
+        except Exception as e:
+            logger.debug(f"读取OCR缓存失败: {cache_file}, {e}")
+            return None
+    
+    @staticmethod
+    def _write_result_cache(cache_file: Path, results: List[Tuple[List, str, float]]) -> None:
+        """写入缓存结果（先写临时文件再替换，避免写入中断产生损坏文件）。"""
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = cache_file.with_name(f"{cache_file.name}.{threading.get_ident()}.tmp")
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(results, f, ensure_ascii=False)
+            os.replace(tmp_file, cache_file)
+        except Exception as e:
+            logger.debug(f"写入OCR缓存失败: {cache_file}, {e}")
+    
     def _preprocess_det(self, image: np.ndarray) -> Tuple[np.ndarray, float, float]:
         """预处理检测输入（PaddleOCR v5 DBNet标准）。
         
@@ -614,7 +1107,7 @@ class OCRService:
         if target_w < 32:
             target_w = 32
         
-        max_size = 960
+        max_size = self.DET_MAX_SIZE
         if target_h > max_size:
             target_h = max_size
         if target_w > max_size:
@@ -626,8 +1119,16 @@ class OCRService:
         # 调整大小
         img_resized = cv2.resize(image, (target_w, target_h))
         
+        # 添加batch维度: (3, H, W) -> (1, 3, H, W)
+        img_batch = np.expand_dims(self._normalize_det(img_resized), axis=0)
+        
+        return img_batch, ratio_h, ratio_w
+    
+    @staticmethod
+    def _normalize_det(image: np.ndarray) -> np.ndarray:
+        """BGR 图像 -> 归一化的 RGB CHW float32 (3, H, W)。"""
         # BGR -> RGB（PaddleOCR标准）
-        img_rgb = cv2.cvtColor(img_resized, cv2.COLOR_BGR2RGB)
+        img_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
         
         # 归一化 (PaddleOCR DBNet标准)
         # scale=1.0/255.0, mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]
@@ -639,12 +1140,7 @@ class OCRService:
         img_normalized = (img_float - mean) / std
         
         # HWC -> CHW: (H, W, 3) -> (3, H, W)
-        img_chw = np.transpose(img_normalized, (2, 0, 1))
-        
-        # 添加batch维度: (3, H, W) -> (1, 3, H, W)
-        img_batch = np.expand_dims(img_chw, axis=0).astype(np.float32)
-        
-        return img_batch, ratio_h, ratio_w
+        return np.ascontiguousarray(np.transpose(img_normalized, (2, 0, 1)), dtype=np.float32)
     
     def _postprocess_det(
         self,
@@ -823,49 +1319,57 @@ class OCRService:
         - 归一化: (x/255.0 - 0.5) / 0.5
         - 颜色空间: RGB（PaddleOCR标准）
         """
-        import math
+        return self._preprocess_rec_batch([image])
+    
+    def _preprocess_rec_batch(self, images: List[np.ndarray], batch_size: Optional[int] = None) -> np.ndarray:
+        """批量预处理识别输入，同一批填充到相同宽度。
         
-        # 确保是3通道格式
-        if len(image.shape) == 2:
-            image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+        批宽度按 PaddleOCR 标准取 max(320, 批内最大宽高比 × 高度)，
+        因此调用方应先按宽高比排序，使短行和长行分在不同批次。
         
-        # BGR -> RGB 转换（PaddleOCR标准）
-        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        Args:
+            images: 文本行图像列表(BGR格式)
+            batch_size: 输出的 batch 大小（模型固定 batch 时用零图补齐），默认等于图像数
+        
+        Returns:
+            (batch, 3, H, W) 的输入张量
+        """
+        import math
         
         imgC = 3
         imgH = self.rec_image_height  # 动态获取（32或48）
-        imgW = 320  # 最大宽度
-        max_wh_ratio = imgW / imgH
         
-        h, w = image.shape[:2]
-        ratio = w / float(h)
-        
-        # 计算resize后的宽度（保持宽高比）
-        if math.ceil(imgH * ratio) > imgW:
-            resized_w = imgW
+        ratios = [img.shape[1] / float(img.shape[0]) for img in images]
+        if self.rec_fixed_width:
+            imgW = self.rec_fixed_width
         else:
-            resized_w = int(math.ceil(imgH * ratio))
+            imgW = max(self.REC_MIN_WIDTH, int(math.ceil(imgH * max(ratios))))
+            imgW = min(imgW, self.REC_MAX_WIDTH)
         
-        # Resize图像
-        resized_image = cv2.resize(image, (resized_w, imgH))
-        
-        # 转换为CHW格式
-        resized_image = resized_image.transpose((2, 0, 1))
-        resized_image = resized_image.astype(np.float32)
-        
-        # 归一化
-        resized_image /= 255.0
-        resized_image -= 0.5
-        resized_image /= 0.5
+        batch = np.zeros((batch_size or len(images), imgC, imgH, imgW), dtype=np.float32)
         
-        # 创建padding图像
-        padding_im = np.zeros((imgC, imgH, imgW), dtype=np.float32)
-        padding_im[:, :, 0:resized_w] = resized_image
-        
-        # 添加batch维度
-        img_batch = np.expand_dims(padding_im, axis=0)
+        for k, (image, ratio) in enumerate(zip(images, ratios)):
+            # 确保是3通道格式
+            if len(image.shape) == 2:
+                image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+            
+            # BGR -> RGB 转换（PaddleOCR标准）
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+            
+            # 计算resize后的宽度（保持宽高比）
+            resized_w = min(imgW, int(math.ceil(imgH * ratio)))
+            
+            # Resize图像
+            resized_image = cv2.resize(image, (resized_w, imgH))
+            
+            # 转换为CHW格式并归一化，写入padding区域
+            resized_image = resized_image.transpose((2, 0, 1)).astype(np.float32)
+            resized_image /= 255.0
+            resized_image -= 0.5
+            resized_image /= 0.5
+            batch[k, :, :, 0:resized_w] = resized_image
         
-        return img_batch
+        return batch
     
     def _decode_text(self, pred: np.ndarray) -> Tuple[str, float]:
         """解码识别结果（CTC解码，参考PaddleOCR标准）。
@@ -923,8 +1427,7 @@ class OCRService:
             img_preprocessed = self._preprocess_cls(image)
             
             # 推理
-            input_name = self.cls_session.get_inputs()[0].name
-            outputs = self.cls_session.run(None, {input_name: img_preprocessed})
+            outputs = self.cls_session.run(None, {self.cls_input_name: img_preprocessed})
             
             # 后处理
             prob = outputs[0][0]
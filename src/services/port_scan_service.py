@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""TCP 端口扫描模块。
+
+在一个事件循环内并发发起大量 TCP 连接（由 asyncio.Semaphore 限制同时在途的
+连接数），结果按完成顺序流式返回。每个主机根据已测得的往返时间（连接成功或被
+拒绝都算一次测量）自适应调整超时：响应快的主机很快放弃被过滤的端口，没有任何
+测量结果时使用最大超时。
+"""
+
+import asyncio
+import ipaddress
+import socket
+import sys
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from utils import logger
+
+# 默认同时在途的连接数
+DEFAULT_CONCURRENCY = 500
+
+# 单次扫描允许展开的最多主机数（CIDR 过大时拒绝）
+MAX_HOSTS = 4096
+
+# 端口状态
+STATE_OPEN = "open"
+STATE_CLOSED = "closed"
+STATE_FILTERED = "filtered"
+
+
+@dataclass
+class PortScanResult:
+    """单个端口的检测结果。
+
+    Attributes:
+        host: 主机（输入中的主机名或 IP）
+        port: 端口号
+        state: open / closed / filtered（超时）
+        response_time: 响应时间（毫秒），超时为 0
+    """
+    host: str
+    port: int
+    state: str
+    response_time: float = 0.0
+
+    @property
+    def is_open(self) -> bool:
+        """端口是否开放。"""
+        return self.state == STATE_OPEN
+
+
+class _RttEstimator:
+    """按 RFC 6298 的方式平滑往返时间并计算超时。"""
+
+    def __init__(self, min_timeout: float, max_timeout: float) -> None:
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.srtt: Optional[float] = None
+        self.rttvar = 0.0
+
+    def add(self, rtt: float) -> None:
+        """加入一次往返时间测量（秒）。"""
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+            self.srtt = 0.875 * self.srtt + 0.125 * rtt
+
+    @property
+    def timeout(self) -> float:
+        """当前超时（秒）。"""
+        if self.srtt is None:
+            return self.max_timeout
+        return min(self.max_timeout, max(self.min_timeout, self.srtt + 4 * self.rttvar))
+
+
+def parse_hosts(text: str, max_hosts: int = MAX_HOSTS) -> List[str]:
+    """解析主机列表。
+
+    支持逗号或空格分隔的主机名、IP 地址和 CIDR 网段（如 192.168.1.0/24，
+    网段展开为可用主机地址）。
+
+    Args:
+        text: 输入文本
+        max_hosts: 最多主机数
+
+    Returns:
+        去重后的主机列表（保持输入顺序）
+
+    Raises:
+        ValueError: 网段格式错误或主机数超过上限
+    """
+    hosts: List[str] = []
+    seen = set()
+    for token in text.replace(',', ' ').split():
+        if '/' in token:
+            try:
+                network = ipaddress.ip_network(token, strict=False)
+            except ValueError as e:
+                raise ValueError(f"无效的网段: {token}") from e
+            if network.num_addresses > max_hosts:
+                raise ValueError(f"网段 {token} 超过 {max_hosts} 个地址")
+            # /31、/32 等没有网络/广播地址的网段 hosts() 为空，直接使用全部地址
+            candidates = list(network.hosts()) or list(network)
+            names = [str(address) for address in candidates]
+        else:
+            names = [token]
+        for name in names:
+            if name not in seen:
+                seen.add(name)
+                hosts.append(name)
+        if len(hosts) > max_hosts:
+            raise ValueError(f"主机数不能超过 {max_hosts}")
+    return hosts
+
+
+def default_concurrency() -> int:
+    """默认并发连接数（不超过进程可打开文件数的一半）。"""
+    if sys.platform == "win32":
+        return DEFAULT_CONCURRENCY
+    try:
+        import resource
+        soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    except (ImportError, OSError, ValueError):
+        return DEFAULT_CONCURRENCY
+    if soft == resource.RLIM_INFINITY:
+        return DEFAULT_CONCURRENCY
+    return max(16, min(DEFAULT_CONCURRENCY, soft // 2))
+
+
+class PortScanner:
+    """并发 TCP connect 端口扫描器。"""
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        max_timeout: float = 2.0,
+        min_timeout: float = 0.2
+    ) -> None:
+        """初始化扫描器。
+
+        Args:
+            concurrency: 同时在途的最大连接数，None 表示按系统限制自动选择
+            max_timeout: 连接超时上限（秒），主机尚无往返时间测量时使用
+            min_timeout: 自适应超时的下限（秒）
+        """
+        self.concurrency = concurrency or default_concurrency()
+        self.max_timeout = max_timeout
+        self.min_timeout = min(min_timeout, max_timeout)
+        self._cancelled = False
+
+    def cancel(self) -> None:
+        """请求取消：不再发起新连接，已在途的连接结束后停止。"""
+        self._cancelled = True
+
+    @property
+    def is_cancelled(self) -> bool:
+        """是否已被取消。"""
+        return self._cancelled
+
+    async def _resolve(self, host: str) -> Optional[Tuple[int, str]]:
+        """解析主机地址，返回 (地址族, IP)，失败返回 None。"""
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(host, None, type=socket.SOCK_STREAM)
+        except (socket.gaierror, OSError) as e:
+            logger.warning(f"无法解析主机 {host}: {e}")
+            return None
+        if not infos:
+            return None
+        family, _, _, _, sockaddr = infos[0]
+        return family, sockaddr[0]
+
+    async def _probe(
+        self, host: str, family: int, address: str, port: int, rtt: _RttEstimator
+    ) -> PortScanResult:
+        """检测一个端口（只建立连接，不创建流对象）。"""
+        loop = asyncio.get_running_loop()
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        start = loop.time()
+        try:
+            await asyncio.wait_for(loop.sock_connect(sock, (address, port)), timeout=rtt.timeout)
+        except asyncio.TimeoutError:
+            return PortScanResult(host, port, STATE_FILTERED)
+        except ConnectionRefusedError:
+            # RST 也是一次完整的往返
+            rtt.add(loop.time() - start)
+            return PortScanResult(host, port, STATE_CLOSED)
+        except OSError:
+            return PortScanResult(host, port, STATE_CLOSED)
+        finally:
+            sock.close()
+
+        elapsed = loop.time() - start
+        rtt.add(elapsed)
+        return PortScanResult(host, port, STATE_OPEN, elapsed * 1000)
+
+    async def scan(self, hosts: Sequence[str], ports: Iterable[int]) -> AsyncIterator[PortScanResult]:
+        """扫描多个主机的多个端口，结果按完成顺序逐个产出。
+
+        无法解析的主机不产出任何结果（会记录警告）。
+
+        Args:
+            hosts: 主机列表（主机名或 IP）
+            ports: 端口列表
+
+        Yields:
+            每个端口的检测结果
+        """
+        self._cancelled = False
+        ports = list(ports)
+
+        resolved: Dict[str, Tuple[int, str]] = {}
+        for host, info in zip(hosts, await asyncio.gather(*(self._resolve(host) for host in hosts))):
+            if info is not None:
+                resolved[host] = info
+        estimators = {host: _RttEstimator(self.min_timeout, self.max_timeout) for host in resolved}
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results: asyncio.Queue = asyncio.Queue()
+        tasks = set()
+        done_marker = object()
+        start_time = time.perf_counter()
+
+        async def run_one(host: str, port: int) -> None:
+            try:
+                family, address = resolved[host]
+                result = await self._probe(host, family, address, port, estimators[host])
+            except Exception as e:
+                logger.debug(f"检测 {host}:{port} 异常: {e}")
+                result = PortScanResult(host, port, STATE_CLOSED)
+            finally:
+                semaphore.release()
+            results.put_nowait(result)
+
+        async def produce() -> None:
+            # 端口在外层循环，使同一主机的连接分散开，避免集中冲击单个主机
+            for port in ports:
+                for host in resolved:
+                    await semaphore.acquire()
+                    if self._cancelled:
+                        semaphore.release()
+                        return
+                    task = asyncio.ensure_future(run_one(host, port))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+
+        async def finish() -> None:
+            try:
+                await produce()
+                while tasks:
+                    await asyncio.gather(*list(tasks), return_exceptions=True)
+            finally:
+                results.put_nowait(done_marker)
+
+        finisher = asyncio.ensure_future(finish())
+        scanned = 0
+        try:
+            while True:
+                result = await results.get()
+                if result is done_marker:
+                    break
+                scanned += 1
+                yield result
+        finally:
+            if not finisher.done():
+                self._cancelled = True
+                finisher.cancel()
+                for task in list(tasks):
+                    task.cancel()
+            elapsed = time.perf_counter() - start_time
+            logger.info(
+                f"端口扫描结束: {len(resolved)} 个主机, {scanned} 个端口, 耗时 {elapsed:.1f}s"
+            )
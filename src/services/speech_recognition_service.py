@@ -6,13 +6,17 @@
 """
 
 import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Optional, Callable, TYPE_CHECKING, List, Dict, Any, Tuple
+from typing import Optional, Callable, TYPE_CHECKING, Iterator, List, Dict, Any, Tuple
 from utils import logger
 import numpy as np
 
 if TYPE_CHECKING:
-    from services import FFmpegService
+    from services import ConfigService, FFmpegService
     from services.vad_service import VADService
     from constants import WhisperModelInfo, SenseVoiceModelInfo
 
@@ -24,12 +28,20 @@ class SpeechRecognitionService:
     支持 VAD（语音活动检测）智能分片。
     """
     
+    # 超过此时长（秒）时 recognize() 自动使用流式识别
+    STREAMING_MIN_DURATION: float = 1800.0
+    # 流式模式每次从 ffmpeg 读取的时长（秒）
+    STREAMING_READ_SECONDS: float = 1.0
+    # 流式模式固定分片（无 VAD 时）的时长（秒）
+    STREAMING_CHUNK_SECONDS: float = 28.0
+    
     def __init__(
         self,
         model_dir: Optional[Path] = None,
         ffmpeg_service: Optional['FFmpegService'] = None,
         vad_service: Optional['VADService'] = None,
-        debug_mode: bool = False
+        debug_mode: bool = False,
+        config_service: Optional['ConfigService'] = None
     ):
         """初始化语音识别服务。
         
@@ -38,9 +50,11 @@ class SpeechRecognitionService:
             ffmpeg_service: FFmpeg 服务实例
             vad_service: VAD 服务实例（可选，用于智能分片）
             debug_mode: 是否启用调试模式（输出详细信息）
+            config_service: 配置服务实例（加载模型时读取批量解码配置）
         """
         self.ffmpeg_service = ffmpeg_service
         self.vad_service = vad_service
+        self.config_service = config_service
         self.model_dir = model_dir
         self.debug_mode = debug_mode
         # 确保目录存在
@@ -48,6 +62,9 @@ class SpeechRecognitionService:
             self.model_dir.mkdir(parents=True, exist_ok=True)
         
         self.recognizer = None
+        # 以指定线程数创建同配置识别器的工厂（用于多实例并行解码）
+        self._recognizer_factory: Optional[Callable[[int], Any]] = None
+        self._extra_recognizers: List[Any] = []
         self.current_model: Optional[str] = None
         self.model_type: str = "whisper"  # whisper 或 sensevoice
         self.sample_rate: int = 16000  # 固定使用 16kHz
@@ -56,6 +73,11 @@ class SpeechRecognitionService:
         # VAD 相关设置
         self.use_vad: bool = True  # 是否使用 VAD 智能分片
         
+        # 批量解码设置
+        self.decode_batch_size: int = 8  # 每批最多片段数
+        self.decode_batch_seconds: float = 240.0  # 每批最长总时长（秒）
+        self.num_decoders: int = 1  # 并行解码的识别器实例数（仅 CPU）
+        
         # 设置 FFmpeg 环境
         self._setup_ffmpeg_env()
     
@@ -452,18 +474,24 @@ class SpeechRecognitionService:
             # 使用 from_whisper 工厂方法创建识别器
             # 这是官方推荐的方式，而不是直接实例化 OfflineRecognizer
             # 参考：https://github.com/k2-fsa/sherpa-onnx/blob/master/sherpa-onnx/python/sherpa_onnx/offline_recognizer.py
-            self.recognizer = sherpa_onnx.OfflineRecognizer.from_whisper(
-                encoder=str(encoder_path),
-                decoder=str(decoder_path),
-                tokens=tokens_str,
-                language=lang_code,
-                task=task,
-                num_threads=num_threads,
-                debug=self.debug_mode,  # 调试模式：输出详细的识别过程
-                provider=provider,
-                tail_paddings=1500,  # 尾部填充：增加到1500以确保音频末尾不被截断（默认800）
-                decoding_method="greedy_search",  # 使用贪婪搜索，更稳定
-            )
+            def create_recognizer(threads: int):
+                return sherpa_onnx.OfflineRecognizer.from_whisper(
+                    encoder=str(encoder_path),
+                    decoder=str(decoder_path),
+                    tokens=tokens_str,
+                    language=lang_code,
+                    task=task,
+                    num_threads=threads,
+                    debug=self.debug_mode,  # 调试模式：输出详细的识别过程
+                    provider=provider,
+                    tail_paddings=1500,  # 尾部填充：增加到1500以确保音频末尾不被截断（默认800）
+                    decoding_method="greedy_search",  # 使用贪婪搜索，更稳定
+                )
+            
+            self._extra_recognizers = []
+            self._apply_decode_config()
+            self.recognizer = create_recognizer(num_threads)
+            self._recognizer_factory = create_recognizer
             self.current_model = encoder_path.stem
             self.current_provider = provider
             
@@ -537,27 +565,34 @@ class SpeechRecognitionService:
             
             if model_type == "paraformer":
                 # 加载 Paraformer 模型
-                self.recognizer = sherpa_onnx.OfflineRecognizer.from_paraformer(
-                    paraformer=str(model_path),
-                    tokens=str(tokens_path),
-                    num_threads=num_threads,
-                    debug=self.debug_mode,
-                    provider=provider,
-                )
+                def create_recognizer(threads: int):
+                    return sherpa_onnx.OfflineRecognizer.from_paraformer(
+                        paraformer=str(model_path),
+                        tokens=str(tokens_path),
+                        num_threads=threads,
+                        debug=self.debug_mode,
+                        provider=provider,
+                    )
                 model_name = "Paraformer"
             else:
                 # 加载 SenseVoice 模型
-                self.recognizer = sherpa_onnx.OfflineRecognizer.from_sense_voice(
-                    model=str(model_path),
-                    tokens=str(tokens_path),
-                    num_threads=num_threads,
-                    debug=self.debug_mode,
-                    provider=provider,
-                    use_itn=True,  # 使用逆文本规范化（数字、日期等）
-                    language=language if language != "auto" else "",
-                )
+                def create_recognizer(threads: int):
+                    return sherpa_onnx.OfflineRecognizer.from_sense_voice(
+                        model=str(model_path),
+                        tokens=str(tokens_path),
+                        num_threads=threads,
+                        debug=self.debug_mode,
+                        provider=provider,
+                        use_itn=True,  # 使用逆文本规范化（数字、日期等）
+                        language=language if language != "auto" else "",
+                    )
                 model_name = "SenseVoice"
             
+            self._extra_recognizers = []
+            self._apply_decode_config()
+            self.recognizer = create_recognizer(num_threads)
+            self._recognizer_factory = create_recognizer
+            
             self.current_model = model_path.stem
             self.model_type = model_type
             self.current_provider = provider
@@ -618,6 +653,258 @@ class SpeechRecognitionService:
         except Exception as e:
             raise RuntimeError(f"加载音频时出错: {type(e).__name__}: {str(e)}")
     
+    def _get_audio_duration(self, audio_path: Path) -> Optional[float]:
+        """获取音频时长（秒），无法获取时返回 None。"""
+        try:
+            if self.ffmpeg_service:
+                info = self.ffmpeg_service.probe(audio_path)
+                return info.duration if info and info.duration > 0 else None
+            import ffmpeg
+            self._setup_ffmpeg_env()
+            probe = ffmpeg.probe(str(audio_path))
+            return float(probe['format']['duration'])
+        except Exception:
+            return None
+    
+    def _iter_audio_blocks(self, audio_path: Path) -> Iterator[np.ndarray]:
+        """从 ffmpeg 解码管道按块读取音频。
+        
+        Args:
+            audio_path: 音频文件路径
+            
+        Yields:
+            单声道 16kHz float32 音频块（每块约 STREAMING_READ_SECONDS 秒）
+        """
+        import ffmpeg
+        
+        if not audio_path.exists():
+            raise FileNotFoundError(f"音频文件不存在: {audio_path}")
+        
+        self._setup_ffmpeg_env()
+        process = (
+            ffmpeg.input(str(audio_path))
+            .output('pipe:', format='f32le', acodec='pcm_f32le', ac=1, ar=str(self.sample_rate))
+            .global_args('-loglevel', 'error', '-nostdin')
+            .run_async(cmd=self._get_ffmpeg_cmd(), pipe_stdout=True, pipe_stderr=True)
+        )
+        block_bytes = int(self.STREAMING_READ_SECONDS * self.sample_rate) * 4
+        received = 0
+        try:
+            while True:
+                data = process.stdout.read(block_bytes)
+                if not data:
+                    break
+                # 丢弃不完整的样本（理论上只会出现在管道异常时）
+                usable = len(data) - len(data) % 4
+                if usable:
+                    received += usable
+                    yield np.frombuffer(data[:usable], np.float32)
+            process.wait()
+            if received == 0:
+                error_msg = process.stderr.read().decode('utf-8', errors='ignore')
+                raise RuntimeError(f"FFmpeg 未返回音频数据: {error_msg or '未知错误'}")
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+    
+    def _iter_stream_chunks(
+        self,
+        audio_path: Path,
+        use_vad: bool
+    ) -> Iterator[Tuple[np.ndarray, float, float]]:
+        """边解码边分片。
+        
+        Args:
+            audio_path: 音频文件路径
+            use_vad: 是否使用 VAD 分片，否则按固定时长分片
+            
+        Yields:
+            (音频块, 开始时间, 结束时间)，按时间顺序
+        """
+        if use_vad:
+            segmenter = self.vad_service.create_stream_segmenter(
+                max_segment_duration=28.0,
+                min_gap=0.5,
+                min_segment_duration=1.0,
+                merge_gap=0.6,
+                padding=0.3,
+            )
+            for block in self._iter_audio_blocks(audio_path):
+                yield from segmenter.push(block)
+            yield from segmenter.finish()
+            return
+        
+        chunk_samples = int(self.STREAMING_CHUNK_SECONDS * self.sample_rate)
+        pending: List[np.ndarray] = []
+        pending_samples = 0
+        position = 0
+        for block in self._iter_audio_blocks(audio_path):
+            pending.append(block)
+            pending_samples += len(block)
+            while pending_samples >= chunk_samples:
+                audio = np.concatenate(pending)
+                chunk, rest = audio[:chunk_samples], audio[chunk_samples:]
+                yield chunk, position / self.sample_rate, (position + chunk_samples) / self.sample_rate
+                position += chunk_samples
+                pending, pending_samples = [rest], len(rest)
+        if pending_samples:
+            yield np.concatenate(pending), position / self.sample_rate, (position + pending_samples) / self.sample_rate
+    
+    def _iter_stream_results(
+        self,
+        audio_path: Path,
+        progress_callback: Optional[Callable[[str, float], None]] = None,
+        duration: Optional[float] = None,
+        use_vad: Optional[bool] = None,
+        with_timestamps: bool = False
+    ) -> Iterator[Tuple[str, float, float, List[str], List[float]]]:
+        """流式识别：解码、分片与识别并行，片段确定后立即识别。
+        
+        后台线程读取 ffmpeg 管道并分片，识别线程每次取出所有已就绪的片段
+        （不超过 decode_batch_size）批量解码。队列有界，解码落后时分片线程等待，
+        内存与音频时长无关。
+        
+        Args:
+            audio_path: 音频文件路径
+            progress_callback: 进度回调函数
+            duration: 音频时长（秒），用于计算进度
+            use_vad: 是否使用 VAD 分片，None 表示按 use_vad 设置且 VAD 可用时使用
+            with_timestamps: 是否获取识别器给出的 token 级时间戳
+            
+        Yields:
+            (识别文本, 开始时间, 结束时间, token列表, token 时间戳)，按时间顺序。
+            token 时间戳已加上片段开始时间（秒），未请求或模型不支持时两个列表为空
+        """
+        if use_vad is None:
+            use_vad = bool(self.use_vad and self.vad_service and self.vad_service.is_model_loaded())
+        chunks_queue: queue.Queue = queue.Queue(maxsize=self.decode_batch_size * 2)
+        stop = threading.Event()
+        done_marker = object()
+        
+        def put(item: Any) -> bool:
+            # 消费方已退出（stop 被设置）时放弃，避免在满队列上永久阻塞
+            while not stop.is_set():
+                try:
+                    chunks_queue.put(item, timeout=0.2)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def produce() -> None:
+            try:
+                for item in self._iter_stream_chunks(audio_path, use_vad):
+                    if not put(item):
+                        return
+                put(done_marker)
+            except BaseException as e:
+                put(e)
+        
+        producer = threading.Thread(target=produce, name="asr-stream", daemon=True)
+        producer.start()
+        
+        audio_seconds = 0.0
+        count = 0
+        start_time = time.perf_counter()
+        finished = False
+        try:
+            while not finished:
+                items = [chunks_queue.get()]
+                while len(items) < self.decode_batch_size:
+                    try:
+                        items.append(chunks_queue.get_nowait())
+                    except queue.Empty:
+                        break
+                
+                batch = []
+                for item in items:
+                    if item is done_marker:
+                        finished = True
+                    elif isinstance(item, BaseException):
+                        raise item
+                    else:
+                        batch.append(item)
+                if not batch:
+                    continue
+                
+                chunks = [chunk for chunk, _, _ in batch]
+                if with_timestamps:
+                    results = self._decode_batch_with_timestamps(self.recognizer, chunks)
+                else:
+                    results = [(text, [], []) for text in self._decode_batch(self.recognizer, chunks)]
+                texts = [text for text, _, _ in results]
+                
+                # 进度中显示最新识别出的文本
+                if progress_callback:
+                    position = batch[-1][2]
+                    latest = next((text for text in reversed(texts) if text), "")
+                    progress = 0.1 + 0.85 * min(1.0, position / duration) if duration else 0.5
+                    progress_callback(f"流式识别中... {position:.0f} 秒 {latest[:40]}", progress)
+                
+                for (chunk, chunk_start, chunk_end), (text, tokens, timestamps) in zip(batch, results):
+                    count += 1
+                    audio_seconds += len(chunk) / self.sample_rate
+                    # 只有 token 与时间戳一一对应时才可用
+                    if len(timestamps) != len(tokens):
+                        tokens, timestamps = [], []
+                    yield text, chunk_start, chunk_end, tokens, [chunk_start + t for t in timestamps]
+        finally:
+            stop.set()
+            producer.join(timeout=5)
+        
+        elapsed = time.perf_counter() - start_time
+        logger.info(
+            f"流式识别 {count} 个片段：音频 {audio_seconds:.1f}s，耗时 {elapsed:.1f}s，"
+            f"RTF {elapsed / audio_seconds if audio_seconds > 0 else 0:.3f}"
+        )
+        
+        # VAD 完全没有检测到语音时回退固定分片（同样流式进行）
+        if use_vad and count == 0:
+            logger.warning("流式 VAD 未检测到语音片段，回退到固定分片识别")
+            yield from self._iter_stream_results(
+                audio_path, progress_callback, duration, use_vad=False, with_timestamps=with_timestamps
+            )
+    
+    def iter_recognize_stream(
+        self,
+        audio_path: Path,
+        progress_callback: Optional[Callable[[str, float], None]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """流式识别音频，识别出的分段立即产出。
+        
+        内存与音频时长无关，适合数小时的录音。模型给出 token 级时间戳时
+        （SenseVoice）分段使用真实时间戳，否则（Whisper）在片段内按句子均分。
+        
+        Args:
+            audio_path: 输入音频文件路径
+            progress_callback: 进度回调函数 (状态消息, 进度0-1)
+            
+        Yields:
+            分段结果 {'text': str, 'start': float, 'end': float}，按时间顺序
+        """
+        if self.recognizer is None:
+            raise RuntimeError("模型未加载，请先调用 load_model()")
+        
+        duration = self._get_audio_duration(audio_path)
+        results = self._iter_stream_results(audio_path, progress_callback, duration, with_timestamps=True)
+        for text, chunk_start, chunk_end, tokens, timestamps in results:
+            if not text:
+                continue
+            chunk_segments = []
+            if timestamps:
+                # token 时间戳是 token 开始时间，分段不超出片段范围
+                chunk_segments = self._tokens_to_segments(text, tokens, timestamps)
+                for segment in chunk_segments:
+                    segment['start'] = min(segment['start'], chunk_end)
+                    segment['end'] = min(max(segment['end'], segment['start']), chunk_end)
+            if not chunk_segments:
+                chunk_segments = self._split_into_segments(text, chunk_end - chunk_start)
+                for segment in chunk_segments:
+                    segment['start'] += chunk_start
+                    segment['end'] += chunk_start
+            yield from self._filter_hallucination_segments(chunk_segments)
+    
     def _merge_segments_text(self, segments: List[str]) -> str:
         """智能合并多个文本片段（中文直接连接，英文用空格）。
         
@@ -726,26 +1013,27 @@ class SpeechRecognitionService:
         
         return filtered
     
-    def _recognize_audio_chunk(self, audio_chunk: np.ndarray) -> str:
+    def _recognize_audio_chunk(self, audio_chunk: np.ndarray, recognizer: Any = None) -> str:
         """识别单个音频片段（内部方法）。
         
         Args:
             audio_chunk: 音频数据（不超过 30 秒）
+            recognizer: 使用的识别器，None 表示主识别器
             
         Returns:
             识别的文字内容
         """
-        import sherpa_onnx
+        recognizer = recognizer or self.recognizer
         
         try:
             # 创建离线音频流
-            stream = self.recognizer.create_stream()
+            stream = recognizer.create_stream()
             
             # 接受音频样本
             stream.accept_waveform(self.sample_rate, audio_chunk)
             
             # 解码
-            self.recognizer.decode_stream(stream)
+            recognizer.decode_stream(stream)
             
             # 获取结果
             result = stream.result
@@ -764,6 +1052,198 @@ class SpeechRecognitionService:
             
             # 其他未知异常，向上抛出
             raise RuntimeError(f"音频片段识别失败: {error_msg}")
+    
+    def set_decode_options(
+        self,
+        batch_size: Optional[int] = None,
+        batch_seconds: Optional[float] = None,
+        num_decoders: Optional[int] = None
+    ) -> None:
+        """设置批量解码参数。
+        
+        Args:
+            batch_size: 每批最多片段数（1 表示逐个解码）
+            batch_seconds: 每批最长总时长（秒）
+            num_decoders: 并行解码的识别器实例数，每个实例会额外占用一份模型内存，
+                仅在 CPU 推理时生效
+        """
+        if batch_size is not None:
+            self.decode_batch_size = max(1, batch_size)
+        if batch_seconds is not None:
+            self.decode_batch_seconds = max(1.0, batch_seconds)
+        if num_decoders is not None:
+            self.num_decoders = max(1, num_decoders)
+            del self._extra_recognizers[max(0, self.num_decoders - 1):]
+    
+    def _apply_decode_config(self) -> None:
+        """从配置读取批量解码参数（加载模型时调用）。"""
+        if not self.config_service:
+            return
+        get = self.config_service.get_config_value
+        try:
+            self.set_decode_options(
+                batch_size=int(get("asr_decode_batch_size", self.decode_batch_size)),
+                batch_seconds=float(get("asr_decode_batch_seconds", self.decode_batch_seconds)),
+                num_decoders=int(get("asr_num_decoders", self.num_decoders)),
+            )
+        except (TypeError, ValueError) as e:
+            logger.warning(f"批量解码配置无效，使用默认值: {e}")
+    
+    def _get_recognizers(self) -> List[Any]:
+        """获取用于并行解码的识别器列表（按需创建额外实例）。"""
+        wanted = self.num_decoders if self.current_provider == "cpu" else 1
+        if wanted > 1 and self._recognizer_factory is not None:
+            threads = max(1, (os.cpu_count() or 4) // wanted)
+            while len(self._extra_recognizers) < wanted - 1:
+                try:
+                    self._extra_recognizers.append(self._recognizer_factory(threads))
+                except Exception as e:
+                    logger.warning(f"创建额外识别器失败，使用 {len(self._extra_recognizers) + 1} 个实例: {e}")
+                    break
+        return [self.recognizer] + self._extra_recognizers[:max(0, wanted - 1)]
+    
+    def _plan_decode_batches(self, lengths: List[int]) -> List[List[int]]:
+        """按时长把片段分成批次。
+        
+        片段按长度从长到短依次装入批次，同一批内长度接近，补齐到最长片段的开销小；
+        每批片段数不超过 decode_batch_size，总时长不超过 decode_batch_seconds。
+        长批次在前，多个识别器并行时各实例的负载更均衡。
+        
+        Args:
+            lengths: 各片段的样本数
+            
+        Returns:
+            批次列表，每个批次是片段下标列表
+        """
+        max_samples = int(self.decode_batch_seconds * self.sample_rate)
+        batches: List[List[int]] = []
+        current: List[int] = []
+        current_samples = 0
+        for index in sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True):
+            if current and (
+                len(current) >= self.decode_batch_size
+                or current_samples + lengths[index] > max_samples
+            ):
+                batches.append(current)
+                current, current_samples = [], 0
+            current.append(index)
+            current_samples += lengths[index]
+        if current:
+            batches.append(current)
+        return batches
+    
+    def _decode_batch(self, recognizer: Any, chunks: List[np.ndarray]) -> List[str]:
+        """用一次 decode_streams 调用识别一批片段。
+        
+        批量解码失败时改为逐个解码，以便跳过个别异常片段。
+        """
+        if len(chunks) == 1:
+            return [self._recognize_audio_chunk(chunks[0], recognizer)]
+        try:
+            streams = []
+            for chunk in chunks:
+                stream = recognizer.create_stream()
+                stream.accept_waveform(self.sample_rate, chunk)
+                streams.append(stream)
+            recognizer.decode_streams(streams)
+            return [stream.result.text.strip() for stream in streams]
+        except Exception as e:
+            logger.warning(f"批量解码失败，改为逐个解码: {e}")
+            return [self._recognize_audio_chunk(chunk, recognizer) for chunk in chunks]
+    
+    def _decode_batch_with_timestamps(
+        self,
+        recognizer: Any,
+        chunks: List[np.ndarray]
+    ) -> List[Tuple[str, List[str], List[float]]]:
+        """批量识别并返回识别器给出的 token 级时间戳。
+        
+        SenseVoice 等模型会给出每个 token 相对片段起点的时间戳，Whisper 没有，
+        此时 token 和时间戳列表为空。批量解码失败时改为逐个解码（不带时间戳）。
+        
+        Returns:
+            每个片段的 (文本, token列表, 时间戳列表)
+        """
+        try:
+            streams = []
+            for chunk in chunks:
+                stream = recognizer.create_stream()
+                stream.accept_waveform(self.sample_rate, chunk)
+                streams.append(stream)
+            if len(streams) == 1:
+                recognizer.decode_stream(streams[0])
+            else:
+                recognizer.decode_streams(streams)
+            return [
+                (
+                    stream.result.text.strip(),
+                    list(getattr(stream.result, 'tokens', None) or []),
+                    list(getattr(stream.result, 'timestamps', None) or []),
+                )
+                for stream in streams
+            ]
+        except Exception as e:
+            logger.warning(f"批量解码失败，改为逐个解码: {e}")
+            return [(self._recognize_audio_chunk(chunk, recognizer), [], []) for chunk in chunks]
+    
+    def _recognize_chunks(
+        self,
+        chunks: List[np.ndarray],
+        progress_callback: Optional[Callable[[str, float], None]] = None
+    ) -> List[str]:
+        """批量识别多个独立的音频片段。
+        
+        片段按时长分批，每批一次解码；num_decoders > 1 时多个识别器实例并行处理不同批次。
+        
+        Args:
+            chunks: 音频片段列表
+            progress_callback: 进度回调函数（进度从 0.2 到 0.9）
+            
+        Returns:
+            与 chunks 顺序一致的识别文本列表
+        """
+        texts: List[str] = [""] * len(chunks)
+        if not chunks:
+            return texts
+        
+        batches = self._plan_decode_batches([len(chunk) for chunk in chunks])
+        recognizers = self._get_recognizers()
+        audio_seconds = sum(len(chunk) for chunk in chunks) / self.sample_rate
+        start_time = time.perf_counter()
+        
+        # 空闲的识别器，每个实例同一时间只处理一个批次
+        idle: queue.Queue = queue.Queue()
+        for recognizer in recognizers:
+            idle.put(recognizer)
+        
+        def decode(batch: List[int]) -> Tuple[List[int], List[str]]:
+            recognizer = idle.get()
+            try:
+                return batch, self._decode_batch(recognizer, [chunks[i] for i in batch])
+            finally:
+                idle.put(recognizer)
+        
+        done = 0
+        with ThreadPoolExecutor(max_workers=len(recognizers), thread_name_prefix="asr-decode") as executor:
+            futures = [executor.submit(decode, batch) for batch in batches]
+            for future in as_completed(futures):
+                batch, batch_texts = future.result()
+                for index, text in zip(batch, batch_texts):
+                    texts[index] = text
+                done += len(batch)
+                if progress_callback:
+                    progress_callback(
+                        f"识别片段 {done}/{len(chunks)}...",
+                        0.2 + (done / len(chunks)) * 0.7
+                    )
+        
+        elapsed = time.perf_counter() - start_time
+        logger.info(
+            f"批量识别 {len(chunks)} 个片段（{len(batches)} 批，{len(recognizers)} 个识别器）："
+            f"音频 {audio_seconds:.1f}s，耗时 {elapsed:.1f}s，"
+            f"RTF {elapsed / audio_seconds if audio_seconds > 0 else 0:.3f}"
+        )
+        return texts
 
     def _postprocess_vad_segments(
         self,
@@ -854,16 +1334,9 @@ class SpeechRecognitionService:
         
         results = []
         num_chunks = len(audio_chunks)
+        chunk_texts = self._recognize_chunks([chunk for chunk, _, _ in audio_chunks], progress_callback)
         
-        for i, (chunk, start_time, end_time) in enumerate(audio_chunks):
-            if progress_callback:
-                progress = 0.2 + (i / num_chunks) * 0.7
-                progress_callback(
-                    f"识别片段 {i+1}/{num_chunks} ({start_time:.1f}s - {end_time:.1f}s)...",
-                    progress
-                )
-            
-            chunk_text = self._recognize_audio_chunk(chunk)
+        for i, chunk_text in enumerate(chunk_texts):
             if chunk_text:
                 results.append(chunk_text)
                 logger.info(f"VAD 片段 {i+1}/{num_chunks} 识别完成: {len(chunk_text)} 字符")
@@ -912,25 +1385,8 @@ class SpeechRecognitionService:
             f"分成 {num_chunks} 个片段进行识别"
         )
 
-        results: List[str] = []
-        for i in range(num_chunks):
-            start_idx = i * chunk_samples
-            end_idx = min((i + 1) * chunk_samples, len(audio))
-            chunk = audio[start_idx:end_idx]
-
-            chunk_start_time = start_idx / self.sample_rate
-            chunk_end_time = end_idx / self.sample_rate
-
-            if progress_callback:
-                progress = 0.2 + (i / max(num_chunks, 1)) * 0.7
-                progress_callback(
-                    f"识别片段 {i+1}/{num_chunks} ({chunk_start_time:.1f}s - {chunk_end_time:.1f}s)...",
-                    progress,
-                )
-
-            chunk_text = self._recognize_audio_chunk(chunk)
-            if chunk_text:
-                results.append(chunk_text)
+        chunks = [audio[i * chunk_samples:(i + 1) * chunk_samples] for i in range(num_chunks)]
+        results = [text for text in self._recognize_chunks(chunks, progress_callback) if text]
 
         if progress_callback:
             progress_callback("合并结果...", 0.95)
@@ -993,19 +1449,11 @@ class SpeechRecognitionService:
         
         all_segments = []
         num_chunks = len(audio_chunks)
+        chunk_texts = self._recognize_chunks([chunk for chunk, _, _ in audio_chunks], progress_callback)
         
-        for i, (chunk, chunk_start, chunk_end) in enumerate(audio_chunks):
+        for i, ((_, chunk_start, chunk_end), chunk_text) in enumerate(zip(audio_chunks, chunk_texts)):
             chunk_duration = chunk_end - chunk_start
             
-            if progress_callback:
-                progress = 0.2 + (i / num_chunks) * 0.7
-                progress_callback(
-                    f"识别片段 {i+1}/{num_chunks} ({chunk_start:.1f}s - {chunk_end:.1f}s)...",
-                    progress
-                )
-            
-            chunk_text = self._recognize_audio_chunk(chunk)
-            
             if chunk_text:
                 # 为这个片段生成带时间戳的分段
                 chunk_segments = self._split_into_segments(chunk_text, chunk_duration)
@@ -1059,24 +1507,14 @@ class SpeechRecognitionService:
         chunk_samples = int(max_chunk_duration * self.sample_rate)
         num_chunks = int(np.ceil(len(audio) / chunk_samples))
 
-        all_segments: List[Dict[str, Any]] = []
-        for i in range(num_chunks):
-            start_idx = i * chunk_samples
-            end_idx = min((i + 1) * chunk_samples, len(audio))
-            chunk = audio[start_idx:end_idx]
-
-            chunk_start_time = start_idx / self.sample_rate
-            chunk_end_time = end_idx / self.sample_rate
-            chunk_duration = (end_idx - start_idx) / self.sample_rate
+        chunks = [audio[i * chunk_samples:(i + 1) * chunk_samples] for i in range(num_chunks)]
+        chunk_texts = self._recognize_chunks(chunks, progress_callback)
 
-            if progress_callback:
-                progress = 0.2 + (i / max(num_chunks, 1)) * 0.7
-                progress_callback(
-                    f"识别片段 {i+1}/{num_chunks} ({chunk_start_time:.1f}s - {chunk_end_time:.1f}s)...",
-                    progress,
-                )
+        all_segments: List[Dict[str, Any]] = []
+        for i, (chunk, chunk_text) in enumerate(zip(chunks, chunk_texts)):
+            chunk_start_time = i * chunk_samples / self.sample_rate
+            chunk_duration = len(chunk) / self.sample_rate
 
-            chunk_text = self._recognize_audio_chunk(chunk)
             if chunk_text:
                 chunk_segments = self._split_into_segments(chunk_text, chunk_duration)
                 for seg in chunk_segments:
@@ -1093,7 +1531,8 @@ class SpeechRecognitionService:
         audio_path: Path,
         language: str = "zh",
         task: str = "transcribe",
-        progress_callback: Optional[Callable[[str, float], None]] = None
+        progress_callback: Optional[Callable[[str, float], None]] = None,
+        streaming: Optional[bool] = None
     ) -> str:
         """识别音频中的语音并转换为文字。
         
@@ -1109,6 +1548,8 @@ class SpeechRecognitionService:
             language: （已弃用）语言代码，请在加载模型时指定
             task: （已弃用）任务类型，请在加载模型时指定
             progress_callback: 进度回调函数 (状态消息, 进度0-1)
+            streaming: 是否边解码边识别（内存与时长无关），
+                None 表示时长超过 STREAMING_MIN_DURATION 时自动启用
             
         Returns:
             识别的文字内容
@@ -1125,6 +1566,21 @@ class SpeechRecognitionService:
                     "请在 媒体处理 -> FFmpeg终端 中安装 FFmpeg。"
                 )
         
+        duration = self._get_audio_duration(audio_path) if streaming is not False else None
+        if streaming is None:
+            streaming = duration is not None and duration >= self.STREAMING_MIN_DURATION
+        if streaming:
+            try:
+                results = [
+                    text for text, _, _, _, _ in self._iter_stream_results(audio_path, progress_callback, duration)
+                    if text
+                ]
+            except Exception as e:
+                raise RuntimeError(f"识别失败: {e}")
+            if progress_callback:
+                progress_callback("完成!", 1.0)
+            return self._merge_segments_text(results) if results else "[未识别到语音内容]"
+        
         # 加载音频
         if progress_callback:
             progress_callback("正在加载音频...", 0.1)
@@ -1178,27 +1634,8 @@ class SpeechRecognitionService:
                 f"将自动分成 {num_chunks} 个片段进行识别（固定分片）"
             )
             
-            results = []
-            
-            for i in range(num_chunks):
-                start_idx = i * chunk_samples
-                end_idx = min((i + 1) * chunk_samples, len(audio))
-                chunk = audio[start_idx:end_idx]
-                
-                chunk_start_time = start_idx / self.sample_rate
-                chunk_end_time = end_idx / self.sample_rate
-                
-                if progress_callback:
-                    progress = 0.2 + (i / num_chunks) * 0.7
-                    progress_callback(
-                        f"识别片段 {i+1}/{num_chunks} ({chunk_start_time:.1f}s - {chunk_end_time:.1f}s)...",
-                        progress
-                    )
-                
-                chunk_text = self._recognize_audio_chunk(chunk)
-                if chunk_text:
-                    results.append(chunk_text)
-                    logger.info(f"片段 {i+1}/{num_chunks} 识别完成: {len(chunk_text)} 字符")
+            chunks = [audio[i * chunk_samples:(i + 1) * chunk_samples] for i in range(num_chunks)]
+            results = [text for text in self._recognize_chunks(chunks, progress_callback) if text]
             
             if progress_callback:
                 progress_callback("合并结果...", 0.95)
@@ -1224,7 +1661,8 @@ class SpeechRecognitionService:
         audio_path: Path,
         language: str = "zh",
         task: str = "transcribe",
-        progress_callback: Optional[Callable[[str, float], None]] = None
+        progress_callback: Optional[Callable[[str, float], None]] = None,
+        streaming: Optional[bool] = None
     ) -> List[Dict[str, Any]]:
         """识别音频中的语音并返回带时间戳的分段结果。
         
@@ -1237,6 +1675,8 @@ class SpeechRecognitionService:
             language: （已弃用）语言代码，请在加载模型时指定
             task: （已弃用）任务类型，请在加载模型时指定
             progress_callback: 进度回调函数 (状态消息, 进度0-1)
+            streaming: 是否边解码边识别（内存与时长无关），
+                None 表示时长超过 STREAMING_MIN_DURATION 时自动启用
             
         Returns:
             分段结果列表，每个元素包含：
@@ -1258,6 +1698,19 @@ class SpeechRecognitionService:
                     "请在 媒体处理 -> FFmpeg终端 中安装 FFmpeg。"
                 )
         
+        if streaming is None:
+            duration = self._get_audio_duration(audio_path)
+            streaming = duration is not None and duration >= self.STREAMING_MIN_DURATION
+        if streaming:
+            try:
+                segments = list(self.iter_recognize_stream(audio_path, progress_callback))
+            except Exception as e:
+                raise RuntimeError(f"识别失败: {e}")
+            if progress_callback:
+                progress_callback("完成!", 1.0)
+            logger.info(f"流式识别完成，总共 {len(segments)} 个分段")
+            return segments
+        
         # 加载音频
         if progress_callback:
             progress_callback("正在加载音频...", 0.1)
@@ -1337,23 +1790,12 @@ class SpeechRecognitionService:
                 f"将自动分成 {num_chunks} 个片段进行识别（固定分片）"
             )
             
-            for i in range(num_chunks):
-                start_idx = i * chunk_samples
-                end_idx = min((i + 1) * chunk_samples, len(audio))
-                chunk = audio[start_idx:end_idx]
-                
-                chunk_start_time = start_idx / self.sample_rate
-                chunk_end_time = end_idx / self.sample_rate
-                chunk_duration = (end_idx - start_idx) / self.sample_rate
-                
-                if progress_callback:
-                    progress = 0.2 + (i / num_chunks) * 0.7
-                    progress_callback(
-                        f"识别片段 {i+1}/{num_chunks} ({chunk_start_time:.1f}s - {chunk_end_time:.1f}s)...",
-                        progress
-                    )
-                
-                chunk_text = self._recognize_audio_chunk(chunk)
+            chunks = [audio[i * chunk_samples:(i + 1) * chunk_samples] for i in range(num_chunks)]
+            chunk_texts = self._recognize_chunks(chunks, progress_callback)
+            
+            for i, (chunk, chunk_text) in enumerate(zip(chunks, chunk_texts)):
+                chunk_start_time = i * chunk_samples / self.sample_rate
+                chunk_duration = len(chunk) / self.sample_rate
                 
                 if chunk_text:
                     # 为这个片段生成带时间戳的分段
@@ -1611,6 +2053,8 @@ class SpeechRecognitionService:
                 pass
             finally:
                 self.recognizer = None
+        self._extra_recognizers = []
+        self._recognizer_factory = None
     
     def __del__(self):
         """析构函数：确保对象销毁时清理资源。"""
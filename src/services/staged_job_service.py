@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""分阶段作业调度模块。
+
+多个文件依次经过若干处理阶段（如 提取音频 → 语音识别 → 烧录），
+每个阶段有独立的并发上限，不同文件可以同时处于不同阶段，
+总耗时接近最慢阶段的耗时，而不是所有阶段耗时之和。
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from utils import logger
+
+
+@dataclass
+class JobStage:
+    """处理阶段定义。
+
+    Attributes:
+        name: 阶段名称（用于日志和进度显示）
+        func: 阶段处理函数，参数为 StagedJob，抛出异常表示该作业失败
+        concurrency: 该阶段同时处理的最大作业数
+    """
+    name: str
+    func: Callable[['StagedJob'], None]
+    concurrency: int = 1
+
+
+@dataclass
+class StagedJob:
+    """单个作业及其在各阶段之间传递的数据。
+
+    Attributes:
+        index: 作业序号
+        item: 输入项（如文件路径）
+        data: 阶段之间传递的数据
+        stage: 当前（或最后）所在的阶段名称
+        error: 失败时的异常
+        timings: 各阶段耗时（秒）
+    """
+    index: int
+    item: Any
+    data: Dict[str, Any] = field(default_factory=dict)
+    stage: str = ""
+    error: Optional[BaseException] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def success(self) -> bool:
+        """作业是否成功完成所有阶段。"""
+        return self.error is None
+
+
+class StagedJobScheduler:
+    """分阶段作业调度器。
+
+    每个阶段使用独立的线程池，作业完成一个阶段后进入下一个阶段的队列。
+    同时在途的作业数有上限，避免所有文件同时进入第一阶段（如一次性提取全部音频）。
+    """
+
+    def __init__(self, stages: List[JobStage], max_in_flight: Optional[int] = None) -> None:
+        """初始化调度器。
+
+        Args:
+            stages: 按顺序排列的阶段列表
+            max_in_flight: 最大在途作业数，None 表示各阶段并发数之和加一
+        """
+        if not stages:
+            raise ValueError("至少需要一个处理阶段")
+        self.stages = stages
+        self.max_in_flight = max_in_flight or sum(max(1, s.concurrency) for s in stages) + 1
+        self._cancel_event = threading.Event()
+        self._active: Dict[str, List[StagedJob]] = {stage.name: [] for stage in stages}
+        self._lock = threading.Lock()
+
+    def cancel(self) -> None:
+        """请求取消：已开始的阶段会执行完，之后不再推进任何作业。"""
+        self._cancel_event.set()
+
+    @property
+    def is_cancelled(self) -> bool:
+        """是否已被取消。"""
+        return self._cancel_event.is_set()
+
+    def active_jobs(self) -> Dict[str, List[StagedJob]]:
+        """各阶段正在处理的作业快照（用于进度显示）。"""
+        with self._lock:
+            return {name: list(jobs) for name, jobs in self._active.items()}
+
+    def _run_stage(self, stage: JobStage, job: StagedJob) -> None:
+        """在阶段线程池中执行一个作业的一个阶段。"""
+        job.stage = stage.name
+        with self._lock:
+            self._active[stage.name].append(job)
+        start = time.perf_counter()
+        try:
+            if self._cancel_event.is_set():
+                raise RuntimeError("已取消")
+            stage.func(job)
+        except BaseException as e:
+            job.error = e
+        finally:
+            job.timings[stage.name] = time.perf_counter() - start
+            with self._lock:
+                self._active[stage.name].remove(job)
+
+    def run(
+        self,
+        items: Iterable[Any],
+        on_job_finished: Optional[Callable[[StagedJob], None]] = None
+    ) -> List[StagedJob]:
+        """处理所有输入项（阻塞，请在后台线程中调用）。
+
+        Args:
+            items: 输入项序列
+            on_job_finished: 作业结束（成功、失败或取消）时的回调，在调用 run 的线程中执行
+
+        Returns:
+            按输入顺序排列的作业列表
+        """
+        self._cancel_event.clear()
+        executors = [
+            ThreadPoolExecutor(max_workers=max(1, stage.concurrency), thread_name_prefix=f"stage-{stage.name}")
+            for stage in self.stages
+        ]
+        # 阶段完成事件: (阶段序号, 作业)
+        completed: queue.Queue = queue.Queue()
+        jobs: List[StagedJob] = []
+        pending_items = iter(enumerate(items))
+        in_flight = 0
+        exhausted = False
+        start_time = time.perf_counter()
+
+        def submit(stage_idx: int, job: StagedJob) -> None:
+            future = executors[stage_idx].submit(self._run_stage, self.stages[stage_idx], job)
+            future.add_done_callback(lambda _: completed.put((stage_idx, job)))
+
+        try:
+            while True:
+                # 补充新作业
+                while not exhausted and in_flight < self.max_in_flight and not self._cancel_event.is_set():
+                    item = next(pending_items, None)
+                    if item is None:
+                        exhausted = True
+                        break
+                    job = StagedJob(index=item[0], item=item[1])
+                    jobs.append(job)
+                    in_flight += 1
+                    submit(0, job)
+
+                if in_flight == 0:
+                    break
+
+                stage_idx, job = completed.get()
+                next_idx = stage_idx + 1
+
+                if job.error is None and self._cancel_event.is_set():
+                    job.error = RuntimeError("已取消")
+
+                if job.error is not None or next_idx >= len(self.stages):
+                    in_flight -= 1
+                    if job.error is not None and not self._cancel_event.is_set():
+                        logger.error(f"作业 {job.index + 1} 在阶段 [{job.stage}] 失败: {job.error}")
+                    if on_job_finished:
+                        try:
+                            on_job_finished(job)
+                        except Exception as e:
+                            logger.warning(f"作业完成回调异常: {e}")
+                else:
+                    submit(next_idx, job)
+        finally:
+            for executor in executors:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+        elapsed = time.perf_counter() - start_time
+        self._log_summary(jobs, elapsed)
+        return jobs
+
+    def _log_summary(self, jobs: List[StagedJob], elapsed: float) -> None:
+        """输出各阶段耗时统计，便于找出瓶颈阶段。"""
+        if not jobs:
+            return
+        stage_totals = {
+            stage.name: sum(job.timings.get(stage.name, 0.0) for job in jobs) / max(1, stage.concurrency)
+            for stage in self.stages
+        }
+        details = ", ".join(f"{name} {seconds:.1f}s" for name, seconds in stage_totals.items())
+        bottleneck = max(stage_totals, key=stage_totals.get)
+        succeeded = sum(1 for job in jobs if job.success)
+        logger.info(
+            f"分阶段处理完成: {succeeded}/{len(jobs)} 成功, 总耗时 {elapsed:.1f}s | "
+            f"各阶段(按并发折算) {details} | 瓶颈: {bottleneck}"
+        )
@@ -13,6 +13,7 @@ import cv2
 import numpy as np
 import onnxruntime as ort
 
+from services.frame_pipeline_service import FramePipeline
 from utils import logger
 from utils.onnx_helper import create_onnx_session
 
@@ -164,13 +165,13 @@ class SubtitleRemoveService:
         """卸载模型释放资源。"""
         import gc
         if self.encoder_session:
-            del self.encoder_session
+            self.encoder_session.release(evict=True)
             self.encoder_session = None
         if self.infer_session:
-            del self.infer_session
+            self.infer_session.release(evict=True)
             self.infer_session = None
         if self.decoder_session:
-            del self.decoder_session
+            self.decoder_session.release(evict=True)
             self.decoder_session = None
         gc.collect()
         logger.info("STTN模型已卸载")
@@ -472,30 +473,12 @@ class SubtitleRemoveService:
         
         # 用于缓存mask对应的inpaint_area
         split_h = int(W_ori * 3 / 16)
-        last_mask_hash = None
-        inpaint_area = []
-        mask = None
-        
-        processed_count = 0
+        state = {"last_mask_hash": None, "inpaint_area": [], "mask": None, "processed_count": 0}
         
-        while True:
+        def process_batch(batch_frames: List[np.ndarray]) -> List[np.ndarray]:
             # 记录当前批次的起始帧号
-            batch_start_frame = processed_count
-            
-            # 读取一批帧
-            batch_frames = []
-            batch_times = []
-            for i in range(batch_size):
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                batch_frames.append(frame)
-                # 计算当前帧的时间
-                frame_time = (batch_start_frame + i) / fps
-                batch_times.append(frame_time)
-            
-            if not batch_frames:
-                break
+            batch_start_frame = state["processed_count"]
+            batch_times = [(batch_start_frame + i) / fps for i in range(len(batch_frames))]
             
             # 使用批次中间帧的时间来获取mask（同一批次使用相同mask）
             mid_time = batch_times[len(batch_times) // 2]
@@ -510,63 +493,74 @@ class SubtitleRemoveService:
             # 检查mask是否有变化（通过计算和值来判断）
             mask_hash = np.sum(mask_binary)
             
-            if mask_hash != last_mask_hash:
+            if mask_hash != state["last_mask_hash"]:
                 # mask有变化，重新计算inpaint_area
-                mask = mask_binary[:, :, None]
-                inpaint_area = self.get_inpaint_area_by_mask(H_ori, split_h, mask)
-                last_mask_hash = mask_hash
-                if inpaint_area:
-                    logger.info(f"时间 {mid_time:.1f}s: mask变化，{len(inpaint_area)} 个区域需要修复")
+                state["mask"] = mask_binary[:, :, None]
+                state["inpaint_area"] = self.get_inpaint_area_by_mask(H_ori, split_h, state["mask"])
+                state["last_mask_hash"] = mask_hash
+                if state["inpaint_area"]:
+                    logger.info(f"时间 {mid_time:.1f}s: mask变化，{len(state['inpaint_area'])} 个区域需要修复")
             
-            if not inpaint_area:
-                # 没有需要修复的区域，直接写入原帧
+            mask = state["mask"]
+            # 处理这批帧的每个区域（没有需要修复的区域时直接输出原帧）
+            for k, (from_H, to_H) in enumerate(state["inpaint_area"]):
+                # 提取并缩放这批帧的对应区域
+                frames_scaled = []
                 for frame in batch_frames:
-                    out.write(frame)
-            else:
-                # 处理这批帧的每个区域
-                for k, (from_H, to_H) in enumerate(inpaint_area):
-                    # 提取并缩放这批帧的对应区域
-                    frames_scaled = []
-                    for frame in batch_frames:
-                        image_crop = frame[from_H:to_H, :, :]
-                        image_resize = cv2.resize(
-                            image_crop,
-                            (self.model_input_width, self.model_input_height)
-                        )
-                        frames_scaled.append(image_resize)
-                    
-                    # 修复这个区域
-                    comps = self.inpaint(frames_scaled)
-                    
-                    # 将修复结果合成回原帧
-                    for j, frame in enumerate(batch_frames):
-                        comp = cv2.resize(comps[j], (W_ori, split_h))
-                        comp = cv2.cvtColor(np.array(comp).astype(np.uint8), cv2.COLOR_BGR2RGB)
-                        mask_area = mask[from_H:to_H, :]
-                        frame[from_H:to_H, :, :] = (
-                            mask_area * comp +
-                            (1 - mask_area) * frame[from_H:to_H, :, :]
-                        )
-                    
-                    # 清理临时变量
-                    del frames_scaled
-                    del comps
+                    image_crop = frame[from_H:to_H, :, :]
+                    image_resize = cv2.resize(
+                        image_crop,
+                        (self.model_input_width, self.model_input_height)
+                    )
+                    frames_scaled.append(image_resize)
                 
-                # 写入处理后的帧
-                for frame in batch_frames:
-                    out.write(frame)
+                # 修复这个区域
+                comps = self.inpaint(frames_scaled)
+                
+                # 将修复结果合成回原帧
+                for j, frame in enumerate(batch_frames):
+                    comp = cv2.resize(comps[j], (W_ori, split_h))
+                    comp = cv2.cvtColor(np.array(comp).astype(np.uint8), cv2.COLOR_BGR2RGB)
+                    mask_area = mask[from_H:to_H, :]
+                    frame[from_H:to_H, :, :] = (
+                        mask_area * comp +
+                        (1 - mask_area) * frame[from_H:to_H, :, :]
+                    )
+                
+                # 清理临时变量
+                del frames_scaled
+                del comps
             
-            processed_count += len(batch_frames)
+            state["processed_count"] += len(batch_frames)
             
             if progress_callback:
-                progress_callback(processed_count, total_frames)
+                progress_callback(state["processed_count"], total_frames)
             
-            # 清理这批帧
-            del batch_frames
+            return batch_frames
+        
+        def read_frame(buffer: np.ndarray) -> bool:
+            # 尽量直接解码到缓冲区，OpenCV 重新分配时再拷贝
+            ret, frame = cap.read(buffer)
+            if ret and not np.may_share_memory(frame, buffer):
+                np.copyto(buffer, frame)
+            return ret
+        
+        # 解码（读取）、修复、编码（写入）三阶段流水线
+        pipeline = FramePipeline(
+            frame_shape=(H_ori, W_ori, 3),
+            read_frame=read_frame,
+            write_frame=out.write,
+            process=process_batch,
+            batch_size=batch_size,
+            queue_depth=batch_size,
+        )
         
-        cap.release()
-        out.release()
+        try:
+            pipeline.run()
+        finally:
+            cap.release()
+            out.release()
         
-        logger.info(f"视频处理完成，共 {processed_count} 帧")
+        logger.info(f"视频处理完成，共 {state['processed_count']} 帧")
         return True
 
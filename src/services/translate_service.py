@@ -4,11 +4,29 @@
 使用 Bing 翻译 API 进行文本翻译。
 """
 
-import httpx
 import asyncio
-from typing import Optional, Dict, Any
+import base64
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
 from utils import logger
 
+if TYPE_CHECKING:
+    from services.config_service import ConfigService
+
+# HTTP/2 需要可选依赖 h2，未安装时使用 HTTP/1.1 长连接
+try:
+    import h2  # noqa: F401
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
 
 # 错误代码映射
 ERROR_CODES = {
@@ -55,34 +73,442 @@ SUPPORTED_LANGUAGES = {
 }
 
 
+class TranslateError(Exception):
+    """翻译请求失败。"""
+
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class TranslationMemory:
+    """基于 SQLite 的翻译记忆库，按 (源语言, 目标语言, 原文) 保存译文。"""
+
+    # 单条 SQL 中 IN (...) 参数的最大数量（SQLite 默认上限 999）
+    LOOKUP_CHUNK: int = 500
+
+    def __init__(self, db_path: Path) -> None:
+        """初始化记忆库。
+
+        Args:
+            db_path: 数据库文件路径（不存在时自动创建）
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                "source TEXT NOT NULL, target TEXT NOT NULL, text TEXT NOT NULL, "
+                "translation TEXT NOT NULL, updated REAL NOT NULL, "
+                "PRIMARY KEY (source, target, text)) WITHOUT ROWID"
+            )
+            self._conn.commit()
+
+    def lookup(self, texts: Sequence[str], source_lang: str, target_lang: str) -> Dict[str, str]:
+        """查询已有译文。
+
+        Args:
+            texts: 原文列表
+            source_lang: 源语言代码（空字符串表示自动检测）
+            target_lang: 目标语言代码
+
+        Returns:
+            原文 → 译文（只包含命中的条目）
+        """
+        found: Dict[str, str] = {}
+        unique = list(dict.fromkeys(texts))
+        with self._lock:
+            for i in range(0, len(unique), self.LOOKUP_CHUNK):
+                chunk = unique[i:i + self.LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT text, translation FROM translations "
+                    f"WHERE source = ? AND target = ? AND text IN ({placeholders})",
+                    (source_lang, target_lang, *chunk),
+                )
+                found.update(rows)
+        return found
+
+    def store(self, pairs: Dict[str, str], source_lang: str, target_lang: str) -> None:
+        """保存译文（已存在则覆盖）。
+
+        Args:
+            pairs: 原文 → 译文
+            source_lang: 源语言代码
+            target_lang: 目标语言代码
+        """
+        if not pairs:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO translations (source, target, text, translation, updated) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(source_lang, target_lang, text, translation, now) for text, translation in pairs.items()],
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        """关闭数据库连接。"""
+        with self._lock:
+            self._conn.close()
+
+
+class _RateLimiter:
+    """异步限速器：保证相邻两次请求的发起间隔不小于 1 / rate 秒。"""
+
+    def __init__(self, rate: float) -> None:
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_time = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_time - now
+            self._next_time = max(now, self._next_time) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
 class TranslateService:
-    """Bing 翻译服务。"""
-    
-    def __init__(self):
+    """Bing 翻译服务。
+
+    所有网络请求都在服务自己的后台事件循环中执行，因此无论调用方使用哪个事件循环
+    （asyncio.run、flet 的事件循环或工作线程中新建的循环），都复用同一个 HTTP 连接池、
+    同一个认证令牌和同一个限速器。
+    """
+
+    AUTH_URL: str = "https://edge.microsoft.com/translate/auth"
+    TRANSLATE_URL: str = "https://api-edge.cognitive.microsofttranslator.com/translate"
+
+    # 单次请求的数组元素数和总字符数上限
+    BATCH_MAX_ITEMS: int = 100
+    BATCH_MAX_CHARS: int = 10000
+    # 同时进行的翻译请求数和每秒最多发起的请求数
+    MAX_CONCURRENCY: int = 4
+    REQUESTS_PER_SECOND: float = 8.0
+    # 无法从令牌中解析过期时间时使用的有效期，以及提前刷新的余量（秒）
+    TOKEN_TTL: float = 480.0
+    TOKEN_REFRESH_MARGIN: float = 60.0
+    # 请求过于频繁（429）或服务暂时不可用时的最大重试次数
+    MAX_RETRIES: int = 3
+
+    USER_AGENT: str = (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36 Edg/120.0.0.0"
+    )
+
+    def __init__(
+        self,
+        config_service: Optional['ConfigService'] = None,
+        memory_path: Optional[Path] = None,
+        auth_url: Optional[str] = None,
+        translate_url: Optional[str] = None,
+    ) -> None:
+        """初始化翻译服务。
+
+        Args:
+            config_service: 配置服务（提供时在数据目录中启用翻译记忆库）
+            memory_path: 翻译记忆库路径（优先于 config_service）
+            auth_url: 认证地址（默认为 Edge 翻译认证地址，可指向本地模拟服务）
+            translate_url: 翻译地址（默认为 Edge 翻译 API，可指向本地模拟服务）
+        """
+        self.auth_url = auth_url or self.AUTH_URL
+        self.translate_url = translate_url or self.TRANSLATE_URL
+
         self._auth_token: Optional[str] = None
-        self._token_lock = asyncio.Lock()
-    
-    async def _get_auth_token(self) -> str:
-        """获取认证令牌（异步）。"""
+        self._token_expires_at: float = 0.0
+        # 异步原语绑定到首次使用它们的事件循环，因此在后台事件循环中按需创建，
+        # close() 后随新的后台循环重建
+        self._token_lock: Optional[asyncio.Lock] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._rate_limiter: Optional[_RateLimiter] = None
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+
+        self.memory: Optional[TranslationMemory] = None
+        if memory_path is None and config_service is not None:
+            memory_path = config_service.get_data_dir() / "translation_memory.db"
+        self._memory_path = memory_path
+        self._open_memory()
+
+    def _open_memory(self) -> None:
+        """打开翻译记忆库（未配置路径或打开失败时不使用记忆库）。"""
+        if self.memory is not None or self._memory_path is None:
+            return
+        try:
+            self.memory = TranslationMemory(self._memory_path)
+        except Exception as ex:
+            logger.warning(f"翻译记忆库不可用: {ex}")
+
+    # ==================== 后台事件循环与连接池 ====================
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """获取（必要时启动）服务的后台事件循环。"""
+        with self._loop_lock:
+            if self._loop is None or self._loop.is_closed():
+                # close() 之后再次使用：重新打开记忆库
+                self._open_memory()
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, daemon=True, name="TranslateService")
+                thread.start()
+                self._loop = loop
+            return self._loop
+
+    async def _run(self, coro):
+        """在后台事件循环中执行协程，并在调用方的事件循环中等待结果。"""
+        loop = self._ensure_loop()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    def _ensure_async_state(self) -> None:
+        """创建令牌锁、并发信号量和限速器（仅在后台事件循环中调用）。"""
+        if self._token_lock is None:
+            self._token_lock = asyncio.Lock()
+            self._semaphore = asyncio.Semaphore(self.MAX_CONCURRENCY)
+            self._rate_limiter = _RateLimiter(self.REQUESTS_PER_SECOND)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """获取共享的 HTTP 客户端（仅在后台事件循环中调用）。"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=_HTTP2_AVAILABLE,
+                timeout=30,
+                headers={"User-Agent": self.USER_AGENT},
+                limits=httpx.Limits(
+                    max_connections=self.MAX_CONCURRENCY,
+                    max_keepalive_connections=self.MAX_CONCURRENCY,
+                ),
+            )
+        return self._client
+
+    def close(self) -> None:
+        """关闭连接池、后台事件循环和翻译记忆库。"""
+        with self._loop_lock:
+            loop, self._loop = self._loop, None
+        if loop is not None and not loop.is_closed():
+            client, self._client = self._client, None
+            if client is not None:
+                try:
+                    asyncio.run_coroutine_threadsafe(client.aclose(), loop).result(timeout=5)
+                except Exception:
+                    pass
+            loop.call_soon_threadsafe(loop.stop)
+        self._token_lock = self._semaphore = self._rate_limiter = None
+        if self.memory is not None:
+            self.memory.close()
+            self.memory = None
+
+    # ==================== 认证令牌 ====================
+
+    def _token_ttl(self, token: str) -> float:
+        """从 JWT 令牌中解析剩余有效期（秒），解析失败时使用默认值。"""
+        try:
+            payload = token.split(".")[1]
+            payload += "=" * (-len(payload) % 4)
+            expires = json.loads(base64.urlsafe_b64decode(payload)).get("exp")
+            if expires:
+                return max(0.0, float(expires) - time.time())
+        except Exception:
+            pass
+        return self.TOKEN_TTL
+
+    async def _get_auth_token(self, force_refresh: bool = False) -> str:
+        """获取认证令牌（在有效期内复用缓存）。"""
+        self._ensure_async_state()
         async with self._token_lock:
-            ua = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36 Edg/120.0.0.0"
-            }
-            auth_url = "https://edge.microsoft.com/translate/auth"
-            
+            if (
+                not force_refresh
+                and self._auth_token
+                and time.monotonic() < self._token_expires_at - self.TOKEN_REFRESH_MARGIN
+            ):
+                return self._auth_token
+
             try:
-                async with httpx.AsyncClient(timeout=10) as client:
-                    resp = await client.get(auth_url, headers=ua)
-                    if resp.status_code == 200:
-                        self._auth_token = resp.text
-                        return self._auth_token
-                    else:
-                        logger.error(f"获取翻译认证令牌失败: {resp.status_code}")
-                        return ""
+                resp = await self._get_client().get(self.auth_url, timeout=10)
+                if resp.status_code == 200:
+                    self._auth_token = resp.text
+                    self._token_expires_at = time.monotonic() + self._token_ttl(self._auth_token)
+                    return self._auth_token
+                else:
+                    logger.error(f"获取翻译认证令牌失败: {resp.status_code}")
+                    return ""
             except Exception as ex:
                 logger.error(f"获取翻译认证令牌异常: {ex}")
                 return ""
-    
+
+    # ==================== 请求 ====================
+
+    def _pack_batches(self, texts: Sequence[str]) -> List[List[str]]:
+        """按数组元素数和总字符数上限，将文本打包成多个请求。"""
+        batches: List[List[str]] = []
+        current: List[str] = []
+        current_chars = 0
+        for text in texts:
+            if current and (
+                len(current) >= self.BATCH_MAX_ITEMS
+                or current_chars + len(text) > self.BATCH_MAX_CHARS
+            ):
+                batches.append(current)
+                current, current_chars = [], 0
+            current.append(text)
+            current_chars += len(text)
+        if current:
+            batches.append(current)
+        return batches
+
+    async def _request_batch(self, texts: List[str], target_lang: str, source_lang: str) -> List[str]:
+        """发送一次数组翻译请求（在后台事件循环中执行）。
+
+        Raises:
+            TranslateError: 请求失败
+        """
+        params = {
+            "from": source_lang,
+            "to": target_lang,
+            "api-version": "3.0",
+            "includeSentenceLength": "true",
+        }
+        post_data = [{"Text": text} for text in texts]
+        refreshed = False
+        attempt = 0
+
+        self._ensure_async_state()
+        async with self._semaphore:
+            while True:
+                auth_token = await self._get_auth_token(force_refresh=refreshed)
+                if not auth_token:
+                    raise TranslateError(401, "无法获取认证令牌")
+
+                headers = {
+                    "accept": "*/*",
+                    "accept-language": "zh-CN,zh;q=0.9,en;q=0.8",
+                    "authorization": f"Bearer {auth_token}",
+                    "content-type": "application/json",
+                    "sec-ch-ua": "\"Microsoft Edge\";v=\"120\", \"Chromium\";v=\"120\"",
+                    "sec-ch-ua-mobile": "?0",
+                    "sec-ch-ua-platform": "\"Windows\"",
+                    "sec-fetch-dest": "empty",
+                    "sec-fetch-mode": "cors",
+                    "sec-fetch-site": "cross-site",
+                    "referer": "https://www.bing.com/",
+                }
+
+                await self._rate_limiter.acquire()
+                try:
+                    resp = await self._get_client().post(
+                        self.translate_url, params=params, json=post_data, headers=headers
+                    )
+                except httpx.TimeoutException:
+                    raise TranslateError(408, "请求超时")
+
+                # 令牌过期：刷新后重试一次
+                if resp.status_code == 401 and not refreshed:
+                    refreshed = True
+                    continue
+
+                # 请求过于频繁或服务暂时不可用：指数退避后重试
+                if resp.status_code in (429, 503) and attempt < self.MAX_RETRIES:
+                    retry_after = resp.headers.get("retry-after", "")
+                    delay = float(retry_after) if retry_after.isdigit() else 2.0 ** attempt
+                    attempt += 1
+                    logger.warning(f"翻译请求受限({resp.status_code})，{delay:.0f}s 后重试")
+                    await asyncio.sleep(delay)
+                    continue
+                break
+
+        try:
+            data = resp.json()
+        except Exception:
+            logger.error(f"翻译响应解析失败: {resp.text}")
+            raise TranslateError(500, "响应解析失败")
+
+        if isinstance(data, dict) and "error" in data:
+            error_code = str(data["error"].get("code", ""))
+            msg = ERROR_CODES.get(error_code, f"未知错误: {error_code}")
+            raise TranslateError(int(error_code) if error_code.isdigit() else 500, msg)
+
+        try:
+            return [item["translations"][0]["text"] for item in data]
+        except (KeyError, IndexError, TypeError):
+            logger.error(f"翻译响应格式异常: {resp.text[:200]}")
+            raise TranslateError(500, "响应格式异常")
+
+    async def _translate_texts(
+        self,
+        texts: List[str],
+        target_lang: str,
+        source_lang: str,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+    ) -> Tuple[Dict[str, str], Optional[TranslateError]]:
+        """翻译一组互不相同的非空文本（在后台事件循环中执行）。
+
+        先查翻译记忆库，其余文本打包后并发请求，成功的结果写回记忆库。
+
+        Returns:
+            (原文 → 译文, 第一个失败请求的错误)
+        """
+        total = len(texts)
+        translations: Dict[str, str] = {}
+        if self.memory is not None:
+            try:
+                translations.update(self.memory.lookup(texts, source_lang, target_lang))
+            except Exception as ex:
+                logger.warning(f"查询翻译记忆库失败: {ex}")
+
+        done = len(translations)
+        if progress_callback and done:
+            progress_callback(done, total)
+
+        pending = [text for text in texts if text not in translations]
+        if not pending:
+            return translations, None
+
+        first_error: Optional[TranslateError] = None
+
+        async def run_batch(batch: List[str]) -> None:
+            nonlocal done, first_error
+            try:
+                results = await self._request_batch(batch, target_lang, source_lang)
+            except TranslateError as ex:
+                logger.error(f"翻译失败: {ex.message}")
+                first_error = first_error or ex
+                results = None
+            except Exception as ex:
+                logger.error(f"翻译异常: {ex}")
+                first_error = first_error or TranslateError(500, str(ex))
+                results = None
+
+            if results is not None:
+                batch_result = dict(zip(batch, results))
+                translations.update(batch_result)
+                if self.memory is not None:
+                    try:
+                        self.memory.store(batch_result, source_lang, target_lang)
+                    except Exception as ex:
+                        logger.warning(f"写入翻译记忆库失败: {ex}")
+
+            done += len(batch)
+            if progress_callback:
+                progress_callback(done, total)
+
+        await asyncio.gather(*(run_batch(batch) for batch in self._pack_batches(pending)))
+        return translations, first_error
+
+    # ==================== 公共接口 ====================
+
     async def translate(
         self,
         text: str,
@@ -105,80 +531,20 @@ class TranslateService:
                 "message": "success",
                 "data": {"text": ""}
             }
-        
-        # 获取认证令牌
-        auth_token = await self._get_auth_token()
-        if not auth_token:
+
+        translations, error = await self._run(self._translate_texts([text], target_lang, source_lang))
+        if text in translations:
             return {
-                "code": 401,
-                "message": "无法获取认证令牌",
-                "data": {"text": text}
+                "code": 200,
+                "message": "success",
+                "data": {"text": translations[text]}
             }
-        
-        url = f"https://api-edge.cognitive.microsofttranslator.com/translate?from={source_lang}&to={target_lang}&api-version=3.0&includeSentenceLength=true"
-        
-        post_data = [{"Text": text}]
-        
-        headers = {
-            "accept": "*/*",
-            "accept-language": "zh-CN,zh;q=0.9,en;q=0.8",
-            "authorization": f"Bearer {auth_token}",
-            "content-type": "application/json",
-            "sec-ch-ua": "\"Microsoft Edge\";v=\"120\", \"Chromium\";v=\"120\"",
-            "sec-ch-ua-mobile": "?0",
-            "sec-ch-ua-platform": "\"Windows\"",
-            "sec-fetch-dest": "empty",
-            "sec-fetch-mode": "cors",
-            "sec-fetch-site": "cross-site",
-            "referer": "https://www.bing.com/",
+        return {
+            "code": error.code if error else 500,
+            "message": error.message if error else "翻译失败",
+            "data": {"text": text}
         }
-        
-        try:
-            async with httpx.AsyncClient(timeout=30) as client:
-                resp = await client.post(url, json=post_data, headers=headers)
-                
-                try:
-                    data = resp.json()
-                except:
-                    logger.error(f"翻译响应解析失败: {resp.text}")
-                    return {
-                        "code": 500,
-                        "message": "响应解析失败",
-                        "data": {"text": text}
-                    }
-                
-                if isinstance(data, dict) and "error" in data:
-                    error_code = str(data["error"].get("code", ""))
-                    msg = ERROR_CODES.get(error_code, f"未知错误: {error_code}")
-                    logger.error(f"翻译失败: {msg}")
-                    return {
-                        "code": int(error_code) if error_code.isdigit() else 500,
-                        "message": msg,
-                        "data": {"text": text}
-                    }
-                else:
-                    translated_text = data[0]["translations"][0]["text"]
-                    return {
-                        "code": 200,
-                        "message": "success",
-                        "data": {"text": translated_text}
-                    }
-        
-        except httpx.TimeoutException:
-            logger.error("翻译请求超时")
-            return {
-                "code": 408,
-                "message": "请求超时",
-                "data": {"text": text}
-            }
-        except Exception as ex:
-            logger.error(f"翻译异常: {ex}")
-            return {
-                "code": 500,
-                "message": str(ex),
-                "data": {"text": text}
-            }
-    
+
     async def translate_batch(
         self,
         texts: list,
@@ -187,31 +553,43 @@ class TranslateService:
         progress_callback=None,
     ) -> list:
         """批量翻译文本（异步）。
+
+        相同的文本只翻译一次；多条文本打包成数组请求并发发送；
+        已在翻译记忆库中的文本不再请求。翻译失败的条目保留原文。
         
         Args:
             texts: 要翻译的文本列表
             target_lang: 目标语言代码
             source_lang: 源语言代码
-            progress_callback: 进度回调函数 (current, total)
+            progress_callback: 进度回调函数 (current, total)，按条目计数，在服务的后台线程中调用
         
         Returns:
-            翻译结果列表
+            翻译结果列表（与输入一一对应）
         """
-        results = []
         total = len(texts)
-        
-        for i, text in enumerate(texts):
-            result = await self.translate(text, target_lang, source_lang)
-            results.append(result["data"]["text"])
-            
+        non_blank = [text for text in texts if text and text.strip()]
+        unique = list(dict.fromkeys(non_blank))
+        # 空白条目直接计为完成
+        blank_count = total - len(non_blank)
+
+        def on_progress(done_unique: int, unique_total: int) -> None:
             if progress_callback:
-                progress_callback(i + 1, total)
-            
-            # 添加小延迟避免请求过于频繁
-            if i < total - 1:
-                await asyncio.sleep(0.05)
-        
-        return results
+                # 按去重前的条目数换算进度
+                done = blank_count + round(len(non_blank) * done_unique / unique_total)
+                progress_callback(done, total)
+
+        translations: Dict[str, str] = {}
+        if unique:
+            translations, _ = await self._run(
+                self._translate_texts(unique, target_lang, source_lang, on_progress)
+            )
+        elif progress_callback and total:
+            progress_callback(total, total)
+
+        return [
+            translations.get(text, text) if text and text.strip() else ""
+            for text in texts
+        ]
     
     @staticmethod
     def get_supported_languages() -> Dict[str, str]:
@@ -4,9 +4,11 @@
 使用 Silero VAD 检测音频中的语音段落，用于智能分片。
 """
 
+import math
 import os
+from collections import deque
 from pathlib import Path
-from typing import Optional, Callable, List, Tuple, TYPE_CHECKING, Any
+from typing import Optional, Callable, Deque, List, Tuple, TYPE_CHECKING, Any
 import numpy as np
 
 from utils import logger
@@ -244,11 +246,13 @@ class VADService:
         audio_duration = total_samples / self.sample_rate
 
         # 仅供 VAD 使用的音频（确保 float32，且当幅度>1时归一化到 [-1, 1]）
+        # 归一化只记录缩放系数，在送入 VAD 的每个窗口上应用，不复制整段音频
         audio_vad = audio.astype(np.float32, copy=False)
+        scale = 1.0
         try:
-            peak = float(np.max(np.abs(audio_vad))) if audio_vad.size else 0.0
+            peak = self._peak(audio_vad)
             if peak > 1.0:
-                audio_vad = audio_vad / peak
+                scale = 1.0 / peak
                 logger.info(f"VAD 输入归一化: peak {peak:.6f} -> 1.000000")
         except Exception:
             pass
@@ -278,49 +282,25 @@ class VADService:
                 if callable(pop_attr):
                     pop_attr()
 
-            def _segment_samples(seg):
-                samples_attr = getattr(seg, "samples", [])
-                return samples_attr() if callable(samples_attr) else samples_attr
-
             vad_buffer_samples = int(vad_buffer_seconds * self.sample_rate)
 
             def _drain_segments(total_accepted_samples: int) -> None:
-                buffer_start = max(0, total_accepted_samples - vad_buffer_samples)
                 while not _vad_is_empty():
                     seg = _vad_front()
                     _vad_pop()
 
-                    samples = _segment_samples(seg)
-                    seg_start = getattr(seg, "start", 0)
-                    try:
-                        seg_start_i = int(seg_start)
-                    except Exception:
-                        seg_start_i = 0
-
-                    cand_global = seg_start_i
-                    cand_relative = buffer_start + seg_start_i
-
-                    def _is_valid(start_sample: int) -> bool:
-                        end_sample = start_sample + len(samples)
-                        return 0 <= start_sample <= end_sample <= (total_accepted_samples + window_samples)
-
-                    if _is_valid(cand_global):
-                        start_sample = cand_global
-                    elif _is_valid(cand_relative):
-                        start_sample = cand_relative
-                    else:
-                        start_sample = cand_global
-
-                    end_sample = start_sample + len(samples)
+                    start_sample, end_sample = self._segment_span(
+                        seg, total_accepted_samples, vad_buffer_samples
+                    )
                     segments_local.append((start_sample / self.sample_rate, end_sample / self.sample_rate))
 
             for i in range(0, total_samples, window_samples):
                 end_idx = min(i + window_samples, total_samples)
                 chunk = audio_vad[i:end_idx]
+                if scale != 1.0:
+                    chunk = chunk * np.float32(scale)
                 if len(chunk) < window_samples:
                     chunk = np.pad(chunk, (0, window_samples - len(chunk)), mode='constant')
-                if chunk.dtype != np.float32:
-                    chunk = chunk.astype(np.float32, copy=False)
 
                 vad_inst.accept_waveform(chunk)
                 _drain_segments(total_accepted_samples=end_idx)
@@ -380,6 +360,7 @@ class VADService:
                 sample_rate=self.sample_rate,
                 min_silence_duration=self.min_silence_duration,
                 min_speech_duration=self.min_speech_duration,
+                scale=scale,
             )
             # 对兜底结果也做规范化
             for s, e in fallback_segs:
@@ -399,8 +380,8 @@ class VADService:
         else:
             # 辅助诊断：音频能量过低时 VAD 可能全空
             try:
-                rms = float(np.sqrt(np.mean(audio_vad.astype(np.float32) ** 2)))
-                peak = float(np.max(np.abs(audio_vad.astype(np.float32))))
+                rms = scale * float(np.sqrt(np.dot(audio_vad, audio_vad) / max(1, audio_vad.size)))
+                peak = scale * self._peak(audio_vad)
                 logger.warning(f"VAD 无片段：音频能量 rms={rms:.6f}, peak={peak:.6f}")
             except Exception:
                 pass
@@ -412,6 +393,119 @@ class VADService:
         
         return segments
 
+    def _segment_span(
+        self,
+        seg: Any,
+        total_accepted_samples: int,
+        vad_buffer_samples: int
+    ) -> Tuple[int, int]:
+        """计算 VAD 输出片段的全局采样点范围。
+        
+        segment.start 可能是全局索引，也可能是缓冲区内的相对索引，
+        取落在已接收音频范围内的那一种解释。
+        
+        Args:
+            seg: sherpa-onnx 输出的语音片段
+            total_accepted_samples: 已送入 VAD 的采样点数
+            vad_buffer_samples: VAD 缓冲区长度（采样点）
+            
+        Returns:
+            (起始采样点, 结束采样点)
+        """
+        samples_attr = getattr(seg, "samples", [])
+        samples = samples_attr() if callable(samples_attr) else samples_attr
+        try:
+            seg_start = int(getattr(seg, "start", 0))
+        except Exception:
+            seg_start = 0
+        
+        def _is_valid(start_sample: int) -> bool:
+            end_sample = start_sample + len(samples)
+            return 0 <= start_sample <= end_sample <= (total_accepted_samples + self.window_size)
+        
+        start_sample = seg_start
+        if not _is_valid(seg_start):
+            relative = max(0, total_accepted_samples - vad_buffer_samples) + seg_start
+            if _is_valid(relative):
+                start_sample = relative
+        return start_sample, start_sample + len(samples)
+    
+    def create_stream_segmenter(
+        self,
+        max_segment_duration: float = 28.0,
+        min_gap: float = 0.5,
+        min_segment_duration: float = 1.0,
+        merge_gap: float = 0.6,
+        padding: float = 0.3
+    ) -> '_StreamingSegmenter':
+        """创建流式分片器，用于边解码边检测语音。
+        
+        合并规则与 merge_short_segments + 识别服务的二次合并一致，
+        但片段在确定不会再与后续语音合并后立即输出。
+        
+        Args:
+            max_segment_duration: 最大片段时长（秒）
+            min_gap: 小于此间隔的相邻片段直接合并（秒）
+            min_segment_duration: 短于此时长的片段在间隔不超过 merge_gap 时合并（秒）
+            merge_gap: 短片段的合并间隔（秒）
+            padding: 输出音频块的前后填充（秒）
+            
+        Returns:
+            流式分片器
+        """
+        if self.vad is None:
+            raise RuntimeError("VAD 模型未加载，请先调用 load_model()")
+        return _StreamingSegmenter(
+            self,
+            max_segment_duration=max_segment_duration,
+            min_gap=min_gap,
+            min_segment_duration=min_segment_duration,
+            merge_gap=merge_gap,
+            padding=padding,
+        )
+    
+    @staticmethod
+    def _peak(audio: np.ndarray) -> float:
+        """峰值绝对幅度（不分配与音频等长的临时数组）。"""
+        if audio.size == 0:
+            return 0.0
+        return float(max(audio.max(), -audio.min()))
+    
+    @staticmethod
+    def _frame_rms(audio: np.ndarray, frame: int, hop: int) -> np.ndarray:
+        """计算每帧 RMS。
+        
+        先在音频的分块视图上求每个长度为 gcd(frame, hop) 的小块的平方和，
+        再用小块能量的累积和一次得到所有帧的能量，不复制音频；
+        末尾不足一帧时按补零计算。
+        
+        Args:
+            audio: 音频数据
+            frame: 帧长（采样点）
+            hop: 帧移（采样点）
+            
+        Returns:
+            每帧的 RMS (n_frames,)
+        """
+        unit = math.gcd(frame, hop)
+        full_units = len(audio) // unit
+        n_units = -(-len(audio) // unit)
+        
+        # 小块平方和（float64 累加，避免长音频上的精度损失）
+        unit_energy = np.zeros(n_units + 1, dtype=np.float64)
+        blocks = audio[:full_units * unit].reshape(full_units, unit)
+        unit_energy[1:full_units + 1] = np.einsum('ij,ij->i', blocks, blocks, dtype=np.float64)
+        if n_units > full_units:
+            tail = audio[full_units * unit:].astype(np.float64)
+            unit_energy[-1] = np.dot(tail, tail)
+        cumsum = np.cumsum(unit_energy, out=unit_energy)
+        
+        n_frames = 1 + max(0, (len(audio) - frame) // hop)
+        starts = np.arange(n_frames) * (hop // unit)
+        ends = np.minimum(starts + frame // unit, n_units)
+        energy = np.maximum(cumsum[ends] - cumsum[starts], 0.0)
+        return np.sqrt(energy / frame).astype(np.float32)
+    
     def _fallback_energy_vad(
         self,
         audio: np.ndarray,
@@ -421,10 +515,15 @@ class VADService:
         frame_ms: float = 20.0,
         hop_ms: float = 10.0,
         padding: float = 0.08,
+        scale: float = 1.0,
     ) -> List[Tuple[float, float]]:
         """能量型 VAD 兜底实现（不依赖 sherpa-onnx）。
 
         设计目标：当 Silero VAD 失效/返回空时，保证至少能做出“还不错”的静音切分。
+        帧能量、语音段边界和静音合并均为向量化计算。
+
+        Args:
+            scale: 音频幅度缩放系数（归一化用，作用于帧 RMS）
         """
         if audio is None or audio.size == 0:
             return []
@@ -434,18 +533,12 @@ class VADService:
         hop = max(1, int(sample_rate * hop_ms / 1000.0))
 
         # 计算每帧 RMS
-        n_frames = 1 + max(0, (len(audio) - frame) // hop)
-        rms = np.empty(n_frames, dtype=np.float32)
-        for i in range(n_frames):
-            start = i * hop
-            seg = audio[start:start + frame]
-            if seg.size < frame:
-                seg = np.pad(seg, (0, frame - seg.size), mode="constant")
-            rms[i] = np.sqrt(np.mean(seg * seg, dtype=np.float32))
+        rms = self._frame_rms(audio, frame, hop)
+        if scale != 1.0:
+            rms *= np.float32(scale)
 
         # 动态阈值：用分位数估计噪声底和语音上界
-        noise = float(np.percentile(rms, 20))
-        hi = float(np.percentile(rms, 95))
+        noise, hi = (float(v) for v in np.percentile(rms, [20, 95]))
         # 若几乎全静音，直接返回空
         if hi < 1e-4:
             return []
@@ -454,47 +547,31 @@ class VADService:
 
         voiced = rms >= thr
 
-        # 将 voiced 帧合并成时间段
-        segments: List[Tuple[float, float]] = []
-        in_seg = False
-        seg_start = 0.0
-        for i, v in enumerate(voiced):
-            t = (i * hop) / sample_rate
-            if v and not in_seg:
-                in_seg = True
-                seg_start = t
-            elif not v and in_seg:
-                in_seg = False
-                seg_end = t
-                segments.append((seg_start, seg_end))
-        if in_seg:
-            segments.append((seg_start, len(audio) / sample_rate))
-
-        if not segments:
+        # 将 voiced 帧合并成时间段：前后补 False 后差分，+1 为语音开始，-1 为语音结束
+        edges = np.diff(np.concatenate(([False], voiced, [False])).astype(np.int8))
+        start_frames = np.flatnonzero(edges == 1)
+        end_frames = np.flatnonzero(edges == -1)
+        if start_frames.size == 0:
             return []
 
-        # 合并短静音间隔
-        merged: List[Tuple[float, float]] = []
-        cur_s, cur_e = segments[0]
-        for s, e in segments[1:]:
-            gap = s - cur_e
-            if gap < min_silence_duration:
-                cur_e = e
-            else:
-                merged.append((cur_s, cur_e))
-                cur_s, cur_e = s, e
-        merged.append((cur_s, cur_e))
+        audio_dur = len(audio) / sample_rate
+        starts = start_frames * hop / sample_rate
+        ends = end_frames * hop / sample_rate
+        # 持续到最后一帧的语音段延伸到音频末尾
+        if end_frames[-1] == len(voiced):
+            ends[-1] = audio_dur
+
+        # 合并短静音间隔：间隔不小于 min_silence_duration 处断开
+        breaks = np.flatnonzero(starts[1:] - ends[:-1] >= min_silence_duration) + 1
+        merged_starts = starts[np.concatenate(([0], breaks))]
+        merged_ends = ends[np.concatenate((breaks - 1, [len(ends) - 1]))]
 
         # 过滤过短语音段，并加 padding
-        out: List[Tuple[float, float]] = []
-        audio_dur = len(audio) / sample_rate
-        for s, e in merged:
-            if e - s < min_speech_duration:
-                continue
-            s2 = max(0.0, s - padding)
-            e2 = min(audio_dur, e + padding)
-            if e2 > s2:
-                out.append((s2, e2))
+        keep = merged_ends - merged_starts >= min_speech_duration
+        out_starts = np.maximum(0.0, merged_starts[keep] - padding)
+        out_ends = np.minimum(audio_dur, merged_ends[keep] + padding)
+        valid = out_ends > out_starts
+        out = [(float(s), float(e)) for s, e in zip(out_starts[valid], out_ends[valid])]
 
         logger.info(
             f"能量型 VAD 兜底：thr={thr:.4f}, segments={len(out)} "
@@ -632,3 +709,196 @@ class VADService:
         except Exception:
             pass
 
+
+class _StreamingSegmenter:
+    """流式 VAD 分片状态机。
+    
+    按块接收 PCM，增量送入 VAD，把检测到的语音段合并为不超过最大时长的片段，
+    在片段确定后立即输出带填充的音频块。只保留尚未输出的片段和 VAD 可能回溯的
+    最近一段音频，内存与音频时长无关。
+    
+    所有位置均为从音频开头计的采样点。
+    """
+    
+    def __init__(
+        self,
+        service: VADService,
+        max_segment_duration: float,
+        min_gap: float,
+        min_segment_duration: float,
+        merge_gap: float,
+        padding: float
+    ) -> None:
+        """初始化流式分片状态。
+        
+        Args:
+            service: 已加载模型的 VAD 服务
+            其余参数见 VADService.create_stream_segmenter
+        """
+        self.service = service
+        sr = service.sample_rate
+        self.sample_rate: int = sr
+        self.max_samples: int = int(max_segment_duration * sr)
+        self.min_gap: int = int(min_gap * sr)
+        self.min_samples: int = int(min_segment_duration * sr)
+        self.merge_gap: int = int(merge_gap * sr)
+        self.padding: int = int(padding * sr)
+        # VAD 输出的片段最多回溯一个缓冲区长度
+        self.vad_buffer_samples: int = int(service.buffer_size_in_seconds * sr)
+        
+        # 使用独立的 VAD 实例，不影响整段检测
+        self.vad = service.vad
+        if service._vad_config is not None:
+            try:
+                import sherpa_onnx
+                self.vad = sherpa_onnx.VoiceActivityDetector(
+                    service._vad_config,
+                    buffer_size_in_seconds=service.buffer_size_in_seconds,
+                )
+            except Exception:
+                self.vad = service.vad
+        reset_attr = getattr(self.vad, "reset", None)
+        if callable(reset_attr):
+            reset_attr()
+        
+        # 最近的音频块 (起始位置, 数据)
+        self.blocks: Deque[Tuple[int, np.ndarray]] = deque()
+        self.n_samples: int = 0  # 已接收的样本数
+        self.peak: float = 1.0  # 已接收音频的峰值（用于 VAD 输入归一化）
+        
+        self.group: Optional[Tuple[int, int]] = None  # 尚未确定的合并片段
+        self.ready: Deque[Tuple[int, int]] = deque()  # 已确定、等待填充音频的片段
+        self.segment_count: int = 0  # VAD 检测到的语音段数
+    
+    def push(self, audio: np.ndarray) -> List[Tuple[np.ndarray, float, float]]:
+        """接收一块音频。
+        
+        Args:
+            audio: 单声道 16kHz float32 音频块
+            
+        Returns:
+            已确定的音频块列表，每个元素为 (音频数据, 开始时间, 结束时间)
+        """
+        if audio.size == 0:
+            return []
+        audio = audio.astype(np.float32, copy=False)
+        self.blocks.append((self.n_samples, audio))
+        self.n_samples += len(audio)
+        
+        # 仅 VAD 输入归一化到 [-1, 1]，送入识别的仍是原始音频
+        peak = float(np.max(np.abs(audio)))
+        if peak > self.peak:
+            self.peak = peak
+        self.vad.accept_waveform(audio / self.peak if self.peak > 1.0 else audio)
+        self._drain()
+        
+        # 长时间没有语音时，当前片段不会再与后续语音合并
+        if self.group is not None and not self._is_speech():
+            if self.n_samples - self.group[1] > max(self.min_gap, self.merge_gap):
+                self._close_group()
+        
+        return self._emit(final=False)
+    
+    def finish(self) -> List[Tuple[np.ndarray, float, float]]:
+        """结束输入，输出剩余的音频块。"""
+        flush_attr = getattr(self.vad, "flush", None)
+        if callable(flush_attr):
+            flush_attr()
+        self._drain()
+        self._close_group()
+        return self._emit(final=True)
+    
+    def _is_speech(self) -> bool:
+        """VAD 当前是否处于语音中（无法判断时视为是）。"""
+        attr = getattr(self.vad, "is_speech_detected", None)
+        if attr is None:
+            return True
+        return bool(attr() if callable(attr) else attr)
+    
+    def _drain(self) -> None:
+        """取出 VAD 已输出的语音段并合并。"""
+        vad = self.vad
+        while True:
+            empty_attr = getattr(vad, "empty")
+            if empty_attr() if callable(empty_attr) else empty_attr:
+                break
+            front_attr = getattr(vad, "front")
+            seg = front_attr() if callable(front_attr) else front_attr
+            vad.pop()
+            
+            start, end = self.service._segment_span(seg, self.n_samples, self.vad_buffer_samples)
+            end = min(end, self.n_samples)
+            if end > start:
+                self.segment_count += 1
+                self._add(start, end)
+    
+    def _add(self, start: int, end: int) -> None:
+        """把一个语音段并入当前片段，不能合并时输出当前片段。"""
+        if self.group is None:
+            self.group = (start, end)
+            return
+        group_start, group_end = self.group
+        if start < group_end:
+            # 乱序或重叠的语音段并入当前片段
+            self.group = (min(group_start, start), max(group_end, end))
+            return
+        gap = start - group_end
+        short = group_end - group_start < self.min_samples or end - start < self.min_samples
+        if end - group_start <= self.max_samples and (
+            gap < self.min_gap or (short and gap <= self.merge_gap)
+        ):
+            self.group = (group_start, end)
+        else:
+            self._close_group()
+            self.group = (start, end)
+    
+    def _close_group(self) -> None:
+        """确定当前片段（超长片段按最大时长切分）。"""
+        if self.group is None:
+            return
+        start, end = self.group
+        self.group = None
+        while end - start > self.max_samples:
+            self.ready.append((start, start + self.max_samples))
+            start += self.max_samples
+        self.ready.append((start, end))
+    
+    def _emit(self, final: bool) -> List[Tuple[np.ndarray, float, float]]:
+        """输出填充所需音频已到达的片段，并丢弃不再需要的音频。"""
+        chunks = []
+        while self.ready:
+            start, end = self.ready[0]
+            padded_start = max(0, start - self.padding)
+            padded_end = min(self.n_samples, end + self.padding)
+            if not final and end + self.padding > self.n_samples:
+                break
+            self.ready.popleft()
+            chunks.append((
+                self._slice(padded_start, padded_end),
+                padded_start / self.sample_rate,
+                padded_end / self.sample_rate,
+            ))
+        
+        # 保留：待输出片段、当前片段以及 VAD 可能回溯的音频
+        keep_from = self.n_samples - self.vad_buffer_samples - self.service.window_size
+        if self.ready:
+            keep_from = min(keep_from, self.ready[0][0] - self.padding)
+        if self.group is not None:
+            keep_from = min(keep_from, self.group[0] - self.padding)
+        while self.blocks and self.blocks[0][0] + len(self.blocks[0][1]) <= keep_from:
+            self.blocks.popleft()
+        return chunks
+    
+    def _slice(self, start: int, end: int) -> np.ndarray:
+        """从保留的音频块中取出 [start, end) 的样本。"""
+        parts = []
+        for block_start, block in self.blocks:
+            block_end = block_start + len(block)
+            if block_end <= start:
+                continue
+            if block_start >= end:
+                break
+            parts.append(block[max(0, start - block_start):min(len(block), end - block_start)])
+        if not parts:
+            return np.zeros(0, dtype=np.float32)
+        return parts[0].copy() if len(parts) == 1 else np.concatenate(parts)
@@ -25,6 +25,19 @@ class VocalSeparationService:
     使用 UVR MDX-Net ONNX 模型进行音频源分离。
     """
     
+    # STFT/ISTFT 每批处理的帧数（限制临时内存）
+    STFT_BLOCK_FRAMES: int = 64
+    # 重采样滤波器参数：sinc 单侧过零点数、Kaiser 窗 beta、每块输出样本数
+    RESAMPLE_ZERO_CROSSINGS: int = 16
+    RESAMPLE_KAISER_BETA: float = 8.0
+    RESAMPLE_BLOCK_SIZE: int = 32768
+    # 默认每次推理合并的频谱块数
+    DEFAULT_BATCH_SIZE: int = 4
+    # 超过此时长（秒）自动使用流式分离
+    STREAMING_MIN_DURATION: float = 600.0
+    # 流式模式每次从 ffmpeg 读取的样本数（约 10 秒）
+    STREAMING_READ_SAMPLES: int = 441000
+    
     def __init__(
         self,
         model_dir: Optional[Path] = None,
@@ -50,6 +63,19 @@ class VocalSeparationService:
         self.model_channels: int = 0
         self.model_freq_bins: int = 0
         self.invert_output: bool = False  # 是否反转输出（模型输出伴奏而非人声）
+        self.input_name: Optional[str] = None
+        self.output_name: Optional[str] = None
+        self.model_batch_dim: Optional[int] = None  # 模型固定的 batch 维度，None 表示动态
+        
+        # 每次推理合并的块数（可在设置中调整）
+        self.batch_size: int = self.DEFAULT_BATCH_SIZE
+        if self.config_service:
+            self.batch_size = max(1, int(self.config_service.get_config_value(
+                "vocal_separation_batch_size", self.DEFAULT_BATCH_SIZE
+            )))
+        
+        # 重叠相加权重缓存，键为 (有效帧数, 淡入, 淡出, 淡入淡出长度)
+        self._chunk_window_cache: dict = {}
         
         # 模型参数
         self.sample_rate: int = 44100  # MDX-Net 标准采样率
@@ -194,8 +220,14 @@ class VocalSeparationService:
         from utils import logger
         logger.info(f"人声分离模型已加载: {model_path.name}, 执行提供者: {actual_providers[0]}")
         
-        # 从模型输入获取参数
-        input_shape = self.session.get_inputs()[0].shape
+        # 从模型输入获取参数（缓存输入输出名称，避免每块推理都查询）
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.output_name = self.session.get_outputs()[0].name
+        input_shape = model_input.shape
+        # batch 维度为整数时表示模型固定了批大小，符号维度表示可变
+        self.model_batch_dim = input_shape[0] if isinstance(input_shape[0], int) else None
+        self._chunk_window_cache.clear()
         # 输入格式: (batch, channels, freq_bins, time_frames)
         # channels: 通常是2(L/R)或4(实部/虚部分开)
         # freq_bins: n_fft // 2 + 1
@@ -259,6 +291,41 @@ class VocalSeparationService:
         except Exception as e:
             raise RuntimeError(f"加载音频时出错: {type(e).__name__}: {str(e)}")
     
+    @staticmethod
+    def _build_encoder_output(
+        stream,
+        output_path: Path,
+        output_format: str,
+        mp3_bitrate: str,
+        ogg_quality: Union[int, str],
+        sample_rate: int
+    ):
+        """根据输出格式设置编码参数。
+        
+        Args:
+            stream: ffmpeg-python 输入流
+            output_path: 输出文件路径
+            output_format: 输出格式 ('wav', 'flac', 'mp3', 'ogg')
+            mp3_bitrate: MP3码率
+            ogg_quality: OGG质量 (0-10的整数)
+            sample_rate: 输出采样率
+            
+        Returns:
+            ffmpeg-python 输出流
+        """
+        if output_format == 'wav':
+            return ffmpeg.output(stream, str(output_path), acodec='pcm_s16le', ar=str(sample_rate))
+        elif output_format == 'flac':
+            return ffmpeg.output(stream, str(output_path), acodec='flac', ar=str(sample_rate), compression_level=8)
+        elif output_format == 'mp3':
+            return ffmpeg.output(stream, str(output_path), acodec='libmp3lame', audio_bitrate=mp3_bitrate, ar=str(sample_rate))
+        elif output_format == 'ogg':
+            # OGG Vorbis 使用 q:a 参数设置质量 (0-10, 10最高)
+            return ffmpeg.output(stream, str(output_path), acodec='libvorbis', ar=str(sample_rate), **{'q:a': ogg_quality})
+        else:
+            # 默认使用 WAV
+            return ffmpeg.output(stream, str(output_path), acodec='pcm_s16le', ar=str(sample_rate))
+    
     def _save_audio_ffmpeg(
         self, 
         audio: np.ndarray, 
@@ -302,20 +369,9 @@ class VocalSeparationService:
             
             # 使用 ffmpeg-python 写入音频
             stream = ffmpeg.input('pipe:', format='f32le', acodec='pcm_f32le', ac=2, ar=str(self.sample_rate))
-            
-            # 根据输出格式设置编码参数
-            if output_format == 'wav':
-                stream = ffmpeg.output(stream, str(output_path), acodec='pcm_s16le', ar=str(self.sample_rate))
-            elif output_format == 'flac':
-                stream = ffmpeg.output(stream, str(output_path), acodec='flac', ar=str(self.sample_rate), compression_level=8)
-            elif output_format == 'mp3':
-                stream = ffmpeg.output(stream, str(output_path), acodec='libmp3lame', audio_bitrate=mp3_bitrate, ar=str(self.sample_rate))
-            elif output_format == 'ogg':
-                # OGG Vorbis 使用 q:a 参数设置质量 (0-10, 10最高)
-                stream = ffmpeg.output(stream, str(output_path), acodec='libvorbis', ar=str(self.sample_rate), **{'q:a': ogg_quality})
-            else:
-                # 默认使用 WAV
-                stream = ffmpeg.output(stream, str(output_path), acodec='pcm_s16le', ar=str(self.sample_rate))
+            stream = self._build_encoder_output(
+                stream, output_path, output_format, mp3_bitrate, ogg_quality, self.sample_rate
+            )
             
             ffmpeg.run(stream, cmd=ffmpeg_cmd, input=audio_bytes, overwrite_output=True, capture_stdout=True, capture_stderr=True)
             
@@ -337,7 +393,8 @@ class VocalSeparationService:
         output_format: str = 'wav',
         output_sample_rate: Optional[int] = None,
         mp3_bitrate: str = '320k',
-        ogg_quality: Union[int, str] = 10
+        ogg_quality: Union[int, str] = 10,
+        streaming: Optional[bool] = None
     ) -> Tuple[Path, Path]:
         """分离人声和伴奏。
         
@@ -349,6 +406,8 @@ class VocalSeparationService:
             output_sample_rate: 输出采样率 (None表示使用原始音频采样率)
             mp3_bitrate: MP3码率 ('original' 或 '128k'/'192k'/'256k'/'320k')
             ogg_quality: OGG质量 ('original' 或 0-10的整数)
+            streaming: 是否使用流式模式（内存与时长无关，中间结果暂存到输出目录），
+                None 表示时长超过 STREAMING_MIN_DURATION 时自动启用
             
         Returns:
             (人声文件路径, 伴奏文件路径)
@@ -367,6 +426,21 @@ class VocalSeparationService:
         
         output_dir.mkdir(parents=True, exist_ok=True)
         
+        duration = self._get_audio_duration(audio_path)
+        if streaming is None:
+            streaming = duration is not None and duration >= self.STREAMING_MIN_DURATION
+        if streaming:
+            return self._separate_streaming(
+                audio_path,
+                output_dir,
+                progress_callback=progress_callback,
+                output_format=output_format,
+                output_sample_rate=output_sample_rate,
+                mp3_bitrate=mp3_bitrate,
+                ogg_quality=ogg_quality,
+                duration=duration,
+            )
+        
         # 加载音频
         if progress_callback:
             progress_callback("正在加载音频...", 0.1)
@@ -414,6 +488,246 @@ class VocalSeparationService:
         instrumental_path = output_dir / f"{stem}_instrumental.{output_format}"
         
         # 处理比特率/质量设置
+        final_mp3_bitrate, final_ogg_quality = self._resolve_output_quality(
+            mp3_bitrate, ogg_quality, original_bitrate
+        )
+        
+        # 保存人声
+        self._save_audio_ffmpeg(
+            vocals, 
+            vocals_path, 
+            output_format=output_format,
+            mp3_bitrate=final_mp3_bitrate,
+            ogg_quality=final_ogg_quality
+        )
+        
+        # 保存伴奏
+        self._save_audio_ffmpeg(
+            instrumentals, 
+            instrumental_path, 
+            output_format=output_format,
+            mp3_bitrate=final_mp3_bitrate,
+            ogg_quality=final_ogg_quality
+        )
+        
+        # 恢复原始采样率
+        if original_sr is not None:
+            self.sample_rate = original_sr
+        
+        if progress_callback:
+            progress_callback("完成!", 1.0)
+        
+        return vocals_path, instrumental_path
+    
+    def _separate_streaming(
+        self,
+        audio_path: Path,
+        output_dir: Path,
+        progress_callback: Optional[Callable[[str, float], None]] = None,
+        output_format: str = 'wav',
+        output_sample_rate: Optional[int] = None,
+        mp3_bitrate: str = '320k',
+        ogg_quality: Union[int, str] = 10,
+        duration: Optional[float] = None
+    ) -> Tuple[Path, Path]:
+        """流式分离人声和伴奏。
+        
+        从 ffmpeg 解码管道按块读取 PCM，增量完成 STFT → 模型 → ISTFT，
+        结果边算边写入输出目录中的 float32 临时文件并记录峰值；全部完成后
+        再按块读回，与整段模式相同地做峰值归一化后交给 ffmpeg 编码。
+        峰值内存与音频时长无关，采样率转换交给编码端的 ffmpeg 完成。
+        
+        Args:
+            audio_path: 输入音频文件路径
+            output_dir: 输出目录
+            progress_callback: 进度回调函数 (状态消息, 进度0-1)
+            output_format: 输出格式 ('wav', 'flac', 'mp3', 'ogg')
+            output_sample_rate: 输出采样率 (None表示使用模型采样率)
+            mp3_bitrate: MP3码率 ('original' 或 '128k'/'192k'/'256k'/'320k')
+            ogg_quality: OGG质量 ('original' 或 0-10的整数)
+            duration: 音频时长（秒），用于计算进度
+            
+        Returns:
+            (人声文件路径, 伴奏文件路径)
+        """
+        if not audio_path.exists():
+            raise FileNotFoundError(f"音频文件不存在: {audio_path}")
+        
+        original_bitrate = None
+        if mp3_bitrate == "original" or ogg_quality == "original":
+            original_bitrate = self._get_audio_bitrate(audio_path)
+        final_mp3_bitrate, final_ogg_quality = self._resolve_output_quality(
+            mp3_bitrate, ogg_quality, original_bitrate
+        )
+        target_sample_rate = output_sample_rate if output_sample_rate else self.sample_rate
+        
+        stem = audio_path.stem
+        vocals_path = output_dir / f"{stem}_vocals.{output_format}"
+        instrumental_path = output_dir / f"{stem}_instrumental.{output_format}"
+        
+        self._setup_ffmpeg_env()
+        ffmpeg_cmd = self._get_ffmpeg_cmd()
+        
+        if progress_callback:
+            progress_callback("正在流式分离人声...", 0.1)
+        
+        # 解码管道: 任意输入 -> 44.1kHz 立体声 f32le
+        decoder = (
+            ffmpeg.input(str(audio_path))
+            .output('pipe:', format='f32le', acodec='pcm_f32le', ac=2, ar=str(self.sample_rate))
+            .global_args('-loglevel', 'error', '-nostdin')
+            .run_async(cmd=ffmpeg_cmd, pipe_stdout=True, pipe_stderr=True)
+        )
+        
+        # 分离结果的临时文件（交错的 f32le 立体声）及各自的峰值
+        temp_paths = []
+        peaks = [0.0, 0.0]
+        try:
+            for _ in range(2):
+                fd, temp_path = tempfile.mkstemp(prefix=f".{stem}_", suffix=".f32", dir=output_dir)
+                os.close(fd)
+                temp_paths.append(Path(temp_path))
+            
+            with open(temp_paths[0], 'wb') as vocals_file, open(temp_paths[1], 'wb') as instrumental_file:
+                def write(vocals: np.ndarray, instrumentals: np.ndarray) -> None:
+                    if vocals.shape[1] == 0:
+                        return
+                    for index, (audio, file) in enumerate(
+                        ((vocals, vocals_file), (instrumentals, instrumental_file))
+                    ):
+                        peaks[index] = max(peaks[index], float(np.abs(audio).max()))
+                        file.write(np.ascontiguousarray(audio.T, dtype=np.float32).tobytes())
+                
+                separator = _StreamingSeparator(self)
+                block_bytes = self.STREAMING_READ_SAMPLES * 2 * 4
+                total_samples = duration * self.sample_rate if duration else None
+                
+                while True:
+                    data = decoder.stdout.read(block_bytes)
+                    if not data:
+                        break
+                    # 丢弃不完整的样本帧（理论上只会出现在管道异常时）
+                    usable = len(data) - len(data) % 8
+                    audio = np.frombuffer(data[:usable], np.float32).reshape(-1, 2).T
+                    write(*separator.push(audio))
+                    
+                    if progress_callback and total_samples:
+                        progress = 0.1 + 0.75 * min(1.0, separator.n_samples / total_samples)
+                        progress_callback(f"流式处理中... {separator.n_samples / self.sample_rate:.0f} 秒", progress)
+                
+                decoder.wait()
+                if separator.n_samples == 0:
+                    error_msg = decoder.stderr.read().decode('utf-8', errors='ignore')
+                    raise RuntimeError(f"FFmpeg 未返回音频数据: {error_msg or '未知错误'}")
+                
+                write(*separator.finish())
+            
+            if progress_callback:
+                progress_callback("正在保存文件...", 0.85)
+            
+            for temp_path, path, peak in zip(temp_paths, (vocals_path, instrumental_path), peaks):
+                self._encode_raw_audio(
+                    temp_path, path, peak, ffmpeg_cmd, output_format,
+                    final_mp3_bitrate, final_ogg_quality, target_sample_rate
+                )
+        finally:
+            if decoder.poll() is None:
+                decoder.kill()
+            for temp_path in temp_paths:
+                temp_path.unlink(missing_ok=True)
+        
+        if progress_callback:
+            progress_callback("完成!", 1.0)
+        
+        return vocals_path, instrumental_path
+    
+    def _encode_raw_audio(
+        self,
+        raw_path: Path,
+        output_path: Path,
+        peak: float,
+        ffmpeg_cmd: str,
+        output_format: str,
+        mp3_bitrate: str,
+        ogg_quality: Union[int, str],
+        target_sample_rate: int
+    ) -> None:
+        """按块读取 f32le 临时文件，峰值归一化后编码为目标格式。
+        
+        归一化规则与 _save_audio_ffmpeg 相同：峰值超过 1 时整体除以峰值。
+        
+        Args:
+            raw_path: 交错的 f32le 立体声临时文件
+            output_path: 输出文件路径
+            peak: 临时文件中音频的绝对值峰值
+            ffmpeg_cmd: ffmpeg 命令
+            output_format: 输出格式
+            mp3_bitrate: MP3码率
+            ogg_quality: OGG质量
+            target_sample_rate: 输出采样率
+        """
+        stream = ffmpeg.input('pipe:', format='f32le', acodec='pcm_f32le', ac=2, ar=str(self.sample_rate))
+        stream = self._build_encoder_output(
+            stream, output_path, output_format, mp3_bitrate, ogg_quality, target_sample_rate
+        )
+        encoder = (
+            stream.global_args('-loglevel', 'error')
+            .overwrite_output()
+            .run_async(cmd=ffmpeg_cmd, pipe_stdin=True, pipe_stderr=True)
+        )
+        try:
+            block_bytes = self.STREAMING_READ_SAMPLES * 2 * 4
+            with open(raw_path, 'rb') as raw_file:
+                while True:
+                    data = raw_file.read(block_bytes)
+                    if not data:
+                        break
+                    if peak > 1.0:
+                        data = (np.frombuffer(data, np.float32) / peak).astype(np.float32).tobytes()
+                    encoder.stdin.write(data)
+            encoder.stdin.close()
+            _, err = encoder.communicate()
+        except BaseException:
+            if encoder.poll() is None:
+                encoder.kill()
+            raise
+        
+        if encoder.returncode != 0 or not output_path.exists() or output_path.stat().st_size == 0:
+            error_msg = err.decode('utf-8', errors='ignore') if err else "未知错误"
+            raise RuntimeError(f"FFmpeg 保存音频失败: {error_msg}")
+    
+    def _get_audio_duration(self, audio_path: Path) -> Optional[float]:
+        """获取音频时长。
+        
+        Args:
+            audio_path: 音频文件路径
+            
+        Returns:
+            时长（秒），如果无法获取则返回None
+        """
+        try:
+            self._setup_ffmpeg_env()
+            probe = ffmpeg.probe(str(audio_path))
+            return float(probe['format']['duration'])
+        except Exception:
+            return None
+    
+    @staticmethod
+    def _resolve_output_quality(
+        mp3_bitrate: str,
+        ogg_quality: Union[int, str],
+        original_bitrate: Optional[int]
+    ) -> Tuple[str, Union[int, str]]:
+        """将 'original' 比特率/质量设置转换为具体的编码参数。
+        
+        Args:
+            mp3_bitrate: MP3码率 ('original' 或 '128k'/'192k'/'256k'/'320k')
+            ogg_quality: OGG质量 ('original' 或 0-10的整数)
+            original_bitrate: 原始文件比特率（bps），未知时为 None
+            
+        Returns:
+            (MP3码率, OGG质量)
+        """
         final_mp3_bitrate = mp3_bitrate
         final_ogg_quality = ogg_quality
         
@@ -445,32 +759,7 @@ class VocalSeparationService:
         elif ogg_quality == "original":
             final_ogg_quality = 10  # 默认最高质量
         
-        # 保存人声
-        self._save_audio_ffmpeg(
-            vocals, 
-            vocals_path, 
-            output_format=output_format,
-            mp3_bitrate=final_mp3_bitrate,
-            ogg_quality=final_ogg_quality
-        )
-        
-        # 保存伴奏
-        self._save_audio_ffmpeg(
-            instrumentals, 
-            instrumental_path, 
-            output_format=output_format,
-            mp3_bitrate=final_mp3_bitrate,
-            ogg_quality=final_ogg_quality
-        )
-        
-        # 恢复原始采样率
-        if original_sr is not None:
-            self.sample_rate = original_sr
-        
-        if progress_callback:
-            progress_callback("完成!", 1.0)
-        
-        return vocals_path, instrumental_path
+        return final_mp3_bitrate, final_ogg_quality
     
     def _get_audio_bitrate(self, audio_path: Path) -> Optional[int]:
         """获取音频文件的比特率。
@@ -511,10 +800,11 @@ class VocalSeparationService:
     def _resample_audio(self, audio: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
         """重采样音频到目标采样率。
         
-        使用 sinc 插值进行高质量重采样（基于 FFT 的方法）。
+        使用 Kaiser 窗 sinc 滤波器的多相（polyphase）重采样，
+        按输出块分段计算，工作内存与音频时长无关。
         
         Args:
-            audio: 音频数据 (channels, samples)
+            audio: 音频数据 (channels, samples) 或 (samples,)
             orig_sr: 原始采样率
             target_sr: 目标采样率
             
@@ -524,55 +814,64 @@ class VocalSeparationService:
         if orig_sr == target_sr:
             return audio
         
-        def resample_single_channel(y: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
-            """对单通道音频进行重采样（使用 FFT 方法）。"""
-            # 计算新的采样点数
-            n_samples = int(np.ceil(len(y) * target_sr / orig_sr))
-            
-            # 使用 FFT 进行重采样（频域插值）
-            Y = np.fft.rfft(y)
-            
-            # 计算新的频率bins数量
-            n_fft_new = n_samples if n_samples % 2 == 0 else n_samples + 1
-            n_freq_new = n_fft_new // 2 + 1
-            n_freq_old = len(Y)
-            
-            # 创建新的频谱
-            if target_sr > orig_sr:
-                # 上采样：在频谱末尾补零
-                Y_new = np.zeros(n_freq_new, dtype=Y.dtype)
-                Y_new[:n_freq_old] = Y
-            else:
-                # 下采样：截断高频
-                Y_new = Y[:n_freq_new]
-            
-            # 逆FFT并调整幅度
-            y_new = np.fft.irfft(Y_new, n=n_fft_new)[:n_samples]
-            y_new *= target_sr / orig_sr
-            
-            return y_new
-        
-        if audio.shape[0] == 2:
-            # 立体声，分别处理每个通道
-            resampled_left = resample_single_channel(audio[0], orig_sr, target_sr)
-            resampled_right = resample_single_channel(audio[1], orig_sr, target_sr)
-            return np.stack([resampled_left, resampled_right])
-        else:
-            # 单声道
-            return resample_single_channel(audio, orig_sr, target_sr)
+        from math import gcd
+        
+        g = gcd(orig_sr, target_sr)
+        up = target_sr // g
+        down = orig_sr // g
+        
+        # 设计原型低通滤波器（在 up 倍上采样率下）
+        # 截止频率取两者中较低的奈奎斯特频率
+        max_rate = max(up, down)
+        half_len = self.RESAMPLE_ZERO_CROSSINGS * max_rate
+        t = np.arange(-half_len, half_len + 1, dtype=np.float64)
+        h = np.sinc(t / max_rate) * np.kaiser(len(t), self.RESAMPLE_KAISER_BETA)
+        h *= up / max_rate
+        
+        # 拆分为 up 个相位的子滤波器: phases[p, j] = h[p + j * up]
+        taps = -(-len(h) // up)
+        h = np.pad(h, (0, taps * up - len(h)))
+        phases = h.reshape(taps, up).T[:, ::-1].copy()
+        
+        squeeze = audio.ndim == 1
+        x = np.atleast_2d(audio)
+        n_in = x.shape[1]
+        n_out = int(np.ceil(n_in * up / down))
+        
+        # 输出 n 对应的滤波器中心位于输入位置 (n * down + half_len) / up
+        out = np.empty((x.shape[0], n_out), dtype=np.float64)
+        block = self.RESAMPLE_BLOCK_SIZE
+        for start in range(0, n_out, block):
+            n = np.arange(start, min(start + block, n_out), dtype=np.int64)
+            pos = n * down + half_len
+            base = pos // up
+            phase = pos % up
+            # 本块用到的输入区间 [lo, hi)，越界部分按零填充（只复制本块的输入）
+            lo = int(base[0]) - taps + 1
+            hi = int(base[-1]) + 1
+            segment = x[:, max(lo, 0):max(min(hi, n_in), 0)]
+            segment = np.pad(segment, ((0, 0), (max(-lo, 0), (hi - lo) - segment.shape[1] - max(-lo, 0))))
+            windows = np.lib.stride_tricks.sliding_window_view(segment, taps, axis=1)
+            # 窗口 [base - taps + 1, base] 从本块输入的 base - taps + 1 - lo 处开始
+            frames = windows[:, base - taps + 1 - lo]
+            out[:, start:start + len(n)] = np.einsum('cnj,nj->cn', frames, phases[phase])
+        
+        return out[0] if squeeze else out
     
     def _stft(self, y: np.ndarray, n_fft: int, hop_length: int, window: str = 'hann', center: bool = True) -> np.ndarray:
-        """手动实现 STFT（短时傅里叶变换）。
+        """STFT（短时傅里叶变换），分块批量计算。
+        
+        通过 stride 视图取帧（不复制），每个块对二维帧矩阵调用一次 rfft。
         
         Args:
-            y: 输入信号
+            y: 输入信号 (samples,) 或 (channels, samples)
             n_fft: FFT 大小
             hop_length: 帧移
             window: 窗口类型
             center: 是否中心填充
             
         Returns:
-            复数频谱 (n_fft//2 + 1, n_frames)
+            复数频谱 (n_fft//2 + 1, n_frames)，多通道输入时为 (channels, n_fft//2 + 1, n_frames)
         """
         # 创建窗口
         if window == 'hann':
@@ -583,25 +882,48 @@ class VocalSeparationService:
         # Center padding（镜像填充）
         if center:
             pad_len = n_fft // 2
-            y = np.pad(y, (pad_len, pad_len), mode='reflect')
+            pad_width = [(0, 0)] * (y.ndim - 1) + [(pad_len, pad_len)]
+            y = np.pad(y, pad_width, mode='reflect')
         
         # 计算帧数
-        n_frames = 1 + (len(y) - n_fft) // hop_length
+        n_frames = 1 + (y.shape[-1] - n_fft) // hop_length
         
-        # 初始化频谱
-        spec = np.zeros((n_fft // 2 + 1, n_frames), dtype=np.complex64)
+        # 帧视图 (..., n_frames, n_fft)，不复制数据
+        frames = np.lib.stride_tricks.sliding_window_view(y, n_fft, axis=-1)[..., ::hop_length, :][..., :n_frames, :]
         
-        # 对每一帧进行 FFT
-        for i in range(n_frames):
-            start = i * hop_length
-            frame = y[start:start + n_fft]
-            
-            # 应用窗口并进行 FFT
-            windowed = frame * win
-            spec[:, i] = np.fft.rfft(windowed, n=n_fft)
+        spec = np.empty(y.shape[:-1] + (n_fft // 2 + 1, n_frames), dtype=np.complex64)
+        
+        # 分块限制临时内存（加窗后的帧矩阵和 complex128 结果）
+        block = self.STFT_BLOCK_FRAMES
+        for start in range(0, n_frames, block):
+            end = min(start + block, n_frames)
+            block_spec = np.fft.rfft(frames[..., start:end, :] * win, n=n_fft, axis=-1)
+            spec[..., start:end] = np.swapaxes(block_spec, -1, -2)
         
         return spec
     
+    @staticmethod
+    def _overlap_add_rows(y_rows: np.ndarray, frames: np.ndarray, row_start: int) -> None:
+        """将加窗后的帧重叠相加到按 hop 分行的输出矩阵中（原地）。
+        
+        第 i 帧从第 row_start + i 行开始，占据 ceil(n_fft / hop) 行，
+        因此只需按段循环，无需按帧循环。
+        
+        Args:
+            y_rows: 输出矩阵 (..., rows, hop)
+            frames: 加窗后的帧 (..., n_frames, n_fft)
+            row_start: 第一帧所在的行
+        """
+        hop_length = y_rows.shape[-1]
+        n_frames, n_fft = frames.shape[-2:]
+        n_seg = -(-n_fft // hop_length)
+        seg_len = n_seg * hop_length
+        if seg_len != n_fft:
+            frames = np.pad(frames, [(0, 0)] * (frames.ndim - 1) + [(0, seg_len - n_fft)])
+        frames = frames.reshape(frames.shape[:-1] + (n_seg, hop_length))
+        for k in range(n_seg):
+            y_rows[..., row_start + k:row_start + k + n_frames, :] += frames[..., k, :]
+    
     def _istft(
         self, 
         spec: np.ndarray, 
@@ -610,20 +932,24 @@ class VocalSeparationService:
         center: bool = True,
         length: Optional[int] = None
     ) -> np.ndarray:
-        """手动实现 ISTFT（逆短时傅里叶变换）。
+        """ISTFT（逆短时傅里叶变换），分块批量计算。
+        
+        每个块对二维频谱矩阵调用一次 irfft，重叠相加按 hop 对齐后
+        用切片整体累加，循环次数为 n_fft / hop 而非帧数。
         
         Args:
-            spec: 复数频谱 (n_fft//2 + 1, n_frames)
+            spec: 复数频谱 (n_fft//2 + 1, n_frames) 或 (channels, n_fft//2 + 1, n_frames)
             hop_length: 帧移
             window: 窗口类型
             center: 是否使用了中心填充（需要裁剪）
             length: 输出长度
             
         Returns:
-            重建的信号
+            重建的信号 (samples,) 或 (channels, samples)
         """
-        n_fft = (spec.shape[0] - 1) * 2
-        n_frames = spec.shape[1]
+        n_fft = (spec.shape[-2] - 1) * 2
+        n_frames = spec.shape[-1]
+        lead_shape = spec.shape[:-2]
         
         # 创建窗口
         if window == 'hann':
@@ -633,38 +959,126 @@ class VocalSeparationService:
         
         # 计算输出长度
         expected_len = n_fft + hop_length * (n_frames - 1)
-        y = np.zeros(expected_len)
-        window_sum = np.zeros(expected_len)
         
-        # 重叠相加重建
-        for i in range(n_frames):
-            start = i * hop_length
-            
-            # 逆 FFT
-            frame = np.fft.irfft(spec[:, i], n=n_fft)
-            
-            # 应用窗口并累加
-            y[start:start + n_fft] += frame * win
-            window_sum[start:start + n_fft] += win * win
+        # 输出视为 (n_frames + n_seg - 1, hop) 的矩阵，每帧占 n_seg 行
+        n_seg = -(-n_fft // hop_length)
+        n_rows = n_frames + n_seg - 1
+        y = np.zeros(lead_shape + (n_rows, hop_length))
+        
+        block = self.STFT_BLOCK_FRAMES
+        for start in range(0, n_frames, block):
+            end = min(start + block, n_frames)
+            # 逆 FFT 并加窗 (..., block, n_fft)
+            frames = np.fft.irfft(np.swapaxes(spec[..., start:end], -1, -2), n=n_fft, axis=-1)
+            frames *= win
+            self._overlap_add_rows(y, frames, start)
+        
+        y = y.reshape(lead_shape + (-1,))[..., :expected_len]
         
-        # 归一化（避免除零）
-        nonzero = window_sum > 1e-10
-        y[nonzero] /= window_sum[nonzero]
+        # 窗口平方和只与帧位置有关，对所有通道共用
+        window_sum = np.zeros((n_rows, hop_length))
+        self._overlap_add_rows(window_sum, np.broadcast_to(win * win, (n_frames, n_fft)), 0)
+        window_sum = window_sum.reshape(-1)[:expected_len]
+        
+        # 归一化（避免除零，窗口和过小处保持原值）
+        y /= np.where(window_sum > 1e-10, window_sum, 1.0)
         
         # 如果使用了 center padding，需要裁剪
         if center:
             pad_len = n_fft // 2
-            y = y[pad_len:-pad_len]
+            y = y[..., pad_len:-pad_len]
         
         # 裁剪到指定长度
         if length is not None:
-            if len(y) > length:
-                y = y[:length]
-            elif len(y) < length:
-                y = np.pad(y, (0, length - len(y)), mode='constant')
+            if y.shape[-1] > length:
+                y = y[..., :length]
+            elif y.shape[-1] < length:
+                y = np.pad(y, [(0, 0)] * (y.ndim - 1) + [(0, length - y.shape[-1])], mode='constant')
         
         return y
     
+    def _get_inference_batch_size(self) -> int:
+        """获取每次推理合并的块数。
+        
+        模型固定 batch 维度时只能使用该大小。
+        """
+        if self.model_batch_dim is not None:
+            return self.model_batch_dim
+        return max(1, self.batch_size)
+    
+    def _get_chunk_window(
+        self,
+        actual_frames: int,
+        overlap_frames: int,
+        fade_in: bool,
+        fade_out: bool
+    ) -> np.ndarray:
+        """获取块的重叠相加权重（按块几何缓存）。
+        
+        Args:
+            actual_frames: 块的有效帧数
+            overlap_frames: 块之间的重叠帧数
+            fade_in: 是否在块开头淡入
+            fade_out: 是否在块结尾淡出
+            
+        Returns:
+            权重 (actual_frames,)
+        """
+        fade_length = min(overlap_frames // 2, actual_frames // 4)
+        key = (actual_frames, fade_in, fade_out, fade_length)
+        window = self._chunk_window_cache.get(key)
+        if window is None:
+            window = np.ones(actual_frames)
+            if fade_length > 0 and fade_in:
+                window[:fade_length] = np.linspace(0, 1, fade_length)
+            if fade_length > 0 and fade_out:
+                window[-fade_length:] = np.linspace(1, 0, fade_length)
+            self._chunk_window_cache[key] = window
+        return window
+    
+    def _infer_chunks(self, spec_batch: np.ndarray) -> np.ndarray:
+        """对一批频谱块进行模型推理。
+        
+        Args:
+            spec_batch: 复数频谱块 (K, 2, freq_bins, chunk_frames)
+            
+        Returns:
+            模型输出的复数频谱 (K, 2, freq_bins, chunk_frames)
+        """
+        # 准备模型输入
+        if self.model_channels == 4:
+            # 4通道: [实部_L, 虚部_L, 实部_R, 虚部_R]
+            # 注意：不同模型可能使用不同的通道顺序，常见的是:
+            # 1. [Real_L, Imag_L, Real_R, Imag_R] (Kuielab/UVR standard)
+            # 2. [Real_L, Real_R, Imag_L, Imag_R] (某些变体)
+            
+            # 使用标准顺序 1: [Real_L, Imag_L, Real_R, Imag_R]
+            k, c, f, t = spec_batch.shape
+            input_data = np.empty((k, c, 2, f, t), dtype=np.float32)
+            input_data[:, :, 0] = spec_batch.real
+            input_data[:, :, 1] = spec_batch.imag
+            input_data = input_data.reshape(k, c * 2, f, t)
+        else:
+            # 2通道: 幅度谱
+            input_data = np.abs(spec_batch).astype(np.float32)
+        
+        # 模型推理，输出 (batch, channels, freq_bins, time_frames)
+        output = self.session.run([self.output_name], {self.input_name: input_data})[0]
+        
+        # 处理模型输出
+        if self.model_channels == 4:
+            # 4通道输出: [Real_L, Imag_L, Real_R, Imag_R]，重建复数频谱
+            vocal_batch = (output[:, 0::2] + 1j * output[:, 1::2]).astype(np.complex64)
+            
+            # UVR 标准: 应用补偿因子 (Compensate)
+            # 模型输出需要除以补偿因子来恢复正确的幅度
+            vocal_batch /= self.compensate
+        else:
+            # 2通道输出: 幅度掩码
+            vocal_batch = spec_batch * np.clip(output, 0, 1)
+        
+        return vocal_batch
+    
     def _process_audio(
         self,
         audio: np.ndarray,
@@ -683,16 +1097,9 @@ class VocalSeparationService:
         if progress_callback:
             progress_callback("正在进行频谱分析...", 0.2)
         
-        # STFT (手动实现)
-        spec_left = self._stft(
-            audio[0],
-            n_fft=self.n_fft,
-            hop_length=self.hop_length,
-            window='hann',
-            center=True
-        )
-        spec_right = self._stft(
-            audio[1],
+        # STFT（左右声道一次批量计算）
+        spec = self._stft(
+            audio[:2],
             n_fft=self.n_fft,
             hop_length=self.hop_length,
             window='hann',
@@ -700,12 +1107,9 @@ class VocalSeparationService:
         )
         
         # MDX-Net 模型需要 n_fft//2 个bins（去掉最高频）
-        if spec_left.shape[0] > self.model_freq_bins:
-            spec_left = spec_left[:self.model_freq_bins, :]
-            spec_right = spec_right[:self.model_freq_bins, :]
-
         # 组合为复数频谱 (channels, freq_bins, time_frames)
-        spec = np.stack([spec_left, spec_right], axis=0)
+        if spec.shape[1] > self.model_freq_bins:
+            spec = spec[:, :self.model_freq_bins, :]
         
         # 分块处理频谱
         total_frames = spec.shape[2]
@@ -718,93 +1122,43 @@ class VocalSeparationService:
         weights = np.zeros(total_frames)
         
         num_chunks = (total_frames - overlap_frames) // stride_frames + 1
+        batch_size = self._get_inference_batch_size()
         
-        for i in range(num_chunks):
-            start_frame = i * stride_frames
-            end_frame = min(start_frame + chunk_frames, total_frames)
+        for batch_start in range(0, num_chunks, batch_size):
+            batch_indices = range(batch_start, min(batch_start + batch_size, num_chunks))
             
             if progress_callback:
-                progress = 0.2 + 0.7 * (i / num_chunks)
-                progress_callback(f"处理中... ({i+1}/{num_chunks})", progress)
-            
-            # 提取频谱块
-            spec_chunk = spec[:, :, start_frame:end_frame]
-            
-            # 如果块太小，填充到模型要求的大小
-            actual_frames = spec_chunk.shape[2]
-            if actual_frames < chunk_frames:
-                padding = chunk_frames - actual_frames
-                spec_chunk = np.pad(spec_chunk, ((0, 0), (0, 0), (0, padding)), mode='constant')
-            
-            # 准备模型输入
-            if self.model_channels == 4:
-                # 4通道: [实部_L, 虚部_L, 实部_R, 虚部_R] 
-                # 注意：不同模型可能使用不同的通道顺序，常见的是:
-                # 1. [Real_L, Imag_L, Real_R, Imag_R] (Kuielab/UVR standard)
-                # 2. [Real_L, Real_R, Imag_L, Imag_R] (某些变体)
-                
-                # 尝试使用标准顺序 1: [Real_L, Imag_L, Real_R, Imag_R]
-                real = np.real(spec_chunk)
-                imag = np.imag(spec_chunk)
-                input_data = np.stack([real[0], imag[0], real[1], imag[1]], axis=0)
-                input_data = input_data[np.newaxis, :, :, :].astype(np.float32)
-            else:
-                # 2通道: 幅度谱
-                mag = np.abs(spec_chunk)
-                input_data = mag[np.newaxis, :, :, :].astype(np.float32)
-            
-            # 计算输入数据的最大幅度，用于后续可能的反归一化
-            if self.model_channels == 4:
-                 # 使用输入数据的绝对最大值作为参考
-                max_mag = np.max(np.abs(input_data))
-            else:
-                max_mag = 1.0 # 幅度掩码模式下通常不需要
-
-            # 模型推理
-            input_name = self.session.get_inputs()[0].name
-            output_name = self.session.get_outputs()[0].name
-            output = self.session.run([output_name], {input_name: input_data})[0]
-            
-            # 解析输出 (batch, channels, freq_bins, time_frames)
-            output_data = output[0]
-                        
-            # 处理模型输出
-            if self.model_channels == 4:
-                # 4通道输出: [Real_L, Imag_L, Real_R, Imag_R]
-                # 重建复数频谱
-                vocal_chunk = np.zeros((2, output_data.shape[1], output_data.shape[2]), dtype=np.complex64)
-                vocal_chunk[0] = output_data[0] + 1j * output_data[1]  # L
-                vocal_chunk[1] = output_data[2] + 1j * output_data[3]  # R
-                
-                # UVR 标准: 应用补偿因子 (Compensate)
-                # 模型输出需要除以补偿因子来恢复正确的幅度
-                vocal_chunk = vocal_chunk / self.compensate
-                
-            else:
-                # 2通道输出: 幅度掩码
-                mask = np.clip(output_data, 0, 1)
-                vocal_chunk = spec_chunk * mask
+                progress = 0.2 + 0.7 * (batch_start / num_chunks)
+                progress_callback(f"处理中... ({batch_indices[-1] + 1}/{num_chunks})", progress)
             
-            # 截取有效帧数
-            vocal_chunk = vocal_chunk[:, :, :actual_frames]
+            # 提取频谱块并堆叠为 (K, 2, freq_bins, chunk_frames)
+            spans = []
+            # 模型固定 batch 维度时，最后一批用零块补齐
+            batch_len = batch_size if self.model_batch_dim is not None else len(batch_indices)
+            spec_batch = np.zeros((batch_len, 2, spec.shape[1], chunk_frames), dtype=spec.dtype)
+            for k, i in enumerate(batch_indices):
+                start_frame = i * stride_frames
+                end_frame = min(start_frame + chunk_frames, total_frames)
+                # 不足模型要求大小的块保持零填充
+                spec_batch[k, :, :, :end_frame - start_frame] = spec[:, :, start_frame:end_frame]
+                spans.append((i, start_frame, end_frame))
             
-            # 创建平滑窗口
-            window = np.ones(actual_frames)
-            fade_length = min(overlap_frames // 2, actual_frames // 4)
-            if fade_length > 0 and i > 0:
-                window[:fade_length] = np.linspace(0, 1, fade_length)
-            if fade_length > 0 and end_frame < total_frames:
-                window[-fade_length:] = np.linspace(1, 0, fade_length)
+            vocal_batch = self._infer_chunks(spec_batch)
             
-            # 应用窗口并累加
-            for ch in range(2):
-                vocal_spec[ch, :, start_frame:end_frame] += vocal_chunk[ch] * window
-            weights[start_frame:end_frame] += window
+            # 应用窗口并累加（窗口按块几何缓存）
+            for k, (i, start_frame, end_frame) in enumerate(spans):
+                actual_frames = end_frame - start_frame
+                window = self._get_chunk_window(
+                    actual_frames,
+                    overlap_frames,
+                    fade_in=i > 0,
+                    fade_out=end_frame < total_frames,
+                )
+                vocal_spec[:, :, start_frame:end_frame] += vocal_batch[k, :, :, :actual_frames] * window
+                weights[start_frame:end_frame] += window
         
         # 归一化
-        weights = np.maximum(weights, 1e-8)
-        for ch in range(2):
-            vocal_spec[ch] = vocal_spec[ch] / weights
+        vocal_spec /= np.maximum(weights, 1e-8)
         
         if progress_callback:
             progress_callback("正在重建音频...", 0.9)
@@ -815,23 +1169,14 @@ class VocalSeparationService:
             padding = expected_freq_bins - vocal_spec.shape[1]
             vocal_spec = np.pad(vocal_spec, ((0, 0), (0, padding), (0, 0)), mode='constant')
         
-        # ISTFT 重建音频 (手动实现)
-        vocals_left = self._istft(
-            vocal_spec[0],
+        # ISTFT 重建音频（左右声道一次批量计算）
+        model_output = self._istft(
+            vocal_spec,
             hop_length=self.hop_length,
             window='hann',
             center=True,
             length=audio.shape[1]  # 指定输出长度，避免长度不匹配
         )
-        vocals_right = self._istft(
-            vocal_spec[1],
-            hop_length=self.hop_length,
-            window='hann',
-            center=True,
-            length=audio.shape[1]
-        )
-        
-        model_output = np.stack([vocals_left, vocals_right])
         
         # 根据模型类型决定输出
         if self.invert_output:
@@ -849,7 +1194,7 @@ class VocalSeparationService:
         """清理资源。"""
         import gc
         if self.session:
-            del self.session
+            self.session.release(evict=True)
             self.session = None
         gc.collect()
 
@@ -859,6 +1204,10 @@ class VocalSeparationService:
         self.current_model = None
         self.model_channels = 0
         self.model_freq_bins = 0
+        self.input_name = None
+        self.output_name = None
+        self.model_batch_dim = None
+        self._chunk_window_cache.clear()
     
     def get_device_info(self) -> str:
         """获取当前使用的设备信息。
@@ -887,3 +1236,263 @@ class VocalSeparationService:
         else:
             return provider
 
+
+class _StreamingSeparator:
+    """流式人声分离状态机。
+    
+    按块接收 PCM，增量完成 STFT → 模型 → ISTFT，并在样本确定后立即输出。
+    与整段处理的 _process_audio 数学上等价（使用相同的中心镜像填充、
+    分块、淡入淡出权重和窗口归一化），但只保留尚未输出的音频、
+    一批频谱块和一段重叠相加缓冲，内存与音频时长无关。
+    
+    所有位置均使用中心填充后的信号坐标（原始样本 j 对应位置 j + n_fft // 2）。
+    """
+    
+    def __init__(self, service: 'VocalSeparationService') -> None:
+        """初始化流式分离状态。
+        
+        Args:
+            service: 已加载模型的人声分离服务
+        """
+        self.service = service
+        self.n_fft: int = service.n_fft
+        self.hop: int = service.hop_length
+        self.pad: int = self.n_fft // 2
+        self.chunk_frames: int = service.model_time_frames
+        self.overlap_frames: int = int(self.chunk_frames * service.overlap)
+        self.stride_frames: int = self.chunk_frames - self.overlap_frames
+        self.freq_bins: int = service.model_freq_bins
+        self.batch_size: int = service._get_inference_batch_size()
+        self.win: np.ndarray = np.hanning(self.n_fft)
+        
+        # 填充后信号的缓冲区，buf[:, 0] 对应位置 buf_off
+        self.buf: np.ndarray = np.zeros((2, 0), dtype=np.float32)
+        self.buf_off: int = 0
+        self.n_samples: int = 0  # 已接收的原始样本数
+        self.started: bool = False  # 是否已添加开头的镜像填充
+        
+        self.next_chunk: int = 0  # 下一个待处理的频谱块序号
+        
+        # 频谱重叠相加缓冲，spec_acc[..., 0] 对应帧 spec_off
+        self.spec_acc: np.ndarray = np.zeros((2, self.freq_bins, 0), dtype=np.complex64)
+        self.weight_acc: np.ndarray = np.zeros(0)
+        self.spec_off: int = 0
+        
+        # 时域重叠相加缓冲（按 hop 分行），ola[..., 0, :] 对应位置 ola_row * hop
+        self.ola: np.ndarray = np.zeros((2, 0, self.hop))
+        self.wsum: np.ndarray = np.zeros((0, self.hop))
+        self.ola_row: int = 0
+        
+        self.emit_pos: int = self.pad  # 下一个待输出的位置
+    
+    def push(self, audio: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """送入一段音频，返回已经确定的输出。
+        
+        Args:
+            audio: 音频数据 (2, samples)
+            
+        Returns:
+            (人声, 伴奏)，长度可能为 0
+        """
+        self.n_samples += audio.shape[1]
+        self.buf = np.concatenate([self.buf, audio.astype(np.float32, copy=False)], axis=1)
+        
+        if not self.started:
+            # 开头镜像填充需要至少 pad + 1 个样本
+            if self.n_samples <= self.pad:
+                return self._empty()
+            head = self.buf[:, 1:self.pad + 1][:, ::-1]
+            self.buf = np.concatenate([head, self.buf], axis=1)
+            self.started = True
+        
+        # 处理完整的一批频谱块：块的所有帧都在已接收范围内，且确定不是最后一帧
+        processed = False
+        while self._chunk_ready(self.next_chunk + self.batch_size - 1):
+            last = self.next_chunk + self.batch_size
+            self._process_chunks(range(self.next_chunk, last), total_frames=None)
+            processed = True
+        
+        if not processed:
+            return self._empty()
+        return self._flush_frames(self.next_chunk * self.stride_frames, final=False)
+    
+    def finish(self) -> Tuple[np.ndarray, np.ndarray]:
+        """输入结束，处理剩余音频并返回全部剩余输出。
+        
+        Returns:
+            (人声, 伴奏)
+        """
+        if self.next_chunk == 0:
+            # 尚未处理任何块（短音频），整段处理即可，结果与非流式完全一致
+            audio = self.buf[:, self.pad:] if self.started else self.buf
+            self.buf = np.zeros((2, 0), dtype=np.float32)
+            if audio.shape[1] == 0:
+                return self._empty()
+            vocals, instrumentals = self.service._process_audio(audio)
+            return self._as_output(vocals), self._as_output(instrumentals)
+        
+        # 结尾镜像填充
+        tail = self.buf[:, -self.pad - 1:-1][:, ::-1]
+        self.buf = np.concatenate([self.buf, tail], axis=1)
+        
+        total_frames = 1 + self.n_samples // self.hop
+        num_chunks = (total_frames - self.overlap_frames) // self.stride_frames + 1
+        for batch_start in range(self.next_chunk, num_chunks, self.batch_size):
+            batch_end = min(batch_start + self.batch_size, num_chunks)
+            self._process_chunks(range(batch_start, batch_end), total_frames=total_frames)
+        
+        return self._flush_frames(total_frames, final=True)
+    
+    def _empty(self) -> Tuple[np.ndarray, np.ndarray]:
+        """空输出。"""
+        empty = np.zeros((2, 0), dtype=np.float32)
+        return empty, empty
+    
+    @staticmethod
+    def _as_output(audio: np.ndarray) -> np.ndarray:
+        """转换为输出用的 float32（不限幅，峰值归一化在编码前统一进行）。"""
+        return audio.astype(np.float32)
+    
+    def _chunk_ready(self, chunk_index: int) -> bool:
+        """判断在不知道音频总长时该块能否处理。
+        
+        块的结束帧 e 需满足：最后一帧完全落在已接收的原始音频内，
+        且总帧数一定大于 e（保证结尾淡出权重与整段处理一致）。
+        """
+        end_frame = chunk_index * self.stride_frames + self.chunk_frames
+        need = max(end_frame * self.hop, (end_frame - 1) * self.hop + self.pad)
+        return self.started and self.n_samples >= need
+    
+    def _process_chunks(self, chunk_indices: range, total_frames: Optional[int]) -> None:
+        """对一批频谱块执行 STFT、推理并累加到频谱缓冲。
+        
+        Args:
+            chunk_indices: 块序号范围
+            total_frames: 总帧数（仅在输入结束后已知）
+        """
+        service = self.service
+        first_frame = chunk_indices[0] * self.stride_frames
+        last_frame = chunk_indices[-1] * self.stride_frames + self.chunk_frames
+        if total_frames is not None:
+            last_frame = min(last_frame, total_frames)
+        
+        # 一次性计算这批块共享的帧 [first_frame, last_frame)
+        seg_start = first_frame * self.hop - self.buf_off
+        seg_end = (last_frame - 1) * self.hop + self.n_fft - self.buf_off
+        spec = service._stft(self.buf[:, seg_start:seg_end], self.n_fft, self.hop, center=False)
+        spec = spec[:, :self.freq_bins, :]
+        
+        batch_len = self.batch_size if service.model_batch_dim is not None else len(chunk_indices)
+        spec_batch = np.zeros((batch_len, 2, self.freq_bins, self.chunk_frames), dtype=spec.dtype)
+        spans = []
+        for k, i in enumerate(chunk_indices):
+            start_frame = i * self.stride_frames
+            end_frame = start_frame + self.chunk_frames
+            if total_frames is not None:
+                end_frame = min(end_frame, total_frames)
+            spec_batch[k, :, :, :end_frame - start_frame] = spec[:, :, start_frame - first_frame:end_frame - first_frame]
+            spans.append((i, start_frame, end_frame))
+        
+        vocal_batch = service._infer_chunks(spec_batch)
+        
+        # 扩展频谱缓冲以覆盖本批的帧
+        needed = last_frame - self.spec_off
+        if self.spec_acc.shape[2] < needed:
+            grow = needed - self.spec_acc.shape[2]
+            self.spec_acc = np.pad(self.spec_acc, ((0, 0), (0, 0), (0, grow)))
+            self.weight_acc = np.pad(self.weight_acc, (0, grow))
+        
+        for k, (i, start_frame, end_frame) in enumerate(spans):
+            actual_frames = end_frame - start_frame
+            window = service._get_chunk_window(
+                actual_frames,
+                self.overlap_frames,
+                fade_in=i > 0,
+                fade_out=total_frames is None or end_frame < total_frames,
+            )
+            a = start_frame - self.spec_off
+            self.spec_acc[:, :, a:a + actual_frames] += vocal_batch[k, :, :, :actual_frames] * window
+            self.weight_acc[a:a + actual_frames] += window
+        
+        self.next_chunk = chunk_indices[-1] + 1
+    
+    def _flush_frames(self, final_frame: int, final: bool) -> Tuple[np.ndarray, np.ndarray]:
+        """将已确定的帧做 ISTFT，并输出已确定的样本。
+        
+        Args:
+            final_frame: 此帧之前的频谱已不会再变化
+            final: 是否为输入结束后的最后一次输出
+            
+        Returns:
+            (人声, 伴奏)
+        """
+        n_final = final_frame - self.spec_off
+        spec = self.spec_acc[:, :, :n_final] / np.maximum(self.weight_acc[:n_final], 1e-8)
+        
+        # 补回被裁掉的最高频（零填充）
+        expected_freq_bins = self.n_fft // 2 + 1
+        if spec.shape[1] < expected_freq_bins:
+            spec = np.pad(spec, ((0, 0), (0, expected_freq_bins - spec.shape[1]), (0, 0)))
+        
+        # 逆 FFT 并重叠相加到时域缓冲
+        n_seg = -(-self.n_fft // self.hop)
+        row_start = self.spec_off - self.ola_row
+        needed_rows = row_start + n_final + n_seg - 1
+        if self.ola.shape[1] < needed_rows:
+            grow = needed_rows - self.ola.shape[1]
+            self.ola = np.pad(self.ola, ((0, 0), (0, grow), (0, 0)))
+            self.wsum = np.pad(self.wsum, ((0, grow), (0, 0)))
+        block = self.service.STFT_BLOCK_FRAMES
+        for start in range(0, n_final, block):
+            end = min(start + block, n_final)
+            frames = np.fft.irfft(np.swapaxes(spec[..., start:end], -1, -2), n=self.n_fft, axis=-1)
+            frames *= self.win
+            self.service._overlap_add_rows(self.ola, frames, row_start + start)
+        self.service._overlap_add_rows(
+            self.wsum, np.broadcast_to(self.win * self.win, (n_final, self.n_fft)), row_start
+        )
+        
+        self.spec_acc = self.spec_acc[:, :, n_final:]
+        self.weight_acc = self.weight_acc[n_final:]
+        self.spec_off = final_frame
+        
+        # 确定的样本范围 [ola_row * hop, end_pos)
+        audio_end = self.pad + self.n_samples
+        if final:
+            # 整段 ISTFT 的有效输出只到 n_fft + hop * (帧数 - 1) - pad，其后为零
+            end_pos = audio_end
+            valid_end = min(audio_end, self.n_fft + self.hop * (final_frame - 1) - self.pad)
+            n_rows = self.ola.shape[1]
+        else:
+            end_pos = valid_end = final_frame * self.hop
+            n_rows = final_frame - self.ola_row
+        
+        y = self.ola[:, :n_rows].reshape(2, -1)
+        wsum = self.wsum[:n_rows].reshape(-1)
+        y = y / np.where(wsum > 1e-10, wsum, 1.0)
+        
+        base = self.ola_row * self.hop
+        out_start = self.emit_pos
+        model_output = np.zeros((2, max(0, end_pos - out_start)), dtype=np.float64)
+        valid_len = max(0, min(valid_end, base + y.shape[1]) - out_start)
+        model_output[:, :valid_len] = y[:, out_start - base:out_start - base + valid_len]
+        
+        audio = self.buf[:, out_start - self.buf_off:end_pos - self.buf_off]
+        if self.service.invert_output:
+            instrumentals = model_output
+            vocals = audio - instrumentals
+        else:
+            vocals = model_output
+            instrumentals = audio - vocals
+        
+        # 丢弃已输出的数据
+        self.emit_pos = end_pos
+        if not final:
+            self.ola = self.ola[:, n_rows:]
+            self.wsum = self.wsum[n_rows:]
+            self.ola_row = final_frame
+            keep_from = min(self.emit_pos, self.next_chunk * self.stride_frames * self.hop)
+            self.buf = self.buf[:, keep_from - self.buf_off:]
+            self.buf_off = keep_from
+        
+        return self._as_output(vocals), self._as_output(instrumentals)
@@ -13,7 +13,6 @@ from .file_utils import (
     list_files_by_extension,
     move_file,
 )
-from .gif_utils import GifUtils
 from .logger import (
     logger,
     debug,
@@ -32,24 +31,28 @@ from .tool_metadata import (
     register_tool,
     register_tool_manual,
 )
-from .network_utils import (
-    check_needs_proxy,
-    get_proxied_url,
-    clear_location_cache,
-    get_location_by_ip,
-    contains_cjk,
-    LocationInfo,
-)
 from .subtitle_utils import (
     segments_to_srt,
     segments_to_vtt,
     segments_to_txt,
 )
+from .ffmpeg_progress import (
+    FFMPEG_PROGRESS_ARGS,
+    FFmpegProgress,
+    FFmpegProgressReader,
+)
 from .onnx_helper import (
     create_session_options,
     create_provider_options,
     create_onnx_session_config,
     create_onnx_session,
+    configure_session_registry,
+)
+from .onnx_session_registry import (
+    OnnxSessionRegistry,
+    SessionHandle,
+    SessionStats,
+    get_session_registry,
 )
 from .platform_utils import (
     get_windows_version,
@@ -60,7 +63,24 @@ from .platform_utils import (
     is_linux,
     supports_file_drop,
 )
-from .windows_drop import WindowsDropHandler, DropInfo
+from .lazy_import import lazy_exports
+
+# 依赖 PIL、httpx、tkinter 的模块在首次访问时再导入
+_LAZY_EXPORTS = {
+    "GifUtils": ".gif_utils",
+    "encode_to_target_size": ".image_encoding",
+    "TargetSizeResult": ".image_encoding",
+    "check_needs_proxy": ".network_utils",
+    "get_proxied_url": ".network_utils",
+    "clear_location_cache": ".network_utils",
+    "get_location_by_ip": ".network_utils",
+    "contains_cjk": ".network_utils",
+    "LocationInfo": ".network_utils",
+    "WindowsDropHandler": ".windows_drop",
+    "DropInfo": ".windows_drop",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _LAZY_EXPORTS, globals())
 
 __all__ = [
     "ensure_dir",
@@ -74,6 +94,8 @@ __all__ = [
     "get_unique_path",
     "list_files_by_extension",
     "GifUtils",
+    "encode_to_target_size",
+    "TargetSizeResult",
     "logger",
     "Logger",
     "debug",
@@ -97,10 +119,18 @@ __all__ = [
     "segments_to_srt",
     "segments_to_vtt",
     "segments_to_txt",
+    "FFMPEG_PROGRESS_ARGS",
+    "FFmpegProgress",
+    "FFmpegProgressReader",
     "create_session_options",
     "create_provider_options",
     "create_onnx_session_config",
     "create_onnx_session",
+    "configure_session_registry",
+    "OnnxSessionRegistry",
+    "SessionHandle",
+    "SessionStats",
+    "get_session_registry",
     "get_windows_version",
     "is_windows",
     "is_windows_10_or_later",
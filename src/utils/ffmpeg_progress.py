@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""FFmpeg 进度解析模块。
+
+解析 ffmpeg `-progress` 输出的 key=value 协议（out_time_us、fps、bitrate、
+total_size、speed 等，每个进度块以 progress=continue/end 结束），
+按固定间隔回报结构化的进度事件，同时保留 stderr 最后若干行日志用于报错。
+"""
+
+import collections
+import threading
+import time
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, Deque, Dict, Optional
+
+from utils import logger
+
+# 启用 -progress 输出的全局参数（-nostats 关闭人类可读的统计行，避免与进度块重复）
+FFMPEG_PROGRESS_ARGS = ('-nostats', '-loglevel', 'info', '-progress', 'pipe:2')
+
+
+@dataclass
+class FFmpegProgress:
+    """一次进度事件。
+
+    Attributes:
+        out_time: 已输出的媒体时长（秒）
+        frame: 已输出的帧数
+        fps: 当前处理帧率
+        bitrate: 当前输出码率（kbit/s）
+        total_size: 已输出的字节数
+        speed: 处理速度（相对实时的倍数），未知时为 0
+        duration: 预期的输出总时长（秒），未知时为 0
+        finished: 是否为最后一个进度块（progress=end）
+    """
+    out_time: float = 0.0
+    frame: int = 0
+    fps: float = 0.0
+    bitrate: float = 0.0
+    total_size: int = 0
+    speed: float = 0.0
+    duration: float = 0.0
+    finished: bool = False
+
+    @property
+    def progress(self) -> float:
+        """进度 (0-1)，结束前最多为 0.99。"""
+        if self.finished:
+            return 1.0
+        if self.duration <= 0:
+            return 0.0
+        return min(max(self.out_time / self.duration, 0.0), 0.99)
+
+    @property
+    def remaining(self) -> Optional[float]:
+        """预计剩余时间（秒），无法估计时为 None。"""
+        if self.finished:
+            return 0.0
+        if self.speed <= 0 or self.duration <= 0:
+            return None
+        return max(self.duration - self.out_time, 0.0) / self.speed
+
+    @property
+    def speed_text(self) -> str:
+        """速度文本（如 "2.35x"）。"""
+        return f"{self.speed:.2f}x" if self.speed > 0 else "N/A"
+
+    @property
+    def remaining_text(self) -> str:
+        """预计剩余时间文本。"""
+        remaining = self.remaining
+        if remaining is None:
+            return "计算中..."
+        return f"{int(remaining // 60)}m {int(remaining % 60)}s"
+
+
+def _parse_float(value: Optional[bytes]) -> float:
+    try:
+        return float(value) if value else 0.0
+    except ValueError:
+        # N/A 等无效值
+        return 0.0
+
+
+def _build_progress(fields: Dict[bytes, bytes], duration: float) -> FFmpegProgress:
+    """由一个进度块的原始键值构造进度事件。"""
+    # out_time_ms 实际单位也是微秒（ffmpeg 历史遗留），旧版本没有 out_time_us
+    out_time_us = _parse_float(fields.get(b'out_time_us') or fields.get(b'out_time_ms'))
+    return FFmpegProgress(
+        out_time=out_time_us / 1_000_000,
+        frame=int(_parse_float(fields.get(b'frame'))),
+        fps=_parse_float(fields.get(b'fps')),
+        bitrate=_parse_float(fields.get(b'bitrate', b'').rstrip(b'kbits/s')),
+        total_size=int(_parse_float(fields.get(b'total_size'))),
+        speed=_parse_float(fields.get(b'speed', b'').rstrip(b'x')),
+        duration=duration,
+        finished=fields.get(b'progress') == b'end',
+    )
+
+
+class FFmpegProgressReader:
+    """在后台线程中读取 ffmpeg stderr，解析 -progress 输出。
+
+    进度键值行不会进入日志尾部，其余行（ffmpeg 日志、错误信息）保留最后
+    tail_lines 行。读取线程会一直读到 EOF，保证 stderr 管道不会写满阻塞 ffmpeg。
+    """
+
+    def __init__(
+        self,
+        stream: BinaryIO,
+        duration: float = 0.0,
+        on_progress: Optional[Callable[[FFmpegProgress], None]] = None,
+        min_interval: float = 0.5,
+        tail_lines: int = 50
+    ) -> None:
+        """初始化读取器。
+
+        Args:
+            stream: ffmpeg 的 stderr（二进制流）
+            duration: 预期的输出总时长（秒），用于计算进度
+            on_progress: 进度回调（在读取线程中调用）
+            min_interval: 两次进度回调的最小间隔（秒），最后一个进度块总会回调
+            tail_lines: 保留的日志行数
+        """
+        self.stream = stream
+        self.duration = duration
+        self.on_progress = on_progress
+        self.min_interval = min_interval
+        self._tail: Deque[str] = collections.deque(maxlen=tail_lines)
+        self._thread: Optional[threading.Thread] = None
+        # 最近一个完整进度块的原始键值（按需解析，避免每个进度块都构造对象）
+        self._last_fields: Dict[bytes, bytes] = {}
+
+    @property
+    def last(self) -> FFmpegProgress:
+        """最近一次进度。"""
+        return _build_progress(self._last_fields, self.duration)
+
+    @property
+    def tail(self) -> str:
+        """stderr 最后若干行日志。"""
+        return "\n".join(self._tail)
+
+    def start(self) -> 'FFmpegProgressReader':
+        """启动读取线程。"""
+        self._thread = threading.Thread(target=self._run, daemon=True, name="FFmpegProgress")
+        self._thread.start()
+        return self
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """等待读取线程结束。"""
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        fields: Dict[bytes, bytes] = {}
+        last_emit = 0.0
+        try:
+            for line in iter(self.stream.readline, b''):
+                key, sep, value = line.strip().partition(b'=')
+                # 进度行形如 out_time_us=1234567，键名为小写且不含空格
+                if not sep or b' ' in key or not key.islower():
+                    text = line.decode('utf-8', errors='ignore').rstrip()
+                    if text:
+                        self._tail.append(text)
+                    continue
+
+                fields[key] = value
+                if key != b'progress':
+                    continue
+
+                # 一个进度块结束
+                self._last_fields, fields = fields, {}
+                if self.on_progress is None:
+                    continue
+                now = time.monotonic()
+                if value == b'end' or now - last_emit >= self.min_interval:
+                    last_emit = now
+                    try:
+                        self.on_progress(self.last)
+                    except Exception as e:
+                        logger.debug(f"进度回调异常: {e}")
+        except (OSError, ValueError):
+            # 进程被终止时管道可能已关闭
+            pass
+        finally:
+            try:
+                self.stream.close()
+            except Exception:
+                pass
@@ -10,7 +10,7 @@ import shutil
 import subprocess
 import sys
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 from utils import logger
 
 
@@ -642,7 +642,7 @@ $Shortcut.Description = "MTools"
         return False, f"创建失败: {str(ex)}"
 
 
-def get_unique_path(path: Path, add_sequence: bool = True) -> Path:
+def get_unique_path(path: Path, add_sequence: bool = True, reserved: Optional[Set[Path]] = None) -> Path:
     """获取唯一的文件路径，避免覆盖已存在的文件。
     
     如果文件不存在，直接返回原路径。
@@ -652,6 +652,8 @@ def get_unique_path(path: Path, add_sequence: bool = True) -> Path:
     Args:
         path: 原始文件路径
         add_sequence: 是否添加序号（True=添加序号，False=覆盖）
+        reserved: 已分配给其它并发任务的路径，视为已存在（即使是覆盖模式也会添加序号，
+            且不会选用已存在的编号文件），返回的路径会加入该集合
         
     Returns:
         唯一的文件路径
@@ -666,7 +668,14 @@ def get_unique_path(path: Path, add_sequence: bool = True) -> Path:
         >>> get_unique_path(Path("video.mp4"), add_sequence=False)
         Path("video.mp4")  # 直接覆盖
     """
-    if not add_sequence or not path.exists():
+    if reserved is None:
+        reserved = set()
+        
+    def taken(candidate: Path) -> bool:
+        return candidate in reserved or (add_sequence and candidate.exists())
+    
+    if not taken(path):
+        reserved.add(path)
         return path
     
     # 文件存在，需要添加序号
@@ -677,7 +686,9 @@ def get_unique_path(path: Path, add_sequence: bool = True) -> Path:
     counter = 1
     while True:
         new_path = parent / f"{stem}_{counter}{suffix}"
-        if not new_path.exists():
+        # 覆盖模式只允许覆盖原路径，编号路径无论哪种模式都不能是已存在的文件
+        if new_path not in reserved and not new_path.exists():
+            reserved.add(new_path)
             return new_path
         counter += 1
         
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""目标大小图像编码模块。
+
+在给定字节预算内找出 JPEG/WebP 的最高质量：先对从原图取样的小图做几次试编码，
+得到「质量 → 文件大小」的近似曲线，用它预测第一个候选质量；每次完整编码后按
+实际大小校正曲线，在已知的可行/不可行质量之间继续预测，预测次数用完后改为二分。
+通常 3~4 次完整编码即可收敛。所有完整编码复用同一个内存缓冲区。
+"""
+
+import io
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+# 支持的格式（PIL 格式名）
+SUPPORTED_FORMATS = ("JPEG", "WEBP")
+
+# 试编码缩略图：小于该像素数的图像直接使用原图
+_PROBE_PIXELS = 256 * 256
+
+# 试编码缩略图由 _PROBE_GRID × _PROBE_GRID 个边长 _PROBE_BLOCK 的原图小块拼成
+_PROBE_GRID = 8
+_PROBE_BLOCK = 32
+
+# 缩略图试编码使用的质量点
+_PROBE_QUALITIES = (10, 30, 50, 70, 85, 95)
+
+# 由模型预测的完整编码次数上限，之后改为纯二分
+_MAX_PREDICTED_ENCODES = 6
+
+
+@dataclass
+class TargetSizeResult:
+    """目标大小编码结果。
+
+    Attributes:
+        data: 编码后的字节数据
+        quality: 使用的质量
+        fits: 是否满足字节预算（最低质量仍超出时为 False）
+        encodes: 完整尺寸编码次数
+    """
+    data: bytes
+    quality: int
+    fits: bool
+    encodes: int
+
+
+def _prepare(image: Image.Image, image_format: str) -> Image.Image:
+    """转换为目标格式支持的颜色模式（JPEG 透明区域填充白色）。"""
+    if image_format == "JPEG":
+        if image.mode in ("RGBA", "LA", "P"):
+            if image.mode == "P":
+                image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.split()[-1])
+            return background
+        if image.mode not in ("RGB", "L", "CMYK"):
+            return image.convert("RGB")
+    elif image.mode not in ("RGB", "RGBA"):
+        return image.convert("RGBA" if "A" in image.getbands() else "RGB")
+    return image
+
+
+def _sample_blocks(image: Image.Image) -> Image.Image:
+    """从原图均匀取若干原始分辨率的小块拼成缩略图。
+
+    直接缩小会抹掉噪点和细节，使试编码明显偏小；按块取样保留了原图的纹理密度。
+    块边长为 16 的倍数，与 JPEG 的编码块对齐。
+    """
+    width, height = image.size
+    if width * height <= _PROBE_PIXELS:
+        return image
+    cols = max(1, min(_PROBE_GRID, width // _PROBE_BLOCK))
+    rows = max(1, min(_PROBE_GRID, height // _PROBE_BLOCK))
+    block_w = min(_PROBE_BLOCK, width)
+    block_h = min(_PROBE_BLOCK, height)
+    mosaic = Image.new(image.mode, (cols * block_w, rows * block_h))
+    for row in range(rows):
+        top = (height - block_h) * row // max(1, rows - 1) if rows > 1 else (height - block_h) // 2
+        for col in range(cols):
+            left = (width - block_w) * col // max(1, cols - 1) if cols > 1 else (width - block_w) // 2
+            mosaic.paste(image.crop((left, top, left + block_w, top + block_h)), (col * block_w, row * block_h))
+    return mosaic
+
+
+class _SizeModel:
+    """质量 → 完整尺寸文件大小的近似模型。
+
+    缩略图试编码的大小减去固定开销（文件头、量化表）后按面积放大，
+    完整编码后用实测值校正放大系数。
+    """
+
+    def __init__(self, image: Image.Image, image_format: str, save_kwargs: Dict[str, Any]) -> None:
+        width, height = image.size
+        probe = _sample_blocks(image)
+        tiny = image.resize((8, 8), Image.Resampling.BILINEAR)
+
+        buffer = io.BytesIO()
+        self._points: List[Tuple[int, float, float]] = []   # (质量, 固定开销, 可变部分)
+        for quality in _PROBE_QUALITIES:
+            overhead = _encode(tiny, buffer, image_format, quality, save_kwargs)
+            size = _encode(probe, buffer, image_format, quality, save_kwargs)
+            self._points.append((quality, float(overhead), max(1.0, size - overhead)))
+        self._scale = (width * height) / float(probe.size[0] * probe.size[1])
+        self._corrections: List[Tuple[int, float]] = []
+
+    def _interpolate(self, quality: int) -> Tuple[float, float]:
+        """在试编码点之间按对数线性插值，返回 (固定开销, 可变部分)。"""
+        points = self._points
+        if quality <= points[0][0]:
+            return points[0][1], points[0][2]
+        for (q0, o0, v0), (q1, o1, v1) in zip(points, points[1:]):
+            if quality <= q1:
+                t = (quality - q0) / (q1 - q0)
+                return o0 + (o1 - o0) * t, math.exp(math.log(v0) + (math.log(v1) - math.log(v0)) * t)
+        return points[-1][1], points[-1][2]
+
+    def _correction(self, quality: int) -> float:
+        """实测值相对模型的校正系数。
+
+        位于两个实测点之间时按对数线性插值，否则取最近的实测点，没有实测时为 1。
+        """
+        points = self._corrections
+        if not points:
+            return 1.0
+        if quality <= points[0][0]:
+            return points[0][1]
+        for (q0, c0), (q1, c1) in zip(points, points[1:]):
+            if quality <= q1:
+                t = (quality - q0) / (q1 - q0)
+                return math.exp(math.log(c0) + (math.log(c1) - math.log(c0)) * t)
+        return points[-1][1]
+
+    def predict(self, quality: int) -> float:
+        """预测完整尺寸的文件大小（字节）。"""
+        overhead, variable = self._interpolate(quality)
+        return overhead + variable * self._scale * self._correction(quality)
+
+    def observe(self, quality: int, size: int) -> None:
+        """加入一次完整编码的实测大小。"""
+        overhead, variable = self._interpolate(quality)
+        self._corrections.append((quality, max(1.0, size - overhead) / (variable * self._scale)))
+        self._corrections.sort()
+
+    def best_quality(self, target_bytes: int, lo: int, hi: int) -> int:
+        """预测 (lo, hi) 区间内不超过预算的最高质量。"""
+        quality = lo + 1
+        for candidate in range(hi - 1, lo, -1):
+            if self.predict(candidate) <= target_bytes:
+                quality = candidate
+                break
+        return quality
+
+
+def _encode(
+    image: Image.Image,
+    buffer: io.BytesIO,
+    image_format: str,
+    quality: int,
+    save_kwargs: Dict[str, Any]
+) -> int:
+    """编码到复用的缓冲区，返回字节数。"""
+    buffer.seek(0)
+    buffer.truncate()
+    image.save(buffer, format=image_format, quality=quality, **save_kwargs)
+    return buffer.tell()
+
+
+def encode_to_target_size(
+    image: Image.Image,
+    target_bytes: int,
+    image_format: str = "JPEG",
+    min_quality: int = 1,
+    max_quality: int = 95,
+    save_kwargs: Optional[Dict[str, Any]] = None
+) -> TargetSizeResult:
+    """以不超过字节预算的最高质量编码图像。
+
+    Args:
+        image: PIL 图像
+        target_bytes: 字节预算
+        image_format: 输出格式，"JPEG" 或 "WEBP"
+        min_quality: 最低质量
+        max_quality: 最高质量
+        save_kwargs: 额外的 Image.save 参数（如 dpi、optimize）
+
+    Returns:
+        编码结果；最低质量仍超出预算时返回最低质量的编码，fits 为 False
+
+    Raises:
+        ValueError: 不支持的格式或参数无效
+    """
+    image_format = image_format.upper()
+    if image_format == "JPG":
+        image_format = "JPEG"
+    if image_format not in SUPPORTED_FORMATS:
+        raise ValueError(f"目标大小编码仅支持 JPEG/WebP，不支持: {image_format}")
+    if target_bytes <= 0:
+        raise ValueError("目标大小必须大于 0")
+    min_quality = max(1, min(min_quality, 100))
+    max_quality = max(min_quality, min(max_quality, 100))
+    save_kwargs = dict(save_kwargs or {})
+
+    image = _prepare(image, image_format)
+    model = _SizeModel(image, image_format, save_kwargs)
+    buffer = io.BytesIO()
+
+    # lo 为已知满足预算的最高质量，hi 为已知超出预算的最低质量
+    lo, hi = min_quality - 1, max_quality + 1
+    best: Optional[bytes] = None
+    encodes = 0
+    while hi - lo > 1:
+        if encodes < _MAX_PREDICTED_ENCODES:
+            quality = model.best_quality(target_bytes, lo, hi)
+        else:
+            quality = (lo + hi) // 2
+        size = _encode(image, buffer, image_format, quality, save_kwargs)
+        encodes += 1
+        model.observe(quality, size)
+        if size <= target_bytes:
+            lo = quality
+            best = buffer.getvalue()
+        else:
+            hi = quality
+
+    if best is not None:
+        return TargetSizeResult(best, lo, True, encodes)
+
+    # 最低质量也超出预算，缓冲区中是最后一次（最低质量）的编码
+    return TargetSizeResult(buffer.getvalue(), min_quality, False, encodes)
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""延迟导入工具模块。
+
+包的 __init__ 只登记 名称 → 子模块 的对应关系，首次访问某个名称时才导入对应子模块，
+避免启动时一次性加载 numpy、cv2、onnxruntime、httpx 等重量级依赖。
+"""
+
+import importlib
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def lazy_exports(
+    package: str,
+    exports: Dict[str, str],
+    namespace: Dict[str, Any]
+) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """为包生成模块级 __getattr__ 和 __dir__（PEP 562）。
+
+    Args:
+        package: 包名（通常为 __name__）
+        exports: 导出名称 → 子模块路径（相对路径以 "." 开头）
+        namespace: 包的全局命名空间（通常为 globals()），导入后的对象会缓存到其中
+
+    Returns:
+        (__getattr__, __dir__)
+    """
+    def __getattr__(name: str) -> Any:
+        module_path = exports.get(name)
+        if module_path is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        module = importlib.import_module(module_path, package)
+        value = getattr(module, name)
+        # 缓存到包命名空间，之后的访问不再经过 __getattr__
+        namespace[name] = value
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(namespace) | set(exports))
+
+    return __getattr__, __dir__
+
+
+def import_object(path: str) -> Any:
+    """按 "模块路径:对象名" 导入对象。
+
+    Args:
+        path: 如 "views.image.compress_view:ImageCompressView"
+
+    Returns:
+        导入的对象
+    """
+    module_path, _, attr = path.partition(":")
+    module = importlib.import_module(module_path)
+    return getattr(module, attr) if attr else module
@@ -25,20 +25,29 @@
    >>> session = ort.InferenceSession(model_path, sess_options, providers)
 
 4. 完全自定义：直接手动配置 SessionOptions 和 Providers
+
+create_onnx_session() 返回的是进程级会话注册表中共享会话的句柄（见
+onnx_session_registry）：相同模型和配置只加载一次，用完调用 release() 释放。
 """
 
 from pathlib import Path
 from typing import Optional, Tuple, List, Union, TYPE_CHECKING, Any
 
-try:
-    import onnxruntime as ort
-except ImportError:
-    ort = None
+from .onnx_session_registry import SessionHandle, get_session_registry
 
 if TYPE_CHECKING:
     from services import ConfigService
 
 
+def _get_ort() -> Any:
+    """延迟导入 onnxruntime（导入耗时较长，避免拖慢启动），未安装时返回 None。"""
+    try:
+        import onnxruntime as ort
+    except ImportError:
+        return None
+    return ort
+
+
 def create_session_options(
     enable_memory_arena: bool = True,
     cpu_threads: int = 0,
@@ -58,6 +67,7 @@ def create_session_options(
     Returns:
         配置好的SessionOptions对象
     """
+    ort = _get_ort()
     if ort is None:
         raise ImportError("需要安装 onnxruntime 库")
     
@@ -112,6 +122,7 @@ def create_provider_options(
     Returns:
         Provider列表
     """
+    ort = _get_ort()
     if ort is None:
         raise ImportError("需要安装 onnxruntime 库")
     
@@ -150,6 +161,51 @@ def create_provider_options(
     return providers
 
 
+def _resolve_session_params(
+    config_service: Optional['ConfigService'],
+    gpu_device_id: Optional[int],
+    gpu_memory_limit: Optional[int],
+    enable_memory_arena: Optional[bool],
+    cpu_threads: Optional[int],
+    execution_mode: Optional[str],
+    enable_model_cache: Optional[bool]
+) -> Tuple[int, int, bool, int, str, bool]:
+    """按「参数 → 配置 → 默认值」的顺序确定会话参数。"""
+    # 从配置服务读取参数（如果提供且参数为None）
+    if config_service is not None:
+        if gpu_device_id is None:
+            gpu_device_id = config_service.get_config_value("gpu_device_id", 0)
+        if gpu_memory_limit is None:
+            gpu_memory_limit = config_service.get_config_value("gpu_memory_limit", 2048)
+        if enable_memory_arena is None:
+            enable_memory_arena = config_service.get_config_value("gpu_enable_memory_arena", True)
+        if cpu_threads is None:
+            cpu_threads = config_service.get_config_value("onnx_cpu_threads", 0)
+        if execution_mode is None:
+            execution_mode = config_service.get_config_value("onnx_execution_mode", "sequential")
+        if enable_model_cache is None:
+            enable_model_cache = config_service.get_config_value("onnx_enable_model_cache", False)
+    
+    # 设置默认值（如果仍为None）
+    if gpu_device_id is None:
+        gpu_device_id = 0
+    if gpu_memory_limit is None:
+        gpu_memory_limit = 2048
+    if enable_memory_arena is None:
+        enable_memory_arena = True
+    if cpu_threads is None:
+        cpu_threads = 0
+    if execution_mode is None:
+        execution_mode = "sequential"
+    if enable_model_cache is None:
+        enable_model_cache = False
+    
+    return (
+        gpu_device_id, gpu_memory_limit, enable_memory_arena,
+        cpu_threads, execution_mode, enable_model_cache
+    )
+
+
 def create_onnx_session_config(
     config_service: Optional['ConfigService'] = None,
     gpu_device_id: Optional[int] = None,
@@ -158,7 +214,8 @@ def create_onnx_session_config(
     cpu_threads: Optional[int] = None,
     execution_mode: Optional[str] = None,
     enable_model_cache: Optional[bool] = None,
-    model_path: Optional[Path] = None
+    model_path: Optional[Path] = None,
+    use_gpu: bool = True
 ) -> Tuple[Any, List[Union[str, Tuple[str, dict]]]]:
     """创建完整的ONNX Runtime会话配置（SessionOptions + Providers）。
     
@@ -174,6 +231,7 @@ def create_onnx_session_config(
         execution_mode: 执行模式sequential/parallel（None则从配置读取，默认sequential）
         enable_model_cache: 是否启用模型缓存（None则从配置读取，默认False）
         model_path: 模型路径（用于缓存）
+        use_gpu: 是否使用GPU加速（提供config_service时以gpu_acceleration配置为准）
         
     Returns:
         (sess_options, providers) 元组
@@ -189,37 +247,17 @@ def create_onnx_session_config(
         ...     providers=providers
         ... )
     """
+    ort = _get_ort()
     if ort is None:
         raise ImportError("需要安装 onnxruntime 库")
     
-    # 从配置服务读取参数（如果提供且参数为None）
-    if config_service is not None:
-        if gpu_device_id is None:
-            gpu_device_id = config_service.get_config_value("gpu_device_id", 0)
-        if gpu_memory_limit is None:
-            gpu_memory_limit = config_service.get_config_value("gpu_memory_limit", 2048)
-        if enable_memory_arena is None:
-            enable_memory_arena = config_service.get_config_value("gpu_enable_memory_arena", True)
-        if cpu_threads is None:
-            cpu_threads = config_service.get_config_value("onnx_cpu_threads", 0)
-        if execution_mode is None:
-            execution_mode = config_service.get_config_value("onnx_execution_mode", "sequential")
-        if enable_model_cache is None:
-            enable_model_cache = config_service.get_config_value("onnx_enable_model_cache", False)
-    
-    # 设置默认值（如果仍为None）
-    if gpu_device_id is None:
-        gpu_device_id = 0
-    if gpu_memory_limit is None:
-        gpu_memory_limit = 2048
-    if enable_memory_arena is None:
-        enable_memory_arena = True
-    if cpu_threads is None:
-        cpu_threads = 0
-    if execution_mode is None:
-        execution_mode = "sequential"
-    if enable_model_cache is None:
-        enable_model_cache = False
+    (
+        gpu_device_id, gpu_memory_limit, enable_memory_arena,
+        cpu_threads, execution_mode, enable_model_cache
+    ) = _resolve_session_params(
+        config_service, gpu_device_id, gpu_memory_limit, enable_memory_arena,
+        cpu_threads, execution_mode, enable_model_cache
+    )
     
     # 创建 SessionOptions
     sess_options = create_session_options(
@@ -232,6 +270,7 @@ def create_onnx_session_config(
     
     # 创建 Providers
     providers = create_provider_options(
+        use_gpu=use_gpu,
         gpu_device_id=gpu_device_id,
         gpu_memory_limit=gpu_memory_limit,
         config_service=config_service
@@ -240,6 +279,22 @@ def create_onnx_session_config(
     return sess_options, providers
 
 
+def configure_session_registry(config_service: 'ConfigService') -> None:
+    """把会话注册表的预算和空闲时长同步为当前配置。
+    
+    应用启动时调用一次，使未传入 config_service 创建的会话同样受配置的预算和
+    空闲时长约束；create_onnx_session 收到 config_service 时也会重新同步。
+    
+    Args:
+        config_service: 配置服务实例
+    """
+    get_session_registry().configure(
+        ram_budget_mb=config_service.get_config_value("onnx_session_ram_budget_mb", 2048),
+        vram_budget_mb=config_service.get_config_value("onnx_session_vram_budget_mb", 2048),
+        idle_ttl=config_service.get_config_value("onnx_session_idle_ttl", 300),
+    )
+
+
 def create_onnx_session(
     model_path: Path,
     config_service: Optional['ConfigService'] = None,
@@ -249,12 +304,17 @@ def create_onnx_session(
     cpu_threads: Optional[int] = None,
     execution_mode: Optional[str] = None,
     enable_model_cache: Optional[bool] = None,
-) -> Any:  # ort.InferenceSession
+    use_gpu: bool = True,
+) -> SessionHandle:
     """创建配置好的ONNX Runtime推理会话（一步到位）。
     
-    这是最便捷的函数，直接返回配置好的InferenceSession对象。
+    这是最便捷的函数，返回的句柄可以直接当作 InferenceSession 使用。
     如果提供 config_service，会自动从配置中读取所有参数。
     
+    会话由进程级注册表共享：模型路径、执行提供者和会话选项都相同时复用已加载的
+    会话。不再使用时调用句柄的 release()（句柄被回收时也会自动释放），空闲会话
+    由注册表按空闲时长和内存预算卸载。
+    
     Args:
         model_path: 模型文件路径
         config_service: 配置服务实例（可选，用于自动读取配置）
@@ -264,9 +324,10 @@ def create_onnx_session(
         cpu_threads: CPU推理线程数（None则从配置读取，默认0=自动）
         execution_mode: 执行模式sequential/parallel（None则从配置读取，默认sequential）
         enable_model_cache: 是否启用模型缓存（None则从配置读取，默认False）
+        use_gpu: 是否使用GPU加速（提供config_service时以gpu_acceleration配置为准）
         
     Returns:
-        配置好的 InferenceSession 对象
+        共享会话的句柄
         
     Raises:
         FileNotFoundError: 模型文件不存在
@@ -286,31 +347,47 @@ def create_onnx_session(
         ...     cpu_threads=4,
         ...     execution_mode="parallel"
         ... )
+        >>> session.release()
     """
+    ort = _get_ort()
     if ort is None:
         raise ImportError("需要安装 onnxruntime 库")
     
     if not model_path.exists():
         raise FileNotFoundError(f"模型文件不存在: {model_path}")
     
-    # 获取配置
-    sess_options, providers = create_onnx_session_config(
-        config_service=config_service,
+    if config_service is not None:
+        configure_session_registry(config_service)
+    
+    (
+        gpu_device_id, gpu_memory_limit, enable_memory_arena,
+        cpu_threads, execution_mode, enable_model_cache
+    ) = _resolve_session_params(
+        config_service, gpu_device_id, gpu_memory_limit, enable_memory_arena,
+        cpu_threads, execution_mode, enable_model_cache
+    )
+    
+    # Providers 决定注册表的键，先创建；SessionOptions 只在需要加载时创建
+    providers = create_provider_options(
+        use_gpu=use_gpu,
         gpu_device_id=gpu_device_id,
         gpu_memory_limit=gpu_memory_limit,
-        enable_memory_arena=enable_memory_arena,
-        cpu_threads=cpu_threads,
-        execution_mode=execution_mode,
-        enable_model_cache=enable_model_cache,
-        model_path=model_path
+        config_service=config_service
     )
     
-    # 创建会话
-    session = ort.InferenceSession(
-        str(model_path),
-        sess_options=sess_options,
-        providers=providers
-    )
+    def load() -> Any:
+        sess_options = create_session_options(
+            enable_memory_arena=enable_memory_arena,
+            cpu_threads=cpu_threads,
+            execution_mode=execution_mode,
+            enable_model_cache=enable_model_cache,
+            model_path=model_path
+        )
+        return ort.InferenceSession(
+            str(model_path),
+            sess_options=sess_options,
+            providers=providers
+        )
     
-    return session
-
+    options_key = (enable_memory_arena, cpu_threads, execution_mode, enable_model_cache)
+    return get_session_registry().acquire(model_path, providers, options_key, load)
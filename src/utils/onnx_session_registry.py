@@ -0,0 +1,430 @@
+# -*- coding: utf-8 -*-
+"""进程级 ONNX Runtime 会话注册表。
+
+同一模型文件、相同执行提供者和会话选项只创建一个 InferenceSession，各服务持有
+带引用计数的 SessionHandle。句柄全部释放后会话不会立即销毁，而是空闲缓存一段
+时间（再次使用时无需重新加载），超过空闲时长或常驻内存超出预算时按最久未使用的
+顺序淘汰。内存占用以模型文件大小估算，按执行设备分别计入内存（CPU）或显存（GPU）
+预算；仍被使用的会话不会被淘汰。用户主动卸载模型时以 release(evict=True) 释放，
+会话在空闲后立即卸载。
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from .logger import logger
+
+# 执行设备
+DEVICE_CPU = "cpu"
+DEVICE_GPU = "gpu"
+
+# 默认空闲时长（秒）：会话不再被使用后保留多久
+DEFAULT_IDLE_TTL = 300.0
+
+# 空闲检查的最短间隔（秒）
+_MIN_SWEEP_INTERVAL = 5.0
+
+_MB = 1024 * 1024
+
+# 不支持在同一会话上并发 Run 的执行提供者，共享会话时需要串行化推理
+_SERIAL_RUN_PROVIDERS = ("DmlExecutionProvider",)
+
+
+@dataclass
+class SessionStats:
+    """常驻会话的统计信息。
+
+    Attributes:
+        model_name: 模型文件名
+        model_path: 模型文件路径
+        providers: 会话实际使用的执行提供者
+        device: 执行设备，cpu 或 gpu
+        refcount: 当前持有的句柄数，0 表示空闲
+        size_mb: 估算的内存占用（MB）
+        loaded_at: 加载时间（time.time() 时间戳）
+        resident_seconds: 已常驻时长（秒）
+        idle_seconds: 已空闲时长（秒），使用中为 0
+        acquires: 被获取的次数（包括首次加载）
+    """
+    model_name: str
+    model_path: str
+    providers: List[str]
+    device: str
+    refcount: int
+    size_mb: float
+    loaded_at: float
+    resident_seconds: float
+    idle_seconds: float
+    acquires: int
+
+
+class _SessionEntry:
+    """注册表中的一个会话。"""
+
+    def __init__(self, key: Hashable, model_path: Path) -> None:
+        self.key = key
+        self.model_path = model_path
+        self.session: Any = None
+        self.providers: List[str] = []
+        self.device = DEVICE_CPU
+        self.size_bytes = 0
+        self.refcount = 0
+        self.acquires = 0
+        self.loaded_at = 0.0
+        self.loaded_monotonic = 0.0
+        self.idle_since = 0.0
+        # 加载锁：同一模型并发获取时只加载一次
+        self.load_lock = threading.Lock()
+        # 推理锁：执行提供者不支持并发 Run 时创建，其余情况为 None
+        self.run_lock: Optional[threading.Lock] = None
+        # 用户要求卸载时仍有其他句柄在用：最后一个句柄释放后立即卸载
+        self.evict_when_idle = False
+
+
+class SessionHandle:
+    """共享会话的句柄。
+
+    属性访问（run、get_inputs、get_providers 等）转发到底层 InferenceSession，
+    可直接当作会话使用。不再需要时调用 release()；句柄被回收时也会自动释放。
+    会话被多个服务共享，执行提供者不支持并发 Run（如 DirectML）时，run() 在
+    同一会话上串行执行。
+    """
+
+    def __init__(self, registry: "OnnxSessionRegistry", entry: _SessionEntry) -> None:
+        self._registry = registry
+        self._entry: Optional[_SessionEntry] = entry
+
+    @property
+    def session(self) -> Any:
+        """底层 InferenceSession。
+
+        Raises:
+            RuntimeError: 句柄已释放
+        """
+        entry = self._entry
+        if entry is None:
+            raise RuntimeError("ONNX 会话句柄已释放")
+        return entry.session
+
+    def run(self, *args: Any, **kwargs: Any) -> Any:
+        """执行推理，参数同 InferenceSession.run。"""
+        entry = self._entry
+        if entry is None:
+            raise RuntimeError("ONNX 会话句柄已释放")
+        if entry.run_lock is None:
+            return entry.session.run(*args, **kwargs)
+        with entry.run_lock:
+            return entry.session.run(*args, **kwargs)
+
+    @property
+    def released(self) -> bool:
+        """句柄是否已释放。"""
+        return self._entry is None
+
+    def release(self, evict: bool = False) -> None:
+        """释放句柄（可重复调用）。
+
+        Args:
+            evict: 是否在会话空闲后立即卸载（用户主动卸载模型时使用），
+                否则空闲会话按空闲时长和内存预算卸载
+        """
+        entry, self._entry = self._entry, None
+        if entry is not None:
+            self._registry._release(entry, evict)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("__") or name in ("_registry", "_entry"):
+            raise AttributeError(name)
+        return getattr(self.session, name)
+
+    def __del__(self) -> None:
+        try:
+            self.release()
+        except Exception:
+            # 解释器退出阶段可能已无法正常释放
+            pass
+
+    def __repr__(self) -> str:
+        entry = self._entry
+        if entry is None:
+            return "<SessionHandle released>"
+        return f"<SessionHandle {entry.model_path.name} {entry.device}>"
+
+
+class OnnxSessionRegistry:
+    """按 (模型路径, 执行提供者, 会话选项) 共享 ONNX Runtime 会话的注册表。"""
+
+    def __init__(
+        self,
+        ram_budget_mb: int = 0,
+        vram_budget_mb: int = 0,
+        idle_ttl: float = DEFAULT_IDLE_TTL
+    ) -> None:
+        """初始化注册表。
+
+        Args:
+            ram_budget_mb: CPU 会话的内存预算（MB），0 表示不限制
+            vram_budget_mb: GPU 会话的显存预算（MB），0 表示不限制
+            idle_ttl: 空闲会话的保留时长（秒），0 表示释放后立即销毁
+        """
+        self.ram_budget_mb = ram_budget_mb
+        self.vram_budget_mb = vram_budget_mb
+        self.idle_ttl = idle_ttl
+        self._entries: Dict[Hashable, _SessionEntry] = {}
+        self._lock = threading.RLock()
+        self._sweep_timer: Optional[threading.Timer] = None
+
+    def configure(
+        self,
+        ram_budget_mb: Optional[int] = None,
+        vram_budget_mb: Optional[int] = None,
+        idle_ttl: Optional[float] = None
+    ) -> None:
+        """更新预算和空闲时长（None 表示保持不变），立即按新设置淘汰。"""
+        with self._lock:
+            if ram_budget_mb is not None:
+                self.ram_budget_mb = max(0, int(ram_budget_mb))
+            if vram_budget_mb is not None:
+                self.vram_budget_mb = max(0, int(vram_budget_mb))
+            if idle_ttl is not None:
+                self.idle_ttl = max(0.0, float(idle_ttl))
+            # 空闲时长变化后按新的截止时间重新安排检查
+            if self._sweep_timer is not None:
+                self._sweep_timer.cancel()
+                self._sweep_timer = None
+            self._evict_expired()
+            self._enforce_budget()
+            self._schedule_sweep()
+
+    def acquire(
+        self,
+        model_path: Path,
+        providers: List[Any],
+        options_key: Tuple[Any, ...],
+        factory: Callable[[], Any]
+    ) -> SessionHandle:
+        """获取会话句柄，注册表中没有时调用 factory 创建。
+
+        Args:
+            model_path: 模型文件路径
+            providers: 请求的执行提供者（create_provider_options 的返回值）
+            options_key: 影响会话行为的选项（可哈希）
+            factory: 创建 InferenceSession 的无参函数
+
+        Returns:
+            会话句柄
+
+        Raises:
+            factory 抛出的异常（加载失败时不会留下注册项）
+        """
+        model_path = Path(model_path).resolve()
+        key = (str(model_path), _providers_key(providers), tuple(options_key))
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _SessionEntry(key, model_path)
+                self._entries[key] = entry
+            # 先占住引用，避免加载期间被淘汰
+            entry.refcount += 1
+            entry.acquires += 1
+            entry.evict_when_idle = False
+
+        with entry.load_lock:
+            if entry.session is None:
+                try:
+                    self._load(entry, factory)
+                except Exception:
+                    with self._lock:
+                        entry.refcount -= 1
+                        if entry.refcount <= 0 and self._entries.get(key) is entry:
+                            del self._entries[key]
+                    raise
+                with self._lock:
+                    self._enforce_budget()
+            else:
+                logger.debug(f"复用 ONNX 会话: {model_path.name} (引用 {entry.refcount})")
+
+        return SessionHandle(self, entry)
+
+    def _load(self, entry: _SessionEntry, factory: Callable[[], Any]) -> None:
+        """加载会话并记录设备和估算大小。"""
+        start = time.perf_counter()
+        session = factory()
+        try:
+            providers = list(session.get_providers())
+        except Exception:
+            providers = []
+        entry.providers = providers
+        entry.device = DEVICE_GPU if providers and providers[0] != "CPUExecutionProvider" else DEVICE_CPU
+        if providers and providers[0] in _SERIAL_RUN_PROVIDERS:
+            entry.run_lock = threading.Lock()
+        entry.size_bytes = _estimate_size(entry.model_path)
+        entry.loaded_at = time.time()
+        entry.loaded_monotonic = time.monotonic()
+        entry.session = session
+        logger.info(
+            f"加载 ONNX 会话: {entry.model_path.name} ({entry.device}, "
+            f"约 {entry.size_bytes / _MB:.0f}MB, {time.perf_counter() - start:.1f}s)"
+        )
+
+    def _release(self, entry: _SessionEntry, evict: bool = False) -> None:
+        """句柄释放回调。"""
+        with self._lock:
+            entry.refcount -= 1
+            if evict:
+                entry.evict_when_idle = True
+            if entry.refcount > 0:
+                return
+            entry.refcount = 0
+            entry.idle_since = time.monotonic()
+            if entry.evict_when_idle:
+                self._evict(entry, "手动卸载")
+                return
+            if self.idle_ttl <= 0:
+                self._evict(entry, "释放")
+                return
+            self._enforce_budget()
+            self._schedule_sweep()
+
+    def _evict(self, entry: _SessionEntry, reason: str) -> None:
+        """从注册表移除会话（调用方持有 _lock，且会话空闲）。"""
+        if self._entries.get(entry.key) is entry:
+            del self._entries[entry.key]
+        if entry.session is not None:
+            resident = time.monotonic() - entry.loaded_monotonic
+            logger.info(f"卸载 ONNX 会话: {entry.model_path.name} ({reason}, 常驻 {resident:.0f}s)")
+        entry.session = None
+
+    def _idle_entries(self) -> List[_SessionEntry]:
+        """已加载且空闲的会话，按空闲开始时间排序（最久未使用在前）。"""
+        idle = [e for e in list(self._entries.values()) if e.refcount == 0 and e.session is not None]
+        idle.sort(key=lambda e: e.idle_since)
+        return idle
+
+    def _evict_expired(self) -> None:
+        """淘汰空闲超过 idle_ttl 的会话。"""
+        now = time.monotonic()
+        for entry in self._idle_entries():
+            if now - entry.idle_since >= self.idle_ttl:
+                self._evict(entry, "空闲超时")
+
+    def _enforce_budget(self) -> None:
+        """常驻内存超出预算时按最久未使用的顺序淘汰空闲会话。"""
+        for device, budget_mb in ((DEVICE_CPU, self.ram_budget_mb), (DEVICE_GPU, self.vram_budget_mb)):
+            if budget_mb <= 0:
+                continue
+            budget = budget_mb * _MB
+            used = sum(e.size_bytes for e in list(self._entries.values()) if e.device == device and e.session is not None)
+            for entry in self._idle_entries():
+                if used <= budget:
+                    break
+                if entry.device == device:
+                    used -= entry.size_bytes
+                    self._evict(entry, "超出预算")
+            if used > budget:
+                logger.debug(
+                    f"{device} 会话占用约 {used / _MB:.0f}MB，超出预算 {budget_mb}MB（均在使用中）"
+                )
+
+    def _schedule_sweep(self) -> None:
+        """有空闲会话时安排下一次空闲检查（调用方持有 _lock）。"""
+        if self._sweep_timer is not None or self.idle_ttl <= 0:
+            return
+        idle = self._idle_entries()
+        if not idle:
+            return
+        delay = max(_MIN_SWEEP_INTERVAL, idle[0].idle_since + self.idle_ttl - time.monotonic())
+        timer = threading.Timer(delay, self._sweep)
+        timer.daemon = True
+        self._sweep_timer = timer
+        timer.start()
+
+    def _sweep(self) -> None:
+        """空闲检查定时器回调。"""
+        with self._lock:
+            self._sweep_timer = None
+            self._evict_expired()
+            self._schedule_sweep()
+
+    def evict_idle(self) -> int:
+        """立即卸载所有空闲会话。
+
+        Returns:
+            卸载的会话数
+        """
+        with self._lock:
+            idle = self._idle_entries()
+            for entry in idle:
+                self._evict(entry, "手动清理")
+            return len(idle)
+
+    def stats(self) -> List[SessionStats]:
+        """当前常驻会话的统计信息，按加载时间排序。"""
+        now = time.monotonic()
+        with self._lock:
+            entries = [e for e in list(self._entries.values()) if e.session is not None]
+            return [
+                SessionStats(
+                    model_name=e.model_path.name,
+                    model_path=str(e.model_path),
+                    providers=list(e.providers),
+                    device=e.device,
+                    refcount=e.refcount,
+                    size_mb=e.size_bytes / _MB,
+                    loaded_at=e.loaded_at,
+                    resident_seconds=now - e.loaded_monotonic,
+                    idle_seconds=now - e.idle_since if e.refcount == 0 else 0.0,
+                    acquires=e.acquires,
+                )
+                for e in sorted(entries, key=lambda e: e.loaded_at)
+            ]
+
+    def memory_usage(self) -> Dict[str, float]:
+        """各设备常驻会话的估算占用（MB）。"""
+        usage = {DEVICE_CPU: 0.0, DEVICE_GPU: 0.0}
+        with self._lock:
+            for entry in list(self._entries.values()):
+                if entry.session is not None:
+                    usage[entry.device] += entry.size_bytes / _MB
+        return usage
+
+
+def _providers_key(providers: List[Any]) -> Tuple[Any, ...]:
+    """把执行提供者列表转换为可哈希的键。"""
+    key = []
+    for provider in providers:
+        if isinstance(provider, (tuple, list)):
+            name, options = provider[0], provider[1] if len(provider) > 1 else {}
+            key.append((name, tuple(sorted((str(k), repr(v)) for k, v in dict(options).items()))))
+        else:
+            key.append((provider, ()))
+    return tuple(key)
+
+
+def _estimate_size(model_path: Path) -> int:
+    """以模型文件（含外部权重数据）大小估算会话内存占用。"""
+    size = 0
+    for path in (model_path, model_path.with_suffix(".data"), Path(f"{model_path}.data")):
+        try:
+            size += path.stat().st_size
+        except OSError:
+            pass
+    return size
+
+
+_registry: Optional[OnnxSessionRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_session_registry() -> OnnxSessionRegistry:
+    """获取进程级会话注册表。"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = OnnxSessionRegistry()
+    return _registry
@@ -39,9 +39,12 @@ def _setup_library_paths():
     
     # 1. 添加 ONNX Runtime 库路径（优先查找同目录或相对目录）
     try:
-        # 先尝试找到 site-packages 中的 onnxruntime
-        import onnxruntime
-        onnxruntime_path = Path(onnxruntime.__file__).parent
+        # 先尝试找到 site-packages 中的 onnxruntime（只查找位置，不导入，避免拖慢启动）
+        import importlib.util
+        onnxruntime_spec = importlib.util.find_spec("onnxruntime")
+        if onnxruntime_spec is None or not onnxruntime_spec.origin:
+            raise ImportError("onnxruntime")
+        onnxruntime_path = Path(onnxruntime_spec.origin).parent
         
         # 查找 ONNX Runtime 库文件目录
         ort_lib_path = onnxruntime_path / "capi"
@@ -0,0 +1,495 @@
+# -*- coding: utf-8 -*-
+"""文本差异计算模块。
+
+行级差异：先把每行内容映射为整数 ID（相同内容只比较一次），去掉公共前后缀，
+再以两侧都只出现一次的行为锚点（patience diff）把输入切成小段；没有锚点的段
+丢弃只在一侧出现的行后，用线性空间的 Myers O(ND) 算法求最短编辑脚本。编辑代价
+超过上限的段整体按替换处理，避免病态输入长时间卡住。
+
+结果以紧凑的操作码数组保存，可以按显示行随机访问；行内字符差异只在取出对应
+行时计算并缓存，界面只需处理当前显示的行。
+"""
+
+import bisect
+import difflib
+import html
+from array import array
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# 操作码类型
+EQUAL, DELETE, INSERT, REPLACE = 0, 1, 2, 3
+_TAG_NAMES = ("equal", "delete", "insert", "replace")
+
+# Myers 算法单段允许的最大编辑代价（超出后该段整体按替换处理）
+MAX_EDIT_COST = 2048
+
+# 超过该长度的行不计算行内差异
+INTRALINE_MAX_CHARS = 2000
+
+# 行内差异的最低相似度，低于该值的行对整行高亮
+INTRALINE_MIN_RATIO = 0.5
+
+# 导出 HTML 的样式
+_HTML_STYLE = """
+body { font-family: sans-serif; margin: 16px; }
+table.diff { border-collapse: collapse; font-family: Consolas, Menlo, monospace; font-size: 13px; width: 100%; }
+table.diff th { background: #f0f0f0; padding: 4px 8px; text-align: left; }
+table.diff td { padding: 1px 6px; vertical-align: top; white-space: pre-wrap; word-break: break-all; }
+table.diff td.num { color: #888; text-align: right; user-select: none; width: 1%; white-space: nowrap; }
+td.del { background: #ffecec; } td.ins { background: #eaffea; }
+td.del span { background: #ffb6ba; } td.ins span { background: #a6f3a6; }
+tr.skip td { background: #f4f8ff; color: #888; text-align: center; }
+"""
+
+
+@dataclass
+class DiffRow:
+    """一个显示行。
+
+    Attributes:
+        type: 行类型（equal / delete / insert）
+        left_line: 左侧行号（从 1 开始），插入行为 None
+        right_line: 右侧行号（从 1 开始），删除行为 None
+        content: 行内容（原始文本）
+        highlights: 行内变化的字符区间 [(start, end), ...]，为空表示不做行内高亮
+    """
+    type: str
+    left_line: Optional[int]
+    right_line: Optional[int]
+    content: str
+    highlights: List[Tuple[int, int]] = field(default_factory=list)
+
+
+def _intern(a: Sequence[str], b: Sequence[str], key: Optional[Callable[[str], str]]) -> Tuple[List[int], List[int]]:
+    """把行内容映射为整数 ID。"""
+    ids: Dict[str, int] = {}
+    setdefault = ids.setdefault
+    if key is None:
+        a_ids = [setdefault(line, len(ids)) for line in a]
+        b_ids = [setdefault(line, len(ids)) for line in b]
+    else:
+        a_ids = [setdefault(key(line), len(ids)) for line in a]
+        b_ids = [setdefault(key(line), len(ids)) for line in b]
+    return a_ids, b_ids
+
+
+def _patience_anchors(a: List[int], b: List[int], alo: int, ahi: int, blo: int, bhi: int) -> List[Tuple[int, int]]:
+    """找出两侧都只出现一次的行，返回其中按位置递增的最长序列。"""
+    counts: Dict[int, int] = {}
+    for i in range(alo, ahi):
+        counts[a[i]] = counts.get(a[i], 0) + 1
+    b_pos: Dict[int, int] = {}
+    for j in range(blo, bhi):
+        value = b[j]
+        if counts.get(value) != 1:
+            continue
+        # 右侧出现多次的行记为 -1
+        b_pos[value] = -1 if value in b_pos else j
+
+    candidates = [(i, b_pos[a[i]]) for i in range(alo, ahi) if b_pos.get(a[i], -1) >= 0]
+    if not candidates:
+        return []
+
+    # 最长递增子序列（patience sorting）
+    tails: List[int] = []        # 每个长度的最小结尾 j
+    tail_index: List[int] = []   # 对应的候选下标
+    prev = [-1] * len(candidates)
+    for index, (_, j) in enumerate(candidates):
+        pos = bisect.bisect_left(tails, j)
+        if pos == len(tails):
+            tails.append(j)
+            tail_index.append(index)
+        else:
+            tails[pos] = j
+            tail_index[pos] = index
+        prev[index] = tail_index[pos - 1] if pos > 0 else -1
+
+    anchors = []
+    index = tail_index[-1]
+    while index >= 0:
+        anchors.append(candidates[index])
+        index = prev[index]
+    anchors.reverse()
+    return anchors
+
+
+def _middle_snake(
+    x: List[int], y: List[int], xlo: int, xhi: int, ylo: int, yhi: int, max_cost: int
+) -> Optional[Tuple[int, int, int, int]]:
+    """Myers 线性空间算法的中间蛇形，返回 (起点 x, 起点 y, 终点 x, 终点 y)。
+
+    编辑代价超过 max_cost 时返回 None。
+    """
+    n = xhi - xlo
+    m = yhi - ylo
+    delta = n - m
+    odd = delta & 1
+    dmax = min((n + m + 1) // 2, (max_cost + 1) // 2)
+    offset = dmax + 1
+    vf = [0] * (2 * dmax + 3)
+    vb = [0] * (2 * dmax + 3)
+
+    for d in range(dmax + 1):
+        # 正向搜索
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and vf[offset + k - 1] < vf[offset + k + 1]):
+                px = vf[offset + k + 1]
+            else:
+                px = vf[offset + k - 1] + 1
+            py = px - k
+            sx, sy = px, py
+            while px < n and py < m and x[xlo + px] == y[ylo + py]:
+                px += 1
+                py += 1
+            vf[offset + k] = px
+            kr = delta - k
+            if odd and -(d - 1) <= kr <= d - 1 and px + vb[offset + kr] >= n:
+                return xlo + sx, ylo + sy, xlo + px, ylo + py
+
+        # 反向搜索（u、v 为距离末尾的偏移）
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and vb[offset + k - 1] < vb[offset + k + 1]):
+                pu = vb[offset + k + 1]
+            else:
+                pu = vb[offset + k - 1] + 1
+            pv = pu - k
+            su, sv = pu, pv
+            while pu < n and pv < m and x[xhi - 1 - pu] == y[yhi - 1 - pv]:
+                pu += 1
+                pv += 1
+            vb[offset + k] = pu
+            kf = delta - k
+            if not odd and -d <= kf <= d and pu + vf[offset + kf] >= n:
+                return xhi - pu, yhi - pv, xhi - su, yhi - sv
+    return None
+
+
+def _myers_matches(x: List[int], y: List[int], max_cost: int) -> List[Tuple[int, int]]:
+    """求 x、y 的最长公共子序列，返回匹配的下标对。"""
+    pairs: List[Tuple[int, int]] = []
+    stack = [(0, len(x), 0, len(y))]
+    while stack:
+        xlo, xhi, ylo, yhi = stack.pop()
+        while xlo < xhi and ylo < yhi and x[xlo] == y[ylo]:
+            pairs.append((xlo, ylo))
+            xlo += 1
+            ylo += 1
+        while xlo < xhi and ylo < yhi and x[xhi - 1] == y[yhi - 1]:
+            xhi -= 1
+            yhi -= 1
+            pairs.append((xhi, yhi))
+        if xlo == xhi or ylo == yhi:
+            continue
+
+        snake = _middle_snake(x, y, xlo, xhi, ylo, yhi, max_cost)
+        if snake is None:
+            # 代价过高，该段按替换处理
+            continue
+        sx, sy, ex, ey = snake
+        if (sx, sy, ex, ey) in ((xlo, ylo, xlo, ylo), (xhi, yhi, xhi, yhi)):
+            continue
+        for offset in range(ex - sx):
+            pairs.append((sx + offset, sy + offset))
+        stack.append((xlo, sx, ylo, sy))
+        stack.append((ex, xhi, ey, yhi))
+    return pairs
+
+
+def _matching_blocks(a: List[int], b: List[int], max_cost: int) -> List[Tuple[int, int, int]]:
+    """计算匹配块 [(i, j, n), ...]（按位置排序，末尾带 (len(a), len(b), 0) 哨兵）。"""
+    blocks: List[Tuple[int, int, int]] = []
+    stack = [(0, len(a), 0, len(b))]
+    while stack:
+        alo, ahi, blo, bhi = stack.pop()
+
+        # 公共前缀
+        start = alo
+        while alo < ahi and blo < bhi and a[alo] == b[blo]:
+            alo += 1
+            blo += 1
+        if alo > start:
+            blocks.append((start, blo - (alo - start), alo - start))
+
+        # 公共后缀
+        end = ahi
+        while alo < ahi and blo < bhi and a[ahi - 1] == b[bhi - 1]:
+            ahi -= 1
+            bhi -= 1
+        if ahi < end:
+            blocks.append((ahi, bhi, end - ahi))
+
+        if alo == ahi or blo == bhi:
+            continue
+
+        anchors = _patience_anchors(a, b, alo, ahi, blo, bhi)
+        if anchors:
+            i0, j0 = alo, blo
+            for i, j in anchors:
+                blocks.append((i, j, 1))
+                stack.append((i0, i, j0, j))
+                i0, j0 = i + 1, j + 1
+            stack.append((i0, ahi, j0, bhi))
+            continue
+
+        # 没有锚点：只在一侧出现的行一定是增删，丢弃后再做 Myers
+        b_values = set(b[blo:bhi])
+        a_index = [i for i in range(alo, ahi) if a[i] in b_values]
+        if not a_index:
+            continue
+        a_values = set(a[alo:ahi])
+        b_index = [j for j in range(blo, bhi) if b[j] in a_values]
+        x = [a[i] for i in a_index]
+        y = [b[j] for j in b_index]
+        for xi, yi in _myers_matches(x, y, max_cost):
+            blocks.append((a_index[xi], b_index[yi], 1))
+
+    blocks.sort()
+    # 合并相邻的块
+    merged: List[Tuple[int, int, int]] = []
+    for i, j, n in blocks:
+        if merged:
+            pi, pj, pn = merged[-1]
+            if pi + pn == i and pj + pn == j:
+                merged[-1] = (pi, pj, pn + n)
+                continue
+        merged.append((i, j, n))
+    merged.append((len(a), len(b), 0))
+    return merged
+
+
+class TextDiff:
+    """行级文本差异结果。
+
+    操作码按 (类型, i1, i2, j1, j2) 扁平存储在整数数组中，语义与
+    difflib.SequenceMatcher.get_opcodes 相同。显示行按操作码顺序展开：
+    替换块先显示删除的行，再显示新增的行。
+    """
+
+    def __init__(self, a: Sequence[str], b: Sequence[str], ops: array) -> None:
+        self.a = a
+        self.b = b
+        self._ops = ops
+        self._intraline: Dict[Tuple[int, int], Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]] = {}
+
+        # 每个操作码之前的显示行数（全部行 / 仅差异行），用于按行随机访问
+        self._row_starts = array('l', [0])
+        self._diff_row_starts = array('l', [0])
+        self.added = self.removed = self.equal = 0
+        for tag, i1, i2, j1, j2 in self.opcodes():
+            rows = (i2 - i1) + (j2 - j1) if tag != EQUAL else i2 - i1
+            self._row_starts.append(self._row_starts[-1] + rows)
+            self._diff_row_starts.append(self._diff_row_starts[-1] + (0 if tag == EQUAL else rows))
+            if tag == EQUAL:
+                self.equal += i2 - i1
+            else:
+                self.removed += i2 - i1
+                self.added += j2 - j1
+
+    @classmethod
+    def compute(
+        cls,
+        a: Sequence[str],
+        b: Sequence[str],
+        key: Optional[Callable[[str], str]] = None,
+        max_cost: int = MAX_EDIT_COST
+    ) -> 'TextDiff':
+        """计算两组行的差异。
+
+        Args:
+            a: 左侧行列表
+            b: 右侧行列表
+            key: 比较前对每行的变换（如忽略大小写、空白），显示仍使用原始内容
+            max_cost: 单段允许的最大编辑代价
+
+        Returns:
+            差异结果
+        """
+        a_ids, b_ids = _intern(a, b, key)
+        ops = array('l')
+        i = j = 0
+        for bi, bj, n in _matching_blocks(a_ids, b_ids, max_cost):
+            if i < bi and j < bj:
+                ops.extend((REPLACE, i, bi, j, bj))
+            elif i < bi:
+                ops.extend((DELETE, i, bi, j, bj))
+            elif j < bj:
+                ops.extend((INSERT, i, bi, j, bj))
+            if n:
+                ops.extend((EQUAL, bi, bi + n, bj, bj + n))
+            i, j = bi + n, bj + n
+        return cls(a, b, ops)
+
+    @property
+    def has_changes(self) -> bool:
+        """是否存在差异。"""
+        return bool(self.added or self.removed)
+
+    def __len__(self) -> int:
+        """操作码数量。"""
+        return len(self._ops) // 5
+
+    def opcodes(self) -> Iterator[Tuple[int, int, int, int, int]]:
+        """遍历操作码 (类型, i1, i2, j1, j2)，类型为 EQUAL/DELETE/INSERT/REPLACE。"""
+        ops = self._ops
+        for index in range(0, len(ops), 5):
+            yield ops[index], ops[index + 1], ops[index + 2], ops[index + 3], ops[index + 4]
+
+    def get_opcodes(self) -> List[Tuple[str, int, int, int, int]]:
+        """与 difflib.SequenceMatcher.get_opcodes 格式相同的操作码列表。"""
+        return [(_TAG_NAMES[tag], i1, i2, j1, j2) for tag, i1, i2, j1, j2 in self.opcodes()]
+
+    def row_count(self, only_changes: bool = False) -> int:
+        """显示行总数。
+
+        Args:
+            only_changes: 是否只统计差异行
+        """
+        starts = self._diff_row_starts if only_changes else self._row_starts
+        return starts[-1]
+
+    def rows(self, start: int, stop: int, only_changes: bool = False) -> List[DiffRow]:
+        """取出 [start, stop) 范围内的显示行（行内差异在此时计算）。
+
+        Args:
+            start: 起始显示行
+            stop: 结束显示行（不包含）
+            only_changes: 是否跳过相同的行
+
+        Returns:
+            显示行列表
+        """
+        starts = self._diff_row_starts if only_changes else self._row_starts
+        stop = min(stop, starts[-1])
+        if start >= stop:
+            return []
+
+        result: List[DiffRow] = []
+        op_index = bisect.bisect_right(starts, start) - 1
+        row = start
+        while row < stop:
+            base = op_index * 5
+            tag, i1, i2, j1, j2 = self._ops[base:base + 5]
+            offset = row - starts[op_index]
+            end = min(stop, starts[op_index + 1]) - starts[op_index]
+            for k in range(offset, end):
+                result.append(self._make_row(tag, i1, i2, j1, j2, k))
+            row += end - offset
+            op_index += 1
+        return result
+
+    def to_html(self, fromdesc: str = "", todesc: str = "", context: Optional[int] = 3) -> str:
+        """生成左右对照的 HTML 页面。
+
+        直接使用已计算的操作码，替换块中的行按顺序两两对照并标出行内差异。
+
+        Args:
+            fromdesc: 左侧标题
+            todesc: 右侧标题
+            context: 差异前后保留的相同行数，None 表示输出全部相同行
+
+        Returns:
+            HTML 文本
+        """
+        parts = [
+            '<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n<title>Text Diff</title>\n',
+            f'<style>{_HTML_STYLE}</style>\n</head>\n<body>\n<table class="diff">\n',
+            f'<tr><th colspan="2">{html.escape(fromdesc)}</th><th colspan="2">{html.escape(todesc)}</th></tr>\n',
+        ]
+        ops = list(self.opcodes())
+        if not self.has_changes:
+            parts.append('<tr class="skip"><td colspan="4">没有差异</td></tr>\n')
+        for index, (tag, i1, i2, j1, j2) in enumerate(ops):
+            if tag == EQUAL:
+                count = i2 - i1
+                if context is None:
+                    blocks = [range(count)]
+                else:
+                    # 上一个差异之后、下一个差异之前各保留 context 行
+                    top = min(context, count) if index > 0 else 0
+                    bottom = min(context, count) if index + 1 < len(ops) else 0
+                    if top + bottom >= count:
+                        blocks = [range(count)]
+                    else:
+                        blocks = [range(top), range(count - bottom, count)]
+                for block_index, block in enumerate(blocks):
+                    if block_index == 1:
+                        skipped = count - len(blocks[0]) - len(block)
+                        parts.append(f'<tr class="skip"><td colspan="4">… 省略 {skipped} 行相同内容 …</td></tr>\n')
+                    for k in block:
+                        line = _html_line(self.a[i1 + k], [])
+                        right = _html_line(self.b[j1 + k], [])
+                        parts.append(
+                            f'<tr><td class="num">{i1 + k + 1}</td><td>{line}</td>'
+                            f'<td class="num">{j1 + k + 1}</td><td>{right}</td></tr>\n'
+                        )
+                continue
+
+            for k in range(max(i2 - i1, j2 - j1)):
+                i, j = i1 + k, j1 + k
+                left_ranges: List[Tuple[int, int]] = []
+                right_ranges: List[Tuple[int, int]] = []
+                if i < i2 and j < j2:
+                    left_ranges, right_ranges = self._intraline_pair(i, j)
+                if i < i2:
+                    left = f'<td class="num">{i + 1}</td><td class="del">{_html_line(self.a[i], left_ranges)}</td>'
+                else:
+                    left = '<td class="num"></td><td></td>'
+                if j < j2:
+                    right = f'<td class="num">{j + 1}</td><td class="ins">{_html_line(self.b[j], right_ranges)}</td>'
+                else:
+                    right = '<td class="num"></td><td></td>'
+                parts.append(f'<tr>{left}{right}</tr>\n')
+
+        parts.append('</table>\n</body>\n</html>\n')
+        return "".join(parts)
+
+    def _make_row(self, tag: int, i1: int, i2: int, j1: int, j2: int, k: int) -> DiffRow:
+        """生成操作码内第 k 个显示行。"""
+        if tag == EQUAL:
+            return DiffRow("equal", i1 + k + 1, j1 + k + 1, self.a[i1 + k])
+        deleted = i2 - i1
+        if k < deleted:
+            i = i1 + k
+            highlights = self._intraline_pair(i, j1 + k)[0] if tag == REPLACE and j1 + k < j2 else []
+            return DiffRow("delete", i + 1, None, self.a[i], highlights)
+        j = j1 + k - deleted
+        highlights = self._intraline_pair(i1 + k - deleted, j)[1] if tag == REPLACE and i1 + k - deleted < i2 else []
+        return DiffRow("insert", None, j + 1, self.b[j], highlights)
+
+    def _intraline_pair(self, i: int, j: int) -> Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]:
+        """计算替换块中一对行的字符级差异（结果缓存）。"""
+        cached = self._intraline.get((i, j))
+        if cached is not None:
+            return cached
+
+        left, right = self.a[i], self.b[j]
+        left_ranges: List[Tuple[int, int]] = []
+        right_ranges: List[Tuple[int, int]] = []
+        if len(left) <= INTRALINE_MAX_CHARS and len(right) <= INTRALINE_MAX_CHARS:
+            matcher = difflib.SequenceMatcher(None, left, right, autojunk=False)
+            if matcher.real_quick_ratio() >= INTRALINE_MIN_RATIO and matcher.ratio() >= INTRALINE_MIN_RATIO:
+                for tag, a1, a2, b1, b2 in matcher.get_opcodes():
+                    if tag == 'equal':
+                        continue
+                    if a1 < a2:
+                        left_ranges.append((a1, a2))
+                    if b1 < b2:
+                        right_ranges.append((b1, b2))
+
+        self._intraline[(i, j)] = (left_ranges, right_ranges)
+        return left_ranges, right_ranges
+
+
+def _html_line(text: str, highlights: List[Tuple[int, int]]) -> str:
+    """转义一行文本，行内变化的区间用 <span> 标出。"""
+    if not highlights:
+        return html.escape(text)
+    pieces = []
+    position = 0
+    for start, end in highlights:
+        pieces.append(html.escape(text[position:start]))
+        pieces.append(f'<span>{html.escape(text[start:end])}</span>')
+        position = end
+    pieces.append(html.escape(text[position:]))
+    return "".join(pieces)
@@ -4,7 +4,97 @@
 集中注册所有可搜索的工具。
 """
 
+from functools import lru_cache
+from typing import Any
+
 from utils import register_tool_manual
+from utils.lazy_import import import_object
+
+
+# 工具ID → 视图类（"模块路径:类名"），视图模块在首次打开工具时才导入
+TOOL_VIEWS = {
+    # 图片处理
+    "image.compress": "views.image.compress_view:ImageCompressView",
+    "image.format": "views.image.format_view:ImageFormatView",
+    "image.resize": "views.image.resize_view:ImageResizeView",
+    "image.crop": "views.image.crop_view:ImageCropView",
+    "image.rotate": "views.image.rotate_view:ImageRotateView",
+    "image.background": "views.image.background_view:ImageBackgroundView",
+    "image.watermark": "views.image.watermark_view:ImageWatermarkView",
+    "image.watermark_remove": "views.image.watermark_remove_view:ImageWatermarkRemoveView",
+    "image.info": "views.image.info_view:ImageInfoView",
+    "image.exif": "views.image.remove_exif_view:ImageRemoveExifView",
+    "image.qrcode": "views.image.qrcode_view:QRCodeGeneratorView",
+    "image.to_base64": "views.image.to_base64_view:ImageToBase64View",
+    "image.gif": "views.image.gif_adjustment_view:GifAdjustmentView",
+    "image.enhance": "views.image.enhance_view:ImageEnhanceView",
+    "image.puzzle.merge": "views.image.puzzle.merge_view:ImagePuzzleMergeView",
+    "image.puzzle.split": "views.image.puzzle.split_view:ImagePuzzleSplitView",
+    "image.search": "views.image.search_view:ImageSearchView",
+    "image.ocr": "views.image.ocr_view:OCRView",
+    # 音频处理
+    "audio.format": "views.media.audio_format_view:AudioFormatView",
+    "audio.compress": "views.media.audio_compress_view:AudioCompressView",
+    "audio.speed": "views.media.audio_speed_view:AudioSpeedView",
+    "audio.vocal_extraction": "views.media.vocal_extraction_view:VocalExtractionView",
+    "audio.to_text": "views.media.audio_to_text_view:AudioToTextView",
+    # 视频处理
+    "video.compress": "views.media.video_compress_view:VideoCompressView",
+    "video.convert": "views.media.video_convert_view:VideoConvertView",
+    "video.extract_audio": "views.media.video_extract_audio_view:VideoExtractAudioView",
+    "video.speed": "views.media.video_speed_view:VideoSpeedView",
+    "video.vocal_separation": "views.media.video_vocal_separation_view:VideoVocalSeparationView",
+    "video.watermark": "views.media.video_watermark_view:VideoWatermarkView",
+    "video.repair": "views.media.video_repair_view:VideoRepairView",
+    "video.enhance": "views.media.video_enhance_view:VideoEnhanceView",
+    "video.interpolation": "views.media.video_interpolation_view:VideoInterpolationView",
+    "video.subtitle_remove": "views.media.subtitle_remove_view:SubtitleRemoveView",
+    "video.subtitle": "views.media.video_subtitle_view:VideoSubtitleView",
+    "video.screen_record": "views.media.screen_record_view:ScreenRecordView",
+    # 开发工具
+    "dev.base64_to_image": "views.dev_tools.base64_to_image_view:Base64ToImageView",
+    "dev.encoding": "views.dev_tools.encoding_convert_view:EncodingConvertView",
+    "dev.json_viewer": "views.dev_tools.json_viewer_view:JsonViewerView",
+    "dev.http_client": "views.dev_tools.http_client_view:HttpClientView",
+    "dev.websocket_client": "views.dev_tools.websocket_client_view:WebSocketClientView",
+    "dev.encoder_decoder": "views.dev_tools.encoder_decoder_view:EncoderDecoderView",
+    "dev.regex_tester": "views.dev_tools.regex_tester_view:RegexTesterView",
+    "dev.timestamp_tool": "views.dev_tools.timestamp_tool_view:TimestampToolView",
+    "dev.jwt_tool": "views.dev_tools.jwt_tool_view:JwtToolView",
+    "dev.uuid_generator": "views.dev_tools.uuid_generator_view:UuidGeneratorView",
+    "dev.color_tool": "views.dev_tools.color_tool_view:ColorToolView",
+    "dev.markdown_viewer": "views.dev_tools.markdown_viewer_view:MarkdownViewerView",
+    "dev.dns_lookup": "views.dev_tools.dns_lookup_view:DnsLookupView",
+    "dev.port_scanner": "views.dev_tools.port_scanner_view:PortScannerView",
+    "dev.format_convert": "views.dev_tools.format_convert_view:FormatConvertView",
+    "dev.text_diff": "views.dev_tools.text_diff_view:TextDiffView",
+    "dev.crypto_tool": "views.dev_tools.crypto_tool_view:CryptoToolView",
+    "dev.sql_formatter": "views.dev_tools.sql_formatter_view:SqlFormatterView",
+    "dev.cron_tool": "views.dev_tools.cron_tool_view:CronToolView",
+    # 其他工具
+    "others.windows_update": "views.others.windows_update_view:WindowsUpdateView",
+    "others.image_to_url": "views.others.image_to_url_view:ImageToUrlView",
+    "others.file_to_url": "views.others.file_to_url_view:FileToUrlView",
+    "others.icp_query": "views.others.icp_query_view:ICPQueryView",
+    "others.id_photo": "views.others.id_photo_view:IDPhotoView",
+    "others.translate": "views.others.translate_view:TranslateView",
+}
+
+
+@lru_cache(maxsize=None)
+def load_tool_view(tool_id: str) -> Any:
+    """按工具ID导入并返回视图类（首次调用时才导入视图模块）。
+    
+    Args:
+        tool_id: 工具ID，如 "image.compress"
+    
+    Returns:
+        视图类
+    
+    Raises:
+        KeyError: 工具ID未登记视图
+    """
+    return import_object(TOOL_VIEWS[tool_id])
 
 
 def register_all_tools():
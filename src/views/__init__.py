@@ -4,12 +4,19 @@
 提供应用程序的所有视图组件。
 """
 
-from views.main_view import MainView
-from views.settings_view import SettingsView
-from views.recommendations_view import RecommendationsView
-from views.image import ImageView
-from views.media import MediaView
-from views.dev_tools import DevToolsView
+from utils.lazy_import import lazy_exports
+
+# 视图模块在首次访问时再导入
+_LAZY_EXPORTS = {
+    "MainView": "views.main_view",
+    "SettingsView": "views.settings_view",
+    "RecommendationsView": "views.recommendations_view",
+    "ImageView": "views.image",
+    "MediaView": "views.media",
+    "DevToolsView": "views.dev_tools",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _LAZY_EXPORTS, globals())
 
 __all__ = [
     'MainView',
@@ -4,16 +4,23 @@
 提供开发工具相关的所有视图组件。
 """
 
-from views.dev_tools.dev_tools_view import DevToolsView
-from views.dev_tools.base64_to_image_view import Base64ToImageView
-from views.dev_tools.encoding_convert_view import EncodingConvertView
-from views.dev_tools.json_viewer_view import JsonViewerView
-from views.dev_tools.dns_lookup_view import DnsLookupView
-from views.dev_tools.format_convert_view import FormatConvertView
-from views.dev_tools.text_diff_view import TextDiffView
-from views.dev_tools.crypto_tool_view import CryptoToolView
-from views.dev_tools.sql_formatter_view import SqlFormatterView
-from views.dev_tools.cron_tool_view import CronToolView
+from utils.lazy_import import lazy_exports
+
+# 视图模块在首次访问时再导入
+_LAZY_EXPORTS = {
+    "DevToolsView": "views.dev_tools.dev_tools_view",
+    "Base64ToImageView": "views.dev_tools.base64_to_image_view",
+    "EncodingConvertView": "views.dev_tools.encoding_convert_view",
+    "JsonViewerView": "views.dev_tools.json_viewer_view",
+    "DnsLookupView": "views.dev_tools.dns_lookup_view",
+    "FormatConvertView": "views.dev_tools.format_convert_view",
+    "TextDiffView": "views.dev_tools.text_diff_view",
+    "CryptoToolView": "views.dev_tools.crypto_tool_view",
+    "SqlFormatterView": "views.dev_tools.sql_formatter_view",
+    "CronToolView": "views.dev_tools.cron_tool_view",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _LAZY_EXPORTS, globals())
 
 __all__ = [
     'DevToolsView',
@@ -4,13 +4,14 @@
 提供端口检测、常用端口扫描、端口范围扫描等功能。
 """
 
-import asyncio
 import socket
-from typing import Callable, Optional, List, Tuple
+import time
+from typing import Callable, Dict, Iterable, List, Optional
 
 import flet as ft
 
 from constants import PADDING_MEDIUM, PADDING_SMALL
+from services.port_scan_service import PortScanner, PortScanResult, STATE_FILTERED, parse_hosts
 
 
 class PortScannerView(ft.Container):
@@ -38,6 +39,9 @@ class PortScannerView(ft.Container):
         27017: "MongoDB",
     }
     
+    # 扫描日志的最小刷新间隔（秒）
+    LOG_REFRESH_INTERVAL = 0.25
+    
     def __init__(
         self,
         page: ft.Page,
@@ -80,6 +84,9 @@ class PortScannerView(ft.Container):
         self.progress_bar = ft.Ref[ft.ProgressBar]()
         self.log_output = ft.Ref[ft.TextField]()
         
+        # 当前扫描器（用于取消）
+        self.scanner: Optional[PortScanner] = None
+        
         self._build_ui()
     
     def _build_ui(self):
@@ -113,7 +120,7 @@ class PortScannerView(ft.Container):
                             ft.TextField(
                                 ref=self.host_input,
                                 label="主机地址",
-                                hint_text="example.com 或 192.168.1.1",
+                                hint_text="example.com、192.168.1.1 或 192.168.1.0/24，多个用逗号分隔",
                                 expand=True,
                                 prefix_icon=ft.Icons.DNS,
                                 height=45,
@@ -201,7 +208,7 @@ class PortScannerView(ft.Container):
                                     text_size=14,
                                     content_padding=10,
                                 ),
-                                ft.Text("建议范围不超过 1000 个端口", color=ft.Colors.OUTLINE),
+                                ft.Text("支持 1-65535 全范围", color=ft.Colors.OUTLINE),
                             ],
                             vertical_alignment=ft.CrossAxisAlignment.CENTER,
                         ),
@@ -328,38 +335,125 @@ class PortScannerView(ft.Container):
                 self.scan_btn.current.disabled = False
                 self.update()
 
-    async def _check_port(self, host: str, port: int, timeout: float = 3) -> Tuple[bool, float]:
-        """检测单个端口。
+    def _get_hosts(self) -> Optional[List[str]]:
+        """解析主机输入，失败时提示并返回 None。"""
+        text = self.host_input.current.value
+        
+        if not text or not text.strip():
+            self._show_snack("请输入主机地址", error=True)
+            return None
         
-        Returns:
-            (是否开放, 响应时间ms)
-        """
         try:
-            start_time = asyncio.get_event_loop().time()
-            
-            # 使用异步方式连接，避免阻塞UI
+            hosts = parse_hosts(text)
+        except ValueError as e:
+            self._show_snack(str(e), error=True)
+            return None
+        
+        if not hosts:
+            self._show_snack("请输入主机地址", error=True)
+            return None
+        return hosts
+    
+    def _get_service_name(self, port: int) -> str:
+        """获取端口对应的服务名称。"""
+        service_name = self.COMMON_PORTS.get(port, "")
+        if not service_name:
             try:
-                await asyncio.wait_for(
-                    asyncio.open_connection(host, port),
-                    timeout=timeout
-                )
-                end_time = asyncio.get_event_loop().time()
-                response_time = (end_time - start_time) * 1000
-                return (True, response_time)
-            except (asyncio.TimeoutError, ConnectionRefusedError, OSError):
-                return (False, 0)
-        except Exception:
-            return (False, 0)
+                service_name = socket.getservbyport(port)
+            except OSError:
+                service_name = "未知"
+        return service_name
+    
+    def _format_open_ports(self, open_ports: List[PortScanResult], multi_host: bool) -> List[str]:
+        """格式化开放端口列表。"""
+        lines = []
+        for result in sorted(open_ports, key=lambda r: (r.host, r.port)):
+            service_name = self._get_service_name(result.port)
+            target = f"{result.host}:{result.port}" if multi_host else f"{result.port:5d}"
+            lines.append(f"  • {target} - {service_name:15s} ({result.response_time:.0f}ms)")
+        return lines
+    
+    async def _run_scan(self, hosts: List[str], ports: Iterable[int], description: str):
+        """并发扫描并实时显示结果。
+        
+        Args:
+            hosts: 主机列表
+            ports: 端口列表
+            description: 扫描内容描述（用于日志标题）
+        """
+        ports = list(ports)
+        total = len(hosts) * len(ports)
+        multi_host = len(hosts) > 1
+        host_text = hosts[0] if not multi_host else f"{len(hosts)} 个主机"
+        
+        self.log_output.current.value = f"正在扫描 {host_text} 的{description}...\n\n"
+        self.progress_bar.current.value = 0
+        self.progress_bar.current.visible = True
+        self.update()
+        
+        open_ports: List[PortScanResult] = []
+        state_counts: Dict[str, int] = {}
+        scanned = 0
+        start_time = time.perf_counter()
+        last_refresh = 0.0
+        
+        self.scanner = PortScanner()
+        try:
+            async for result in self.scanner.scan(hosts, ports):
+                scanned += 1
+                state_counts[result.state] = state_counts.get(result.state, 0) + 1
+                if result.is_open:
+                    open_ports.append(result)
+                
+                # 按时间间隔刷新，或者发现开放端口时立即刷新
+                now = time.perf_counter()
+                if result.is_open or now - last_refresh >= self.LOG_REFRESH_INTERVAL:
+                    last_refresh = now
+                    result_lines = [f"扫描进度: {scanned}/{total}\n"]
+                    if open_ports:
+                        result_lines.append("✅ 发现的开放端口:")
+                        result_lines.extend(self._format_open_ports(open_ports, multi_host))
+                    else:
+                        result_lines.append("未发现开放端口...")
+                    self.progress_bar.current.value = scanned / max(1, total)
+                    self.log_output.current.value = '\n'.join(result_lines)
+                    self.update()
+        finally:
+            self.scanner = None
+        
+        # 完成
+        self.progress_bar.current.visible = False
+        
+        result_lines = []
+        if open_ports:
+            result_lines.append("✅ 开放的端口:")
+            result_lines.extend(self._format_open_ports(open_ports, multi_host))
+        else:
+            result_lines.append("❌ 未发现开放端口")
+        
+        if scanned < total:
+            result_lines.append(f"\n⚠️ {total - scanned} 个端口未扫描（主机无法解析或扫描已取消）")
+        
+        elapsed = time.perf_counter() - start_time
+        filtered = state_counts.get(STATE_FILTERED, 0)
+        result_lines.append("\n" + "="*50)
+        result_lines.append(
+            f"\n📊 统计: 开放 {len(open_ports)} / 关闭 {scanned - len(open_ports) - filtered} / "
+            f"超时 {filtered} / 总计 {total}"
+        )
+        result_lines.append(f"⏱️ 耗时: {elapsed:.1f} 秒")
+        
+        self.log_output.current.value = '\n'.join(result_lines)
+        self.update()
+        self._show_snack(f"扫描完成: 发现 {len(open_ports)} 个开放端口")
     
     async def _check_single_port(self):
         """检测单个端口。"""
-        host = self.host_input.current.value
-        port_str = self.port_input.current.value
-        
-        if not host or not host.strip():
-            self._show_snack("请输入主机地址", error=True)
+        hosts = self._get_hosts()
+        if hosts is None:
             return
         
+        port_str = self.port_input.current.value
         if not port_str or not port_str.strip():
             self._show_snack("请输入端口号", error=True)
             return
@@ -373,45 +467,15 @@ class PortScannerView(ft.Container):
             self._show_snack("请输入有效的端口号", error=True)
             return
         
-        self.log_output.current.value = f"正在检测 {host}:{port}...\n"
-        self.update()
-        
-        is_open, response_time = await self._check_port(host, port)
-        
-        result_lines = []
-        result_lines.append(f"主机: {host}")
-        result_lines.append(f"端口: {port}")
-        
-        # 尝试获取服务名称
-        service_name = self.COMMON_PORTS.get(port, "")
-        if not service_name:
-            try:
-                service_name = socket.getservbyport(port)
-            except:
-                service_name = "未知服务"
-        
-        result_lines.append(f"服务: {service_name}\n")
-        result_lines.append("="*50 + "\n")
-        
-        if is_open:
-            result_lines.append("✅ 端口开放")
-            result_lines.append(f"响应时间: {response_time:.2f} ms")
-        else:
-            result_lines.append("❌ 端口关闭或无法访问")
-        
-        self.log_output.current.value = '\n'.join(result_lines)
-        self.update()
-        self._show_snack("端口检测完成")
+        await self._run_scan(hosts, [port], f" {port} 端口 ({self._get_service_name(port)})")
     
     async def _scan_custom_ports(self):
         """扫描批量指定的端口。"""
-        host = self.host_input.current.value
-        ports_str = self.port_list_input.current.value
-        
-        if not host or not host.strip():
-            self._show_snack("请输入主机地址", error=True)
+        hosts = self._get_hosts()
+        if hosts is None:
             return
         
+        ports_str = self.port_list_input.current.value
         if not ports_str or not ports_str.strip():
             self._show_snack("请输入端口列表", error=True)
             return
@@ -441,134 +505,25 @@ class PortScannerView(ft.Container):
         # 去重并排序
         port_numbers = sorted(set(port_numbers))
         
-        self.log_output.current.value = f"正在扫描 {host} 的 {len(port_numbers)} 个端口...\n\n"
-        self.progress_bar.current.value = 0
-        self.progress_bar.current.visible = True
-        self.update()
-        
-        open_ports = []
-        closed_ports = []
-        
-        for i, port in enumerate(port_numbers, 1):
-            is_open, response_time = await self._check_port(host, port, timeout=2)
-            
-            # 获取服务名
-            service_name = self.COMMON_PORTS.get(port, "")
-            if not service_name:
-                try:
-                    service_name = socket.getservbyport(port)
-                except:
-                    service_name = "未知"
-            
-            if is_open:
-                open_ports.append((port, service_name, response_time))
-            else:
-                closed_ports.append((port, service_name))
-            
-            # 更新进度
-            self.progress_bar.current.value = i / len(port_numbers)
-            
-            # 实时更新日志
-            result_lines = [f"扫描进度: {i}/{len(port_numbers)}\n"]
-            
-            if open_ports:
-                result_lines.append("✅ 开放的端口:")
-                for p, s, rt in open_ports:
-                    result_lines.append(f"  • {p:5d} - {s:15s} ({rt:.0f}ms)")
-            
-            result_lines.append("")
-            
-            if closed_ports:
-                result_lines.append(f"❌ 关闭的端口: ({len(closed_ports)}个)")
-                for p, s in closed_ports[:5]:
-                    result_lines.append(f"  • {p:5d} - {s}")
-                if len(closed_ports) > 5:
-                    result_lines.append(f"  ... 还有 {len(closed_ports) - 5} 个")
-            
-            self.log_output.current.value = '\n'.join(result_lines)
-            self.update()
-        
-        self.progress_bar.current.visible = False
-        
-        # 添加统计
-        result_lines.append("\n" + "="*50)
-        result_lines.append(f"\n📊 统计: 开放 {len(open_ports)} / 关闭 {len(closed_ports)} / 总计 {len(port_numbers)}")
-        
-        self.log_output.current.value = '\n'.join(result_lines)
-        self.update()
-        self._show_snack(f"扫描完成: 发现 {len(open_ports)} 个开放端口")
+        await self._run_scan(hosts, port_numbers, f" {len(port_numbers)} 个端口")
     
     async def _scan_common_ports(self):
         """扫描常用端口。"""
-        host = self.host_input.current.value
-        
-        if not host or not host.strip():
-            self._show_snack("请输入主机地址", error=True)
+        hosts = self._get_hosts()
+        if hosts is None:
             return
         
-        self.log_output.current.value = f"正在扫描 {host} 的常用端口...\n\n"
-        self.progress_bar.current.value = 0
-        self.progress_bar.current.visible = True
-        self.update()
-        
-        open_ports = []
-        closed_ports = []
-        
-        total_ports = len(self.COMMON_PORTS)
-        current_count = 0
-        
-        for port, service in sorted(self.COMMON_PORTS.items()):
-            is_open, response_time = await self._check_port(host, port, timeout=2)
-            
-            current_count += 1
-            self.progress_bar.current.value = current_count / total_ports
-            
-            if is_open:
-                open_ports.append((port, service, response_time))
-            else:
-                closed_ports.append((port, service))
-            
-            # 实时更新结果
-            result_lines = [f"扫描进度: {current_count}/{total_ports}\n"]
-            
-            if open_ports:
-                result_lines.append("✅ 开放的端口:")
-                for p, s, rt in open_ports:
-                    result_lines.append(f"  • {p:5d} - {s:15s} ({rt:.0f}ms)")
-            
-            result_lines.append("")
-            
-            if closed_ports:
-                result_lines.append(f"❌ 关闭的端口: ({len(closed_ports)}个)")
-                # 只显示前5个关闭的端口
-                for p, s in closed_ports[:5]:
-                    result_lines.append(f"  • {p:5d} - {s}")
-                if len(closed_ports) > 5:
-                    result_lines.append(f"  ... 还有 {len(closed_ports) - 5} 个")
-            
-            self.log_output.current.value = '\n'.join(result_lines)
-            self.update()
-        
-        self.progress_bar.current.visible = False
-        
-        # 添加统计
-        result_lines.append("\n" + "="*50)
-        result_lines.append(f"\n📊 统计: 开放 {len(open_ports)} / 关闭 {len(closed_ports)} / 总计 {total_ports}")
-        
-        self.log_output.current.value = '\n'.join(result_lines)
-        self.update()
-        self._show_snack(f"扫描完成: 发现 {len(open_ports)} 个开放端口")
+        await self._run_scan(hosts, sorted(self.COMMON_PORTS), "常用端口")
     
     async def _scan_port_range(self):
         """扫描端口范围。"""
-        host = self.host_input.current.value
+        hosts = self._get_hosts()
+        if hosts is None:
+            return
+        
         start_str = self.start_port_input.current.value
         end_str = self.end_port_input.current.value
         
-        if not host or not host.strip():
-            self._show_snack("请输入主机地址", error=True)
-            return
-        
         try:
             start_port = int(start_str)
             end_port = int(end_str)
@@ -580,74 +535,11 @@ class PortScannerView(ft.Container):
             if start_port > end_port:
                 self._show_snack("起始端口不能大于结束端口", error=True)
                 return
-            
-            if end_port - start_port > 1000:
-                self._show_snack("端口范围不能超过 1000", error=True)
-                return
         except ValueError:
             self._show_snack("请输入有效的端口号", error=True)
             return
         
-        self.log_output.current.value = f"正在扫描 {host} 端口 {start_port}-{end_port}...\n\n"
-        self.progress_bar.current.value = 0
-        self.progress_bar.current.visible = True
-        self.update()
-        
-        open_ports = []
-        total_ports = end_port - start_port + 1
-        scanned = 0
-        
-        for port in range(start_port, end_port + 1):
-            is_open, response_time = await self._check_port(host, port, timeout=1)
-            
-            if is_open:
-                # 尝试获取服务名
-                service_name = self.COMMON_PORTS.get(port, "")
-                if not service_name:
-                    try:
-                        service_name = socket.getservbyport(port)
-                    except:
-                        service_name = "未知"
-                
-                open_ports.append((port, service_name, response_time))
-            
-            scanned += 1
-            
-            # 更新进度
-            self.progress_bar.current.value = scanned / total_ports
-            
-            # 每10个端口更新一次显示，或者发现开放端口时立即更新
-            if scanned % 10 == 0 or is_open:
-                result_lines = [f"扫描进度: {scanned}/{total_ports}\n"]
-                
-                if open_ports:
-                    result_lines.append("✅ 发现的开放端口:")
-                    for p, s, rt in open_ports:
-                        result_lines.append(f"  • {p:5d} - {s:15s} ({rt:.0f}ms)")
-                else:
-                    result_lines.append("未发现开放端口...")
-                
-                self.log_output.current.value = '\n'.join(result_lines)
-                self.update()
-        
-        # 完成
-        self.progress_bar.current.visible = False
-        
-        result_lines = []
-        if open_ports:
-            result_lines.append("✅ 开放的端口:")
-            for p, s, rt in open_ports:
-                result_lines.append(f"  • {p:5d} - {s:15s} ({rt:.0f}ms)")
-        else:
-            result_lines.append("❌ 未发现开放端口")
-        
-        result_lines.append("\n" + "="*50)
-        result_lines.append(f"\n📊 扫描范围: {start_port}-{end_port} ({total_ports} 个端口)")
-        result_lines.append(f"📊 开放端口: {len(open_ports)} 个")
-        
-        self.log_output.current.value = '\n'.join(result_lines)
-        self.update()
-        self._show_snack(f"扫描完成: 发现 {len(open_ports)} 个开放端口")
+        await self._run_scan(hosts, range(start_port, end_port + 1), f"端口 {start_port}-{end_port}")
     
     def _on_back_click(self):
         """返回按钮点击事件。"""
@@ -677,10 +569,14 @@ class PortScannerView(ft.Container):
 
 **4. 端口范围扫描**
 - 自定义扫描端口范围
-- 最多支持 1000 个端口
+- 支持 1-65535 全范围，数百个连接并发检测
 - 实时显示扫描进度
 - 推荐范围: 1-1024 (系统端口)
 
+**主机地址**
+- 支持域名、IP 地址和 CIDR 网段（如 `192.168.1.0/24`）
+- 多个主机使用逗号或空格分隔
+
 **常用端口说明：**
 - **20-21**: FTP
 - **22**: SSH
@@ -734,6 +630,9 @@ class PortScannerView(ft.Container):
     def cleanup(self) -> None:
         """清理视图资源，释放内存。"""
         import gc
+        # 停止正在进行的扫描
+        if self.scanner:
+            self.scanner.cancel()
         # 清除回调引用，打破循环引用
         self.on_back = None
         # 清除 UI 内容
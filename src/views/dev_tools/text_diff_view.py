@@ -4,21 +4,25 @@
 提供文本对比功能。
 """
 
-import difflib
 from pathlib import Path
-from typing import Callable, List, Optional
+from typing import Callable, List, Optional, Tuple
 
 import flet as ft
 
 from constants import PADDING_MEDIUM, PADDING_SMALL, PADDING_LARGE
+from utils.text_diff import DiffRow, TextDiff
 
 
 class TextDiffView(ft.Container):
     """文本对比工具视图类。
 
-    使用 difflib.ndiff 提供详细的字符级差异对比。
+    行级差异由 utils.text_diff 计算，结果区只渲染当前页的行，
+    行内字符差异在显示时才计算。
     """
 
+    # 结果区每页显示的行数
+    PAGE_ROWS = 500
+
     # 颜色方案
     COLOR_ADDED = ft.Colors.with_opacity(0.2, ft.Colors.GREEN)
     COLOR_REMOVED = ft.Colors.with_opacity(0.2, ft.Colors.RED)
@@ -43,6 +47,9 @@ class TextDiffView(ft.Container):
         self.left_stats = ft.Ref[ft.Text]()
         self.right_stats = ft.Ref[ft.Text]()
         self.summary_text = ft.Ref[ft.Text]()
+        self.page_text = ft.Ref[ft.Text]()
+        self.prev_page_button = ft.Ref[ft.IconButton]()
+        self.next_page_button = ft.Ref[ft.IconButton]()
         
         # 选项
         self.ignore_case = ft.Ref[ft.Checkbox]()
@@ -50,7 +57,8 @@ class TextDiffView(ft.Container):
         self.show_only_diff = ft.Ref[ft.Checkbox]()
         
         # 对比结果数据
-        self.diff_results = []
+        self.diff_result: Optional[TextDiff] = None
+        self.page_start = 0
         
         self._build_ui()
 
@@ -178,6 +186,28 @@ class TextDiffView(ft.Container):
                     size=12,
                     color=ft.Colors.ON_SURFACE_VARIANT,
                 ),
+                ft.IconButton(
+                    ref=self.prev_page_button,
+                    icon=ft.Icons.CHEVRON_LEFT,
+                    tooltip="上一页",
+                    icon_size=18,
+                    disabled=True,
+                    on_click=lambda _: self._change_page(-1),
+                ),
+                ft.Text(
+                    "",
+                    ref=self.page_text,
+                    size=12,
+                    color=ft.Colors.ON_SURFACE_VARIANT,
+                ),
+                ft.IconButton(
+                    ref=self.next_page_button,
+                    icon=ft.Icons.CHEVRON_RIGHT,
+                    tooltip="下一页",
+                    icon_size=18,
+                    disabled=True,
+                    on_click=lambda _: self._change_page(1),
+                ),
             ],
             spacing=PADDING_SMALL,
         )
@@ -310,23 +340,19 @@ class TextDiffView(ft.Container):
             self._show_snack("请先输入要对比的文本", error=True)
             return
         
-        # 应用选项
-        if self.ignore_case.current and self.ignore_case.current.value:
-            left_text = left_text.lower()
-            right_text = right_text.lower()
-        
-        if self.ignore_whitespace.current and self.ignore_whitespace.current.value:
-            left_lines = [line.strip() for line in left_text.splitlines()]
-            right_lines = [line.strip() for line in right_text.splitlines()]
-        else:
-            left_lines = left_text.splitlines()
-            right_lines = right_text.splitlines()
+        # 应用选项（只影响比较，显示仍使用原始内容）
+        ignore_case = bool(self.ignore_case.current and self.ignore_case.current.value)
+        ignore_whitespace = bool(self.ignore_whitespace.current and self.ignore_whitespace.current.value)
+        key = None
+        if ignore_case and ignore_whitespace:
+            key = lambda line: line.strip().lower()
+        elif ignore_case:
+            key = str.lower
+        elif ignore_whitespace:
+            key = str.strip
         
-        # 使用 ndiff 进行对比
-        diff = list(difflib.ndiff(left_lines, right_lines))
-        
-        # 解析差异
-        self.diff_results = self._parse_diff(diff)
+        self.diff_result = TextDiff.compute(left_text.splitlines(), right_text.splitlines(), key=key)
+        self.page_start = 0
         
         # 显示结果
         self._display_diff()
@@ -336,71 +362,18 @@ class TextDiffView(ft.Container):
         
         self._show_snack("对比完成")
 
-    def _parse_diff(self, diff_lines: List[str]) -> List[dict]:
-        """解析 ndiff 输出。
-        
-        Args:
-            diff_lines: ndiff 输出的行列表
-            
-        Returns:
-            解析后的差异列表
-        """
-        results = []
-        i = 0
-        line_num_left = 1
-        line_num_right = 1
-        
-        while i < len(diff_lines):
-            line = diff_lines[i]
-            
-            if line.startswith('  '):  # 相同行
-                results.append({
-                    'type': 'equal',
-                    'left_line': line_num_left,
-                    'right_line': line_num_right,
-                    'content': line[2:],
-                })
-                line_num_left += 1
-                line_num_right += 1
-            elif line.startswith('- '):  # 删除行
-                results.append({
-                    'type': 'delete',
-                    'left_line': line_num_left,
-                    'right_line': None,
-                    'content': line[2:],
-                })
-                line_num_left += 1
-            elif line.startswith('+ '):  # 新增行
-                results.append({
-                    'type': 'insert',
-                    'left_line': None,
-                    'right_line': line_num_right,
-                    'content': line[2:],
-                })
-                line_num_right += 1
-            elif line.startswith('? '):  # 字符级差异提示
-                # 这是 ndiff 的特殊标记，表示字符级差异
-                if results:
-                    results[-1]['hint'] = line[2:]
-            
-            i += 1
-        
-        return results
-
     def _display_diff(self):
-        """显示对比结果。"""
-        if not self.diff_container.current:
+        """显示当前页的对比结果。"""
+        if not self.diff_container.current or self.diff_result is None:
             return
         
-        show_only = self.show_only_diff.current and self.show_only_diff.current.value
+        show_only = bool(self.show_only_diff.current and self.show_only_diff.current.value)
+        total = self.diff_result.row_count(show_only)
         
-        controls = []
-        for item in self.diff_results:
-            # 如果只显示差异，跳过相同的行
-            if show_only and item['type'] == 'equal':
-                continue
-            
-            controls.append(self._create_diff_line(item))
+        controls = [
+            self._create_diff_line(row)
+            for row in self.diff_result.rows(self.page_start, self.page_start + self.PAGE_ROWS, show_only)
+        ]
         
         if not controls:
             controls.append(
@@ -416,15 +389,54 @@ class TextDiffView(ft.Container):
             )
         
         self.diff_container.current.controls = controls
+        self.diff_container.current.scroll_to(offset=0, duration=0)
         self.diff_container.current.update()
+        self._update_pager(total)
+
+    def _update_pager(self, total: int):
+        """更新分页按钮和页码文本。
+        
+        Args:
+            total: 当前模式下的显示行总数
+        """
+        if not self.page_text.current:
+            return
+        
+        if total > self.PAGE_ROWS:
+            stop = min(self.page_start + self.PAGE_ROWS, total)
+            self.page_text.current.value = f"{self.page_start + 1}-{stop} / {total}"
+        else:
+            self.page_text.current.value = ""
+        self.prev_page_button.current.disabled = self.page_start <= 0
+        self.next_page_button.current.disabled = self.page_start + self.PAGE_ROWS >= total
+        self.page_text.current.update()
+        self.prev_page_button.current.update()
+        self.next_page_button.current.update()
+
+    def _change_page(self, step: int):
+        """翻页。
+        
+        Args:
+            step: -1 为上一页，1 为下一页
+        """
+        if self.diff_result is None:
+            return
+        
+        show_only = bool(self.show_only_diff.current and self.show_only_diff.current.value)
+        total = self.diff_result.row_count(show_only)
+        start = self.page_start + step * self.PAGE_ROWS
+        if start < 0 or start >= total:
+            return
+        self.page_start = start
+        self._display_diff()
 
-    def _create_diff_line(self, item: dict) -> ft.Container:
+    def _create_diff_line(self, item: DiffRow) -> ft.Container:
         """创建差异行显示。
         
         Args:
-            item: 差异项
+            item: 差异行
         """
-        diff_type = item['type']
+        diff_type = item.type
         
         # 确定背景色和图标
         if diff_type == 'equal':
@@ -445,15 +457,14 @@ class TextDiffView(ft.Container):
             icon_color = ft.Colors.ORANGE
         
         # 行号显示
-        left_num = str(item['left_line']) if item['left_line'] else "-"
-        right_num = str(item['right_line']) if item['right_line'] else "-"
+        left_num = str(item.left_line) if item.left_line else "-"
+        right_num = str(item.right_line) if item.right_line else "-"
         
         # 构建文本内容（带高亮）
-        content = item['content'] if item['content'] else " "
-        hint = item.get('hint')
+        content = item.content if item.content else " "
         
-        if hint:
-            spans = self._get_styled_spans(content, hint, diff_type)
+        if item.highlights:
+            spans = self._get_styled_spans(content, item.highlights, diff_type)
         else:
             spans = [ft.TextSpan(content)]
 
@@ -499,15 +510,18 @@ class TextDiffView(ft.Container):
             border=ft.border.only(bottom=ft.BorderSide(0.5, ft.Colors.OUTLINE_VARIANT)),
         )
 
-    def _get_styled_spans(self, content: str, hint: str, diff_type: str) -> List[ft.TextSpan]:
-        """获取带样式的文本段。"""
-        if not hint:
+    def _get_styled_spans(
+        self, content: str, highlights: List[Tuple[int, int]], diff_type: str
+    ) -> List[ft.TextSpan]:
+        """获取带样式的文本段。
+        
+        Args:
+            content: 行内容
+            highlights: 需要高亮的字符区间 [(start, end), ...]
+            diff_type: 行类型
+        """
+        if not highlights:
             return [ft.TextSpan(content)]
-            
-        spans = []
-        i = 0
-        current_segment = ""
-        is_highlighted = False
         
         # 高亮颜色配置
         if diff_type == 'insert':
@@ -518,33 +532,24 @@ class TextDiffView(ft.Container):
             highlight_bg = ft.Colors.with_opacity(0.5, ft.Colors.RED)
         else:
             highlight_bg = ft.Colors.with_opacity(0.5, ft.Colors.ORANGE)
-            
-        while i < len(content):
-            # 检查当前字符是否需要高亮
-            # hint 可能比 content 短（也可能长，但我们只关心 content 的长度）
-            should_highlight = (i < len(hint)) and (hint[i] != ' ')
-            
-            if should_highlight != is_highlighted:
-                # 状态改变，保存之前的段
-                if current_segment:
-                    style = ft.TextStyle(bgcolor=highlight_bg) if is_highlighted else None
-                    spans.append(ft.TextSpan(current_segment, style=style))
-                    current_segment = ""
-                is_highlighted = should_highlight
-            
-            current_segment += content[i]
-            i += 1
-            
-        # 保存最后一段
-        if current_segment:
-            style = ft.TextStyle(bgcolor=highlight_bg) if is_highlighted else None
-            spans.append(ft.TextSpan(current_segment, style=style))
-            
+        highlight_style = ft.TextStyle(bgcolor=highlight_bg)
+        
+        spans = []
+        position = 0
+        for start, end in highlights:
+            if start > position:
+                spans.append(ft.TextSpan(content[position:start]))
+            spans.append(ft.TextSpan(content[start:end], style=highlight_style))
+            position = end
+        if position < len(content):
+            spans.append(ft.TextSpan(content[position:]))
+        
         return spans
 
     def _refresh_diff_display(self):
         """刷新差异显示（当切换"仅显示差异"时）。"""
-        if self.diff_results:
+        if self.diff_result is not None:
+            self.page_start = 0
             self._display_diff()
 
     def _update_summary(self):
@@ -552,11 +557,14 @@ class TextDiffView(ft.Container):
         if not self.summary_text.current:
             return
         
-        added = sum(1 for item in self.diff_results if item['type'] == 'insert')
-        removed = sum(1 for item in self.diff_results if item['type'] == 'delete')
-        equal = sum(1 for item in self.diff_results if item['type'] == 'equal')
+        if self.diff_result is None:
+            return
+        
+        added = self.diff_result.added
+        removed = self.diff_result.removed
+        equal = self.diff_result.equal
         
-        total = len(self.diff_results)
+        total = self.diff_result.row_count()
         
         self.summary_text.current.value = (
             f"总计 {total} 行 | "
@@ -643,7 +651,9 @@ class TextDiffView(ft.Container):
             self.summary_text.current.value = "等待对比..."
             self.summary_text.current.update()
         
-        self.diff_results = []
+        self.diff_result = None
+        self.page_start = 0
+        self._update_pager(0)
 
     def _import_file(self, side: str):
         """从文件导入文本。"""
@@ -703,26 +713,12 @@ class TextDiffView(ft.Container):
 
     def _export_html(self, e):
         """导出为 HTML 文件。"""
-        if not self.diff_results:
+        if self.diff_result is None:
             self._show_snack("请先执行对比", error=True)
             return
         
-        left_text = (self.left_input.current.value or "").strip()
-        right_text = (self.right_input.current.value or "").strip()
-        
-        left_lines = left_text.splitlines()
-        right_lines = right_text.splitlines()
-        
-        # 使用 difflib.HtmlDiff 生成 HTML
-        html_diff = difflib.HtmlDiff()
-        html = html_diff.make_file(
-            left_lines,
-            right_lines,
-            fromdesc="左侧文本",
-            todesc="右侧文本",
-            context=True,
-            numlines=3,
-        )
+        # 直接使用已计算的差异结果生成 HTML，不再重新对比
+        html = self.diff_result.to_html(fromdesc="左侧文本", todesc="右侧文本", context=3)
         
         # 保存文件
         def save_file(e: ft.FilePickerResultEvent):
@@ -749,13 +745,14 @@ class TextDiffView(ft.Container):
         help_text = """
 **文本对比工具**
 
-**基于 difflib 的高级文本对比工具**
+**高性能文本对比工具**
 
 参考 [pydiff](https://github.com/yelsayd/pydiff) 项目设计理念。
 
 **✨ 功能特性**
 
-- 使用 ndiff 提供详细的行级和字符级差异
+- Patience + Myers 行级差异，大文件也能快速对比
+- 修改行显示字符级差异
 - 清晰的颜色高亮显示
 - 实时统计信息
 - 支持从文件导入
@@ -4,20 +4,29 @@
 提供图像处理相关的所有视图组件。
 """
 
-from views.image.image_view import ImageView
-from views.image.compress_view import ImageCompressView
-from views.image.resize_view import ImageResizeView
-from views.image.format_view import ImageFormatView
-from views.image.background_view import ImageBackgroundView
-from views.image.crop_view import ImageCropView
-from views.image.gif_adjustment_view import GifAdjustmentView
-from views.image.to_base64_view import ImageToBase64View
-from views.image.rotate_view import ImageRotateView
-from views.image.remove_exif_view import ImageRemoveExifView
-from views.image.qrcode_view import QRCodeGeneratorView
-from views.image.watermark_view import ImageWatermarkView
-from views.image.watermark_remove_view import ImageWatermarkRemoveView
-from views.image.puzzle import ImagePuzzleView, ImagePuzzleSplitView, ImagePuzzleMergeView
+from utils.lazy_import import lazy_exports
+
+# 视图模块在首次访问时再导入
+_LAZY_EXPORTS = {
+    "ImageView": "views.image.image_view",
+    "ImageCompressView": "views.image.compress_view",
+    "ImageResizeView": "views.image.resize_view",
+    "ImageFormatView": "views.image.format_view",
+    "ImageBackgroundView": "views.image.background_view",
+    "ImageCropView": "views.image.crop_view",
+    "GifAdjustmentView": "views.image.gif_adjustment_view",
+    "ImageToBase64View": "views.image.to_base64_view",
+    "ImageRotateView": "views.image.rotate_view",
+    "ImageRemoveExifView": "views.image.remove_exif_view",
+    "QRCodeGeneratorView": "views.image.qrcode_view",
+    "ImageWatermarkView": "views.image.watermark_view",
+    "ImageWatermarkRemoveView": "views.image.watermark_remove_view",
+    "ImagePuzzleView": "views.image.puzzle",
+    "ImagePuzzleSplitView": "views.image.puzzle",
+    "ImagePuzzleMergeView": "views.image.puzzle",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _LAZY_EXPORTS, globals())
 
 __all__ = [
     'ImageView',
@@ -4,8 +4,10 @@
 提供图片背景移除功能的用户界面。
 """
 
+import functools
 import gc
 import threading
+import time
 import webbrowser
 from pathlib import Path
 from typing import Callable, List, Optional, Dict
@@ -1379,47 +1381,49 @@ class ImageBackgroundView(ft.Container):
         
         # 在后台线程处理
         def process_task():
-            total_files = len(self.selected_files)
+            from PIL import Image
+            
+            files = list(self.selected_files)
+            total_files = len(files)
             success_count = 0
             
-            for i, file_path in enumerate(self.selected_files):
+            def load_image(file_path: Path) -> Image.Image:
+                # 检查是否是 GIF，如果是则提取指定帧
+                if GifUtils.is_animated_gif(file_path):
+                    frame_index = self.gif_frame_selection.get(str(file_path), 0)
+                    image = GifUtils.extract_frame(file_path, frame_index)
+                    if image is None:
+                        raise RuntimeError("提取 GIF 帧失败")
+                    return image
+                image = Image.open(file_path)
+                image.load()
+                return image
+            
+            add_sequence = self.config_service.get_config_value("output_add_sequence", False)
+            start_time = time.perf_counter()
+            
+            # 解码、预处理、推理和合成以批次流水线方式进行（解码在服务的线程池中），
+            # 结果与文件一一对应、按文件顺序返回
+            loaders = [functools.partial(load_image, file_path) for file_path in files]
+            for i, (result, error) in enumerate(self.bg_remover.iter_remove_background(loaders)):
+                file_path = files[i]
+                self._update_progress(
+                    (i + 1) / total_files,
+                    f"正在处理: {file_path.name} ({i + 1}/{total_files})"
+                )
+                if error is not None:
+                    logger.error(f"处理失败 {file_path.name}: {error}")
+                    continue
+                
                 try:
-                    # 检查是否是 GIF，如果是则显示帧信息
-                    is_gif = GifUtils.is_animated_gif(file_path)
-                    if is_gif:
-                        frame_index = self.gif_frame_selection.get(str(file_path), 0)
-                        progress = i / total_files
-                        self._update_progress(progress, f"正在处理 GIF (帧 {frame_index + 1}): {file_path.name} ({i+1}/{total_files})")
-                    else:
-                        # 更新进度
-                        progress = i / total_files
-                        self._update_progress(progress, f"正在处理: {file_path.name} ({i+1}/{total_files})")
-                    
-                    # 读取图片
-                    from PIL import Image
-                    
-                    # 检查是否是 GIF，如果是则提取指定帧
-                    if is_gif:
-                        image = GifUtils.extract_frame(file_path, frame_index)
-                        if image is None:
-                            logger.error(f"提取 GIF 帧失败: {file_path.name}")
-                            continue
-                    else:
-                        image = Image.open(file_path)
-                    
-                    # 移除背景
-                    result = self.bg_remover.remove_background(image)
-                    
                     # 生成输出文件名
+                    output_filename = f"{file_path.stem}_no_bg.png"
                     if self.output_mode_radio.value == "new":
-                        output_filename = f"{file_path.stem}_no_bg.png"
                         output_path = file_path.parent / output_filename
                     else:
-                        output_filename = f"{file_path.stem}_no_bg.png"
                         output_path = output_dir / output_filename
                     
                     # 根据全局设置决定是否添加序号
-                    add_sequence = self.config_service.get_config_value("output_add_sequence", False)
                     output_path = get_unique_path(output_path, add_sequence=add_sequence)
                     
                     # 保存为PNG格式（保留透明通道）
@@ -1428,10 +1432,13 @@ class ImageBackgroundView(ft.Container):
                     success_count += 1
                     
                 except Exception as ex:
-                    logger.error(f"处理失败 {file_path.name}: {ex}")
+                    logger.error(f"保存失败 {file_path.name}: {ex}")
+            
+            elapsed = time.perf_counter() - start_time
+            speed = total_files / elapsed if elapsed > 0 else 0.0
             
             # 处理完成
-            self._on_process_complete(success_count, total_files, output_dir)
+            self._on_process_complete(success_count, total_files, output_dir, speed)
         
         threading.Thread(target=process_task, daemon=True).start()
     
@@ -1450,17 +1457,24 @@ class ImageBackgroundView(ft.Container):
         except:
             pass
     
-    def _on_process_complete(self, success_count: int, total: int, output_dir: Path) -> None:
+    def _on_process_complete(
+        self,
+        success_count: int,
+        total: int,
+        output_dir: Path,
+        speed: float = 0.0
+    ) -> None:
         """处理完成回调。
         
         Args:
             success_count: 成功处理的数量
             total: 总数量
             output_dir: 输出目录
+            speed: 处理速度（张/秒）
         """
         # 更新进度和按钮状态（一次性更新）
         self.progress_bar.value = 1.0
-        self.progress_text.value = f"处理完成! 成功: {success_count}/{total}"
+        self.progress_text.value = f"处理完成! 成功: {success_count}/{total} ({speed:.2f} 张/秒)"
         button = self.process_button.content
         button.disabled = False
          
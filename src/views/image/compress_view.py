@@ -4,8 +4,10 @@
 提供图片压缩功能的用户界面。
 """
 
+import threading
+import time
 from pathlib import Path
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Set
 
 import flet as ft
 
@@ -16,8 +18,15 @@ from constants import (
     PADDING_SMALL,
     PADDING_XLARGE,
 )
-from services import ConfigService, ImageService
-from utils import format_file_size, GifUtils, get_unique_path
+from services import (
+    BatchCompressStats,
+    CompressTask,
+    CompressTaskResult,
+    ConfigService,
+    ImageBatchCompressService,
+    ImageService,
+)
+from utils import format_file_size, get_unique_path
 from views.image.image_tools_install_view import ImageToolsInstallView
 
 
@@ -62,6 +71,10 @@ class ImageCompressView(ft.Container):
         # GIF 文件集合
         self.gif_files: set = set()
         
+        # 批量压缩服务（后台进程池执行）
+        self.batch_service: ImageBatchCompressService = ImageBatchCompressService()
+        self.is_compressing: bool = False
+        
         self.expand: bool = True
         # 右侧多留一些空间给滚动条
         self.padding: ft.padding = ft.padding.only(
@@ -152,10 +165,22 @@ class ImageCompressView(ft.Container):
                     ft.Radio(value="fast", label="快速模式 (Pillow)"),
                     ft.Radio(value="balanced", label="标准模式 (mozjpeg/pngquant) - 推荐"),
                     ft.Radio(value="max", label="极限模式 (最高压缩率)"),
+                    ft.Radio(value="target", label="目标大小模式 (仅 JPEG/WebP)"),
                 ],
                 spacing=PADDING_MEDIUM // 2,
             ),
             value="balanced",
+            on_change=self._on_mode_change,
+        )
+        
+        # 目标大小输入框（目标大小模式下质量滑块作为质量上限）
+        self.target_kb_field = ft.TextField(
+            label="目标大小 (KB)",
+            value="200",
+            hint_text="例如: 200",
+            keyboard_type=ft.KeyboardType.NUMBER,
+            visible=False,
+            width=200,
         )
         
         self.quality_slider = ft.Slider(
@@ -174,6 +199,7 @@ class ImageCompressView(ft.Container):
                 controls=[
                     ft.Text("压缩模式:", size=14, weight=ft.FontWeight.W_500),
                     self.mode_radio,
+                    self.target_kb_field,
                     ft.Container(height=PADDING_MEDIUM),
                     self.quality_text,
                     self.quality_slider,
@@ -184,7 +210,7 @@ class ImageCompressView(ft.Container):
             border=ft.border.all(1, ft.Colors.OUTLINE_VARIANT),
             border_radius=BORDER_RADIUS_MEDIUM,
             expand=1,  # 平分宽度
-            height=280,  # 固定高度
+            height=340,  # 固定高度
         )
         
         # 输出选项
@@ -244,7 +270,7 @@ class ImageCompressView(ft.Container):
             border=ft.border.all(1, ft.Colors.OUTLINE_VARIANT),
             border_radius=BORDER_RADIUS_MEDIUM,
             expand=1,  # 平分宽度
-            height=280,  # 固定高度
+            height=340,  # 固定高度
         )
         
         # 进度显示
@@ -271,6 +297,14 @@ class ImageCompressView(ft.Container):
             alignment=ft.alignment.center,
         )
         
+        # 取消按钮（压缩进行中显示）
+        self.cancel_button = ft.OutlinedButton(
+            "取消压缩",
+            icon=ft.Icons.CANCEL,
+            on_click=self._on_cancel_compress,
+            visible=False,
+        )
+        
         # 主内容 - 隐藏滚动条
         # 可滚动内容区域
         scrollable_content = ft.Column(
@@ -286,6 +320,7 @@ class ImageCompressView(ft.Container):
                 self.progress_bar,
                 self.progress_text,
                 self.compress_button,
+                ft.Container(content=self.cancel_button, alignment=ft.alignment.center),
                 ft.Container(height=PADDING_LARGE),  # 底部间距
             ],
             spacing=PADDING_LARGE,
@@ -534,7 +569,18 @@ class ImageCompressView(ft.Container):
     def _on_quality_change(self, e: ft.ControlEvent) -> None:
         """质量滑块变化事件。"""
         quality = int(e.control.value)
-        self.quality_text.value = f"质量: {quality}"
+        label = "质量上限" if self.mode_radio.value == "target" else "质量"
+        self.quality_text.value = f"{label}: {quality}"
+        self.quality_text.update()
+    
+    def _on_mode_change(self, e: ft.ControlEvent) -> None:
+        """压缩模式变化事件。"""
+        is_target = e.control.value == "target"
+        self.target_kb_field.visible = is_target
+        self.quality_text.value = (
+            f"{'质量上限' if is_target else '质量'}: {int(self.quality_slider.value)}"
+        )
+        self.target_kb_field.update()
         self.quality_text.update()
     
     def _on_output_mode_change(self, e: ft.ControlEvent) -> None:
@@ -566,6 +612,9 @@ class ImageCompressView(ft.Container):
     
     def _on_compress(self, e: ft.ControlEvent) -> None:
         """开始压缩按钮点击事件。"""
+        if self.is_compressing:
+            return
+        
         if not self.selected_files:
             self._show_message("请先选择要压缩的图片", ft.Colors.ORANGE)
             return
@@ -581,36 +630,24 @@ class ImageCompressView(ft.Container):
                 self._show_message("需要安装图片压缩工具，请点击右上角的安装按钮", ft.Colors.ORANGE)
                 return
         
-        # 显示进度
-        self.progress_bar.visible = True
-        self.progress_bar.value = 0
-        self.progress_text.value = "准备压缩..."
-        self.progress_bar.update()
-        self.progress_text.update()
+        target_kb = None
+        if mode == "target":
+            try:
+                target_kb = int(self.target_kb_field.value)
+            except (TypeError, ValueError):
+                target_kb = 0
+            if target_kb <= 0:
+                self._show_message("请输入有效的目标大小 (KB)", ft.Colors.ORANGE)
+                return
         
         quality = int(self.quality_slider.value)
         output_mode = self.output_mode_radio.value
+        add_sequence = self.config_service.get_config_value("output_add_sequence", False)
         
-        # 压缩文件
-        total = len(self.selected_files)
-        success_count = 0
-        total_original = 0
-        total_compressed = 0
-        
-        skipped_gifs = 0
+        # 预先确定所有输出路径（并行执行时文件尚未生成，需避免同名冲突）
+        tasks: List[CompressTask] = []
+        reserved_paths: Set[Path] = set()
         for i, input_path in enumerate(self.selected_files):
-            # 更新进度
-            self.progress_text.value = f"正在压缩 ({i+1}/{total}): {input_path.name}"
-            self.progress_bar.value = (i + 1) / total
-            self.progress_text.update()
-            self.progress_bar.update()
-            
-            # 检查是否为 GIF，跳过
-            if GifUtils.is_animated_gif(input_path):
-                skipped_gifs += 1
-                continue
-            
-            # 确定输出路径
             if output_mode == "overwrite":
                 output_path = input_path
             elif output_mode == "new":
@@ -622,47 +659,108 @@ class ImageCompressView(ft.Container):
             
             # 根据全局设置决定是否添加序号（覆盖模式除外）
             if output_mode != "overwrite":
-                add_sequence = self.config_service.get_config_value("output_add_sequence", False)
-                output_path = get_unique_path(output_path, add_sequence=add_sequence)
+                output_path = get_unique_path(output_path, add_sequence=add_sequence, reserved=reserved_paths)
             
-            # 执行压缩
-            success, message = self.image_service.compress_image(
-                input_path,
-                output_path,
-                mode=mode,
-                quality=quality
+            tasks.append(CompressTask(index=i, input_path=input_path, output_path=output_path))
+        
+        # 显示进度
+        self.is_compressing = True
+        self.compress_button.content.disabled = True
+        self.cancel_button.visible = True
+        self.progress_bar.visible = True
+        self.progress_bar.value = 0
+        self.progress_text.value = f"准备压缩... (并行 {self.batch_service.max_workers} 个进程)"
+        self.page.update()
+        
+        threading.Thread(
+            target=self._run_compress_batch,
+            args=(tasks, mode, quality, target_kb),
+            daemon=True,
+        ).start()
+    
+    def _run_compress_batch(
+        self, tasks: List[CompressTask], mode: str, quality: int, target_kb: Optional[int] = None
+    ) -> None:
+        """在后台线程中执行批量压缩。
+        
+        Args:
+            tasks: 压缩任务列表
+            mode: 压缩模式
+            quality: 质量参数
+            target_kb: 目标文件大小（KB），仅目标大小模式使用
+        """
+        total = len(tasks)
+        last_update = 0.0
+        
+        def on_result(result: CompressTaskResult, stats: BatchCompressStats) -> None:
+            nonlocal last_update
+            now = time.monotonic()
+            # 限制界面刷新频率，避免大批量时刷新本身成为瓶颈
+            if stats.completed < total and now - last_update < 0.1:
+                return
+            last_update = now
+            self.progress_bar.value = stats.completed / total
+            self.progress_text.value = (
+                f"正在压缩 ({stats.completed}/{total}): {result.input_path.name}\n"
+                f"已节省: {format_file_size(max(0, stats.saved_bytes))} • "
+                f"{stats.files_per_second:.1f} 文件/秒 • {stats.mb_per_second:.1f} MB/秒"
             )
-            
-            if success:
-                success_count += 1
-                total_original += input_path.stat().st_size
-                if output_path.exists():
-                    total_compressed += output_path.stat().st_size
+            try:
+                self.page.update()
+            except Exception:
+                pass
+        
+        try:
+            stats = self.batch_service.compress_batch(
+                tasks, mode=mode, quality=quality, on_result=on_result, target_kb=target_kb
+            )
+        except Exception as ex:
+            self.is_compressing = False
+            self.compress_button.content.disabled = False
+            self.cancel_button.visible = False
+            self.progress_bar.visible = False
+            self.progress_text.value = f"压缩失败: {ex}"
+            self._show_message("压缩失败！", ft.Colors.RED)
+            return
+        
+        self.is_compressing = False
+        self.compress_button.content.disabled = False
+        self.cancel_button.visible = False
         
         # 显示结果
         self.progress_bar.visible = False
-        self.progress_bar.update()
         
-        if total_original > 0:
-            total_ratio = (1 - total_compressed / total_original) * 100
+        title = "压缩已取消" if stats.cancelled else "压缩完成"
+        if stats.original_bytes > 0:
+            total_ratio = (1 - stats.compressed_bytes / stats.original_bytes) * 100
             result_message = (
-                f"压缩完成！\n"
-                f"成功: {success_count}/{total}\n"
-                f"原始大小: {format_file_size(total_original)}\n"
-                f"压缩后: {format_file_size(total_compressed)}\n"
-                f"减小: {total_ratio:.1f}%"
+                f"{title}！\n"
+                f"成功: {stats.success}/{total}\n"
+                f"原始大小: {format_file_size(stats.original_bytes)}\n"
+                f"压缩后: {format_file_size(stats.compressed_bytes)}\n"
+                f"减小: {total_ratio:.1f}%\n"
+                f"耗时: {stats.elapsed:.1f} 秒 ({stats.files_per_second:.1f} 文件/秒, {stats.mb_per_second:.1f} MB/秒)"
             )
-            if skipped_gifs > 0:
-                result_message += f"\n跳过 GIF: {skipped_gifs}个"
+            if stats.skipped > 0:
+                result_message += f"\n跳过 GIF: {stats.skipped}个"
         else:
-            result_message = f"压缩完成！成功: {success_count}/{total}"
-            if skipped_gifs > 0:
-                result_message += f" (跳过 GIF: {skipped_gifs}个)"
+            result_message = f"{title}！成功: {stats.success}/{total}"
+            if stats.skipped > 0:
+                result_message += f" (跳过 GIF: {stats.skipped}个)"
         
         self.progress_text.value = result_message
-        self.progress_text.update()
         
-        self._show_message("压缩完成！", ft.Colors.GREEN)
+        if stats.cancelled:
+            self._show_message("压缩已取消", ft.Colors.ORANGE)
+        else:
+            self._show_message("压缩完成！", ft.Colors.GREEN)
+    
+    def _on_cancel_compress(self, e: ft.ControlEvent) -> None:
+        """取消压缩按钮点击事件。"""
+        if self.is_compressing:
+            self.batch_service.cancel()
+            self.progress_text.value = "正在取消，等待进行中的文件完成..."
+            self.progress_text.update()
     
     
     def _on_back_click(self, e: ft.ControlEvent) -> None:
@@ -684,6 +782,8 @@ class ImageCompressView(ft.Container):
     def cleanup(self) -> None:
         """清理视图资源，释放内存。"""
         import gc
+        if self.is_compressing:
+            self.batch_service.cancel()
         if hasattr(self, 'selected_files'):
             self.selected_files.clear()
         # 清除回调引用，打破循环引用
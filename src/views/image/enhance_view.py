@@ -619,6 +619,9 @@ class ImageEnhanceView(ft.Container):
             cpu_threads = self.config_service.get_config_value("onnx_cpu_threads", 0)
             execution_mode = self.config_service.get_config_value("onnx_execution_mode", "sequential")
             enable_model_cache = self.config_service.get_config_value("onnx_enable_model_cache", False)
+            memmap_threshold_mb = self.config_service.get_config_value(
+                "image_enhance_memmap_threshold_mb", ImageEnhancer.DEFAULT_MEMMAP_THRESHOLD_MB
+            )
             
             self.enhancer = ImageEnhancer(
                 self.model_path,
@@ -630,7 +633,9 @@ class ImageEnhanceView(ft.Container):
                 scale=self.current_model.scale,
                 cpu_threads=cpu_threads,
                 execution_mode=execution_mode,
-                enable_model_cache=enable_model_cache
+                enable_model_cache=enable_model_cache,
+                memmap_threshold_mb=memmap_threshold_mb,
+                config_service=self.config_service
             )
             self._on_model_loaded(True, None)
         except Exception as e:
@@ -733,6 +738,9 @@ class ImageEnhanceView(ft.Container):
                 cpu_threads = self.config_service.get_config_value("onnx_cpu_threads", 0)
                 execution_mode = self.config_service.get_config_value("onnx_execution_mode", "sequential")
                 enable_model_cache = self.config_service.get_config_value("onnx_enable_model_cache", False)
+                memmap_threshold_mb = self.config_service.get_config_value(
+                    "image_enhance_memmap_threshold_mb", ImageEnhancer.DEFAULT_MEMMAP_THRESHOLD_MB
+                )
                 
                 self.enhancer = ImageEnhancer(
                     self.model_path,
@@ -744,7 +752,9 @@ class ImageEnhanceView(ft.Container):
                     scale=self.current_model.scale,
                     cpu_threads=cpu_threads,
                     execution_mode=execution_mode,
-                    enable_model_cache=enable_model_cache
+                    enable_model_cache=enable_model_cache,
+                    memmap_threshold_mb=memmap_threshold_mb,
+                    config_service=self.config_service
                 )
                 self._on_model_loaded(True, None)
             except Exception as e:
@@ -1345,13 +1355,35 @@ class ImageEnhanceView(ft.Container):
                     
                     image = Image.open(file_path)
                     
-                    # 增强图像
-                    result = self.enhancer.enhance_image(image)
+                    # 生成输出文件名
+                    if self.output_mode_radio.value == "new":
+                        output_filename = f"{file_path.stem}_enhanced{file_path.suffix}"
+                        output_path = file_path.parent / output_filename
+                    else:
+                        output_filename = f"{file_path.stem}_enhanced{file_path.suffix}"
+                        output_path = output_dir / output_filename
+                    
+                    # 根据全局设置决定是否添加序号
+                    add_sequence = self.config_service.get_config_value("output_add_sequence", False)
+                    output_path = get_unique_path(output_path, add_sequence=add_sequence)
+                    
+                    # 获取输出质量
+                    quality = int(self.quality_slider.value)
                     
-                    # 应用后处理（如果启用）
                     denoise_strength = int(self.denoise_slider.value)
                     sharpen_strength = int(self.sharpen_slider.value)
                     
+                    # 无后处理时直接编码到文件，大图结果不会整幅进入内存
+                    if (denoise_strength == 0 and sharpen_strength == 0 and
+                            output_path.suffix.lower() in ImageEnhancer.FILE_OUTPUT_FORMATS):
+                        self.enhancer.enhance_image_to_file(image, output_path, quality=quality)
+                        success_count += 1
+                        continue
+                    
+                    # 增强图像
+                    result = self.enhancer.enhance_image(image)
+                    
+                    # 应用后处理（如果启用）
                     if denoise_strength > 0 or sharpen_strength > 0:
                         # 转换为numpy数组进行处理
                         result_np = np.array(result)
@@ -1369,21 +1401,6 @@ class ImageEnhanceView(ft.Container):
                         result_np = cv2.cvtColor(result_np, cv2.COLOR_BGR2RGB)
                         result = Image.fromarray(result_np)
                     
-                    # 生成输出文件名
-                    if self.output_mode_radio.value == "new":
-                        output_filename = f"{file_path.stem}_enhanced{file_path.suffix}"
-                        output_path = file_path.parent / output_filename
-                    else:
-                        output_filename = f"{file_path.stem}_enhanced{file_path.suffix}"
-                        output_path = output_dir / output_filename
-                    
-                    # 根据全局设置决定是否添加序号
-                    add_sequence = self.config_service.get_config_value("output_add_sequence", False)
-                    output_path = get_unique_path(output_path, add_sequence=add_sequence)
-                    
-                    # 获取输出质量
-                    quality = int(self.quality_slider.value)
-                    
                     # 保存结果
                     if output_path.suffix.lower() in ['.jpg', '.jpeg']:
                         result.save(output_path, quality=quality, optimize=True)
@@ -4,7 +4,7 @@
 提供图片格式转换、尺寸调整、滤镜效果等功能的用户界面。
 """
 
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 import flet as ft
 
@@ -16,18 +16,17 @@ from constants import (
 )
 from services import ConfigService, ImageService
 from utils import logger
-from views.image.background_view import ImageBackgroundView
-from views.image.compress_view import ImageCompressView
-from views.image.crop_view import ImageCropView
-from views.image.enhance_view import ImageEnhanceView
-from views.image.format_view import ImageFormatView
-from views.image.gif_adjustment_view import GifAdjustmentView
-from views.image.info_view import ImageInfoView
-from views.image.puzzle.split_view import ImagePuzzleSplitView
-from views.image.puzzle.merge_view import ImagePuzzleMergeView
-from views.image.resize_view import ImageResizeView
-from views.image.search_view import ImageSearchView
-from views.image.watermark_remove_view import ImageWatermarkRemoveView
+from utils.tool_registry import load_tool_view
+
+if TYPE_CHECKING:
+    from views.image.background_view import ImageBackgroundView
+    from views.image.compress_view import ImageCompressView
+    from views.image.crop_view import ImageCropView
+    from views.image.enhance_view import ImageEnhanceView
+    from views.image.format_view import ImageFormatView
+    from views.image.gif_adjustment_view import GifAdjustmentView
+    from views.image.info_view import ImageInfoView
+    from views.image.resize_view import ImageResizeView
 
 
 class ImageView(ft.Container):
@@ -66,17 +65,17 @@ class ImageView(ft.Container):
         )
         
         # 创建子视图（延迟创建）
-        self.compress_view: Optional[ImageCompressView] = None
+        self.compress_view: Optional["ImageCompressView"] = None
         self.image_tools_install_view: Optional[object] = None  # 图片工具安装视图
-        self.resize_view: Optional[ImageResizeView] = None
-        self.format_view: Optional[ImageFormatView] = None
-        self.background_view: Optional[ImageBackgroundView] = None
-        self.enhance_view: Optional[ImageEnhanceView] = None
+        self.resize_view: Optional["ImageResizeView"] = None
+        self.format_view: Optional["ImageFormatView"] = None
+        self.background_view: Optional["ImageBackgroundView"] = None
+        self.enhance_view: Optional["ImageEnhanceView"] = None
         self.split_view = None  # 九宫格切分视图
         self.merge_view = None  # 多图合并视图
-        self.crop_view: Optional[ImageCropView] = None
-        self.info_view: Optional[ImageInfoView] = None
-        self.gif_adjustment_view: Optional[GifAdjustmentView] = None
+        self.crop_view: Optional["ImageCropView"] = None
+        self.info_view: Optional["ImageInfoView"] = None
+        self.gif_adjustment_view: Optional["GifAdjustmentView"] = None
         self.to_base64_view = None  # 图片转Base64视图
         self.rotate_view = None  # 图片旋转/翻转视图
         self.remove_exif_view = None  # 去除EXIF视图
@@ -431,7 +430,7 @@ class ImageView(ft.Container):
         
         # 创建压缩视图（如果还没创建）
         if not self.compress_view:
-            self.compress_view = ImageCompressView(
+            self.compress_view = load_tool_view("image.compress")(
                 self._saved_page,
                 self.config_service,
                 self.image_service,
@@ -462,7 +461,7 @@ class ImageView(ft.Container):
         
         # 创建尺寸调整视图（如果还没创建）
         if not self.resize_view:
-            self.resize_view = ImageResizeView(
+            self.resize_view = load_tool_view("image.resize")(
                 self._saved_page,
                 self.config_service,
                 self.image_service,
@@ -492,7 +491,7 @@ class ImageView(ft.Container):
         
         # 创建格式转换视图（如果还没创建）
         if not self.format_view:
-            self.format_view = ImageFormatView(
+            self.format_view = load_tool_view("image.format")(
                 self._saved_page,
                 self.config_service,
                 self.image_service,
@@ -526,7 +525,7 @@ class ImageView(ft.Container):
         def delayed_create_and_switch():
             # 创建背景移除视图（如果还没创建）
             if not self.background_view:
-                self.background_view = ImageBackgroundView(
+                self.background_view = load_tool_view("image.background")(
                     self._saved_page,
                     self.config_service,
                     self.image_service,
@@ -564,7 +563,7 @@ class ImageView(ft.Container):
         def delayed_create_and_switch():
             # 创建图像增强视图（如果还没创建）
             if not self.enhance_view:
-                self.enhance_view = ImageEnhanceView(
+                self.enhance_view = load_tool_view("image.enhance")(
                     self._saved_page,
                     self.config_service,
                     self.image_service,
@@ -598,7 +597,7 @@ class ImageView(ft.Container):
         
         # 创建切分视图（如果还没创建）
         if not self.split_view:
-            self.split_view = ImagePuzzleSplitView(
+            self.split_view = load_tool_view("image.puzzle.split")(
                 self._saved_page,
                 self.config_service,
                 self.image_service,
@@ -628,7 +627,7 @@ class ImageView(ft.Container):
         
         # 创建合并视图（如果还没创建）
         if not self.merge_view:
-            self.merge_view = ImagePuzzleMergeView(
+            self.merge_view = load_tool_view("image.puzzle.merge")(
                 self._saved_page,
                 self.config_service,
                 self.image_service,
@@ -658,7 +657,7 @@ class ImageView(ft.Container):
         
         # 创建裁剪视图（如果还没创建）
         if not self.crop_view:
-            self.crop_view = ImageCropView(
+            self.crop_view = load_tool_view("image.crop")(
                 self._saved_page,
                 self.config_service,
                 self.image_service,
@@ -688,7 +687,7 @@ class ImageView(ft.Container):
         
         # 创建信息查看视图（如果还没创建）
         if not self.info_view:
-            self.info_view = ImageInfoView(
+            self.info_view = load_tool_view("image.info")(
                 self._saved_page,
                 self.config_service,
                 self.image_service,
@@ -718,7 +717,7 @@ class ImageView(ft.Container):
         
         # 创建 GIF 调整视图（如果还没创建）
         if not self.gif_adjustment_view:
-            self.gif_adjustment_view = GifAdjustmentView(
+            self.gif_adjustment_view = load_tool_view("image.gif")(
                 self._saved_page,
                 self.config_service,
                 self.image_service,
@@ -749,8 +748,7 @@ class ImageView(ft.Container):
         
         # 创建图片转Base64视图（如果还没创建）
         if not self.to_base64_view:
-            from views.image.to_base64_view import ImageToBase64View
-            self.to_base64_view = ImageToBase64View(
+            self.to_base64_view = load_tool_view("image.to_base64")(
                 self._saved_page,
                 self.config_service,
                 self.image_service,
@@ -780,8 +778,7 @@ class ImageView(ft.Container):
         
         # 创建图片旋转视图（如果还没创建）
         if not self.rotate_view:
-            from views.image.rotate_view import ImageRotateView
-            self.rotate_view = ImageRotateView(
+            self.rotate_view = load_tool_view("image.rotate")(
                 self._saved_page,
                 self.config_service,
                 self.image_service,
@@ -811,8 +808,7 @@ class ImageView(ft.Container):
         
         # 创建去除EXIF视图（如果还没创建）
         if not self.remove_exif_view:
-            from views.image.remove_exif_view import ImageRemoveExifView
-            self.remove_exif_view = ImageRemoveExifView(
+            self.remove_exif_view = load_tool_view("image.exif")(
                 self._saved_page,
                 self.config_service,
                 self.image_service,
@@ -842,8 +838,7 @@ class ImageView(ft.Container):
         
         # 创建二维码生成视图（如果还没创建）
         if not self.qrcode_view:
-            from views.image.qrcode_view import QRCodeGeneratorView
-            self.qrcode_view = QRCodeGeneratorView(
+            self.qrcode_view = load_tool_view("image.qrcode")(
                 self._saved_page,
                 self.config_service,
                 self.image_service,
@@ -873,8 +868,7 @@ class ImageView(ft.Container):
         
         # 创建添加水印视图（如果还没创建）
         if not self.watermark_view:
-            from views.image.watermark_view import ImageWatermarkView
-            self.watermark_view = ImageWatermarkView(
+            self.watermark_view = load_tool_view("image.watermark")(
                 self._saved_page,
                 self.config_service,
                 self.image_service,
@@ -904,7 +898,7 @@ class ImageView(ft.Container):
         
         # 创建图片去水印视图（如果还没创建）
         if not self.watermark_remove_view:
-            self.watermark_remove_view = ImageWatermarkRemoveView(
+            self.watermark_remove_view = load_tool_view("image.watermark_remove")(
                 self._saved_page,
                 self.config_service,
                 on_back=self._back_to_main
@@ -933,7 +927,7 @@ class ImageView(ft.Container):
         
         # 创建图片搜索视图（如果还没创建）
         if not self.search_view:
-            self.search_view = ImageSearchView(
+            self.search_view = load_tool_view("image.search")(
                 self._saved_page,
                 on_back=self._back_to_main
             )
@@ -961,8 +955,7 @@ class ImageView(ft.Container):
         
         # 创建OCR视图（如果还没创建）
         if not self.ocr_view:
-            from views.image.ocr_view import OCRView
-            self.ocr_view = OCRView(
+            self.ocr_view = load_tool_view("image.ocr")(
                 self._saved_page,
                 self.config_service,
                 on_back=self._back_to_main
@@ -1021,28 +1021,20 @@ class OCRView(ft.Container):
                             pass
                         return
                 
-                # 逐个处理文件
-                for i, file_path in enumerate(self.selected_files):
-                    def file_progress_callback(progress: float, message: str):
-                        # 计算总进度（加载10% + 文件处理90%）
-                        file_base_progress = 0.1 + (i / total_files) * 0.9
-                        file_delta_progress = (progress / total_files) * 0.9
-                        total_progress = file_base_progress + file_delta_progress
-                        
-                        self.progress_bar.value = total_progress
-                        self.progress_text.value = f"正在处理 {i+1}/{total_files}: {file_path.name} - {message}"
-                        try:
-                            self.page.update()
-                        except:
-                            pass
-                    
-                    # 执行OCR
-                    success, results = self.ocr_service.ocr(
-                        str(file_path),
-                        progress_callback=file_progress_callback
-                    )
+                # 批量处理文件（读取/检测/识别流水线，未变化的图片直接使用缓存结果）
+                self.progress_bar.value = 0.1
+                self.progress_text.value = f"正在处理 0/{total_files}..."
+                try:
+                    self.page.update()
+                except:
+                    pass
+                
+                selected_files = list(self.selected_files)
+                for page_result in self.ocr_service.ocr_many(selected_files):
+                    file_path = selected_files[page_result.index]
                     
-                    if success:
+                    if page_result.success:
+                        results = page_result.results
                         self.ocr_results[str(file_path)] = results
                         
                         # 自动保存结果到文件
@@ -1056,6 +1048,11 @@ class OCRView(ft.Container):
                         fail_count += 1
                         logger.error(f"OCR识别失败: {file_path}")
                     
+                    # 计算总进度（加载10% + 文件处理90%）
+                    done_count = page_result.index + 1
+                    self.progress_bar.value = 0.1 + (done_count / total_files) * 0.9
+                    self.progress_text.value = f"已处理 {done_count}/{total_files}: {file_path.name}"
+                    
                     # 更新文件列表显示（标记已处理）
                     try:
                         self._update_file_list()
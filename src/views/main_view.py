@@ -6,13 +6,13 @@
 
 import threading
 import webbrowser
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 import flet as ft
 
 from components import CustomTitleBar, ToolInfo, ToolSearchDialog
 from constants import APP_VERSION, BUILD_CUDA_VARIANT, DOWNLOAD_URL_GITHUB, DOWNLOAD_URL_CHINA
-from services import ConfigService, EncodingService, ImageService, FFmpegService, UpdateService, UpdateStatus
+from services import ConfigService
 from utils.tool_registry import register_all_tools
 from utils import get_all_tools
 
@@ -34,12 +34,15 @@ def get_full_version_string() -> str:
         return f"{version} (CUDA Full)"
     else:
         return version
-from views.media import MediaView
-from views.dev_tools import DevToolsView
-from views.others import OthersView
-from views.image import ImageView
-from views.settings_view import SettingsView
 from views.recommendations_view import RecommendationsView
+from views.settings_view import SettingsView
+
+if TYPE_CHECKING:
+    from services import EncodingService, FFmpegService, ImageService
+    from views.dev_tools import DevToolsView
+    from views.image import ImageView
+    from views.media import MediaView
+    from views.others import OthersView
 
 
 class MainView(ft.Column):
@@ -63,11 +66,11 @@ class MainView(ft.Column):
         self.expand: bool = True
         self.spacing: int = 0
         
-        # 创建服务
+        # 创建服务（其余服务依赖较重，首次使用时再创建）
         self.config_service: ConfigService = ConfigService()
-        self.image_service: ImageService = ImageService(self.config_service)
-        self.encoding_service: EncodingService = EncodingService()
-        self.ffmpeg_service: FFmpegService = FFmpegService(self.config_service)
+        self._image_service: Optional["ImageService"] = None
+        self._encoding_service: Optional["EncodingService"] = None
+        self._ffmpeg_service: Optional["FFmpegService"] = None
         
         # 创建自定义标题栏（传递配置服务以保存窗口状态）
         self.title_bar: CustomTitleBar = CustomTitleBar(page, self.config_service)
@@ -77,11 +80,14 @@ class MainView(ft.Column):
         
         # 创建各功能视图
         self.recommendations_view: Optional[RecommendationsView] = None  # 推荐视图
-        self.image_view: Optional[ImageView] = None
-        self.dev_tools_view: Optional[DevToolsView] = None
-        self.media_view: Optional[MediaView] = None  # 统一的媒体处理视图
-        self.others_view: Optional[OthersView] = None
-        self.settings_view: SettingsView = SettingsView(page, self.config_service)
+        self.image_view: Optional["ImageView"] = None
+        self.dev_tools_view: Optional["DevToolsView"] = None
+        self.media_view: Optional["MediaView"] = None  # 统一的媒体处理视图
+        self.others_view: Optional["OthersView"] = None
+        self._settings_view: Optional[SettingsView] = None  # 设置视图（首次打开时创建）
+        if SettingsView.needs_startup_restore(self.config_service):
+            # 需要在启动时恢复自定义字体或壁纸轮换，立即创建
+            self._settings_view = SettingsView(page, self.config_service)
         
         # 创建UI组件
         self._build_ui()
@@ -289,13 +295,7 @@ class MainView(ft.Column):
             self.content_container.content = self.recommendations_view
         else:
             # 按需创建图片视图
-            self.image_view = ImageView(
-                self.page, 
-                self.config_service, 
-                self.image_service, 
-                self.content_container,
-            )
-            self.content_container.content = self.image_view
+            self.content_container.content = self._get_or_create_image_view()
         
         # 注册键盘快捷键
         self.page.on_keyboard_event = self._on_keyboard
@@ -329,9 +329,41 @@ class MainView(ft.Column):
         # 我们将在初始化完成后添加
         self.page.floating_action_button = self.fab_search
     
-    def _get_or_create_image_view(self) -> ImageView:
+    @property
+    def image_service(self) -> "ImageService":
+        """图片服务（懒加载，依赖 numpy/cv2/PIL）。"""
+        if self._image_service is None:
+            from services import ImageService
+            self._image_service = ImageService(self.config_service)
+        return self._image_service
+    
+    @property
+    def encoding_service(self) -> "EncodingService":
+        """编码服务（懒加载）。"""
+        if self._encoding_service is None:
+            from services import EncodingService
+            self._encoding_service = EncodingService()
+        return self._encoding_service
+    
+    @property
+    def ffmpeg_service(self) -> "FFmpegService":
+        """FFmpeg 服务（懒加载）。"""
+        if self._ffmpeg_service is None:
+            from services import FFmpegService
+            self._ffmpeg_service = FFmpegService(self.config_service)
+        return self._ffmpeg_service
+    
+    @property
+    def settings_view(self) -> SettingsView:
+        """设置视图（懒加载）。"""
+        if self._settings_view is None:
+            self._settings_view = SettingsView(self.page, self.config_service)
+        return self._settings_view
+    
+    def _get_or_create_image_view(self) -> "ImageView":
         """获取或创建图片视图（懒加载）。"""
         if self.image_view is None:
+            from views.image import ImageView
             self.image_view = ImageView(
                 self.page, 
                 self.config_service, 
@@ -340,9 +372,10 @@ class MainView(ft.Column):
             )
         return self.image_view
     
-    def _get_or_create_media_view(self) -> MediaView:
+    def _get_or_create_media_view(self) -> "MediaView":
         """获取或创建媒体视图（懒加载）。"""
         if self.media_view is None:
+            from views.media import MediaView
             self.media_view = MediaView(
                 self.page, 
                 self.config_service, 
@@ -350,9 +383,10 @@ class MainView(ft.Column):
             )
         return self.media_view
     
-    def _get_or_create_dev_tools_view(self) -> DevToolsView:
+    def _get_or_create_dev_tools_view(self) -> "DevToolsView":
         """获取或创建开发工具视图（懒加载）。"""
         if self.dev_tools_view is None:
+            from views.dev_tools import DevToolsView
             self.dev_tools_view = DevToolsView(
                 self.page, 
                 self.config_service, 
@@ -361,9 +395,10 @@ class MainView(ft.Column):
             )
         return self.dev_tools_view
     
-    def _get_or_create_others_view(self) -> OthersView:
+    def _get_or_create_others_view(self) -> "OthersView":
         """获取或创建其他工具视图（懒加载）。"""
         if self.others_view is None:
+            from views.others import OthersView
             self.others_view = OthersView(
                 self.page, 
                 self.config_service, 
@@ -670,7 +705,7 @@ class MainView(ft.Column):
         
         # 调整选中的索引
         # 检查当前是否在设置页面
-        is_in_settings = self.content_container.content == self.settings_view
+        is_in_settings = self._settings_view is not None and self.content_container.content == self._settings_view
         
         # 更新导航栏内容
         if show and not is_in_settings:
@@ -748,6 +783,8 @@ class MainView(ft.Column):
                 from utils import logger
                 logger.info("[Update] 开始检查更新...")
                 
+                from services import UpdateService, UpdateStatus
+                
                 update_service = UpdateService()
                 update_info = update_service.check_update()
                 
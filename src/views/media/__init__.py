@@ -4,11 +4,18 @@
 提供音视频处理相关的所有视图组件。
 """
 
-from views.media.audio_format_view import AudioFormatView
-from views.media.ffmpeg_install_view import FFmpegInstallView
-from views.media.media_view import MediaView
-from views.media.video_enhance_view import VideoEnhanceView
-from views.media.video_subtitle_view import VideoSubtitleView
+from utils.lazy_import import lazy_exports
+
+# 视图模块在首次访问时再导入
+_LAZY_EXPORTS = {
+    "AudioFormatView": "views.media.audio_format_view",
+    "FFmpegInstallView": "views.media.ffmpeg_install_view",
+    "MediaView": "views.media.media_view",
+    "VideoEnhanceView": "views.media.video_enhance_view",
+    "VideoSubtitleView": "views.media.video_subtitle_view",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _LAZY_EXPORTS, globals())
 
 __all__ = [
     'AudioFormatView',
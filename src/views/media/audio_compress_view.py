@@ -7,7 +7,7 @@
 import re
 import threading
 from pathlib import Path
-from typing import Callable, List, Optional
+from typing import Callable, List, Optional, Set
 
 import flet as ft
 
@@ -18,7 +18,7 @@ from constants import (
     PADDING_SMALL,
     PADDING_XLARGE,
 )
-from services import ConfigService, FFmpegService
+from services import ConfigService, FFmpegJobQueue, FFmpegJobStatus, FFmpegService
 from utils import format_file_size, logger, get_unique_path
 from views.media.ffmpeg_install_view import FFmpegInstallView
 
@@ -59,6 +59,7 @@ class AudioCompressView(ft.Container):
         self.on_back: Optional[Callable] = on_back
         
         self.selected_files: List[Path] = []
+        self._job_queue: Optional[FFmpegJobQueue] = None
         
         self.expand: bool = True
         self.padding: ft.padding = ft.padding.only(
@@ -539,19 +540,33 @@ class AudioCompressView(ft.Container):
     
     def _process_files(self) -> None:
         """处理文件（后台线程）。"""
-        total_files = len(self.selected_files)
-        success_count = 0
+        # 构建FFmpeg参数
+        bitrate = int(self.bitrate_slider.value)
+        sample_rate = self.sample_rate_dropdown.value
+        channels = self.channel_dropdown.value
+        
+        def compress_job(job):
+            success = self._compress_audio(
+                job.item,
+                job.data["output_path"],
+                bitrate,
+                sample_rate,
+                channels,
+                process_callback=job.attach_process
+            )
+            return success, "" if success else "压缩失败"
+        
+        # 音频编码基本是单线程，按核心数并发
+        job_queue = self.ffmpeg_service.create_job_queue()
+        self._job_queue = job_queue
         error_count = 0
         
-        for i, file_path in enumerate(self.selected_files):
+        # 输出路径按顺序预先分配，避免并发作业写入同一个文件
+        add_sequence = self.config_service.get_config_value("output_add_sequence", False)
+        reserved_paths: Set[Path] = set()
+        
+        for file_path in self.selected_files:
             try:
-                # 更新进度
-                progress = (i + 1) / total_files
-                self._update_progress(
-                    progress,
-                    f"正在压缩: {file_path.name} ({i + 1}/{total_files})"
-                )
-                
                 # 确定输出路径
                 if self.output_mode.value == "custom_dir":
                     output_dir = Path(self.output_dir_field.value)
@@ -561,31 +576,19 @@ class AudioCompressView(ft.Container):
                 output_path = output_dir / f"{file_path.stem}_compressed{file_path.suffix}"
                 
                 # 根据全局设置决定是否添加序号
-                add_sequence = self.config_service.get_config_value("output_add_sequence", False)
-                output_path = get_unique_path(output_path, add_sequence=add_sequence)
-                
-                # 构建FFmpeg参数
-                bitrate = int(self.bitrate_slider.value)
-                sample_rate = self.sample_rate_dropdown.value
-                channels = self.channel_dropdown.value
-                
-                # 执行压缩
-                success = self._compress_audio(
-                    file_path,
-                    output_path,
-                    bitrate,
-                    sample_rate,
-                    channels
-                )
-                
-                if success:
-                    success_count += 1
-                else:
-                    error_count += 1
-                    
-            except Exception as e:
+                output_path = get_unique_path(output_path, add_sequence=add_sequence, reserved=reserved_paths)
+                job = job_queue.submit(compress_job, item=file_path, weight=file_path.stat().st_size)
+                job.data["output_path"] = output_path
+            except Exception:
                 error_count += 1
         
+        jobs = job_queue.run(
+            on_progress=lambda progress: self._update_progress(progress.progress, progress.summary())
+        )
+        self._job_queue = None
+        success_count = sum(1 for job in jobs if job.status == FFmpegJobStatus.SUCCEEDED)
+        error_count += len(jobs) - success_count
+        
         # 完成处理
         self._on_processing_complete(success_count, error_count)
     
@@ -595,7 +598,8 @@ class AudioCompressView(ft.Container):
         output_path: Path,
         bitrate: int,
         sample_rate: str,
-        channels: str
+        channels: str,
+        process_callback: Optional[Callable] = None
     ) -> bool:
         """压缩音频文件。
         
@@ -605,6 +609,7 @@ class AudioCompressView(ft.Container):
             bitrate: 比特率（kbps）
             sample_rate: 采样率
             channels: 声道数
+            process_callback: ffmpeg 进程启动后的回调（用于取消时终止进程）
         
         Returns:
             是否成功
@@ -632,14 +637,19 @@ class AudioCompressView(ft.Container):
             stream = ffmpeg.output(stream, str(output_path), **output_kwargs)
             
             # 执行转换（覆盖已存在的文件）
-            ffmpeg.run(
+            process = ffmpeg.run_async(
                 stream,
                 cmd=self.ffmpeg_service.get_ffmpeg_path(),
                 overwrite_output=True,
-                capture_stdout=True,
-                capture_stderr=True,
+                pipe_stdout=True,
+                pipe_stderr=True,
                 quiet=True
             )
+            if process_callback:
+                process_callback(process)
+            out, err = process.communicate()
+            if process.returncode != 0:
+                raise ffmpeg.Error('ffmpeg', out, err)
             
             return True
             
@@ -752,6 +762,9 @@ class AudioCompressView(ft.Container):
     def cleanup(self) -> None:
         """清理视图资源，释放内存。"""
         import gc
+        # 终止仍在运行的 ffmpeg 作业
+        if self._job_queue:
+            self._job_queue.cancel_all()
         if hasattr(self, 'selected_files'):
             self.selected_files.clear()
         # 清除回调引用，打破循环引用
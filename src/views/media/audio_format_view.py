@@ -6,7 +6,7 @@
 
 import threading
 from pathlib import Path
-from typing import Callable, List, Optional
+from typing import Callable, List, Optional, Set
 
 import flet as ft
 
@@ -17,7 +17,7 @@ from constants import (
     PADDING_SMALL,
     PADDING_XLARGE,
 )
-from services import AudioService, ConfigService, FFmpegService
+from services import AudioService, ConfigService, FFmpegJobQueue, FFmpegJobStatus, FFmpegService
 from utils import format_file_size, logger, get_unique_path
 
 
@@ -59,6 +59,7 @@ class AudioFormatView(ft.Container):
         self.on_back: Optional[Callable] = on_back
         
         self.selected_files: List[Path] = []
+        self._job_queue: Optional[FFmpegJobQueue] = None
         
         self.expand: bool = True
         self.padding: ft.padding = ft.padding.only(
@@ -661,16 +662,30 @@ class AudioFormatView(ft.Container):
             pass
         
         # 在后台线程处理
+        def convert_job(job):
+            return self.audio_service.convert_audio(
+                job.item,
+                job.data["output_path"],
+                output_format=output_format,
+                bitrate=bitrate,
+                sample_rate=sample_rate,
+                channels=channels,
+                process_callback=job.attach_process
+            )
+        
         def process_task():
             total_files = len(self.selected_files)
-            success_count = 0
             
-            for i, file_path in enumerate(self.selected_files):
+            # 音频编码基本是单线程，按核心数并发
+            job_queue = self.ffmpeg_service.create_job_queue()
+            self._job_queue = job_queue
+            
+            # 输出路径按顺序预先分配，避免并发作业写入同一个文件
+            add_sequence = self.config_service.get_config_value("output_add_sequence", False)
+            reserved_paths: Set[Path] = set()
+            
+            for file_path in self.selected_files:
                 try:
-                    # 更新进度
-                    progress = i / total_files
-                    self._update_progress(progress, f"正在转换: {file_path.name} ({i+1}/{total_files})")
-                    
                     # 生成输出文件名
                     if output_dir:
                         output_path = output_dir / f"{file_path.stem}.{output_format}"
@@ -678,27 +693,23 @@ class AudioFormatView(ft.Container):
                         output_path = file_path.parent / f"{file_path.stem}_converted.{output_format}"
                     
                     # 根据全局设置决定是否添加序号
-                    add_sequence = self.config_service.get_config_value("output_add_sequence", False)
-                    output_path = get_unique_path(output_path, add_sequence=add_sequence)
-                    
-                    # 转换音频
-                    success, message = self.audio_service.convert_audio(
-                        file_path,
-                        output_path,
-                        output_format=output_format,
-                        bitrate=bitrate,
-                        sample_rate=sample_rate,
-                        channels=channels
-                    )
-                    
-                    if success:
-                        success_count += 1
-                    else:
-                        logger.error(f"转换失败 {file_path.name}: {message}")
-                
+                    output_path = get_unique_path(output_path, add_sequence=add_sequence, reserved=reserved_paths)
+                    job = job_queue.submit(convert_job, item=file_path, weight=file_path.stat().st_size)
+                    job.data["output_path"] = output_path
                 except Exception as ex:
                     logger.error(f"处理失败 {file_path.name}: {ex}")
             
+            def on_job_finished(job):
+                if job.status != FFmpegJobStatus.SUCCEEDED:
+                    logger.error(f"转换失败 {job.name}: {job.message}")
+            
+            jobs = job_queue.run(
+                on_progress=lambda progress: self._update_progress(progress.progress, progress.summary()),
+                on_job_finished=on_job_finished
+            )
+            self._job_queue = None
+            success_count = sum(1 for job in jobs if job.status == FFmpegJobStatus.SUCCEEDED)
+            
             # 处理完成
             self._on_process_complete(success_count, total_files, output_dir)
         
@@ -802,6 +813,9 @@ class AudioFormatView(ft.Container):
     def cleanup(self) -> None:
         """清理视图资源，释放内存。"""
         import gc
+        # 终止仍在运行的 ffmpeg 作业
+        if self._job_queue:
+            self._job_queue.cancel_all()
         if hasattr(self, 'selected_files'):
             self.selected_files.clear()
         # 清除回调引用，打破循环引用
@@ -98,7 +98,8 @@ class AudioToTextView(ft.Container):
         self.speech_service: SpeechRecognitionService = SpeechRecognitionService(
             model_dir,
             ffmpeg_service,
-            vad_service=self.vad_service
+            vad_service=self.vad_service,
+            config_service=self.config_service
         )
         self.model_loading: bool = False
         self.model_loaded: bool = False
@@ -4,7 +4,7 @@
 提供音频和视频处理相关功能的统一用户界面。
 """
 
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 import flet as ft
 
@@ -15,23 +15,26 @@ from constants import (
     PADDING_MEDIUM,
 )
 from services import AudioService, ConfigService, FFmpegService
-from views.media.audio_compress_view import AudioCompressView
-from views.media.audio_format_view import AudioFormatView
-from views.media.audio_speed_view import AudioSpeedView
-from views.media.audio_to_text_view import AudioToTextView
+from utils.tool_registry import load_tool_view
+
+if TYPE_CHECKING:
+    from views.media.audio_compress_view import AudioCompressView
+    from views.media.audio_format_view import AudioFormatView
+    from views.media.audio_speed_view import AudioSpeedView
+    from views.media.audio_to_text_view import AudioToTextView
+    from views.media.screen_record_view import ScreenRecordView
+    from views.media.subtitle_remove_view import SubtitleRemoveView
+    from views.media.video_compress_view import VideoCompressView
+    from views.media.video_convert_view import VideoConvertView
+    from views.media.video_enhance_view import VideoEnhanceView
+    from views.media.video_extract_audio_view import VideoExtractAudioView
+    from views.media.video_interpolation_view import VideoInterpolationView
+    from views.media.video_repair_view import VideoRepairView
+    from views.media.video_speed_view import VideoSpeedView
+    from views.media.video_subtitle_view import VideoSubtitleView
+    from views.media.video_vocal_separation_view import VideoVocalSeparationView
+    from views.media.video_watermark_view import VideoWatermarkView
 from views.media.ffmpeg_install_view import FFmpegInstallView
-from views.media.video_compress_view import VideoCompressView
-from views.media.video_convert_view import VideoConvertView
-from views.media.video_enhance_view import VideoEnhanceView
-from views.media.video_extract_audio_view import VideoExtractAudioView
-from views.media.video_interpolation_view import VideoInterpolationView
-from views.media.video_repair_view import VideoRepairView
-from views.media.video_speed_view import VideoSpeedView
-from views.media.video_vocal_separation_view import VideoVocalSeparationView
-from views.media.video_watermark_view import VideoWatermarkView
-from views.media.subtitle_remove_view import SubtitleRemoveView
-from views.media.video_subtitle_view import VideoSubtitleView
-from views.media.screen_record_view import ScreenRecordView
 
 
 class MediaView(ft.Container):
@@ -80,25 +83,25 @@ class MediaView(ft.Container):
         self.audio_service: AudioService = AudioService(self.ffmpeg_service)
         
         # 创建音频子视图（延迟创建）
-        self.audio_format_view: Optional[AudioFormatView] = None
-        self.audio_compress_view: Optional[AudioCompressView] = None
-        self.audio_speed_view: Optional[AudioSpeedView] = None
+        self.audio_format_view: Optional["AudioFormatView"] = None
+        self.audio_compress_view: Optional["AudioCompressView"] = None
+        self.audio_speed_view: Optional["AudioSpeedView"] = None
         self.vocal_extraction_view = None  # 人声提取视图
-        self.audio_to_text_view: Optional[AudioToTextView] = None  # 音视频转文字视图
+        self.audio_to_text_view: Optional["AudioToTextView"] = None  # 音视频转文字视图
         
         # 创建视频子视图（延迟创建）
-        self.video_compress_view: Optional[VideoCompressView] = None
-        self.video_convert_view: Optional[VideoConvertView] = None
-        self.video_enhance_view: Optional[VideoEnhanceView] = None
-        self.video_interpolation_view: Optional[VideoInterpolationView] = None
-        self.video_extract_audio_view: Optional[VideoExtractAudioView] = None
-        self.video_repair_view: Optional[VideoRepairView] = None
-        self.video_speed_view: Optional[VideoSpeedView] = None
-        self.video_vocal_separation_view: Optional[VideoVocalSeparationView] = None
-        self.video_watermark_view: Optional[VideoWatermarkView] = None
-        self.subtitle_remove_view: Optional[SubtitleRemoveView] = None
-        self.video_subtitle_view: Optional[VideoSubtitleView] = None
-        self.screen_record_view: Optional[ScreenRecordView] = None
+        self.video_compress_view: Optional["VideoCompressView"] = None
+        self.video_convert_view: Optional["VideoConvertView"] = None
+        self.video_enhance_view: Optional["VideoEnhanceView"] = None
+        self.video_interpolation_view: Optional["VideoInterpolationView"] = None
+        self.video_extract_audio_view: Optional["VideoExtractAudioView"] = None
+        self.video_repair_view: Optional["VideoRepairView"] = None
+        self.video_speed_view: Optional["VideoSpeedView"] = None
+        self.video_vocal_separation_view: Optional["VideoVocalSeparationView"] = None
+        self.video_watermark_view: Optional["VideoWatermarkView"] = None
+        self.subtitle_remove_view: Optional["SubtitleRemoveView"] = None
+        self.video_subtitle_view: Optional["VideoSubtitleView"] = None
+        self.screen_record_view: Optional["ScreenRecordView"] = None
         
         # FFmpeg安装视图
         self.ffmpeg_install_view: Optional[FFmpegInstallView] = None
@@ -314,7 +317,7 @@ class MediaView(ft.Container):
         # 根据视图名称创建或切换到对应的子视图
         if view_name == 'audio_format':
             if not self.audio_format_view:
-                self.audio_format_view = AudioFormatView(
+                self.audio_format_view = load_tool_view("audio.format")(
                     self._saved_page,
                     self.config_service,
                     self.audio_service,
@@ -325,7 +328,7 @@ class MediaView(ft.Container):
             
         elif view_name == 'audio_compress':
             if not self.audio_compress_view:
-                self.audio_compress_view = AudioCompressView(
+                self.audio_compress_view = load_tool_view("audio.compress")(
                     self._saved_page,
                     self.config_service,
                     self.ffmpeg_service,
@@ -335,7 +338,7 @@ class MediaView(ft.Container):
             
         elif view_name == 'audio_speed':
             if not self.audio_speed_view:
-                self.audio_speed_view = AudioSpeedView(
+                self.audio_speed_view = load_tool_view("audio.speed")(
                     self._saved_page,
                     self.config_service,
                     self.ffmpeg_service,
@@ -345,8 +348,7 @@ class MediaView(ft.Container):
             
         elif view_name == 'vocal_extraction':
             if not self.vocal_extraction_view:
-                from views.media.vocal_extraction_view import VocalExtractionView
-                self.vocal_extraction_view = VocalExtractionView(
+                self.vocal_extraction_view = load_tool_view("audio.vocal_extraction")(
                     self._saved_page,
                     self.config_service,
                     self.ffmpeg_service,
@@ -356,7 +358,7 @@ class MediaView(ft.Container):
             
         elif view_name == 'audio_to_text':
             if not self.audio_to_text_view:
-                self.audio_to_text_view = AudioToTextView(
+                self.audio_to_text_view = load_tool_view("audio.to_text")(
                     self._saved_page,
                     self.config_service,
                     self.ffmpeg_service,
@@ -366,7 +368,7 @@ class MediaView(ft.Container):
             
         elif view_name == 'video_compress':
             if not self.video_compress_view:
-                self.video_compress_view = VideoCompressView(
+                self.video_compress_view = load_tool_view("video.compress")(
                     self._saved_page,
                     self.config_service,
                     self.ffmpeg_service,
@@ -376,7 +378,7 @@ class MediaView(ft.Container):
             
         elif view_name == 'video_convert':
             if not self.video_convert_view:
-                self.video_convert_view = VideoConvertView(
+                self.video_convert_view = load_tool_view("video.convert")(
                     self._saved_page,
                     self.config_service,
                     self.ffmpeg_service,
@@ -386,7 +388,7 @@ class MediaView(ft.Container):
             
         elif view_name == 'video_enhance':
             if not self.video_enhance_view:
-                self.video_enhance_view = VideoEnhanceView(
+                self.video_enhance_view = load_tool_view("video.enhance")(
                     self._saved_page,
                     self.config_service,
                     self.ffmpeg_service,
@@ -396,7 +398,7 @@ class MediaView(ft.Container):
             
         elif view_name == 'video_interpolation':
             if not self.video_interpolation_view:
-                self.video_interpolation_view = VideoInterpolationView(
+                self.video_interpolation_view = load_tool_view("video.interpolation")(
                     self._saved_page,
                     self.config_service,
                     self.ffmpeg_service,
@@ -406,7 +408,7 @@ class MediaView(ft.Container):
         
         elif view_name == 'subtitle_remove':
             if not self.subtitle_remove_view:
-                self.subtitle_remove_view = SubtitleRemoveView(
+                self.subtitle_remove_view = load_tool_view("video.subtitle_remove")(
                     self._saved_page,
                     self.config_service,
                     self.ffmpeg_service,
@@ -416,7 +418,7 @@ class MediaView(ft.Container):
         
         elif view_name == 'video_subtitle':
             if not self.video_subtitle_view:
-                self.video_subtitle_view = VideoSubtitleView(
+                self.video_subtitle_view = load_tool_view("video.subtitle")(
                     self._saved_page,
                     self.config_service,
                     self.ffmpeg_service,
@@ -426,7 +428,7 @@ class MediaView(ft.Container):
             
         elif view_name == 'video_extract_audio':
             if not self.video_extract_audio_view:
-                self.video_extract_audio_view = VideoExtractAudioView(
+                self.video_extract_audio_view = load_tool_view("video.extract_audio")(
                     self._saved_page,
                     self.config_service,
                     self.ffmpeg_service,
@@ -436,7 +438,7 @@ class MediaView(ft.Container):
             
         elif view_name == 'video_speed':
             if not self.video_speed_view:
-                self.video_speed_view = VideoSpeedView(
+                self.video_speed_view = load_tool_view("video.speed")(
                     self._saved_page,
                     self.config_service,
                     self.ffmpeg_service,
@@ -446,7 +448,7 @@ class MediaView(ft.Container):
             
         elif view_name == 'video_vocal_separation':
             if not self.video_vocal_separation_view:
-                self.video_vocal_separation_view = VideoVocalSeparationView(
+                self.video_vocal_separation_view = load_tool_view("video.vocal_separation")(
                     self._saved_page,
                     self.config_service,
                     self.ffmpeg_service,
@@ -456,7 +458,7 @@ class MediaView(ft.Container):
             
         elif view_name == 'video_watermark':
             if not self.video_watermark_view:
-                self.video_watermark_view = VideoWatermarkView(
+                self.video_watermark_view = load_tool_view("video.watermark")(
                     self._saved_page,
                     self.config_service,
                     self.ffmpeg_service,
@@ -466,7 +468,7 @@ class MediaView(ft.Container):
             
         elif view_name == 'video_repair':
             if not self.video_repair_view:
-                self.video_repair_view = VideoRepairView(
+                self.video_repair_view = load_tool_view("video.repair")(
                     self._saved_page,
                     self.config_service,
                     self.ffmpeg_service,
@@ -476,7 +478,7 @@ class MediaView(ft.Container):
         
         elif view_name == 'screen_record':
             if not self.screen_record_view:
-                self.screen_record_view = ScreenRecordView(
+                self.screen_record_view = load_tool_view("video.screen_record")(
                     self._saved_page,
                     self.config_service,
                     self.ffmpeg_service,
@@ -7,7 +7,7 @@
 import re
 import threading
 from pathlib import Path
-from typing import Callable, List, Optional
+from typing import Callable, List, Optional, Set
 
 import flet as ft
 
@@ -18,7 +18,7 @@ from constants import (
     PADDING_SMALL,
     PADDING_XLARGE,
 )
-from services import ConfigService, FFmpegService
+from services import ConfigService, FFmpegJobQueue, FFmpegJobStatus, FFmpegService
 from utils import format_file_size, get_unique_path
 from views.media.ffmpeg_install_view import FFmpegInstallView
 
@@ -59,6 +59,7 @@ class VideoCompressView(ft.Container):
         self.on_back: Optional[Callable] = on_back
         
         self.selected_files: List[Path] = []
+        self._job_queue: Optional[FFmpegJobQueue] = None
         
         self.expand: bool = True
         self.padding: ft.padding = ft.padding.only(
@@ -956,62 +957,74 @@ class VideoCompressView(ft.Container):
         }
         output_mode = self.output_mode_radio.value
 
+        # 输出路径按顺序预先分配，避免并发作业写入同一个文件
+        reserved_paths: Set[Path] = set()
+
+        def build_output_path(input_path: Path) -> Path:
+            # 确定输出格式
+            output_format = compression_params.get("output_format", "same")
+            if output_mode == "new":
+                suffix = self.file_suffix.value or "_compressed"
+                if output_format == "same":
+                    ext = input_path.suffix
+                else:
+                    ext = f".{output_format}"
+                output_path = input_path.parent / f"{input_path.stem}{suffix}{ext}"
+            else:
+                output_dir = Path(self.custom_output_dir.value)
+                output_dir.mkdir(parents=True, exist_ok=True)
+                if output_format == "same":
+                    output_path = output_dir / input_path.name
+                else:
+                    output_path = output_dir / f"{input_path.stem}.{output_format}"
+            
+            # 根据全局设置决定是否添加序号
+            add_sequence = self.config_service.get_config_value("output_add_sequence", False)
+            return get_unique_path(output_path, add_sequence=add_sequence, reserved=reserved_paths)
+
+        def compress_job(job):
+            return self.ffmpeg_service.compress_video(
+                job.item, job.data["output_path"], compression_params,
+                job.report_progress, job.attach_process
+            )
+
         def compress_task():
             total = len(self.selected_files)
-            success_count = 0
             failed_files = []
             
-            for i, input_path in enumerate(self.selected_files):
+            # 按实际使用的编码器决定并发数（compress_video 会优先使用 GPU 编码器）
+            vcodec = compression_params["vcodec"] if compression_params["mode"] == "advanced" else "libx264"
+            if vcodec == "libx264":
+                vcodec = self.ffmpeg_service.get_preferred_gpu_encoder() or vcodec
+            job_queue = self.ffmpeg_service.create_job_queue(vcodec)
+            self._job_queue = job_queue
+            
+            for input_path in self.selected_files:
                 try:
-                    # 确定输出格式
-                    output_format = compression_params.get("output_format", "same")
-                    if output_mode == "new":
-                        suffix = self.file_suffix.value or "_compressed"
-                        if output_format == "same":
-                            ext = input_path.suffix
-                        else:
-                            ext = f".{output_format}"
-                        output_path = input_path.parent / f"{input_path.stem}{suffix}{ext}"
-                    else:
-                        output_dir = Path(self.custom_output_dir.value)
-                        output_dir.mkdir(parents=True, exist_ok=True)
-                        if output_format == "same":
-                            output_path = output_dir / input_path.name
-                        else:
-                            output_path = output_dir / f"{input_path.stem}.{output_format}"
-                    
-                    # 根据全局设置决定是否添加序号
-                    add_sequence = self.config_service.get_config_value("output_add_sequence", False)
-                    output_path = get_unique_path(output_path, add_sequence=add_sequence)
-                    
-                    def progress_handler(progress, speed, remaining_time):
-                        # 计算总体进度
-                        overall_progress = (i + progress) / total
-                        self.progress_bar.value = overall_progress
-                        
-                        # 显示详细信息
-                        percent = int(progress * 100)
-                        self.progress_text.value = (
-                            f"正在处理 ({i+1}/{total}): {input_path.name}\n"
-                            f"进度: {percent}% | 速度: {speed} | 预计剩余: {remaining_time}"
-                        )
-                        self.page.update()
-                    
-                    # 显示开始处理
-                    self.progress_text.value = f"开始处理 ({i+1}/{total}): {input_path.name}..."
-                    self.page.update()
-                    
-                    result, message = self.ffmpeg_service.compress_video(
-                        input_path, output_path, compression_params, progress_handler
-                    )
-                    
-                    if result:
-                        success_count += 1
-                    else:
-                        failed_files.append(f"{input_path.name}: {message}")
-                    
+                    output_path = build_output_path(input_path)
+                    job = job_queue.submit(compress_job, item=input_path, weight=input_path.stat().st_size)
+                    job.data["output_path"] = output_path
                 except Exception as e:
                     failed_files.append(f"{input_path.name}: {str(e)}")
+            
+            self.progress_text.value = f"开始处理 {total} 个文件（并发 {job_queue.max_workers}）..."
+            self.page.update()
+            
+            def progress_handler(progress):
+                self.progress_bar.value = progress.progress
+                self.progress_text.value = progress.summary()
+                try:
+                    self.page.update()
+                except Exception:
+                    pass
+            
+            jobs = job_queue.run(on_progress=progress_handler)
+            self._job_queue = None
+            
+            success_count = sum(1 for job in jobs if job.status == FFmpegJobStatus.SUCCEEDED)
+            failed_files.extend(
+                f"{job.name}: {job.message}" for job in jobs if job.status != FFmpegJobStatus.SUCCEEDED
+            )
 
             # 完成后显示结果
             self.progress_bar.visible = False
@@ -1081,6 +1094,9 @@ class VideoCompressView(ft.Container):
     def cleanup(self) -> None:
         """清理视图资源，释放内存。"""
         import gc
+        # 终止仍在运行的 ffmpeg 作业
+        if self._job_queue:
+            self._job_queue.cancel_all()
         if hasattr(self, 'selected_files'):
             self.selected_files.clear()
         # 清除回调引用，打破循环引用
@@ -6,7 +6,7 @@
 
 import threading
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Set
 
 import flet as ft
 
@@ -18,8 +18,8 @@ from constants import (
     PADDING_SMALL,
     PADDING_XLARGE,
 )
-from services import ConfigService, FFmpegService
-from utils import format_file_size, logger, get_unique_path
+from services import ConfigService, FFmpegJobQueue, FFmpegJobStatus, FFmpegService
+from utils import FFMPEG_PROGRESS_ARGS, format_file_size, logger, get_unique_path
 from views.media.ffmpeg_install_view import FFmpegInstallView
 
 
@@ -59,6 +59,7 @@ class VideoConvertView(ft.Container):
         # 状态变量
         self.selected_files: List[Path] = []
         self.is_converting: bool = False
+        self._job_queue: Optional[FFmpegJobQueue] = None
         
         # 创建UI组件
         self._build_ui()
@@ -659,19 +660,25 @@ class VideoConvertView(ft.Container):
                     params["vcodec"] = "copy"
                     params["acodec"] = "copy"
                 
-                # 处理每个文件
-                for i, input_file in enumerate(self.selected_files):
+                # 仅封装转换时不重新编码，可以同时运行更多进程
+                job_queue = self.ffmpeg_service.create_job_queue(params["vcodec"])
+                self._job_queue = job_queue
+                
+                # 输出路径按顺序预先分配，避免并发作业写入同一个文件
+                add_sequence = self.config_service.get_config_value("output_add_sequence", False)
+                reserved_paths: Set[Path] = set()
+                
+                def convert_job(job):
+                    return self._convert_video(
+                        job.item,
+                        job.data["output_path"],
+                        params,
+                        job.report_progress,
+                        job.attach_process,
+                    )
+                
+                for input_file in self.selected_files:
                     try:
-                        # 更新进度
-                        overall_progress = i / total_files
-                        self.progress_bar.value = overall_progress
-                        self.progress_text.value = f"正在转换: {input_file.name} ({i+1}/{total_files})"
-                        self.speed_text.value = ""
-                        try:
-                            self.page.update()
-                        except:
-                            pass
-                        
                         # 构建输出路径
                         if output_dir:
                             output_path = output_dir / f"{input_file.stem}.{output_format}"
@@ -679,36 +686,30 @@ class VideoConvertView(ft.Container):
                             output_path = input_file.parent / f"{input_file.stem}.{output_format}"
                         
                         # 根据全局设置决定是否添加序号
-                        add_sequence = self.config_service.get_config_value("output_add_sequence", False)
-                        output_path = get_unique_path(output_path, add_sequence=add_sequence)
-                        
-                        # 执行转换
-                        def progress_callback(progress: float, speed: str, remaining: str):
-                            # 计算总体进度
-                            file_progress = (i + progress) / total_files
-                            self.progress_bar.value = file_progress
-                            self.progress_text.value = f"转换中: {input_file.name} ({i+1}/{total_files}) - {int(progress * 100)}%"
-                            self.speed_text.value = f"速度: {speed} | 剩余: {remaining}"
-                            try:
-                                self.page.update()
-                            except:
-                                pass
-                        
-                        success, message = self._convert_video(
-                            input_file,
-                            output_path,
-                            params,
-                            progress_callback,
-                        )
-                        
-                        if success:
-                            success_count += 1
-                        else:
-                            logger.error(f"转换失败 {input_file.name}: {message}")
-                    
+                        output_path = get_unique_path(output_path, add_sequence=add_sequence, reserved=reserved_paths)
+                        job = job_queue.submit(convert_job, item=input_file, weight=input_file.stat().st_size)
+                        job.data["output_path"] = output_path
                     except Exception as ex:
                         logger.error(f"处理失败 {input_file.name}: {ex}")
                 
+                def progress_callback(progress):
+                    self.progress_bar.value = progress.progress
+                    self.progress_text.value = f"转换中: {progress.finished}/{total_files} - {int(progress.progress * 100)}%"
+                    running = ", ".join(f"{job.name} {job.speed}".strip() for job in progress.running[:3])
+                    self.speed_text.value = f"剩余: {progress.eta_text}" + (f" | 正在处理: {running}" if running else "")
+                    try:
+                        self.page.update()
+                    except:
+                        pass
+                
+                def on_job_finished(job):
+                    if job.status != FFmpegJobStatus.SUCCEEDED:
+                        logger.error(f"转换失败 {job.name}: {job.message}")
+                
+                jobs = job_queue.run(on_progress=progress_callback, on_job_finished=on_job_finished)
+                self._job_queue = None
+                success_count = sum(1 for job in jobs if job.status == FFmpegJobStatus.SUCCEEDED)
+                
                 # 更新UI
                 self.is_converting = False
                 self.convert_button.content.disabled = False
@@ -744,6 +745,7 @@ class VideoConvertView(ft.Container):
         output_path: Path,
         params: dict,
         progress_callback: Optional[callable] = None,
+        process_callback: Optional[callable] = None,
     ) -> tuple[bool, str]:
         """执行视频转换。
         
@@ -752,6 +754,7 @@ class VideoConvertView(ft.Container):
             output_path: 输出文件路径
             params: 转换参数
             progress_callback: 进度回调函数 (progress, speed, remaining_time)
+            process_callback: ffmpeg 进程启动后的回调（用于取消时终止进程）
         
         Returns:
             (是否成功, 消息)
@@ -842,7 +845,7 @@ class VideoConvertView(ft.Container):
             stream = ffmpeg.output(stream, str(output_path), **output_params)
             
             # 添加全局参数以确保进度输出
-            stream = stream.global_args('-stats', '-loglevel', 'info', '-progress', 'pipe:2')
+            stream = stream.global_args(*FFMPEG_PROGRESS_ARGS)
             
             # 运行转换
             process = ffmpeg.run_async(
@@ -852,72 +855,17 @@ class VideoConvertView(ft.Container):
                 pipe_stdout=True,
                 overwrite_output=True
             )
+            if process_callback:
+                process_callback(process)
             
-            # 实时读取进度
-            stderr_lines = []  # 收集所有stderr输出用于错误报告
-            
-            if duration > 0 and progress_callback:
-                import re
-                
-                def read_stderr():
-                    for line in iter(process.stderr.readline, b''):
-                        try:
-                            line_str = line.decode('utf-8', errors='ignore').strip()
-                            stderr_lines.append(line_str)  # 保存所有输出
-                            
-                            # 解析时间进度
-                            time_match = re.search(r"time=(\d{2}):(\d{2}):(\d{2})\.\d{2}", line_str)
-                            speed_match = re.search(r"speed=\s*([\d.]+)x", line_str)
-                            
-                            if time_match:
-                                hours = int(time_match.group(1))
-                                minutes = int(time_match.group(2))
-                                seconds = int(time_match.group(3))
-                                current_time = hours * 3600 + minutes * 60 + seconds
-                                
-                                progress = min(current_time / duration, 0.99) if duration > 0 else 0
-                                
-                                speed_str = f"{speed_match.group(1)}x" if speed_match else "N/A"
-                                
-                                if speed_match and float(speed_match.group(1)) > 0:
-                                    remaining_seconds = (duration - current_time) / float(speed_match.group(1))
-                                    remaining_time_str = f"{int(remaining_seconds // 60)}m {int(remaining_seconds % 60)}s"
-                                else:
-                                    remaining_time_str = "计算中..."
-                                
-                                progress_callback(progress, speed_str, remaining_time_str)
-                        except Exception:
-                            pass
-                    process.stderr.close()
-                
-                stderr_thread = threading.Thread(target=read_stderr, daemon=True)
-                stderr_thread.start()
-                
-                # 等待进程结束
-                process.wait()
-                stderr_thread.join(timeout=1)
-            else:
-                # 没有时长信息或回调时直接等待，但仍收集stderr
-                def read_stderr_simple():
-                    for line in iter(process.stderr.readline, b''):
-                        try:
-                            line_str = line.decode('utf-8', errors='ignore').strip()
-                            stderr_lines.append(line_str)
-                        except Exception:
-                            pass
-                    process.stderr.close()
-                
-                stderr_thread = threading.Thread(target=read_stderr_simple, daemon=True)
-                stderr_thread.start()
-                process.wait()
-                stderr_thread.join(timeout=1)
+            # 等待结束，通过 -progress 输出回报进度
+            returncode, error_output = self.ffmpeg_service.run_with_progress(process, duration, progress_callback)
             
             # 检查返回码
-            if process.returncode != 0:
-                # 获取最后50行错误信息
-                error_output = "\n".join(stderr_lines[-50:]) if stderr_lines else "无详细错误信息"
+            if returncode != 0:
+                error_output = error_output or "无详细错误信息"
                 logger.error(f"FFmpeg转换失败，完整输出:\n{error_output}")
-                return False, f"FFmpeg 执行失败，退出码: {process.returncode}\n{error_output}"
+                return False, f"FFmpeg 执行失败，退出码: {returncode}\n{error_output}"
             
             return True, "转换成功"
             
@@ -975,6 +923,9 @@ class VideoConvertView(ft.Container):
     def cleanup(self) -> None:
         """清理视图资源，释放内存。"""
         import gc
+        # 终止仍在运行的 ffmpeg 作业
+        if self._job_queue:
+            self._job_queue.cancel_all()
         if hasattr(self, 'selected_files'):
             self.selected_files.clear()
         # 清除回调引用，打破循环引用
@@ -24,7 +24,8 @@ from constants import (
     PADDING_SMALL,
 )
 from constants.model_config import ImageEnhanceModelInfo
-from services import ConfigService, FFmpegService
+from services import ConfigService, FFmpegService, FramePipeline, FramePipelineStats
+from services.frame_pipeline_service import pipe_frame_reader, pipe_frame_writer
 from services.image_service import ImageEnhancer
 from utils import format_file_size, get_unique_path
 from views.media.ffmpeg_install_view import FFmpegInstallView
@@ -703,7 +704,8 @@ class VideoEnhanceView(ft.Container):
                 gpu_device_id=gpu_device_id,
                 gpu_memory_limit=gpu_memory_limit,
                 enable_memory_arena=enable_memory_arena,
-                scale=self.current_model.scale
+                scale=self.current_model.scale,
+                config_service=self.config_service
             )
             self._on_model_loaded(True, None)
         except Exception as e:
@@ -809,7 +811,8 @@ class VideoEnhanceView(ft.Container):
                     gpu_device_id=gpu_device_id,
                     gpu_memory_limit=gpu_memory_limit,
                     enable_memory_arena=enable_memory_arena,
-                    scale=self.current_model.scale
+                    scale=self.current_model.scale,
+                    config_service=self.config_service
                 )
                 self._on_model_loaded(True, None)
             except Exception as e:
@@ -1247,26 +1250,21 @@ class VideoEnhanceView(ft.Container):
                 )
             )
         else:
+            # 批量获取视频信息（带缓存，未缓存的文件并发探测）
+            media_infos = self.ffmpeg_service.probe_many(self.selected_files)
             for i, file_path in enumerate(self.selected_files):
                 try:
                     file_size = file_path.stat().st_size
                     size_str = format_file_size(file_size)
                     
                     # 获取视频信息
-                    video_info = self.ffmpeg_service.safe_probe(str(file_path))
+                    video_info = media_infos[i]
                     info_text = f"大小: {size_str}"
                     
                     if video_info:
-                        # 获取视频流信息
-                        video_stream = None
-                        for stream in video_info.get('streams', []):
-                            if stream.get('codec_type') == 'video':
-                                video_stream = stream
-                                break
-                        
-                        if video_stream:
-                            width = video_stream.get('width', 0)
-                            height = video_stream.get('height', 0)
+                        if video_info.has_video:
+                            width = video_info.width
+                            height = video_info.height
                             current_scale = self.scale_slider.value
                             enhanced_width = int(width * current_scale)
                             enhanced_height = int(height * current_scale)
@@ -1732,241 +1730,100 @@ class VideoEnhanceView(ft.Container):
                 queue_depth = 4  # 从3增加到4
                 logger.warning("⚠️  超高分辨率，小批量+浅队列")
                 gc_interval = 10
-                flush_interval = 5
             elif enhanced_frame_size_mb > 20:  # 4K
                 frame_batch_size = 4  # 从2增加到4
                 queue_depth = 6  # 从4增加到6
                 logger.info("⚡ 4K分辨率，批量=4, 队列深度=6")
                 gc_interval = 20
-                flush_interval = 10
             elif enhanced_frame_size_mb > 8:  # 1440p
                 frame_batch_size = 8  # 从4增加到8
                 queue_depth = 10  # 从6增加到10
                 logger.info("⚡ 2K分辨率，批量=8, 队列深度=10")
                 gc_interval = 30
-                flush_interval = 15
             else:  # 1080p及以下
                 frame_batch_size = 12  # 从6增加到12
                 queue_depth = 16  # 从8增加到16
                 logger.info("✓ 1080p及以下，批量=12, 队列深度=16")
                 gc_interval = 40
-                flush_interval = 20
             
             logger.info(f"✓ 批量大小: {frame_batch_size}, 队列深度: {queue_depth} (保持GPU持续忙碌)")
             logger.info("✓ 异步流水线: 解码 ⟷ 推理 ⟷ 编码 并行执行")
             logger.info("=" * 80)
             
-            frame_idx = 0
-            last_gc_time = 0
-            
-            # 🔥 异步流水线：使用队列实现生产者-消费者模式
-            from queue import Queue
-            from threading import Thread, Event, Lock
+            # 🔥 三阶段流水线：解码线程 → 批量增强（当前线程） → 编码线程
+            # 注意：DirectML不支持多线程并发推理，所以推理只在一个线程中执行
+            next_gc_frame = [gc_interval]
+            next_progress_frame = [1]
             
-            raw_frame_queue = Queue(maxsize=queue_depth)  # 原始帧队列
-            enhanced_frame_queue = Queue(maxsize=queue_depth)  # 增强后帧队列
-            stop_event = Event()  # 停止信号
-            error_event = Event()  # 错误信号
-            error_msg = []  # 错误消息
-            
-            # 解码线程：读取帧 → raw_frame_queue
-            def decoder_worker():
-                try:
-                    while not self.should_cancel and not stop_event.is_set():
-                        raw_frame = decoder_process.stdout.read(frame_size)
-                        
-                        if len(raw_frame) != frame_size:
-                            break  # EOF
-                        
-                        frame_array = np.frombuffer(raw_frame, dtype=np.uint8).reshape([height, width, 3])
-                        raw_frame_queue.put(frame_array)  # 阻塞直到队列有空间
-                    
-                    raw_frame_queue.put(None)  # EOF信号
-                except Exception as e:
-                    logger.error(f"解码线程错误: {e}")
-                    error_msg.append(str(e))
-                    error_event.set()
-                    raw_frame_queue.put(None)
-            
-            # 推理线程：raw_frame_queue → 批量增强 → enhanced_frame_queue
-            # 🔥 关键优化：使用激进的批量收集策略，最大化GPU利用率
-            def inference_worker():
-                try:
-                    import time
-                    
-                    while not self.should_cancel and not error_event.is_set():
-                        frame_buffer = []
-                        
-                        # 🚀 激进策略：尽可能快地收集帧，不等待
-                        # 第一帧用阻塞等待
-                        first_frame = raw_frame_queue.get()
-                        
-                        if first_frame is None:  # EOF
-                            enhanced_frame_queue.put(None)
-                            break
-                        
-                        frame_buffer.append(first_frame)
-                        
-                        # 后续帧用非阻塞方式快速收集，最多等待10ms
-                        start_time = time.time()
-                        max_wait = 0.01  # 10ms超时，避免GPU空闲
-                        
-                        while len(frame_buffer) < frame_batch_size:
-                            elapsed = time.time() - start_time
-                            if elapsed > max_wait:
-                                break  # 超时，立即处理已有的帧
-                            
-                            try:
-                                # 非阻塞获取，最多等1ms
-                                frame = raw_frame_queue.get(timeout=0.001)
-                                if frame is None:  # EOF
-                                    # 处理buffer中的帧，然后退出
-                                    if frame_buffer:
-                                        enhanced_frames = self._batch_enhance_frames(
-                                            frame_buffer, enhanced_width, enhanced_height
-                                        )
-                                        for ef in enhanced_frames:
-                                            enhanced_frame_queue.put(ef)
-                                    enhanced_frame_queue.put(None)
-                                    return
-                                frame_buffer.append(frame)
-                            except:
-                                break  # 队列空，立即处理
-                        
-                        # 立即处理收集到的帧（即使不满batch_size）
-                        if frame_buffer:
-                            enhanced_frames = self._batch_enhance_frames(
-                                frame_buffer, enhanced_width, enhanced_height
-                            )
-                            
-                            if not enhanced_frames:
-                                raise RuntimeError("批量增强失败")
-                            
-                            for ef in enhanced_frames:
-                                enhanced_frame_queue.put(ef)
+            def process_frames(frames: List[np.ndarray]) -> List[np.ndarray]:
+                if self.should_cancel:
+                    logger.warning("用户取消处理")
+                    pipeline.cancel()
+                    return []
                 
-                except Exception as e:
-                    logger.error(f"推理线程错误: {e}")
-                    import traceback
-                    logger.error(traceback.format_exc())
-                    error_msg.append(str(e))
-                    error_event.set()
-                    enhanced_frame_queue.put(None)
-            
-            # 启动工作线程
-            # 注意：DirectML不支持多线程并发推理，所以使用单推理线程
-            # 但使用激进的帧收集策略（10ms超时）来最大化GPU利用率
+                enhanced_frames = self._batch_enhance_frames(frames, enhanced_width, enhanced_height)
+                if not enhanced_frames:
+                    raise RuntimeError("批量增强失败")
+                
+                for enhanced_array in enhanced_frames:
+                    # 验证帧
+                    if enhanced_array.shape != (enhanced_height, enhanced_width, 3):
+                        raise RuntimeError(f"增强后的帧尺寸不匹配: {enhanced_array.shape}")
+                
+                return enhanced_frames
             
-            decoder_thread = Thread(target=decoder_worker, daemon=True, name="Decoder")
-            inference_thread = Thread(target=inference_worker, daemon=True, name="Inference")
+            def on_pipeline_progress(stats: FramePipelineStats) -> None:
+                frame_idx = stats.frames_in
+                
+                # 定期垃圾回收
+                if frame_idx >= next_gc_frame[0]:
+                    next_gc_frame[0] = frame_idx + gc_interval
+                    gc.collect()
+                
+                # 更新进度
+                if frame_idx >= next_progress_frame[0]:
+                    next_progress_frame[0] = frame_idx + 10
+                    file_progress = file_idx / total_files
+                    frame_progress = min(frame_idx / total_frames, 1.0) if total_frames > 0 else 0
+                    overall_progress = file_progress + (frame_progress / total_files)
+                    
+                    self._update_progress(
+                        overall_progress,
+                        f"[{file_idx+1}/{total_files}] 处理帧 {frame_idx}/{total_frames} | {stats.summary()}"
+                    )
             
-            decoder_thread.start()
-            inference_thread.start()
+            pipeline = FramePipeline(
+                frame_shape=(height, width, 3),
+                read_frame=pipe_frame_reader(decoder_process.stdout),
+                write_frame=pipe_frame_writer(encoder_process.stdin),
+                process=process_frames,
+                batch_size=frame_batch_size,
+                queue_depth=queue_depth,
+            )
             
-            logger.info("✓ 异步流水线已启动：解码线程 + 推理线程并行运行")
-            logger.info("✓ 使用激进帧收集策略（10ms超时），最小化GPU等待时间")
+            logger.info("✓ 异步流水线已启动：解码线程 + 推理 + 编码线程并行运行")
             
-            # 主线程：enhanced_frame_queue → 编码器（不阻塞）
             try:
-                while True:
-                    # 检查取消和错误
-                    if self.should_cancel:
-                        logger.warning("用户取消处理")
-                        stop_event.set()
-                        break
-                    
-                    if error_event.is_set():
-                        logger.error(f"工作线程错误: {error_msg}")
-                        return False
-                    
-                    # 🔥 从队列获取增强后的帧（非阻塞检查）
-                    try:
-                        enhanced_array = enhanced_frame_queue.get(timeout=0.1)
-                    except:
-                        continue  # 队列空，继续等待
-                    
-                    # EOF信号
-                    if enhanced_array is None:
-                        logger.info("所有帧处理完成")
-                        break
-                    
-                    # 验证帧
-                    if enhanced_array.shape != (enhanced_height, enhanced_width, 3):
-                        logger.error(f"增强后的帧尺寸不匹配: {enhanced_array.shape}")
-                        stop_event.set()
-                        return False
-                    
-                    # 确保数据类型正确
-                    if enhanced_array.dtype != np.uint8:
-                        enhanced_array = enhanced_array.astype(np.uint8)
-                    
-                    # 写入编码器
-                    try:
-                        encoder_process.stdin.write(enhanced_array.tobytes())
-                    except BrokenPipeError:
-                        logger.error("编码器管道断开")
-                        try:
-                            encoder_stderr = encoder_process.stderr.read().decode('utf-8', errors='ignore')
-                            if encoder_stderr:
-                                logger.error(f"编码器错误信息: {encoder_stderr}")
-                        except:
-                            pass
-                        stop_event.set()
-                        return False
-                    except Exception as e:
-                        logger.error(f"写入编码器失败: {e}")
-                        stop_event.set()
-                        return False
-                    
-                    frame_idx += 1
-                    
-                    # 定期刷新管道
-                    if frame_idx % flush_interval == 0:
-                        encoder_process.stdin.flush()
-                    
-                    # 定期垃圾回收和进度更新
-                    if frame_idx % gc_interval == 0:
-                        gc.collect()
-                        if frame_idx % (gc_interval * 3) == 0:
-                            try:
-                                import psutil
-                                process = psutil.Process()
-                                memory_mb = process.memory_info().rss / (1024 * 1024)
-                                logger.info(f"内存占用: {memory_mb:.1f} MB (已处理 {frame_idx} 帧)")
-                            except:
-                                pass
-                    
-                    # 更新进度
-                    if frame_idx % 10 == 0 or frame_idx == 1:
-                        file_progress = file_idx / total_files
-                        frame_progress = min(frame_idx / total_frames, 1.0) if total_frames > 0 else 0
-                        overall_progress = file_progress + (frame_progress / total_files)
-                        
-                        # 显示队列状态
-                        queue_info = f"队列: {raw_frame_queue.qsize()}/{enhanced_frame_queue.qsize()}"
-                        
-                        self._update_progress(
-                            overall_progress,
-                            f"[{file_idx+1}/{total_files}] 处理帧 {frame_idx}/{total_frames} | {queue_info}"
-                        )
-                
+                pipeline.run(on_progress=on_pipeline_progress)
             except MemoryError:
                 logger.error("❌ 内存不足！建议：1)关闭其他程序 2)降低batch_size")
-                stop_event.set()
+                return False
+            except BrokenPipeError:
+                logger.error("编码器管道断开")
+                try:
+                    encoder_stderr = encoder_process.stderr.read().decode('utf-8', errors='ignore')
+                    if encoder_stderr:
+                        logger.error(f"编码器错误信息: {encoder_stderr}")
+                except:
+                    pass
                 return False
             except Exception as e:
                 logger.error(f"处理帧时发生错误: {e}")
                 import traceback
                 logger.error(traceback.format_exc())
-                stop_event.set()
                 return False
-            finally:
-                # 等待工作线程结束
-                stop_event.set()
-                logger.info("等待工作线程结束...")
-                decoder_thread.join(timeout=2)
-                inference_thread.join(timeout=2)
-                logger.info("工作线程已结束")
+            
+            frame_idx = pipeline.stats.frames_out
             
             
             # 步骤5：关闭管道并等待进程完成
@@ -5,7 +5,6 @@
 """
 
 import gc
-import queue
 import subprocess
 import threading
 from pathlib import Path
@@ -24,7 +23,8 @@ from constants import (
     PADDING_SMALL,
 )
 from constants.model_config import FrameInterpolationModelInfo
-from services import ConfigService, FFmpegService
+from services import ConfigService, FFmpegService, FramePipeline, FramePipelineStats
+from services.frame_pipeline_service import pipe_frame_reader, pipe_frame_writer
 from services.frame_interpolation_service import FrameInterpolationService
 from utils import format_file_size, logger, get_unique_path
 from views.media.ffmpeg_install_view import FFmpegInstallView
@@ -1009,34 +1009,25 @@ class VideoInterpolationView(ft.Container):
         if not self.selected_files:
             self._init_empty_state()
         else:
-            for file_path in self.selected_files:
+            # 批量获取视频信息（带缓存，未缓存的文件并发探测）
+            media_infos = self.ffmpeg_service.probe_many(self.selected_files)
+            for file_path, video_info in zip(self.selected_files, media_infos):
                 try:
                     file_size = file_path.stat().st_size
                     size_str = format_file_size(file_size)
                     
-                    # 获取视频信息
-                    video_info = self.ffmpeg_service.safe_probe(str(file_path))
                     info_parts = [f"大小: {size_str}"]
                     
                     if video_info:
-                        # 获取视频流信息
-                        video_stream = next((s for s in video_info['streams'] if s['codec_type'] == 'video'), None)
-                        if video_stream:
-                            width = video_stream.get('width', '?')
-                            height = video_stream.get('height', '?')
-                            fps_str = video_stream.get('r_frame_rate', '?/1')
-                            try:
-                                fps_parts = fps_str.split('/')
-                                fps = int(fps_parts[0]) / int(fps_parts[1])
-                                info_parts.append(f"{width}x{height}")
-                                info_parts.append(f"{fps:.2f}fps")
-                            except:
-                                info_parts.append(f"{width}x{height}")
+                        # 视频流信息
+                        if video_info.has_video:
+                            info_parts.append(f"{video_info.width}x{video_info.height}")
+                            if video_info.fps > 0:
+                                info_parts.append(f"{video_info.fps:.2f}fps")
                         
-                        # 获取时长
-                        duration = video_info.get('format', {}).get('duration')
-                        if duration:
-                            duration_sec = int(float(duration))
+                        # 时长
+                        if video_info.duration:
+                            duration_sec = int(video_info.duration)
                             mins = duration_sec // 60
                             secs = duration_sec % 60
                             info_parts.append(f"{mins}:{secs:02d}")
@@ -1586,7 +1577,6 @@ class VideoInterpolationView(ft.Container):
             
             # 阶段4: 处理帧（插帧）- 先计算预期输出帧数
             logger.info("开始插帧处理...")
-            frame_size = width * height * 3
             processed_frames = 0
             original_frames_read = 0
             
@@ -1616,169 +1606,101 @@ class VideoInterpolationView(ft.Container):
                 stderr=subprocess.DEVNULL  # 必须是 DEVNULL，避免缓冲区阻塞
             )
             
-            # 🚀 使用队列和写入线程，避免 stdin.write() 阻塞主线程
-            frame_queue: queue.Queue = queue.Queue(maxsize=30)  # 最多缓存30帧
-            write_error = threading.Event()
-            write_done = threading.Event()
-            frames_written = [0]  # 使用列表以便在闭包中修改
-            
-            def writer_thread():
-                """写入线程：从队列取帧写入FFmpeg stdin"""
-                try:
-                    while True:
-                        try:
-                            frame_data = frame_queue.get(timeout=0.5)
-                        except queue.Empty:
-                            if write_done.is_set() and frame_queue.empty():
-                                logger.info("队列已空且处理完成，写入线程退出")
-                                break
-                            continue
-                        
-                        if frame_data is None:  # 结束信号
-                            logger.info("收到结束信号，写入线程退出")
-                            break
-                        
-                        try:
-                            encoder_process.stdin.write(frame_data)
-                            frames_written[0] += 1
-                        except BrokenPipeError:
-                            logger.error("编码器管道断开")
-                            write_error.set()
-                            break
-                        except Exception as e:
-                            logger.error(f"写入帧失败: {e}")
-                            write_error.set()
-                            break
-                except Exception as e:
-                    logger.error(f"写入线程异常: {e}")
-                    write_error.set()
-                finally:
-                    try:
-                        encoder_process.stdin.close()
-                        logger.info("已关闭编码器stdin")
-                    except Exception as e:
-                        logger.warning(f"关闭stdin失败: {e}")
-                    logger.info(f"写入线程结束，共写入 {frames_written[0]} 帧")
-            
-            # 启动写入线程
-            writer = threading.Thread(target=writer_thread, daemon=True)
-            writer.start()
-            
-            # 读取第一帧
-            prev_frame_data = decoder_process.stdout.read(frame_size)
-            if not prev_frame_data or len(prev_frame_data) != frame_size:
-                write_done.set()
-                frame_queue.put(None)
-                raise RuntimeError("无法读取视频帧")
-            
-            prev_frame = np.frombuffer(prev_frame_data, dtype=np.uint8).reshape((height, width, 3))
-            original_frames_read += 1
-            
-            # 写入第一帧到队列
-            frame_queue.put(prev_frame.tobytes())
-            processed_frames += 1
-            
-            # 初始进度更新
-            base_progress = (current_idx - 1) / total_count
-            self._update_progress(
-                base_progress + 0.15,
-                f"正在处理 ({current_idx}/{total_count})",
-                input_path.name,
-                f"插帧处理中... 1/{expected_total} 帧 (0%)"
-            )
+            # 🚀 解码 → 插帧 → 编码 三阶段流水线（有界队列背压，不丢帧）
+            # 每次推理处理的帧对数（中间帧与多个帧对一起打包成 batch）
+            pairs_per_call = self.interpolator.pairs_per_batch(n_interpolate) if n_interpolate > 0 else 1
+            prev_frames: List[Optional[np.ndarray]] = [None]
+            last_progress_time = [0.0]
             
-            # 主处理循环
-            while not self.should_cancel and not write_error.is_set():
-                # 读取下一帧
-                curr_frame_data = decoder_process.stdout.read(frame_size)
-                if not curr_frame_data or len(curr_frame_data) != frame_size:
-                    logger.info(f"视频帧读取完成，共读取 {original_frames_read} 帧")
-                    break
+            def process_frames(new_frames: List[np.ndarray]) -> List[np.ndarray]:
+                if self.should_cancel:
+                    pipeline.cancel()
+                    return []
                 
-                curr_frame = np.frombuffer(curr_frame_data, dtype=np.uint8).reshape((height, width, 3))
-                original_frames_read += 1
+                outputs = []
+                prev_frame = prev_frames[0]
+                if prev_frame is None:
+                    # 第一帧直接输出
+                    outputs.append(new_frames[0])
+                    window = new_frames
+                else:
+                    window = [prev_frame] + new_frames
                 
-                # 在两帧之间插帧
-                if n_interpolate > 0:
+                # 在每对相邻帧之间插帧（prev_frame 的预处理结果会被复用）
+                interpolated_groups = [[] for _ in window[1:]]
+                if n_interpolate > 0 and len(window) > 1:
                     try:
-                        # ✓✓✓ 关键优化：使用超高性能版本以最大化GPU利用率
-                        interpolated_frames = self.interpolator.interpolate_n_times_highperf(
-                            prev_frame,
-                            curr_frame,
-                            n_interpolate,
-                            aggressive=True  # 启用激进模式
-                        )
-                        
-                        # 将插值帧放入队列（非阻塞放置）
-                        for interp_frame in interpolated_frames:
-                            if write_error.is_set() or self.should_cancel:
-                                break
-                            try:
-                                # ✓ 使用put_nowait避免阻塞GPU处理
-                                frame_queue.put_nowait(interp_frame.tobytes())
-                                processed_frames += 1
-                            except queue.Full:
-                                # 队列满时短暂等待而不是长时间阻塞
-                                try:
-                                    frame_queue.put(interp_frame.tobytes(), timeout=0.5)
-                                    processed_frames += 1
-                                except queue.Full:
-                                    logger.debug("帧缓冲满，跳过以保持GPU流畅")
+                        interpolated_groups = self.interpolator.interpolate_pairs(window, n_interpolate)
                     except Exception as e:
                         logger.error(f"插帧失败: {e}")
-
                 
-                if write_error.is_set() or self.should_cancel:
-                    break
+                for curr_frame, interpolated_frames in zip(window[1:], interpolated_groups):
+                    outputs.extend(interpolated_frames)
+                    outputs.append(curr_frame)
                 
-                # 将当前帧放入队列
-                try:
-                    frame_queue.put(curr_frame.tobytes(), timeout=5.0)
-                    processed_frames += 1
-                except queue.Full:
-                    logger.warning("帧队列满，跳过当前帧")
+                prev_frames[0] = new_frames[-1]
+                return outputs
+            
+            def on_pipeline_progress(stats: FramePipelineStats) -> None:
+                # 限制进度刷新频率
+                now = stats.elapsed
+                if now - last_progress_time[0] < 0.25:
+                    return
+                last_progress_time[0] = now
                 
-                # 更新进度（不会被阻塞）
                 base_progress = (current_idx - 1) / total_count
-                frame_progress = (processed_frames / expected_total) * 0.7
+                frame_progress = (stats.frames_out / max(expected_total, 1)) * 0.7
                 total_progress = base_progress + 0.15 + frame_progress
-                percentage = min(processed_frames * 100 // expected_total, 99)
+                percentage = min(stats.frames_out * 100 // max(expected_total, 1), 99)
                 
                 self._update_progress(
                     total_progress,
                     f"正在处理 ({current_idx}/{total_count})",
                     input_path.name,
-                    f"插帧处理中... {processed_frames}/{expected_total} 帧 ({percentage}%)"
+                    f"插帧处理中... {stats.frames_out}/{expected_total} 帧 ({percentage}%) | {stats.output_fps:.1f} fps"
                 )
-                
-                # 准备下一轮
-                prev_frame = curr_frame
             
-            # 通知写入线程结束
-            logger.info(f"✓ 帧处理完成，共输出 {processed_frames} 帧，等待写入完成...")
-            write_done.set()
+            pipeline = FramePipeline(
+                frame_shape=(height, width, 3),
+                read_frame=pipe_frame_reader(decoder_process.stdout),
+                write_frame=pipe_frame_writer(encoder_process.stdin),
+                process=process_frames,
+                batch_size=pairs_per_call,
+                queue_depth=8,
+                retain_frames=1,  # 上一批最后一帧是下一批第一对的第一帧
+            )
             
+            # 初始进度更新
+            base_progress = (current_idx - 1) / total_count
             self._update_progress(
-                (current_idx - 1 + 0.85) / total_count,
+                base_progress + 0.15,
                 f"正在处理 ({current_idx}/{total_count})",
                 input_path.name,
-                "等待帧写入完成..."
+                f"插帧处理中... 0/{expected_total} 帧 (0%)"
             )
             
-            # 发送结束信号（使用循环避免阻塞）
-            for _ in range(100):  # 最多尝试100次
+            try:
+                stats = pipeline.run(on_progress=on_pipeline_progress)
+            except BrokenPipeError:
+                logger.error("编码器管道断开")
+                stats = pipeline.stats
+            except Exception as e:
+                logger.error(f"插帧流水线出错: {e}")
+                stats = pipeline.stats
+            finally:
                 try:
-                    frame_queue.put(None, timeout=0.5)
-                    break
-                except queue.Full:
-                    # 队列满，等待写入线程消费
-                    if not writer.is_alive():
-                        break
+                    encoder_process.stdin.close()
+                    logger.info("已关闭编码器stdin")
+                except Exception as e:
+                    logger.warning(f"关闭stdin失败: {e}")
+            
+            original_frames_read = stats.frames_in
+            processed_frames = stats.frames_out
+            if original_frames_read == 0 and not self.should_cancel:
+                raise RuntimeError("无法读取视频帧")
             
-            # 等待写入线程结束
-            writer.join(timeout=60.0)  # 最多等60秒
-            if writer.is_alive():
-                logger.warning("写入线程超时，强制终止")
+            logger.info(f"视频帧读取完成，共读取 {original_frames_read} 帧")
+            logger.info(f"✓ 帧处理完成，共输出 {processed_frames} 帧 | {stats.summary()}")
             
             self._update_progress(
                 (current_idx - 1 + 0.90) / total_count,
@@ -28,7 +28,7 @@ from constants import (
     SenseVoiceModelInfo,
     WhisperModelInfo,
 )
-from services import ConfigService, FFmpegService, SpeechRecognitionService, TranslateService, VADService, VocalSeparationService, AISubtitleFixService, SUPPORTED_LANGUAGES
+from services import ConfigService, FFmpegService, SpeechRecognitionService, TranslateService, VADService, VocalSeparationService, AISubtitleFixService, JobStage, StagedJob, StagedJobScheduler, SUPPORTED_LANGUAGES
 from utils import format_file_size, logger, get_system_fonts, get_unique_path
 from utils.subtitle_utils import segments_to_srt
 from views.media.ffmpeg_install_view import FFmpegInstallView
@@ -121,7 +121,8 @@ class VideoSubtitleView(ft.Container):
         self.speech_service: SpeechRecognitionService = SpeechRecognitionService(
             model_dir,
             self.ffmpeg_service,
-            vad_service=self.vad_service
+            vad_service=self.vad_service,
+            config_service=self.config_service
         )
         
         self.expand: bool = True
@@ -136,7 +137,7 @@ class VideoSubtitleView(ft.Container):
         self.system_fonts = get_system_fonts()
         
         # 翻译服务
-        self.translate_service = TranslateService()
+        self.translate_service = TranslateService(self.config_service)
         self.enable_translation: bool = False
         self.target_language: str = "en"  # 默认翻译目标语言
         self.translate_engine: str = self.config_service.get_config_value("video_subtitle_translate_engine", "bing")  # bing 或 iflow
@@ -3199,8 +3200,6 @@ class VideoSubtitleView(ft.Container):
         Returns:
             翻译后的分段列表，每个分段额外包含 translated_text 字段
         """
-        import asyncio
-        
         # 如果使用心流 AI 翻译
         if self.translate_engine == "iflow" and self.ai_fix_service.is_configured():
             try:
@@ -3220,39 +3219,25 @@ class VideoSubtitleView(ft.Container):
                 logger.warning(f"心流 AI 翻译失败，回退到 Bing 翻译: {e}")
                 # 继续使用 Bing 翻译
         
-        # 使用 Bing 翻译 API（默认）
-        total = len(segments)
-        translated_segments = []
+        # 使用 Bing 翻译 API（默认）：整批打包请求，已翻译过的文本直接取自翻译记忆库
+        texts = [segment.get("text", "").strip() for segment in segments]
         
-        for i, segment in enumerate(segments):
-            text = segment.get("text", "").strip()
-            if not text:
-                segment["translated_text"] = ""
-                translated_segments.append(segment)
-                continue
-            
-            # 调用翻译 API（异步）
-            result = await self.translate_service.translate(
-                text=text,
-                target_lang=target_lang,
-                source_lang=""  # 自动检测源语言
-            )
-            
-            if result["code"] == 200:
-                segment["translated_text"] = result["data"]["text"]
-            else:
-                # 翻译失败，保留原文
-                logger.warning(f"翻译失败: {result['message']}, 保留原文")
-                segment["translated_text"] = text
-            
-            translated_segments.append(segment)
-            
+        def batch_progress(current, total):
             if progress_callback:
-                progress_callback(i + 1, total, f"翻译中... ({i + 1}/{total})")
-            
-            # 添加小延迟避免请求过于频繁
-            if i < total - 1:
-                await asyncio.sleep(0.05)
+                progress_callback(current, total, f"翻译中... ({current}/{total})")
+        
+        translations = await self.translate_service.translate_batch(
+            texts,
+            target_lang=target_lang,
+            source_lang="",  # 自动检测源语言
+            progress_callback=batch_progress,
+        )
+        
+        translated_segments = []
+        for segment, translated in zip(segments, translations):
+            # 翻译失败的条目保留原文
+            segment["translated_text"] = translated
+            translated_segments.append(segment)
         
         return translated_segments
     
@@ -3536,234 +3521,280 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
         self.progress_text.visible = True
         self.page.update()
         
-        def process_task():
+        # 处理期间使用启动时的选项，避免中途修改界面导致前后不一致
+        use_vocal = self.use_vocal_separation and self.vocal_loaded
+        use_ai_fix = self.use_ai_fix and self.ai_fix_service.is_configured()
+        enable_translation = self.enable_translation
+        target_language = self.target_language
+        export_subtitle = self.export_subtitle_checkbox.value
+        only_subtitle = self.only_subtitle_checkbox.value
+        subtitle_format = self.subtitle_format_dropdown.value
+        add_sequence = self.config_service.get_config_value("output_add_sequence", False)
+        
+        files = list(self.selected_files)
+        total = len(files)
+        # 各作业当前状态文本（作业序号 -> 状态），用于汇总显示
+        job_status: Dict[int, str] = {}
+        status_lock = threading.Lock()
+        progress = {"finished": 0, "stages_done": 0}
+        
+        def refresh_progress() -> None:
+            with status_lock:
+                lines = [f"已完成 {progress['finished']}/{total}"]
+                lines.extend(
+                    f"[{i + 1}/{total}] {files[i].name}: {job_status[i]}"
+                    for i in sorted(job_status)
+                )
+                stage_count = len(stages)
+                self.progress_text.value = "\n".join(lines)
+                self.progress_bar.value = min(1.0, progress["stages_done"] / (total * stage_count))
+            try:
+                self.page.update()
+            except:
+                pass
+        
+        def set_status(job: StagedJob, message: str) -> None:
+            with status_lock:
+                job_status[job.index] = message
+            refresh_progress()
+        
+        def complete_stage(job: StagedJob) -> None:
+            with status_lock:
+                job.data["stages_done"] = job.data.get("stages_done", 0) + 1
+                progress["stages_done"] += 1
+        
+        # 阶段1：提取音频（ffmpeg 解码，可与其他阶段并行）
+        def extract_stage(job: StagedJob) -> None:
+            file_path: Path = job.item
+            set_status(job, "提取音频...")
+            temp_audio = Path(tempfile.gettempdir()) / f"temp_audio_{file_path.stem}_{job.index}.wav"
+            job.data["temp_audio"] = temp_audio
+            self._extract_audio(file_path, temp_audio)
+            job.data["audio"] = temp_audio
+            complete_stage(job)
+        
+        # 阶段1.5：人声分离（独占分离模型）
+        def vocal_stage(job: StagedJob) -> None:
+            file_path: Path = job.item
+            set_status(job, "人声分离...")
+            temp_audio = job.data["temp_audio"]
             try:
-                total = len(self.selected_files)
+                # 创建临时目录存放分离结果
+                vocal_temp_dir = self.config_service.get_temp_dir() / "video_subtitle_vocals" / f"{file_path.stem}_{job.index}"
+                vocal_temp_dir.mkdir(parents=True, exist_ok=True)
+                job.data["vocal_temp_dir"] = vocal_temp_dir
                 
-                for idx, file_path in enumerate(self.selected_files):
-                    self.progress_text.value = f"处理中: {file_path.name} ({idx + 1}/{total})"
-                    self.progress_bar.value = idx / total
-                    self.page.update()
+                # 执行人声分离
+                vocals_path, _ = self.vocal_service.separate(
+                    temp_audio,
+                    vocal_temp_dir,
+                    output_format='wav'
+                )
+                
+                job.data["audio"] = vocals_path
+                logger.info(f"人声分离完成: {temp_audio} -> {vocals_path}")
+            except Exception as e:
+                logger.warning(f"人声分离失败，使用原始音频: {e}")
+            complete_stage(job)
+        
+        # 阶段2：语音识别（独占识别模型）
+        def asr_stage(job: StagedJob) -> None:
+            file_path: Path = job.item
+            set_status(job, "语音识别中...")
+            
+            def recognition_progress(message: str, prog: float):
+                set_status(job, message)
+            
+            segments = self.speech_service.recognize_with_timestamps(
+                job.data["audio"],
+                progress_callback=recognition_progress
+            )
+            
+            if not segments:
+                raise RuntimeError(f"语音识别失败: {file_path}")
+            job.data["segments"] = segments
+            complete_stage(job)
+        
+        # 阶段3：AI 修复、翻译、生成并导出字幕（主要是网络请求）
+        def subtitle_stage(job: StagedJob) -> None:
+            file_path: Path = job.item
+            segments = job.data["segments"]
+            
+            # AI 修复字幕（如果启用）
+            if use_ai_fix:
+                set_status(job, "AI 修复字幕...")
+                try:
+                    def ai_fix_progress(msg, prog):
+                        set_status(job, msg)
                     
-                    try:
-                        # 步骤1：提取音频
-                        self.progress_text.value = f"[{idx + 1}/{total}] 提取音频..."
-                        self.page.update()
-                        
-                        temp_audio = Path(tempfile.gettempdir()) / f"temp_audio_{file_path.stem}.wav"
-                        self._extract_audio(file_path, temp_audio)
-                        
-                        # 步骤1.5：人声分离（如果启用）
-                        audio_for_recognition = temp_audio
-                        if self.use_vocal_separation and self.vocal_loaded:
-                            self.progress_text.value = f"[{idx + 1}/{total}] 人声分离..."
-                            self.page.update()
-                            
-                            try:
-                                # 创建临时目录存放分离结果
-                                vocal_temp_dir = self.config_service.get_temp_dir() / "video_subtitle_vocals" / f"{file_path.stem}_{idx}"
-                                vocal_temp_dir.mkdir(parents=True, exist_ok=True)
-                                
-                                # 执行人声分离
-                                vocals_path, _ = self.vocal_service.separate(
-                                    temp_audio,
-                                    vocal_temp_dir,
-                                    output_format='wav'
-                                )
-                                
-                                audio_for_recognition = vocals_path
-                                logger.info(f"人声分离完成: {temp_audio} -> {vocals_path}")
-                            except Exception as e:
-                                logger.warning(f"人声分离失败，使用原始音频: {e}")
-                                audio_for_recognition = temp_audio
-                        
-                        # 步骤2：语音识别
-                        self.progress_text.value = f"[{idx + 1}/{total}] 语音识别中..."
-                        self.page.update()
-                        
-                        def recognition_progress(message: str, progress: float):
-                            self.progress_text.value = f"[{idx + 1}/{total}] {message}"
-                            self.progress_bar.value = (idx + progress * 0.5) / total
-                            try:
-                                self.page.update()
-                            except:
-                                pass
-                        
-                        segments = self.speech_service.recognize_with_timestamps(
-                            audio_for_recognition,
-                            progress_callback=recognition_progress
-                        )
-                        
-                        if not segments:
-                            logger.error(f"语音识别失败: {file_path}")
-                            continue
-                        
-                        # 步骤2.5：AI 修复字幕（如果启用）
-                        if self.use_ai_fix and self.ai_fix_service.is_configured():
-                            self.progress_text.value = f"[{idx + 1}/{total}] AI 修复字幕..."
-                            self.page.update()
-                            
-                            try:
-                                def ai_fix_progress(msg, prog):
-                                    self.progress_text.value = f"[{idx + 1}/{total}] {msg}"
-                                    try:
-                                        self.page.update()
-                                    except:
-                                        pass
-                                
-                                segments = self.ai_fix_service.fix_segments(
-                                    segments,
-                                    language="auto",
-                                    progress_callback=ai_fix_progress
-                                )
-                                logger.info(f"AI 修复完成: {file_path.name}")
-                            except Exception as e:
-                                logger.warning(f"AI 修复失败，使用原始结果: {e}")
-                        
-                        # 步骤3：获取视频信息
-                        video_info = self.ffmpeg_service.safe_probe(str(file_path))
-                        if not video_info:
-                            logger.error(f"无法获取视频信息: {file_path}")
-                            continue
-                        
-                        video_stream = next(
-                            (s for s in video_info.get('streams', []) if s.get('codec_type') == 'video'),
-                            None
+                    segments = self.ai_fix_service.fix_segments(
+                        segments,
+                        language="auto",
+                        progress_callback=ai_fix_progress
+                    )
+                    logger.info(f"AI 修复完成: {file_path.name}")
+                except Exception as e:
+                    logger.warning(f"AI 修复失败，使用原始结果: {e}")
+            
+            # 获取视频信息
+            video_info = self.ffmpeg_service.safe_probe(str(file_path))
+            if not video_info:
+                raise RuntimeError(f"无法获取视频信息: {file_path}")
+            
+            video_stream = next(
+                (s for s in video_info.get('streams', []) if s.get('codec_type') == 'video'),
+                None
+            )
+            if not video_stream:
+                raise RuntimeError(f"未找到视频流: {file_path}")
+            
+            video_width = video_stream.get('width', 1920)
+            video_height = video_stream.get('height', 1080)
+            
+            # 如果启用翻译，进行翻译
+            if enable_translation:
+                set_status(job, "翻译字幕...")
+                
+                import asyncio
+                
+                def translate_progress(current, total_items, msg):
+                    set_status(job, msg)
+                
+                # 异步翻译（每个工作线程使用独立的事件循环）
+                loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(loop)
+                try:
+                    segments = loop.run_until_complete(
+                        self._translate_segments(
+                            segments, 
+                            target_language,
+                            translate_progress
                         )
-                        if not video_stream:
-                            logger.error(f"未找到视频流: {file_path}")
-                            continue
-                        
-                        video_width = video_stream.get('width', 1920)
-                        video_height = video_stream.get('height', 1080)
-                        
-                        # 步骤3.5：如果启用翻译，进行翻译
-                        if self.enable_translation:
-                            self.progress_text.value = f"[{idx + 1}/{total}] 翻译字幕..."
-                            self.page.update()
-                            
-                            import asyncio
-                            
-                            def translate_progress(current, total_items, msg):
-                                self.progress_text.value = f"[{idx + 1}/{total}] {msg}"
-                                self.page.update()
-                            
-                            # 异步翻译
-                            loop = asyncio.new_event_loop()
-                            asyncio.set_event_loop(loop)
-                            try:
-                                segments = loop.run_until_complete(
-                                    self._translate_segments(
-                                        segments, 
-                                        self.target_language,
-                                        translate_progress
-                                    )
-                                )
-                            finally:
-                                loop.close()
-                        
-                        # 获取该视频的设置
-                        video_settings = self._get_video_settings(file_path)
-                        
-                        # 计算每行最大字符数
-                        font_size = int(video_settings["font_size"])
-                        max_width_pct = int(video_settings["max_width"])
-                        estimated_char_width = font_size * 0.6  # 估算字符宽度
-                        max_line_width = video_width * max_width_pct / 100
-                        max_chars_per_line = int(max_line_width / estimated_char_width)
-                        max_chars_per_line = max(10, min(max_chars_per_line, 50))  # 限制范围
-                        
-                        # 步骤4：生成 ASS 字幕
-                        self.progress_text.value = f"[{idx + 1}/{total}] 生成字幕..."
-                        self.page.update()
-                        
-                        ass_style = self._generate_ass_style(video_width, video_height, file_path)
-                        ass_events = self._segments_to_ass_events(segments, max_chars_per_line)
-                        ass_content = ass_style + ass_events
-                        
-                        temp_ass = Path(tempfile.gettempdir()) / f"temp_subtitle_{file_path.stem}.ass"
-                        with open(temp_ass, 'w', encoding='utf-8') as f:
-                            f.write(ass_content)
-                        
-                        # 步骤4.5：导出字幕文件（如果启用）
-                        export_subtitle = self.export_subtitle_checkbox.value
-                        only_subtitle = self.only_subtitle_checkbox.value
-                        subtitle_format = self.subtitle_format_dropdown.value
-                        
-                        if export_subtitle:
-                            self.progress_text.value = f"[{idx + 1}/{total}] 导出字幕文件..."
-                            self.page.update()
-                            
-                            if output_dir:
-                                subtitle_dir = output_dir
-                            else:
-                                subtitle_dir = file_path.parent
-                            
-                            # 根据全局设置决定是否添加序号
-                            add_sequence = self.config_service.get_config_value("output_add_sequence", False)
-                            
-                            if subtitle_format == "ass":
-                                # 导出 ASS 格式
-                                subtitle_path = subtitle_dir / f"{file_path.stem}.ass"
-                                subtitle_path = get_unique_path(subtitle_path, add_sequence=add_sequence)
-                                with open(subtitle_path, 'w', encoding='utf-8') as f:
-                                    f.write(ass_content)
-                                logger.info(f"已导出 ASS 字幕: {subtitle_path}")
-                            else:
-                                # 导出 SRT 格式
-                                subtitle_path = subtitle_dir / f"{file_path.stem}.srt"
-                                subtitle_path = get_unique_path(subtitle_path, add_sequence=add_sequence)
-                                srt_content = self._segments_to_srt(segments)
-                                with open(subtitle_path, 'w', encoding='utf-8') as f:
-                                    f.write(srt_content)
-                                logger.info(f"已导出 SRT 字幕: {subtitle_path}")
-                        
-                        # 步骤5：烧录字幕到视频（如果不是"仅导出字幕"模式）
-                        if not only_subtitle:
-                            self.progress_text.value = f"[{idx + 1}/{total}] 烧录字幕..."
-                            self.progress_bar.value = (idx + 0.7) / total
-                            self.page.update()
-                            
-                            if output_dir:
-                                output_path = output_dir / f"{file_path.stem}_subtitled.mp4"
-                            else:
-                                output_path = file_path.parent / f"{file_path.stem}_subtitled.mp4"
-                            
-                            # 根据全局设置决定是否添加序号
-                            add_sequence = self.config_service.get_config_value("output_add_sequence", False)
-                            output_path = get_unique_path(output_path, add_sequence=add_sequence)
-                            
-                            # 获取字体目录（如果使用外部字体）
-                            font_dir = None
-                            custom_font_path = video_settings.get("custom_font_path")
-                            if custom_font_path and Path(custom_font_path).exists():
-                                font_dir = str(Path(custom_font_path).parent)
-                            
-                            self._burn_subtitles(file_path, temp_ass, output_path, font_dir)
-                            logger.info(f"处理完成: {output_path}")
-                        else:
-                            logger.info(f"仅导出字幕完成: {file_path.name}")
-                        
-                        # 清理临时文件
-                        try:
-                            temp_audio.unlink()
-                            temp_ass.unlink()
-                            
-                            # 清理人声分离临时目录
-                            if self.use_vocal_separation and audio_for_recognition != temp_audio:
-                                import shutil
-                                vocal_temp_dir = self.config_service.get_temp_dir() / "video_subtitle_vocals" / f"{file_path.stem}_{idx}"
-                                if vocal_temp_dir.exists():
-                                    shutil.rmtree(vocal_temp_dir, ignore_errors=True)
-                                    logger.debug(f"已清理人声分离临时目录: {vocal_temp_dir}")
-                        except:
-                            pass
-                        
-                    except Exception as ex:
-                        logger.error(f"处理文件失败 {file_path}: {ex}", exc_info=True)
-                        continue
+                    )
+                finally:
+                    loop.close()
+            
+            # 获取该视频的设置
+            video_settings = self._get_video_settings(file_path)
+            job.data["video_settings"] = video_settings
+            
+            # 计算每行最大字符数
+            font_size = int(video_settings["font_size"])
+            max_width_pct = int(video_settings["max_width"])
+            estimated_char_width = font_size * 0.6  # 估算字符宽度
+            max_line_width = video_width * max_width_pct / 100
+            max_chars_per_line = int(max_line_width / estimated_char_width)
+            max_chars_per_line = max(10, min(max_chars_per_line, 50))  # 限制范围
+            
+            # 生成 ASS 字幕
+            set_status(job, "生成字幕...")
+            
+            ass_style = self._generate_ass_style(video_width, video_height, file_path)
+            ass_events = self._segments_to_ass_events(segments, max_chars_per_line)
+            ass_content = ass_style + ass_events
+            
+            temp_ass = Path(tempfile.gettempdir()) / f"temp_subtitle_{file_path.stem}_{job.index}.ass"
+            job.data["temp_ass"] = temp_ass
+            with open(temp_ass, 'w', encoding='utf-8') as f:
+                f.write(ass_content)
+            
+            # 导出字幕文件（如果启用）
+            if export_subtitle:
+                set_status(job, "导出字幕文件...")
+                
+                if output_dir:
+                    subtitle_dir = output_dir
+                else:
+                    subtitle_dir = file_path.parent
+                
+                if subtitle_format == "ass":
+                    # 导出 ASS 格式
+                    subtitle_path = subtitle_dir / f"{file_path.stem}.ass"
+                    subtitle_path = get_unique_path(subtitle_path, add_sequence=add_sequence)
+                    with open(subtitle_path, 'w', encoding='utf-8') as f:
+                        f.write(ass_content)
+                    logger.info(f"已导出 ASS 字幕: {subtitle_path}")
+                else:
+                    # 导出 SRT 格式
+                    subtitle_path = subtitle_dir / f"{file_path.stem}.srt"
+                    subtitle_path = get_unique_path(subtitle_path, add_sequence=add_sequence)
+                    srt_content = self._segments_to_srt(segments)
+                    with open(subtitle_path, 'w', encoding='utf-8') as f:
+                        f.write(srt_content)
+                    logger.info(f"已导出 SRT 字幕: {subtitle_path}")
+            
+            if only_subtitle:
+                logger.info(f"仅导出字幕完成: {file_path.name}")
+            complete_stage(job)
+        
+        # 阶段4：烧录字幕到视频（libx264 编码本身已多线程）
+        def burn_stage(job: StagedJob) -> None:
+            file_path: Path = job.item
+            set_status(job, "烧录字幕...")
+            
+            if output_dir:
+                output_path = output_dir / f"{file_path.stem}_subtitled.mp4"
+            else:
+                output_path = file_path.parent / f"{file_path.stem}_subtitled.mp4"
+            
+            output_path = get_unique_path(output_path, add_sequence=add_sequence)
+            
+            # 获取字体目录（如果使用外部字体）
+            font_dir = None
+            custom_font_path = job.data["video_settings"].get("custom_font_path")
+            if custom_font_path and Path(custom_font_path).exists():
+                font_dir = str(Path(custom_font_path).parent)
+            
+            self._burn_subtitles(file_path, job.data["temp_ass"], output_path, font_dir)
+            logger.info(f"处理完成: {output_path}")
+            complete_stage(job)
+        
+        def on_job_finished(job: StagedJob) -> None:
+            # 清理临时文件
+            for key in ("temp_audio", "temp_ass"):
+                temp_path = job.data.get(key)
+                if temp_path:
+                    try:
+                        Path(temp_path).unlink(missing_ok=True)
+                    except Exception:
+                        pass
+            
+            # 清理人声分离临时目录
+            vocal_temp_dir = job.data.get("vocal_temp_dir")
+            if vocal_temp_dir and vocal_temp_dir.exists():
+                import shutil
+                shutil.rmtree(vocal_temp_dir, ignore_errors=True)
+                logger.debug(f"已清理人声分离临时目录: {vocal_temp_dir}")
+            
+            with status_lock:
+                job_status.pop(job.index, None)
+                progress["finished"] += 1
+                # 失败的作业跳过的阶段也计入进度
+                progress["stages_done"] += len(stages) - job.data.get("stages_done", 0)
+            refresh_progress()
+        
+        # 各阶段并发数：模型推理阶段独占模型，ffmpeg 和网络阶段可以并行
+        stages: List[JobStage] = [
+            JobStage("extract", extract_stage, self.config_service.get_config_value("video_subtitle_extract_workers", 2)),
+        ]
+        if use_vocal:
+            stages.append(JobStage("vocal", vocal_stage, 1))
+        stages.append(JobStage("asr", asr_stage, 1))
+        stages.append(JobStage("subtitle", subtitle_stage, self.config_service.get_config_value("video_subtitle_text_workers", 2)))
+        if not only_subtitle:
+            stages.append(JobStage("burn", burn_stage, self.config_service.get_config_value("video_subtitle_burn_workers", 1)))
+        
+        scheduler = StagedJobScheduler(stages)
+        
+        def process_task():
+            try:
+                jobs = scheduler.run(files, on_job_finished=on_job_finished)
+                succeeded = sum(1 for job in jobs if job.success)
                 
-                self.progress_text.value = f"处理完成，共处理 {total} 个文件"
+                if succeeded == total:
+                    self.progress_text.value = f"处理完成，共处理 {total} 个文件"
+                else:
+                    self.progress_text.value = f"处理完成，成功 {succeeded} 个，失败 {total - succeeded} 个"
                 self.progress_bar.value = 1.0
                 self.page.update()
                 
@@ -3876,6 +3907,9 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
         # 卸载语音识别模型
         if hasattr(self, 'speech_service') and self.speech_service:
             self.speech_service.unload_model()
+        # 关闭翻译服务的后台事件循环、连接池和翻译记忆库
+        if hasattr(self, 'translate_service') and self.translate_service:
+            self.translate_service.close()
         # 清除回调引用，打破循环引用
         self.on_back = None
         # 清除 UI 内容
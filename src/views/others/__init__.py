@@ -1,12 +1,19 @@
 # -*- coding: utf-8 -*-
 """其他工具视图模块。"""
 
-from .others_view import OthersView
-from .windows_update_view import WindowsUpdateView
-from .image_to_url_view import ImageToUrlView
-from .file_to_url_view import FileToUrlView
-from .icp_query_view import ICPQueryView
-from .id_photo_view import IDPhotoView
-from .translate_view import TranslateView
+from utils.lazy_import import lazy_exports
+
+# 视图模块在首次访问时再导入
+_LAZY_EXPORTS = {
+    "OthersView": ".others_view",
+    "WindowsUpdateView": ".windows_update_view",
+    "ImageToUrlView": ".image_to_url_view",
+    "FileToUrlView": ".file_to_url_view",
+    "ICPQueryView": ".icp_query_view",
+    "IDPhotoView": ".id_photo_view",
+    "TranslateView": ".translate_view",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _LAZY_EXPORTS, globals())
 
 __all__ = ["OthersView", "WindowsUpdateView", "ImageToUrlView", "FileToUrlView", "ICPQueryView", "IDPhotoView", "TranslateView"]
@@ -1263,6 +1263,72 @@ class IDPhotoView(ft.Container):
         add_sequence = self.config_service.get_config_value("output_add_sequence", False) if self.config_service else False
         return get_unique_path(output_path, add_sequence=add_sequence)
     
+    def _load_image(self, file_path: Path) -> np.ndarray:
+        """读取图片为 BGR 格式的 numpy 数组。"""
+        if not file_path.exists():
+            raise ValueError(f"文件不存在: {file_path}")
+        
+        file_ext = file_path.suffix.lower()
+        if file_ext in ['.heic', '.heif']:
+            from PIL import Image as PILImage
+            pil_image = PILImage.open(file_path)
+            if pil_image.mode != 'RGB':
+                pil_image = pil_image.convert('RGB')
+            image = np.array(pil_image)
+            image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+        else:
+            with open(file_path, 'rb') as f:
+                file_data = f.read()
+            file_array = np.frombuffer(file_data, dtype=np.uint8)
+            image = cv2.imdecode(file_array, cv2.IMREAD_COLOR)
+        
+        if image is None:
+            raise ValueError("无法读取图片文件")
+        
+        return image
+    
+    def _save_result(self, file_path: Path, result: IDPhotoResult) -> None:
+        """保存证件照处理结果（标准照、高清照和排版照）。"""
+        standard_path = self._get_output_path(file_path, "_standard")
+        hd_path = self._get_output_path(file_path, "_hd")
+        
+        # 标准照：根据KB限制选项决定格式和压缩
+        if self.kb_limit_checkbox.value:
+            # 启用KB限制，压缩为JPEG
+            try:
+                target_kb = int(self.kb_value_field.value)
+                if target_kb <= 0:
+                    target_kb = 48
+            except ValueError:
+                target_kb = 48
+        
+            standard_compressed = self.id_photo_service.compress_image_to_kb(result.standard, target_kb=target_kb)
+            # 对 JPG 路径也应用序号设置
+            jpg_path = standard_path.with_suffix('.jpg')
+            add_sequence = self.config_service.get_config_value("output_add_sequence", False) if self.config_service else False
+            jpg_path = get_unique_path(jpg_path, add_sequence=add_sequence)
+            with open(jpg_path, 'wb') as f:
+                f.write(standard_compressed)
+        else:
+            # 不限制KB，保存为PNG
+            is_success, buffer = cv2.imencode('.png', result.standard)
+            if is_success:
+                with open(standard_path, 'wb') as f:
+                    f.write(buffer)
+        
+        # 高清照保存为PNG格式（无损）
+        is_success, buffer = cv2.imencode('.png', result.hd)
+        if is_success:
+            with open(hd_path, 'wb') as f:
+                f.write(buffer)
+        
+        if result.layout is not None:
+            layout_path = self._get_output_path(file_path, "_layout")
+            is_success, buffer = cv2.imencode('.png', result.layout)
+            if is_success:
+                with open(layout_path, 'wb') as f:
+                    f.write(buffer)
+    
     def _on_generate_click(self, e: ft.ControlEvent) -> None:
         """批量生成证件照。"""
         if not self.selected_files or self.is_processing:
@@ -1292,93 +1358,62 @@ class IDPhotoView(ft.Container):
             success_count = 0
             failed_count = 0
             
-            for idx, file_path in enumerate(self.selected_files):
+            batch_size = self.id_photo_service.batch_size
+            
+            for start in range(0, total_files, batch_size):
+                chunk = self.selected_files[start:start + batch_size]
+                
+                # 更新进度
+                self.progress_bar.value = start / total_files
+                self.progress_text.value = (
+                    f"正在处理 ({start + 1}-{start + len(chunk)}/{total_files}): {chunk[0].name}"
+                )
+                self._safe_update()
+                
+                # 读取图片
+                loaded_files = []
+                images = []
+                for file_path in chunk:
+                    try:
+                        images.append(self._load_image(file_path))
+                        loaded_files.append(file_path)
+                    except Exception as ex:
+                        logger.error(f"处理失败 {file_path.name}: {ex}")
+                        failed_count += 1
+                
+                if not images:
+                    continue
+                
+                # 处理（同一组图像的人脸检测合并推理）
                 try:
-                    # 更新进度
-                    self.progress_bar.value = idx / total_files
-                    self.progress_text.value = f"正在处理 ({idx + 1}/{total_files}): {file_path.name}"
-                    self._safe_update()
-                    
-                    # 读取图片
-                    if not file_path.exists():
-                        raise ValueError(f"文件不存在: {file_path}")
-                    
-                    file_ext = file_path.suffix.lower()
-                    if file_ext in ['.heic', '.heif']:
-                        from PIL import Image as PILImage
-                        pil_image = PILImage.open(file_path)
-                        if pil_image.mode != 'RGB':
-                            pil_image = pil_image.convert('RGB')
-                        image = np.array(pil_image)
-                        image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
-                    else:
-                        with open(file_path, 'rb') as f:
-                            file_data = f.read()
-                        file_array = np.frombuffer(file_data, dtype=np.uint8)
-                        image = cv2.imdecode(file_array, cv2.IMREAD_COLOR)
-                    
-                    if image is None:
-                        raise ValueError("无法读取图片文件")
-                    
-                    # 处理
-                    result = self.id_photo_service.process(
-                        image=image,
+                    results = self.id_photo_service.process_batch(
+                        images=images,
                         params=params,
                         bg_color=bg_color,
                         render_mode=render_mode,
                         generate_layout=generate_layout,
                         layout_size=layout_size,
-                        progress_callback=None,
                     )
+                except Exception as ex:
+                    results = [(None, ex)] * len(images)
+                del images
+                
+                for file_path, (result, error) in zip(loaded_files, results):
+                    if error is not None:
+                        logger.error(f"处理失败 {file_path.name}: {error}")
+                        failed_count += 1
+                        continue
                     
-                    # 保存结果
-                    standard_path = self._get_output_path(file_path, "_standard")
-                    hd_path = self._get_output_path(file_path, "_hd")
-                    
-                    # 标准照：根据KB限制选项决定格式和压缩
-                    if self.kb_limit_checkbox.value:
-                        # 启用KB限制，压缩为JPEG
-                        try:
-                            target_kb = int(self.kb_value_field.value)
-                            if target_kb <= 0:
-                                target_kb = 48
-                        except ValueError:
-                            target_kb = 48
+                    try:
+                        self._save_result(file_path, result)
                         
-                        standard_compressed = self.id_photo_service.compress_image_to_kb(result.standard, target_kb=target_kb)
-                        # 对 JPG 路径也应用序号设置
-                        jpg_path = standard_path.with_suffix('.jpg')
-                        add_sequence = self.config_service.get_config_value("output_add_sequence", False) if self.config_service else False
-                        jpg_path = get_unique_path(jpg_path, add_sequence=add_sequence)
-                        with open(jpg_path, 'wb') as f:
-                            f.write(standard_compressed)
-                    else:
-                        # 不限制KB，保存为PNG
-                        is_success, buffer = cv2.imencode('.png', result.standard)
-                        if is_success:
-                            with open(standard_path, 'wb') as f:
-                                f.write(buffer)
-                    
-                    # 高清照保存为PNG格式（无损）
-                    is_success, buffer = cv2.imencode('.png', result.hd)
-                    if is_success:
-                        with open(hd_path, 'wb') as f:
-                            f.write(buffer)
-                    
-                    if result.layout is not None:
-                        layout_path = self._get_output_path(file_path, "_layout")
-                        is_success, buffer = cv2.imencode('.png', result.layout)
-                        if is_success:
-                            with open(layout_path, 'wb') as f:
-                                f.write(buffer)
-                    
-                    # 保存到结果字典
-                    self.processing_results[str(file_path)] = result
-                    success_count += 1
-                    
-                except Exception as ex:
-                    logger.error(f"处理失败 {file_path.name}: {ex}")
-                    failed_count += 1
+                        # 保存到结果字典
+                        self.processing_results[str(file_path)] = result
+                        success_count += 1
+                        
+                    except Exception as ex:
+                        logger.error(f"处理失败 {file_path.name}: {ex}")
+                        failed_count += 1
             
             # 完成
             self.is_processing = False
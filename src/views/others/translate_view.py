@@ -51,7 +51,7 @@ class TranslateView(ft.Container):
         self.on_back: Optional[callable] = on_back
         
         # 翻译服务
-        self.bing_service: TranslateService = TranslateService()
+        self.bing_service: TranslateService = TranslateService(self.config_service)
         self.ai_service: AISubtitleFixService = AISubtitleFixService()
         
         # 加载 AI API Key
@@ -483,7 +483,9 @@ class TranslateView(ft.Container):
     
     def cleanup(self) -> None:
         """清理资源。"""
-        pass
+        # 关闭翻译服务的后台事件循环、连接池和翻译记忆库
+        if self.bing_service:
+            self.bing_service.close()
     
     def add_files(self, files: list) -> None:
         """处理拖放的文件。
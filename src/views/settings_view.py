@@ -6,7 +6,7 @@
 """
 
 from pathlib import Path
-from typing import Optional, List, Dict
+from typing import TYPE_CHECKING, Optional, List, Dict
 import threading
 import time
 import sys
@@ -16,7 +16,6 @@ from utils import logger
 from utils.file_utils import get_system_fonts
 
 import flet as ft
-import httpx
 
 from constants import (
     APP_VERSION,
@@ -26,10 +25,12 @@ from constants import (
     PADDING_MEDIUM,
     PADDING_SMALL,
 )
-from services import ConfigService, UpdateService, UpdateInfo, UpdateStatus
-from services.auto_updater import AutoUpdater
+from services import ConfigService
 from constants import APP_DESCRIPTION
 
+if TYPE_CHECKING:
+    from services import UpdateInfo
+
 
 def get_full_version_string() -> str:
     """获取完整的版本字符串（包含 CUDA 变体信息）。
@@ -96,6 +97,23 @@ class SettingsView(ft.Container):
         # 初始化文件选择器
         self._init_file_picker()
 
+    @staticmethod
+    def needs_startup_restore(config_service: ConfigService) -> bool:
+        """是否需要在启动时创建设置视图（恢复自定义字体或必应壁纸轮换）。
+        
+        Args:
+            config_service: 配置服务实例
+        
+        Returns:
+            需要在启动时恢复状态时返回 True，否则可在首次打开设置时再创建
+        """
+        if config_service.get_config_value("custom_font_file", None):
+            return True
+        if config_service.get_config_value("wallpaper_auto_switch", False):
+            return True
+        current_bg = config_service.get_config_value("background_image", None)
+        return bool(current_bg and isinstance(current_bg, str) and "bing.com" in current_bg.lower())
+
     def _init_file_picker(self) -> None:
         """初始化文件选择器。"""
         def on_font_file_picked(e: ft.FilePickerResultEvent):
@@ -1447,6 +1465,8 @@ class SettingsView(ft.Container):
             壁纸信息列表，每项包含 url、title、copyright 等字段，失败时返回 None
         """
         try:
+            import httpx
+            
             api = f"https://www.bing.com/HPImageArchive.aspx?format=js&n={n}&mkt=zh-CN"
             resp = httpx.get(api, timeout=10.0)
             resp.raise_for_status()
@@ -3377,6 +3397,8 @@ class SettingsView(ft.Container):
         
         # 在后台线程中检查更新
         def check_update_task():
+            from services import UpdateService, UpdateInfo, UpdateStatus
+            
             try:
                 update_service = UpdateService()
                 update_info = update_service.check_update()
@@ -3394,12 +3416,14 @@ class SettingsView(ft.Container):
         thread = threading.Thread(target=check_update_task, daemon=True)
         thread.start()
     
-    def _update_check_result(self, update_info: UpdateInfo) -> None:
+    def _update_check_result(self, update_info: "UpdateInfo") -> None:
         """更新检查结果到UI。
         
         Args:
             update_info: 更新信息对象
         """
+        from services import UpdateStatus
+        
         # 保存更新信息用于下载
         self._latest_update_info = update_info
         
@@ -3457,7 +3481,7 @@ class SettingsView(ft.Container):
             url = update_info.release_url or "https://github.com/HG-ha/MTools/releases"
             webbrowser.open(url)
     
-    def _show_update_dialog(self, update_info: UpdateInfo) -> None:
+    def _show_update_dialog(self, update_info: "UpdateInfo") -> None:
         """显示更新对话框。
         
         Args:
@@ -3545,7 +3569,7 @@ class SettingsView(ft.Container):
     
     def _start_auto_update(
         self, 
-        update_info: UpdateInfo,
+        update_info: "UpdateInfo",
         dialog: ft.AlertDialog,
         auto_btn: ft.ElevatedButton,
         manual_btn: ft.OutlinedButton,
@@ -3579,6 +3603,7 @@ class SettingsView(ft.Container):
         def update_task():
             try:
                 import asyncio
+                from services.auto_updater import AutoUpdater
                 updater = AutoUpdater()
                 
                 # 定义进度回调
@@ -3659,7 +3684,7 @@ class SettingsView(ft.Container):
         thread = threading.Thread(target=update_task, daemon=True)
         thread.start()
     
-    def _open_release_page(self, update_info: UpdateInfo, dialog: ft.AlertDialog) -> None:
+    def _open_release_page(self, update_info: "UpdateInfo", dialog: ft.AlertDialog) -> None:
         """打开 Release 页面。
         
         Args:
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""TranslateService 测试。
+
+使用本地模拟的认证和翻译服务（http.server），检查令牌复用、数组打包上限、
+翻译记忆库命中以及 close() 之后的复用。
+
+运行:
+    python -m pytest tests/test_translate_service.py
+    python -m unittest discover tests
+"""
+
+import asyncio
+import base64
+import json
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List
+from urllib.parse import parse_qs, urlparse
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from services.translate_service import TranslateService  # noqa: E402
+
+
+def _make_token() -> str:
+    """生成一小时后过期的 JWT 形式令牌（签名部分不校验）。"""
+    payload = json.dumps({"exp": int(time.time()) + 3600}).encode()
+    body = base64.urlsafe_b64encode(payload).decode().rstrip("=")
+    return f"header.{body}.signature"
+
+
+class _MockTranslator:
+    """本地模拟的认证和翻译服务，记录收到的请求。"""
+
+    def __init__(self) -> None:
+        self.token = _make_token()
+        self.token_fetches = 0
+        # 每次翻译请求的原文数组
+        self.batches: List[List[str]] = []
+        self._lock = threading.Lock()
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args) -> None:
+                pass
+
+            def _reply(self, status: int, body: bytes, content_type: str) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self) -> None:
+                with mock._lock:
+                    mock.token_fetches += 1
+                self._reply(200, mock.token.encode(), "text/plain")
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", 0))
+                items = json.loads(self.rfile.read(length))
+                query = parse_qs(urlparse(self.path).query)
+                if self.headers.get("authorization") != f"Bearer {mock.token}":
+                    self._reply(401, b'{"error": {"code": 401000}}', "application/json")
+                    return
+                texts = [item["Text"] for item in items]
+                with mock._lock:
+                    mock.batches.append(texts)
+                target = query["to"][0]
+                result = [{"translations": [{"text": f"[{target}] {text}", "to": target}]} for text in texts]
+                self._reply(200, json.dumps(result).encode(), "application/json")
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "_MockTranslator":
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.token_fetches = 0
+            self.batches = []
+
+
+class TranslateServiceTest(unittest.TestCase):
+    """TranslateService 的请求打包、令牌复用和翻译记忆库。"""
+
+    def setUp(self) -> None:
+        self.mock = _MockTranslator().start()
+        self.addCleanup(self.mock.stop)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.service = TranslateService(
+            memory_path=Path(self.tmp.name) / "memory.db",
+            auth_url=f"{self.mock.base_url}/auth",
+            translate_url=f"{self.mock.base_url}/translate",
+        )
+        self.addCleanup(self.service.close)
+        # 测试中不需要限速
+        self.service.REQUESTS_PER_SECOND = 1000.0
+
+    def translate_batch(self, texts: List[str], target: str = "zh-Hans") -> List[str]:
+        return asyncio.run(self.service.translate_batch(texts, target_lang=target))
+
+    def test_batch_reuses_token_and_packs_arrays(self) -> None:
+        # 1500 行中有 700 条不同文本（另有重复行和空行）
+        unique = [f"line {i}" for i in range(700)]
+        lines = [unique[i % 700] if i % 50 else "  " for i in range(1500)]
+
+        results = self.translate_batch(lines)
+
+        self.assertEqual(results, [f"[zh-Hans] {line}" if line.strip() else "" for line in lines])
+        self.assertEqual(self.mock.token_fetches, 1)
+        self.assertEqual(len(self.mock.batches), 7)
+        sent = [text for batch in self.mock.batches for text in batch]
+        self.assertEqual(sorted(sent), sorted(set(line for line in lines if line.strip())))
+        for batch in self.mock.batches:
+            self.assertLessEqual(len(batch), TranslateService.BATCH_MAX_ITEMS)
+
+    def test_batch_respects_char_limit(self) -> None:
+        texts = [f"{i:04d}" + "x" * 2996 for i in range(10)]
+
+        results = self.translate_batch(texts)
+
+        self.assertEqual(results, [f"[zh-Hans] {text}" for text in texts])
+        # 每条 3000 字符，每个请求最多 3 条
+        self.assertEqual([len(batch) for batch in self.mock.batches].count(3), 3)
+        self.assertEqual(len(self.mock.batches), 4)
+        for batch in self.mock.batches:
+            self.assertLessEqual(sum(map(len, batch)), TranslateService.BATCH_MAX_CHARS)
+
+    def test_memory_hits_send_no_requests(self) -> None:
+        texts = [f"sentence {i}" for i in range(150)]
+        first = self.translate_batch(texts)
+        self.mock.reset()
+
+        second = self.translate_batch(texts)
+
+        self.assertEqual(second, first)
+        self.assertEqual(self.mock.batches, [])
+        self.assertEqual(self.mock.token_fetches, 0)
+
+        # 目标语言不同时不命中
+        self.translate_batch(texts[:10], target="ja")
+        self.assertEqual(self.mock.batches, [texts[:10]])
+
+    def test_reuse_after_close(self) -> None:
+        self.translate_batch(["hello"])
+        self.service.close()
+        self.mock.reset()
+
+        # 记忆库重新打开，已有译文不再请求
+        self.assertEqual(self.translate_batch(["hello"]), ["[zh-Hans] hello"])
+        self.assertEqual(self.mock.batches, [])
+
+        result = asyncio.run(self.service.translate("world"))
+        self.assertEqual(result["code"], 200)
+        self.assertEqual(result["data"]["text"], "[zh-Hans] world")
+        self.assertEqual(self.mock.batches, [["world"]])
+        # 令牌仍在有效期内，关闭后继续使用
+        self.assertEqual(self.mock.token_fetches, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()